@@ -0,0 +1,96 @@
+"""Benchmark of the time taken to import quilt_knit modules, measured with python -X importtime in fresh interpreters.
+
+Examples:
+    $ python benchmarks/bench_import_time.py
+    $ python benchmarks/bench_import_time.py quilt_knit.quilt.Quilt --repeat 10 --top 20 --json import_time.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES: list[str] = ["quilt_knit.cli", "quilt_knit.swatch.Swatch", "quilt_knit.quilt.Quilt", "quilt_knit.quilt.Quilt_Spec", "quilt_knit.Quilt_Merge_Worker"]
+"""The modules imported by short command-line invocations and worker processes."""
+DEFERRED_PACKAGES: list[str] = ["knitout_to_dat_python", "parglare"]
+"""Packages that are only imported on first use: the DAT backend is only needed to compile DAT files and the knitout parser is only needed to read knitout text."""
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+_SOURCE_DIRECTORY: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """
+    Imports the given module in a fresh interpreter.
+
+    Args:
+        module (str): The name of the module to import.
+
+    Returns:
+        dict[str, tuple[int, int]]: The self and cumulative import time, in microseconds, of every module imported by the given module, keyed by module name.
+    """
+    environment = {**os.environ, "PYTHONPATH": os.pathsep.join(path for path in [_SOURCE_DIRECTORY, os.environ.get("PYTHONPATH")] if path)}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, env=environment, check=True)
+    times: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match is not None:
+            times[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return times
+
+
+def benchmark_module(module: str, repeat: int = 5, top: int = 10) -> dict[str, object]:
+    """
+    Args:
+        module (str): The name of the module to import.
+        repeat (int, optional): The number of fresh interpreters to import the module in. Defaults to 5.
+        top (int, optional): The number of imported modules with the largest cumulative import time to report. Defaults to 10.
+
+    Returns:
+        dict[str, object]:
+            The median and minimum import time of the module in milliseconds, the deferred packages that it imported,
+            and the imported modules with the largest cumulative import time in the fastest run.
+    """
+    runs = [import_times(module) for _ in range(repeat)]
+    fastest = min(runs, key=lambda times: times[module][1])
+    cumulative_ms = [times[module][1] / 1000 for times in runs]
+    slowest_imports = sorted(((name, times[1] / 1000) for name, times in fastest.items() if name != module), key=lambda item: -item[1])[:top]
+    return {"module": module, "median_ms": statistics.median(cumulative_ms), "min_ms": min(cumulative_ms),
+            "deferred_packages_imported": [package for package in DEFERRED_PACKAGES if package in fastest],
+            "slowest_imports_ms": dict(slowest_imports)}
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Reports the import time of each given module.
+
+    Args:
+        argv (list[str], optional): The command-line arguments, not including the program name. Defaults to the arguments of this process.
+
+    Returns:
+        int: The exit status: 0 if no module imported a deferred package, otherwise 1.
+    """
+    parser = argparse.ArgumentParser(description="Measure the import time of quilt_knit modules with python -X importtime.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="The modules to import. Defaults to the modules used by the command line and workers.")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of fresh interpreters to import each module in. Defaults to 5.")
+    parser.add_argument("--top", type=int, default=10, help="The number of slowest imported modules to report for each module. Defaults to 10.")
+    parser.add_argument("--json", default=None, help="The path of a JSON report to write.")
+    arguments = parser.parse_args(argv)
+    results = [benchmark_module(module, arguments.repeat, arguments.top) for module in arguments.modules]
+    for result in results:
+        print(f"{result['module']}: median {result['median_ms']:.1f} ms, min {result['min_ms']:.1f} ms")
+        for name, milliseconds in result["slowest_imports_ms"].items():
+            print(f"    {milliseconds:8.1f} ms  {name}")
+        if len(result["deferred_packages_imported"]) > 0:
+            print(f"    imports deferred packages: {', '.join(result['deferred_packages_imported'])}")
+    if arguments.json is not None:
+        with open(arguments.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+    return 1 if any(len(result["deferred_packages_imported"]) > 0 for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
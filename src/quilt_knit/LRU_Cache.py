@@ -0,0 +1,89 @@
+"""Module containing the LRU_Cache class used to bound the caches kept by long-running merges."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Generic, TypeVar
+
+_Key = TypeVar("_Key")
+_Value = TypeVar("_Value")
+
+
+class LRU_Cache(Generic[_Key, _Value]):
+    """
+    A mapping that holds at most a fixed number of entries, evicting the least recently used entry when a new entry would exceed that number.
+
+    Attributes:
+        max_entries (int | None): The maximum number of entries held by the cache, or None if the cache is unbounded.
+        hits (int): The number of lookups that found an entry.
+        misses (int): The number of lookups that did not find an entry.
+        evictions (int): The number of entries evicted to make room for new entries.
+    """
+
+    def __init__(self, max_entries: int | None = None):
+        """
+        Args:
+            max_entries (int, optional): The maximum number of entries held by the cache. Defaults to an unbounded cache.
+
+        Raises:
+            ValueError: If max_entries is less than 1.
+        """
+        if max_entries is not None and max_entries < 1:
+            raise ValueError(f"An LRU cache must hold at least one entry, not {max_entries}")
+        self.max_entries: int | None = max_entries
+        self._entries: OrderedDict[_Key, _Value] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def get(self, key: _Key) -> _Value | None:
+        """
+        Args:
+            key (_Key): The key to look up. A found key becomes the most recently used entry.
+
+        Returns:
+            _Value | None: The value cached for the given key or None if the key is not cached.
+        """
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: _Key, value: _Value) -> None:
+        """
+        Caches the given value as the most recently used entry, evicting the least recently used entries beyond the size of the cache.
+
+        Args:
+            key (_Key): The key of the value.
+            value (_Value): The value to cache.
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key: _Key) -> bool:
+        """
+        Args:
+            key (_Key): The key to check. Checking a key does not change its use order or the hit and miss counts.
+
+        Returns:
+            bool: True if the key is cached.
+        """
+        return key in self._entries
+
+    def __len__(self) -> int:
+        """
+        Returns:
+            int: The number of cached entries.
+        """
+        return len(self._entries)
+
+    def report(self) -> dict[str, int | None]:
+        """
+        Returns:
+            dict[str, int | None]: The size, bound, hits, misses and evictions of this cache.
+        """
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
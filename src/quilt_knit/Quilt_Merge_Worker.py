@@ -0,0 +1,252 @@
+"""Module containing the Quilt_Merge_Worker class, a long-running process that merges quilt jobs with caches kept warm between jobs."""
+from __future__ import annotations
+
+import json
+import os
+import socket
+from collections.abc import Callable
+from time import perf_counter, sleep
+from types import TracebackType
+from typing import Any
+
+from quilt_knit.LRU_Cache import LRU_Cache
+from quilt_knit.quilt.Quilt_Spec import Quilt_Spec
+from quilt_knit.swatch.Dat_Compile_Pool import Dat_Compile_Pool
+from quilt_knit.swatch.Swatch_Cache import Swatch_Cache
+
+
+class Quilt_Merge_Worker:
+    """
+    A worker that stays resident and merges quilt jobs from a spool directory or a UNIX socket.
+    The imports, the DAT compiling processes, the executed swatch programs and the merged results are kept between jobs, so each job only pays for the work that differs from prior jobs.
+
+    A spool directory has four job directories and a results directory:
+        * incoming: Specification files submitted as jobs. Relative swatch paths in a specification are resolved from this directory.
+        * processing: The jobs claimed by a worker. A job is claimed by moving it, so several workers can share a spool directory.
+        * done and failed: The finished jobs.
+        * results: A directory for each finished job, named after its specification file, that holds its output files and its metrics.json.
+
+    A UNIX socket accepts one JSON request per line and answers each request with one line of JSON metrics. A request holds either a "spec_path" or an inline "spec" object.
+    It may also hold an "output_dir" (defaults to the working directory of the worker) and a "base_directory" for an inline specification's relative swatch paths.
+
+    Examples:
+        >>> with Quilt_Merge_Worker(cache_directory="swatch_cache") as worker:
+        ...     worker.serve_spool("quilt_spool")
+
+    Attributes:
+        swatch_cache (Swatch_Cache): The bounded cache of executed swatch programs shared by all jobs.
+        merge_results (LRU_Cache[str, list[tuple[str, bytes]]]): The bounded cache of merged swatch programs, keyed by the content digest of the merged specification.
+        compile_pool (Dat_Compile_Pool): The processes that compile DAT files for all jobs.
+        profile (bool): If True, the metrics of each merged job include a profile of its merge.
+        jobs_completed (int): The number of jobs merged by this worker.
+        jobs_failed (int): The number of jobs that failed.
+
+    Notes:
+        * Merges modify the swatches they merge, so swatches are cached as executed programs and each job constructs its own swatches from them.
+        * Seam plans are not cached. Quilt merges do not plan their seams with a Course_Seam_Planner or a Wale_Transfer_Planner, so a job has no seam plans to reuse.
+    """
+    INCOMING: str = "incoming"
+    PROCESSING: str = "processing"
+    DONE: str = "done"
+    FAILED: str = "failed"
+    RESULTS: str = "results"
+    _SPEC_EXTENSIONS: tuple[str, ...] = (".json", ".toml")
+
+    def __init__(self, cache_directory: str | None = None, max_cached_swatches: int | None = 256, max_cached_merges: int | None = 64, workers: int | None = None,
+                 profile: bool = False):
+        """
+        Args:
+            cache_directory (str, optional): A directory of executed swatch programs shared with other workers and runs. Defaults to caching programs only in memory.
+            max_cached_swatches (int, optional): The maximum number of executed swatch programs kept in memory. Defaults to 256.
+            max_cached_merges (int, optional): The maximum number of merged results kept in memory. Defaults to 64.
+            workers (int, optional): The number of background processes that compile DAT files. Defaults to the number of processors.
+            profile (bool, optional): If True, the metrics of each merged job include a profile of its merge. Defaults to False.
+        """
+        self.swatch_cache: Swatch_Cache = Swatch_Cache(cache_directory, max_cached_swatches)
+        self.merge_results: LRU_Cache[str, list[tuple[str, bytes]]] = LRU_Cache(max_cached_merges)
+        self.compile_pool: Dat_Compile_Pool = Dat_Compile_Pool(workers)
+        self.profile: bool = profile
+        self.jobs_completed: int = 0
+        self.jobs_failed: int = 0
+
+    def run_job(self, spec: Quilt_Spec, output_directory: str) -> dict[str, object]:
+        """
+        Merges the given specification and waits for its DAT files to compile.
+
+        Args:
+            spec (Quilt_Spec): The specification of the quilt to merge.
+            output_directory (str): The directory to write the output files of the job to.
+
+        Returns:
+            dict[str, object]: The metrics of the job, including the time taken to compile each of its DAT files and the state of the worker's caches after the job.
+
+        Notes:
+            * The compile times of the job are popped from the shared compile pool, so the pool does not accumulate the compile times of every job served by the worker.
+        """
+        start = perf_counter()
+        os.makedirs(output_directory, exist_ok=True)
+        metrics = spec.merge(output_directory, self.swatch_cache, self.compile_pool, self.profile, merge_results=self.merge_results)
+        job_dats = [swatch["dat"] for swatch in metrics["swatches"] if swatch["dat"] is not None]
+        try:
+            compile_seconds = self.compile_pool.gather()
+            metrics["dat_compile_seconds"] = {dat: compile_seconds[dat] for dat in job_dats}
+        finally:
+            for dat in job_dats:
+                self.compile_pool.compile_seconds.pop(dat, None)
+        metrics["seconds"] = perf_counter() - start
+        metrics["swatch_cache"] = self.swatch_cache.report()
+        metrics["merge_cache"] = self.merge_results.report()
+        self.jobs_completed += 1
+        return metrics
+
+    def _run_job_or_report_error(self, load_spec: Callable[[], Quilt_Spec], output_directory: str) -> dict[str, object]:
+        """
+        Args:
+            load_spec (Callable[[], Quilt_Spec]): A function that loads the specification of the job.
+            output_directory (str): The directory to write the output files of the job to.
+
+        Returns:
+            dict[str, object]: The metrics of the job or, if the job failed, the error that it failed with.
+        """
+        try:
+            return self.run_job(load_spec(), output_directory)
+        except Exception as error:
+            self.jobs_failed += 1
+            return {"error": f"{type(error).__name__}: {error}"}
+
+    def process_spool(self, spool_directory: str, max_jobs: int | None = None) -> int:
+        """
+        Merges the jobs waiting in the incoming directory of the given spool directory, in sorted order.
+
+        Args:
+            spool_directory (str): The spool directory to take jobs from.
+            max_jobs (int, optional): The maximum number of jobs to merge. Defaults to merging every waiting job.
+
+        Returns:
+            int: The number of jobs merged or failed.
+        """
+        for job_directory in [self.INCOMING, self.PROCESSING, self.DONE, self.FAILED, self.RESULTS]:
+            os.makedirs(os.path.join(spool_directory, job_directory), exist_ok=True)
+        incoming_directory = os.path.join(spool_directory, self.INCOMING)
+        processed = 0
+        for file_name in sorted(os.listdir(incoming_directory)):
+            if max_jobs is not None and processed >= max_jobs:
+                break
+            if not file_name.endswith(self._SPEC_EXTENSIONS):
+                continue
+            processing_path = os.path.join(spool_directory, self.PROCESSING, file_name)
+            try:
+                os.rename(os.path.join(incoming_directory, file_name), processing_path)
+            except FileNotFoundError:  # Claimed by another worker.
+                continue
+            output_directory = os.path.join(spool_directory, self.RESULTS, os.path.splitext(file_name)[0])
+            os.makedirs(output_directory, exist_ok=True)
+            metrics = self._run_job_or_report_error(lambda: Quilt_Spec.load(processing_path, incoming_directory), output_directory)
+            with open(os.path.join(output_directory, "metrics.json"), "w") as metrics_file:
+                json.dump(metrics, metrics_file, indent=2)
+            os.replace(processing_path, os.path.join(spool_directory, self.FAILED if "error" in metrics else self.DONE, file_name))
+            processed += 1
+        return processed
+
+    def serve_spool(self, spool_directory: str, poll_seconds: float = 1.0, max_jobs: int | None = None) -> int:
+        """
+        Merges jobs from the given spool directory as they arrive.
+
+        Args:
+            spool_directory (str): The spool directory to take jobs from.
+            poll_seconds (float, optional): The time to wait before checking for new jobs when there are none. Defaults to 1 second.
+            max_jobs (int, optional): The number of jobs to merge before returning. Defaults to serving until the process is interrupted.
+
+        Returns:
+            int: The number of jobs merged or failed.
+        """
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            newly_processed = self.process_spool(spool_directory, None if max_jobs is None else max_jobs - processed)
+            processed += newly_processed
+            if newly_processed == 0:
+                sleep(poll_seconds)
+        return processed
+
+    def handle_request(self, request: Any) -> dict[str, object]:
+        """
+        Args:
+            request (Any): A decoded socket request. A valid request is a dictionary holding a "spec_path" or an inline "spec", and optionally an "output_dir" and a "base_directory".
+
+        Returns:
+            dict[str, object]: The metrics of the requested job or, if the request is invalid or the job failed, the error that it failed with.
+        """
+        if not isinstance(request, dict):
+            return {"error": f"Invalid request: expected a JSON object, got {type(request).__name__}"}
+        if "spec_path" in request:
+            def load_spec() -> Quilt_Spec:
+                return Quilt_Spec.load(request["spec_path"])
+        else:
+            def load_spec() -> Quilt_Spec:
+                return Quilt_Spec.from_dict(request["spec"], request.get("base_directory", "."))
+        return self._run_job_or_report_error(load_spec, request.get("output_dir", "."))
+
+    def serve_socket(self, socket_path: str, max_jobs: int | None = None) -> int:
+        """
+        Merges jobs requested over a UNIX socket at the given path, one request at a time.
+        An invalid request is answered with an error and does not stop the worker. If a client disconnects before its response is sent, the worker moves on to the next client.
+
+        Args:
+            socket_path (str): The path to bind the socket to. A stale socket file at this path is replaced.
+            max_jobs (int, optional): The number of jobs to merge before returning. Defaults to serving until the process is interrupted.
+
+        Returns:
+            int: The number of jobs merged or failed.
+        """
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        processed = 0
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(socket_path)
+            server.listen()
+            try:
+                while max_jobs is None or processed < max_jobs:
+                    connection, _address = server.accept()
+                    with connection, connection.makefile("rb") as requests:
+                        while max_jobs is None or processed < max_jobs:
+                            request_line = requests.readline()
+                            if len(request_line) == 0:  # The client closed the connection.
+                                break
+                            try:
+                                response = self.handle_request(json.loads(request_line))
+                            except Exception as error:
+                                response = {"error": f"Invalid request: {type(error).__name__}: {error}"}
+                            processed += 1
+                            try:
+                                connection.sendall(f"{json.dumps(response, default=str)}\n".encode())
+                            except OSError:  # The client disconnected before reading its response.
+                                break
+            finally:
+                os.remove(socket_path)
+        return processed
+
+    def report(self) -> dict[str, object]:
+        """
+        Returns:
+            dict[str, object]: The number of jobs completed and failed by this worker and the state of its caches.
+        """
+        return {"jobs_completed": self.jobs_completed, "jobs_failed": self.jobs_failed, "swatch_cache": self.swatch_cache.report(), "merge_cache": self.merge_results.report()}
+
+    def close(self) -> None:
+        """
+        Stops the DAT compiling processes of this worker after their compiles finish.
+        """
+        self.compile_pool.shutdown()
+
+    def __enter__(self) -> Quilt_Merge_Worker:
+        """
+        Returns:
+            Quilt_Merge_Worker: This worker.
+        """
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None) -> None:
+        """
+        Closes this worker.
+        """
+        self.close()
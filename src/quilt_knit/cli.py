@@ -0,0 +1,123 @@
+"""Command-line entry point that merges quilts described by JSON or TOML specification files.
+The merging modules are imported after the arguments are parsed, so --help and argument errors return without importing the knitting machine."""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from time import perf_counter
+
+_SPEC_EXTENSIONS: tuple[str, ...] = (".json", ".toml")
+
+
+def collect_spec_paths(paths: list[str]) -> list[str]:
+    """
+    Args:
+        paths (list[str]): Paths of specification files or of directories of specification files.
+
+    Returns:
+        list[str]: The paths of the specification files, with the JSON and TOML files of each directory in sorted order.
+    """
+    spec_paths: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            spec_paths.extend(os.path.join(path, file_name) for file_name in sorted(os.listdir(path)) if file_name.endswith(_SPEC_EXTENSIONS))
+        else:
+            spec_paths.append(path)
+    return spec_paths
+
+
+def _argument_parser() -> argparse.ArgumentParser:
+    """
+    Returns:
+        argparse.ArgumentParser: The parser of the quilt-knit command-line arguments.
+    """
+    parser = argparse.ArgumentParser(prog="quilt-knit", description="Merge the quilts described by JSON or TOML specification files into knitout and DAT files.")
+    parser.add_argument("specs", nargs="*", help="Quilt specification files, or directories whose .json and .toml files are processed as one batch.")
+    parser.add_argument("-o", "--output-dir", default=".", help="The directory to write knitout, DAT, trace and metrics files to. Defaults to the working directory.")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="The number of background processes that compile DAT files. Defaults to the number of processors.")
+    parser.add_argument("--cache-dir", default=None, help="A directory of executed swatch programs shared between runs. Defaults to caching swatches in memory for this batch.")
+    parser.add_argument("--profile", action="store_true", help="Include a profile of the merge phases and events of each quilt in the metrics report.")
+    parser.add_argument("--trace", action="store_true", help="Write a Chrome Trace Event file of the merge of each quilt.")
+    parser.add_argument("--metrics", default=None, help="The path of the JSON metrics report. Defaults to metrics.json in the output directory.")
+    parser.add_argument("--no-dat", action="store_true", help="Write only knitout files, even for specifications that request DAT files.")
+    worker_mode = parser.add_mutually_exclusive_group()
+    worker_mode.add_argument("--spool-dir", default=None, help="Stay resident and merge the specification files submitted to the incoming directory of this spool directory.")
+    worker_mode.add_argument("--socket", default=None, help="Stay resident and merge the JSON requests sent to a UNIX socket at this path.")
+    parser.add_argument("--poll-seconds", type=float, default=1.0, help="The time a spool worker waits before checking for new jobs. Defaults to 1 second.")
+    parser.add_argument("--max-cached-swatches", type=int, default=256, help="The number of executed swatch programs a worker keeps in memory. Defaults to 256.")
+    parser.add_argument("--max-cached-merges", type=int, default=64, help="The number of merged results a worker keeps in memory. Defaults to 64.")
+    return parser
+
+
+def _serve(arguments: argparse.Namespace) -> int:
+    """
+    Runs a resident Quilt_Merge_Worker on the spool directory or socket given in the arguments until the process is interrupted.
+
+    Args:
+        arguments (argparse.Namespace): The parsed command-line arguments.
+
+    Returns:
+        int: The exit status, 0.
+    """
+    from quilt_knit.Quilt_Merge_Worker import Quilt_Merge_Worker
+    with Quilt_Merge_Worker(arguments.cache_dir, arguments.max_cached_swatches, arguments.max_cached_merges, arguments.workers, arguments.profile) as worker:
+        try:
+            if arguments.socket is not None:
+                worker.serve_socket(arguments.socket)
+            else:
+                worker.serve_spool(arguments.spool_dir, arguments.poll_seconds)
+        except KeyboardInterrupt:
+            pass
+        print(json.dumps(worker.report()), file=sys.stderr)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Merges every quilt given on the command line and writes a JSON metrics report.
+    A quilt that fails to merge is recorded with its error in the metrics report, and the remaining quilts of the batch are still merged.
+    With --spool-dir or --socket, runs a resident worker instead (see Quilt_Merge_Worker).
+
+    Args:
+        argv (list[str], optional): The command-line arguments, not including the program name. Defaults to the arguments of this process.
+
+    Returns:
+        int: The exit status: 0 if every quilt was merged, otherwise 1.
+    """
+    parser = _argument_parser()
+    arguments = parser.parse_args(argv)
+    if arguments.spool_dir is not None or arguments.socket is not None:
+        return _serve(arguments)
+    if len(arguments.specs) == 0:
+        parser.error("at least one specification is required unless --spool-dir or --socket is given")
+    from quilt_knit.quilt.Quilt_Spec import Quilt_Spec
+    from quilt_knit.swatch.Dat_Compile_Pool import Dat_Compile_Pool
+    from quilt_knit.swatch.Swatch_Cache import Swatch_Cache
+    os.makedirs(arguments.output_dir, exist_ok=True)
+    start = perf_counter()
+    swatch_cache = Swatch_Cache(arguments.cache_dir)
+    quilt_metrics: list[dict[str, object]] = []
+    failed = False
+    with Dat_Compile_Pool(arguments.workers) as compile_pool:
+        for spec_path in collect_spec_paths(arguments.specs):
+            try:
+                spec = Quilt_Spec.load(spec_path)
+                if arguments.no_dat:
+                    spec.compile_dat = False
+                quilt_metrics.append({"spec": spec_path, **spec.merge(arguments.output_dir, swatch_cache, compile_pool, arguments.profile, arguments.trace)})
+            except Exception as error:
+                failed = True
+                quilt_metrics.append({"spec": spec_path, "error": f"{type(error).__name__}: {error}"})
+                print(f"Failed to merge quilt {spec_path}: {type(error).__name__}: {error}", file=sys.stderr)
+        compile_seconds = compile_pool.gather()
+    metrics = {"seconds": perf_counter() - start, "quilts": quilt_metrics, "swatch_cache": swatch_cache.report(), "dat_compile_seconds": compile_seconds}
+    metrics_path = arguments.metrics if arguments.metrics is not None else os.path.join(arguments.output_dir, "metrics.json")
+    with open(metrics_path, "w") as metrics_file:
+        json.dump(metrics, metrics_file, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Module containing the Merge_Profiler class and the enumerations of the merge phases and events that it records."""
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from enum import Enum
+from time import perf_counter
+from typing import Any, ParamSpec, TypeVar, cast
+
+from quilt_knit.profiling.Merge_Recorder import Merge_Recorder
+
+_Params = ParamSpec("_Params")
+_Return = TypeVar("_Return")
+
+
+class Merge_Phase(Enum):
+    """Enumeration of the phases of the merge process timed by a Merge_Profiler."""
+    swatch_execution = "swatch_execution"  # Execution of a swatch program on a virtual knitting machine.
+    boundary_analysis = "boundary_analysis"  # Finding the course and wale boundary instructions of a swatch.
+    seam_search_construction = "seam_search_construction"  # Building the network of possible connections along a seam.
+    connection_selection = "connection_selection"  # Choosing or planning the connections formed along a seam.
+    float_analysis = "float_analysis"  # Measuring the floats that an instruction forms in the merged program.
+    release_injection = "release_injection"  # Injecting releasehooks required by the merged program.
+    final_re_execution = "final_re_execution"  # Re-executing the merged program to clean and reorganize it.
+    dat_compilation = "dat_compilation"  # Writing knitout and compiling DAT files.
+
+    def __str__(self) -> str:
+        """
+        Returns:
+            str: The name of this phase.
+        """
+        return self.name
+
+
+class Merge_Event(Enum):
+    """Enumeration of the events counted by a Merge_Profiler."""
+    cut_injected = "cuts_injected"  # A carrier was cut by the merge to avoid a long float.
+    inhook_injected = "inhooks_injected"  # A carrier was brought in by the merge.
+    rack = "racks"  # A racking instruction was added to a merged program.
+    transfer = "transfers"  # A transfer instruction was added to a merged program.
+    carriage_pass = "carriage_passes"  # A carriage pass was formed by the final execution of a merged program.
+
+    def __str__(self) -> str:
+        """
+        Returns:
+            str: The name of this event.
+        """
+        return self.name
+
+
+class Merge_Profiler(Merge_Recorder):
+    """
+    Records the wall time and call count of each merge phase and counts merge events while it is active.
+
+    A profiler is activated as a context manager (see Merge_Recorder).
+
+    Examples:
+        >>> with Merge_Profiler() as profiler:
+        ...     quilt.merge_quilt()
+        >>> profiler.write_report("merge_profile")
+
+    Attributes:
+        phase_seconds (dict[Merge_Phase, float]): The wall time spent in each phase.
+        phase_calls (dict[Merge_Phase, int]): The number of times each phase was entered.
+        event_counts (dict[Merge_Event, int]): The number of times each event occurred.
+
+    Notes:
+        * Phases are timed inclusively. A phase entered within another phase (e.g., swatch execution while constructing a swatch during a merge) counts toward both.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.phase_seconds: dict[Merge_Phase, float] = defaultdict(float)
+        self.phase_calls: dict[Merge_Phase, int] = defaultdict(int)
+        self.event_counts: dict[Merge_Event, int] = defaultdict(int)
+
+    @staticmethod
+    def active_profiler() -> Merge_Profiler | None:
+        """
+        Returns:
+            Merge_Profiler | None: The profiler that is currently recording or None if no profiler is active.
+        """
+        return cast(Merge_Profiler | None, Merge_Profiler.active_recorder())
+
+    @contextmanager
+    def phase(self, merge_phase: Merge_Phase) -> Iterator[None]:
+        """
+        Times the body of the context as a call to the given phase.
+
+        Args:
+            merge_phase (Merge_Phase): The phase to record.
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[merge_phase] += perf_counter() - start
+            self.phase_calls[merge_phase] += 1
+
+    def count(self, merge_event: Merge_Event, count: int = 1) -> None:
+        """
+        Args:
+            merge_event (Merge_Event): The event to count.
+            count (int, optional): The number of times the event occurred. Defaults to 1.
+        """
+        self.event_counts[merge_event] += count
+
+    @staticmethod
+    def profiled(merge_phase: Merge_Phase) -> Callable[[Callable[_Params, _Return]], Callable[_Params, _Return]]:
+        """
+        Args:
+            merge_phase (Merge_Phase): The phase that calls to the decorated function are recorded as.
+
+        Returns:
+            Callable[[Callable[_Params, _Return]], Callable[_Params, _Return]]: A decorator that times calls to a function in the active profiler, if there is one.
+        """
+
+        def _record_phase(profiler: Merge_Profiler, function: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+            with profiler.phase(merge_phase):
+                return function(*args, **kwargs)
+
+        return Merge_Profiler.instrumented(_record_phase)
+
+    @staticmethod
+    def count_event(merge_event: Merge_Event, count: int = 1) -> None:
+        """
+        Counts the given event in the active profiler. If no profiler is active, nothing happens.
+
+        Args:
+            merge_event (Merge_Event): The event to count.
+            count (int, optional): The number of times the event occurred. Defaults to 1.
+        """
+        profiler = Merge_Profiler.active_profiler()
+        if profiler is not None:
+            profiler.count(merge_event, count)
+
+    def report(self) -> dict[str, dict[str, dict[str, float | int] | int]]:
+        """
+        Returns:
+            dict[str, dict[str, dict[str, float | int] | int]]:
+                A machine-readable report with two entries:
+                * "phases" maps each phase name to its "calls" and "seconds".
+                * "events" maps each event name to its count.
+                Every phase and event is included, with zero values if it was not recorded.
+        """
+        return {"phases": {phase.value: {"calls": self.phase_calls[phase], "seconds": self.phase_seconds[phase]} for phase in Merge_Phase},
+                "events": {event.value: self.event_counts[event] for event in Merge_Event}}
+
+    def write_report(self, report_name: str) -> None:
+        """
+        Writes the report of this profiler to a JSON file.
+
+        Args:
+            report_name (str): The name of the JSON file to write, without the .json extension.
+        """
+        with open(f"{report_name}.json", "w") as report_file:
+            json.dump(self.report(), report_file, indent=2)
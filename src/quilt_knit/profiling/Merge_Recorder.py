@@ -0,0 +1,88 @@
+"""Module containing the Merge_Recorder class, the base of the recorders that instrument a merge while they are active."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import wraps
+from types import TracebackType
+from typing import Any, ParamSpec, TypeVar, cast
+
+_Params = ParamSpec("_Params")
+_Return = TypeVar("_Return")
+_Recorder = TypeVar("_Recorder", bound="Merge_Recorder")
+
+
+class Merge_Recorder:
+    """
+    Base class of recorders that are activated as context managers to record a merge, such as the Merge_Profiler and the Merge_Trace_Exporter.
+
+    Each direct subclass is a kind of recorder that tracks its own active recorder, so recorders of different kinds can be active at once.
+    While no recorder of a kind is active, the functions instrumented for that kind only check that no recorder is active before running.
+
+    Notes:
+        * Recorders of the same kind can be nested. The innermost active recorder of the kind records the merge.
+    """
+    _active_recorder: Merge_Recorder | None = None
+    _recorder_kind: type[Merge_Recorder]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """
+        Gives each direct subclass its own active recorder. Subclasses of a kind of recorder share the active recorder of that kind.
+        """
+        super().__init_subclass__(**kwargs)
+        if Merge_Recorder in cls.__bases__:
+            cls._active_recorder = None
+            cls._recorder_kind = cls
+
+    def __init__(self) -> None:
+        self._prior_recorder: Merge_Recorder | None = None
+
+    @classmethod
+    def active_recorder(cls) -> Merge_Recorder | None:
+        """
+        Returns:
+            Merge_Recorder | None: The recorder of this kind that is currently recording or None if no recorder of this kind is active.
+        """
+        return cls._recorder_kind._active_recorder
+
+    def __enter__(self: _Recorder) -> _Recorder:
+        """
+        Activates this recorder.
+
+        Returns:
+            Merge_Recorder: This recorder.
+        """
+        self._prior_recorder = self._recorder_kind._active_recorder
+        self._recorder_kind._active_recorder = self
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None) -> None:
+        """
+        Deactivates this recorder and restores the recorder of its kind that was active before it.
+        """
+        self._recorder_kind._active_recorder = self._prior_recorder
+        self._prior_recorder = None
+
+    @classmethod
+    def instrumented(cls, record_call: Callable[[Any, Callable[..., Any], tuple[Any, ...], dict[str, Any]], Any]) -> Callable[[Callable[_Params, _Return]], Callable[_Params, _Return]]:
+        """
+        Args:
+            record_call (Callable[[Any, Callable[..., Any], tuple[Any, ...], dict[str, Any]], Any]):
+                A function called with the active recorder, the decorated function, and the positional and keyword arguments of a call to it.
+                It calls the decorated function with the arguments while recording the call and returns the result of the call.
+
+        Returns:
+            Callable[[Callable[_Params, _Return]], Callable[_Params, _Return]]: A decorator that records calls to a function in the active recorder of this kind, if there is one.
+        """
+        recorder_kind = cls._recorder_kind
+
+        def _decorator(function: Callable[_Params, _Return]) -> Callable[_Params, _Return]:
+            @wraps(function)
+            def _instrumented_function(*args: _Params.args, **kwargs: _Params.kwargs) -> _Return:
+                recorder = recorder_kind._active_recorder
+                if recorder is None:
+                    return function(*args, **kwargs)
+                return cast(_Return, record_call(recorder, function, args, kwargs))
+
+            return _instrumented_function
+
+        return _decorator
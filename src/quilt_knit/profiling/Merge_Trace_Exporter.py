@@ -0,0 +1,136 @@
+"""Module containing the Merge_Trace_Exporter class used to export the timeline of a quilt merge as a Chrome Trace Event file."""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, ParamSpec, TypeVar, cast
+
+from quilt_knit.profiling.Merge_Recorder import Merge_Recorder
+
+if TYPE_CHECKING:
+    from quilt_knit.swatch.Swatch import Swatch
+
+_Params = ParamSpec("_Params")
+_Return = TypeVar("_Return")
+
+
+class Merge_Trace_Exporter(Merge_Recorder):
+    """
+    Records spans of the merge process while it is active and writes them as a Chrome Trace Event JSON file.
+    An exporter is activated as a context manager (see Merge_Recorder).
+    The file can be loaded into a standard trace viewer (e.g., chrome://tracing or Perfetto) to inspect the merge schedule and its critical path.
+
+    Examples:
+        >>> with Merge_Trace_Exporter() as trace_exporter:
+        ...     quilt.merge_quilt()
+        >>> trace_exporter.write_trace("merge_trace")
+
+    Attributes:
+        trace_events (list[dict]): The complete events recorded by this exporter, in the order that the spans ended.
+
+    Notes:
+        * Spans are recorded as complete ("X") events with timestamps in microseconds from the creation of the exporter.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.trace_events: list[dict] = []
+        self._start_time: float = perf_counter()
+
+    @staticmethod
+    def active_exporter() -> Merge_Trace_Exporter | None:
+        """
+        Returns:
+            Merge_Trace_Exporter | None: The exporter that is currently recording or None if no exporter is active.
+        """
+        return cast(Merge_Trace_Exporter | None, Merge_Trace_Exporter.active_recorder())
+
+    def _microseconds(self, time: float) -> float:
+        """
+        Args:
+            time (float): A time in seconds, as given by perf_counter.
+
+        Returns:
+            float: The number of microseconds between the creation of this exporter and the given time.
+        """
+        return (time - self._start_time) * 1_000_000
+
+    @contextmanager
+    def span(self, span_name: str, category: str = "merge", **span_args: object) -> Iterator[dict[str, object]]:
+        """
+        Records the body of the context as a span.
+
+        Args:
+            span_name (str): The name of the span.
+            category (str, optional): The category of the span. Defaults to "merge".
+            **span_args (object): Labels of the span shown by the trace viewer.
+
+        Yields:
+            dict[str, object]: The labels of the span. Labels added to this dictionary within the context are recorded with the span.
+        """
+        start = perf_counter()
+        try:
+            yield span_args
+        finally:
+            end = perf_counter()
+            self.trace_events.append({"name": span_name, "cat": category, "ph": "X",
+                                      "ts": self._microseconds(start), "dur": (end - start) * 1_000_000,
+                                      "pid": os.getpid(), "tid": threading.get_ident(),
+                                      "args": {label: str(value) if not isinstance(value, (int, float, bool)) else value for label, value in span_args.items()}})
+
+    @staticmethod
+    def traced(span_name: str, category: str = "merge",
+               labels: Callable[..., dict[str, object]] | None = None) -> Callable[[Callable[_Params, _Return]], Callable[_Params, _Return]]:
+        """
+        Args:
+            span_name (str): The name of the spans recorded for calls to the decorated function.
+            category (str, optional): The category of the spans. Defaults to "merge".
+            labels (Callable[..., dict[str, object]], optional):
+                A function called with the return value of the decorated function followed by the arguments it was called with. It returns the labels of the span. Defaults to no labels.
+
+        Returns:
+            Callable[[Callable[_Params, _Return]], Callable[_Params, _Return]]: A decorator that records calls to a function as spans in the active exporter, if there is one.
+        """
+
+        def _record_span(exporter: Merge_Trace_Exporter, function: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+            with exporter.span(span_name, category) as span_args:
+                result = function(*args, **kwargs)
+                if labels is not None:
+                    span_args.update(labels(result, *args, **kwargs))
+            return result
+
+        return Merge_Trace_Exporter.instrumented(_record_span)
+
+    @staticmethod
+    def swatch_labels(role: str, swatch: Swatch) -> dict[str, object]:
+        """
+        Args:
+            role (str): The role of the swatch in the span (e.g., "bottom_swatch").
+            swatch (Swatch): The swatch to label the span with.
+
+        Returns:
+            dict[str, object]: Labels of the name, width, height, and number of instructions of the given swatch, prefixed by its role.
+        """
+        return {role: swatch.name, f"{role}_width": swatch.width, f"{role}_height": swatch.height, f"{role}_instructions": len(swatch.knitout_program)}
+
+    def trace(self) -> dict[str, object]:
+        """
+        Returns:
+            dict[str, object]: The Chrome Trace Event object of the recorded spans.
+        """
+        process_name = {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "QUILT merge"}}
+        return {"traceEvents": [process_name, *self.trace_events], "displayTimeUnit": "ms"}
+
+    def write_trace(self, trace_name: str) -> None:
+        """
+        Writes the recorded spans to a Chrome Trace Event JSON file.
+
+        Args:
+            trace_name (str): The name of the JSON file to write, without the .json extension.
+        """
+        with open(f"{trace_name}.json", "w") as trace_file:
+            json.dump(self.trace(), trace_file)
@@ -1,4 +1,5 @@
 """Module containing the Connection Interval Tree class."""
+from collections.abc import Iterable
 from typing import cast
 
 from intervaltree import Interval, IntervalTree
@@ -97,6 +98,33 @@ class Connection_Interval_Tree:
         interval = self._get_source_interval(connection)
         self.interval_tree[interval.begin: interval.end] = connection
 
+    def make_connections(self, connections: Iterable[Swatch_Connection]) -> None:
+        """
+        Add the given connections to this connection interval tree in one batch.
+        If the tree is empty, it is bulk loaded as a balanced tree from the sorted intervals instead of inserting the intervals one at a time.
+
+        Args:
+            connections (Iterable[Swatch_Connection]): The connections to add to the interval tree.
+
+        Notes:
+            This method does not verify that the connections should be added to the interval tree and does not override or overlap existing connections.
+        """
+        intervals = [Interval(interval.begin, interval.end, connection) for connection, interval in ((c, self._get_source_interval(c)) for c in connections)]
+        if len(self.interval_tree) == 0:
+            self.interval_tree = IntervalTree(intervals)
+        else:
+            self.interval_tree.update(intervals)
+
+    def remove_connections(self, prior_connections: Iterable[Swatch_Connection]) -> None:
+        """
+        Remove the given connections from the interval tree in one batch. Connections that are not in the tree are ignored.
+
+        Args:
+            prior_connections (Iterable[Swatch_Connection]): The connections to remove from the interval tree.
+        """
+        self.interval_tree.difference_update(Interval(interval.begin, interval.end, connection)
+                                             for connection, interval in ((c, self._get_source_interval(c)) for c in prior_connections))
+
     def remove_connection(self, prior_connection: Swatch_Connection) -> None:
         """
         Remove a given connection from the interval tree.
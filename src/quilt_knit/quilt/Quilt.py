@@ -1,9 +1,27 @@
 """The module containing the Quilt class."""
-from typing import cast
+from __future__ import annotations
+
+import warnings
+from collections import defaultdict
+from collections.abc import Iterable
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, cast
 
 from knitout_interpreter.knitout_operations.Knitout_Line import Knitout_Comment_Line
 from networkx import DiGraph, topological_generations, topological_sort
 
+from quilt_knit.profiling.Merge_Profiler import Merge_Profiler
+from quilt_knit.profiling.Merge_Trace_Exporter import Merge_Trace_Exporter
+from quilt_knit.quilt.Quilt_Merge_Checkpoint import (
+    Merge_Checkpoint_Phase,
+    Merge_Checkpoint_State,
+    Quilt_Merge_Checkpoint,
+)
+from quilt_knit.quilt.Quilt_Merge_Planner import (
+    Merge_Cost_Model,
+    Quilt_Merge_Planner,
+)
+from quilt_knit.quilt.Quilt_Spatial_Index import Quilt_Spatial_Index
 from quilt_knit.quilt.Swatch_Neighborhood import Swatch_Neighborhood
 from quilt_knit.swatch.course_wise_merging.Course_Merge_Process import (
     Course_Merge_Process,
@@ -11,13 +29,22 @@ from quilt_knit.swatch.course_wise_merging.Course_Merge_Process import (
 from quilt_knit.swatch.course_wise_merging.Course_Wise_Connection import (
     Course_Wise_Connection,
 )
+from quilt_knit.swatch.course_wise_merging.Multi_Course_Merge_Process import (
+    Multi_Course_Merge_Process,
+)
 from quilt_knit.swatch.Swatch import Swatch
 from quilt_knit.swatch.Swatch_Connection import Swatch_Connection
+from quilt_knit.swatch.wale_wise_merging.Multi_Wale_Merge_Process import (
+    Multi_Wale_Merge_Process,
+)
 from quilt_knit.swatch.wale_wise_merging.Wale_Merge_Process import Wale_Merge_Process
 from quilt_knit.swatch.wale_wise_merging.Wale_Wise_Connection import (
     Wale_Wise_Connection,
 )
 
+if TYPE_CHECKING:
+    from quilt_knit.swatch.Dat_Compile_Pool import Dat_Compile_Pool
+
 
 class Blocked_Swatch_Connection_Exception(Exception):
     """
@@ -59,6 +86,50 @@ class Unconnected_Swatches_Exception(Exception):
         super().__init__(f"Cannot merge unconnected swatches {a_swatch} and {b_swatch}")
 
 
+class Unsupported_Merge_Option_Warning(UserWarning):
+    """A warning raised when a merge option cannot be applied to a quilt and the merge falls back to the default merge."""
+
+
+def _course_merge_trace_labels(merge_result: tuple[Swatch, set[Swatch], set[Swatch]], _quilt: Quilt, left_swatch: Swatch, right_swatch: Swatch,
+                               *_args: object, **_kwargs: object) -> dict[str, object]:
+    """
+    Args:
+        merge_result (tuple[Swatch, set[Swatch], set[Swatch]]): The result of a course-wise merge in a quilt.
+        _quilt (Quilt): The quilt the swatches were merged in.
+        left_swatch (Swatch): The left swatch of the merge.
+        right_swatch (Swatch): The right swatch of the merge.
+
+    Returns:
+        dict[str, object]: Labels of the merged swatches and the resulting swatch for the trace span of the merge.
+    """
+    return {**Merge_Trace_Exporter.swatch_labels("left_swatch", left_swatch), **Merge_Trace_Exporter.swatch_labels("right_swatch", right_swatch),
+            **Merge_Trace_Exporter.swatch_labels("merged_swatch", merge_result[0])}
+
+
+def _row_merge_trace_labels(merged_swatch: Swatch, _quilt: Quilt, row: list[Swatch], *_args: object, **_kwargs: object) -> dict[str, object]:
+    """
+    Args:
+        merged_swatch (Swatch): The result of a row merge in a quilt.
+        _quilt (Quilt): The quilt the row was merged in.
+        row (list[Swatch]): The swatches in the merged row.
+
+    Returns:
+        dict[str, object]: Labels of the number of swatches in the row and the resulting swatch for the trace span of the merge.
+    """
+    return {"row_swatches": len(row), **Merge_Trace_Exporter.swatch_labels("merged_swatch", merged_swatch)}
+
+
+def _course_bands_trace_labels(bands: list[set[Swatch]], *_args: object, **_kwargs: object) -> dict[str, object]:
+    """
+    Args:
+        bands (list[set[Swatch]]): The course-wise bands formed from a quilt.
+
+    Returns:
+        dict[str, object]: Labels of the number of bands and the swatches in them for the trace span of the conversion.
+    """
+    return {"bands": len(bands), "band_swatches": sum(len(band) for band in bands)}
+
+
 class Quilt:
     """A data structure of a dynamic grid of connected swatches which can be merged to form a unified swatch.
 
@@ -67,6 +138,7 @@ class Quilt:
         wale_wise_connections (DiGraph): A directed graph of the wale wise connections between swatches in the quilt.
         swatch_neighborhoods (dict[Swatch, Swatch_Neighborhood]): A dictionary of swatches keyed to their neighborhoods.
         swatches_to_rightward_shifts (dict[Swatch, int]): A dictionary of swatches keyed to the number of needles to shift them by rightward when merging the quilt.
+        spatial_index (Quilt_Spatial_Index): The index of the placements of the connected swatches and their connections on a common needle by course frame of the quilt.
     """
     _CONNECTION: str = "connection"
 
@@ -75,6 +147,52 @@ class Quilt:
         self.wale_wise_connections: DiGraph = DiGraph()
         self.swatch_neighborhoods: dict[Swatch, Swatch_Neighborhood] = {}
         self.swatches_to_rightward_shifts: dict[Swatch, int] = {}
+        self.spatial_index: Quilt_Spatial_Index = Quilt_Spatial_Index()
+
+    @classmethod
+    def from_grid(cls, grid: list[list[Swatch | None]], remove_cast_ons: bool = True) -> Quilt:
+        """
+        Builds a quilt from a grid of swatches in one pass.
+        Each swatch is connected course-wise to the swatch to its right in the same row and wale-wise to the swatch above it in the same column.
+        The connections span the full height and width of the connected swatches, as with the defaults of connect_swatches_course_wise and connect_swatches_wale_wise.
+
+        Args:
+            grid (list[list[Swatch | None]]):
+                The rows of the grid, ordered from the bottom to the top of the quilt. Each row is ordered from left to right. Rows may have different lengths.
+                None marks an empty cell, which breaks the connections that would cross it.
+            remove_cast_ons (bool, optional): Whether to remove cast-on operations from swatches with a swatch below them. Defaults to True.
+
+        Returns:
+            Quilt: The quilt of the given grid.
+
+        Raises:
+            ValueError: If a swatch is placed in more than one cell of the grid.
+
+        Notes:
+            Every swatch in a grid has at most one connection on each side, so no connection can block or envelop another.
+            The connections are bulk loaded without the prior-connection, blocking and envelope checks of connect_swatches_course_wise and connect_swatches_wale_wise.
+        """
+        placed_swatches: set[Swatch] = set()
+        connections: list[Swatch_Connection] = []
+        course_wise_neighbors: list[tuple[Swatch, Swatch]] = []
+        for row_index, row in enumerate(grid):
+            for column_index, swatch in enumerate(row):
+                if swatch is None:
+                    continue
+                if swatch in placed_swatches:
+                    raise ValueError(f"Swatch {swatch} is placed in more than one cell of the grid")
+                placed_swatches.add(swatch)
+                if column_index > 0 and row[column_index - 1] is not None:
+                    course_wise_neighbors.append((cast(Swatch, row[column_index - 1]), swatch))
+                if row_index > 0 and column_index < len(grid[row_index - 1]) and grid[row_index - 1][column_index] is not None:
+                    connections.append(Wale_Wise_Connection(cast(Swatch, grid[row_index - 1][column_index]), swatch, remove_cast_ons=remove_cast_ons))
+        # Course-wise connections are formed after cast-ons are removed by the wale-wise connections, so that they span the remaining carriage passes.
+        connections.extend(Course_Wise_Connection(left_swatch, right_swatch) for left_swatch, right_swatch in course_wise_neighbors)
+        quilt = cls()
+        for swatch in placed_swatches:
+            quilt.add_swatch(swatch)
+        quilt._add_connections(connections)
+        return quilt
 
     def connect_swatches_wale_wise(self, bottom_swatch: Swatch, top_swatch: Swatch,
                                    bottom_leftmost_needle_position: int = 0, bottom_rightmost_needle_position: int | None = None,
@@ -145,22 +263,21 @@ class Quilt:
             assert isinstance(prior_connection, Swatch_Connection)
             return prior_connection
         if new_connection.from_swatch in self:
-            blocked_connections = self.swatch_neighborhoods[new_connection.from_swatch].blocking_connections(new_connection)
+            blocked_connections = self.spatial_index.blocking_connections(new_connection.from_swatch, new_connection)
             if len(blocked_connections) > 0:
                 raise Blocked_Swatch_Connection_Exception(new_connection, blocked_connections)
         if new_connection.to_swatch in self:
-            blocked_connections = self.swatch_neighborhoods[new_connection.to_swatch].blocking_connections(new_connection)
+            blocked_connections = self.spatial_index.blocking_connections(new_connection.to_swatch, new_connection)
             if len(blocked_connections) > 0:
                 raise Blocked_Swatch_Connection_Exception(new_connection, blocked_connections)
-        if prior_connection is not None:
-            self._remove_connection(prior_connection)
-        enveloped_connections = set()
+        replaced_connections = set()
         if new_connection.from_swatch in self:
-            enveloped_connections = self.swatch_neighborhoods[new_connection.from_swatch].enveloped_connections(new_connection)
+            replaced_connections = self.spatial_index.enveloped_connections(new_connection.from_swatch, new_connection)
         if new_connection.to_swatch in self:
-            enveloped_connections.update(self.swatch_neighborhoods[new_connection.to_swatch].enveloped_connections(new_connection))
-        for enveloped_connection in enveloped_connections:
-            self._remove_connection(enveloped_connection)
+            replaced_connections.update(self.spatial_index.enveloped_connections(new_connection.to_swatch, new_connection))
+        if prior_connection is not None:
+            replaced_connections.add(prior_connection)
+        self._remove_connections(replaced_connections)
         self._add_connection(new_connection)
         return new_connection
 
@@ -267,8 +384,7 @@ class Quilt:
         """
         if swatch in self:
             neighborhood = self.swatch_neighborhoods[swatch]
-            for connection in neighborhood.get_all_connections():
-                self._remove_connection(connection)
+            self._remove_connections(neighborhood.get_all_connections())
             self.course_wise_connections.remove_node(swatch)
             self.wale_wise_connections.remove_node(swatch)
             del self.swatch_neighborhoods[swatch]
@@ -284,13 +400,21 @@ class Quilt:
         Args:
             connection (Swatch_Connection): The connection to remove.
         """
-        if connection in self:
-            self.swatch_neighborhoods[connection.from_swatch].remove_connection(connection)
-            self.swatch_neighborhoods[connection.to_swatch].remove_connection(connection)
-            if isinstance(connection, Course_Wise_Connection):
-                self.course_wise_connections.remove_edge(connection.from_swatch, connection.to_swatch)
-            else:
-                self.wale_wise_connections.remove_edge(connection.from_swatch, connection.to_swatch)
+        self._remove_connections([connection])
+
+    def _remove_connections(self, connections: Iterable[Swatch_Connection]) -> None:
+        """
+        Removes the given connections from the quilt in one batch. Each swatch neighborhood, connection graph and seam of the spatial index is updated once. Connections that are not in the quilt are ignored.
+
+        Args:
+            connections (Iterable[Swatch_Connection]): The connections to remove.
+        """
+        connections = [c for c in connections if c in self]
+        for swatch, swatch_connections in self._connections_by_swatch(connections).items():
+            self.swatch_neighborhoods[swatch].remove_connections(swatch_connections)
+        self.spatial_index.remove_connections(connections)
+        self.course_wise_connections.remove_edges_from((c.from_swatch, c.to_swatch) for c in connections if isinstance(c, Course_Wise_Connection))
+        self.wale_wise_connections.remove_edges_from((c.from_swatch, c.to_swatch) for c in connections if isinstance(c, Wale_Wise_Connection))
 
     def _add_connection(self, connection: Swatch_Connection) -> None:
         """
@@ -298,17 +422,42 @@ class Quilt:
         Args:
             connection (Swatch_Connection): The connection to add to the quilt.
         """
-        if connection.from_swatch not in self:
-            self.add_swatch(connection.from_swatch)
-        if connection.to_swatch not in self:
-            self.add_swatch(connection.to_swatch)
-        self.swatch_neighborhoods[connection.from_swatch].make_connection(connection)
-        self.swatch_neighborhoods[connection.to_swatch].make_connection(connection)
-        if isinstance(connection, Course_Wise_Connection):
-            self.course_wise_connections.add_edge(connection.from_swatch, connection.to_swatch, connection=connection)
-        else:
-            assert isinstance(connection, Wale_Wise_Connection)
-            self.wale_wise_connections.add_edge(connection.from_swatch, connection.to_swatch, connection=connection)
+        self._add_connections([connection])
+
+    def _add_connections(self, connections: Iterable[Swatch_Connection]) -> None:
+        """
+        Adds the given connections to the quilt in one batch. Swatches in the connections that are not in the quilt are added to the quilt.
+        The interval trees of each swatch neighborhood and each seam of the spatial index are updated once with all of their new connections (see Connection_Interval_Tree.make_connections).
+
+        Args:
+            connections (Iterable[Swatch_Connection]): The connections to add to the quilt.
+
+        Notes:
+            This method does not verify that the connections are not blocked by each other or by connections in the quilt.
+        """
+        connections = list(connections)
+        for swatch, swatch_connections in self._connections_by_swatch(connections).items():
+            if swatch not in self:
+                self.add_swatch(swatch)
+            self.swatch_neighborhoods[swatch].make_connections(swatch_connections)
+        self.spatial_index.make_connections(connections, self.swatches_to_rightward_shifts)
+        self.course_wise_connections.add_edges_from((c.from_swatch, c.to_swatch, {Quilt._CONNECTION: c}) for c in connections if isinstance(c, Course_Wise_Connection))
+        self.wale_wise_connections.add_edges_from((c.from_swatch, c.to_swatch, {Quilt._CONNECTION: c}) for c in connections if isinstance(c, Wale_Wise_Connection))
+
+    @staticmethod
+    def _connections_by_swatch(connections: Iterable[Swatch_Connection]) -> dict[Swatch, list[Swatch_Connection]]:
+        """
+        Args:
+            connections (Iterable[Swatch_Connection]): The connections to group by the swatches that they connect.
+
+        Returns:
+            dict[Swatch, list[Swatch_Connection]]: Dictionary of swatches keyed to the given connections that involve them. Each connection is listed under both of its swatches.
+        """
+        connections_by_swatch: dict[Swatch, list[Swatch_Connection]] = defaultdict(list)
+        for connection in connections:
+            connections_by_swatch[connection.from_swatch].append(connection)
+            connections_by_swatch[connection.to_swatch].append(connection)
+        return connections_by_swatch
 
     def _reconnect_swatch(self, swatch: Swatch | None, prior_connections: set[Swatch_Connection],
                           match_prior_swatch: None | Swatch,
@@ -350,6 +499,7 @@ class Quilt:
                                             connection.bottom_left_needle_position, connection.bottom_right_needle_position,
                                             connection.top_left_needle_position, connection.top_right_needle_position, remove_cast_ons=False)
 
+    @Merge_Trace_Exporter.traced("merge_swatches_course_wise", labels=_course_merge_trace_labels)
     def merge_swatches_course_wise(self, left_swatch: Swatch, right_swatch: Swatch,
                                    discard_unconnected_lower_courses: bool = False,
                                    discard_unconnected_upper_courses: bool = False) -> tuple[Swatch, set[Swatch], set[Swatch]]:
@@ -375,15 +525,13 @@ class Quilt:
         original_connection = self.get_course_wise_connection(left_swatch, right_swatch)
         if original_connection is None:
             raise Unconnected_Swatches_Exception(left_swatch, right_swatch)
-        left_original_neighborhood = self.swatch_neighborhoods[left_swatch]
-        right_original_neighborhood = self.swatch_neighborhoods[right_swatch]
-        left_swatch_effected_connections = left_original_neighborhood.get_connections_to_courses(original_connection.left_bottom_course,
-                                                                                                 original_connection.left_top_course, exclude_right_connections=True)
-        right_swatch_effected_connections = right_original_neighborhood.get_connections_to_courses(original_connection.right_bottom_course,
-                                                                                                   original_connection.right_top_course, exclude_left_connection=True)
+        left_swatch_effected_connections = self.spatial_index.get_connections_to_courses(left_swatch, original_connection.left_bottom_course,
+                                                                                         original_connection.left_top_course, exclude_right_connections=True)
+        right_swatch_effected_connections = self.spatial_index.get_connections_to_courses(right_swatch, original_connection.right_bottom_course,
+                                                                                          original_connection.right_top_course, exclude_left_connection=True)
 
         # split off the portions of the swatches.
-        connections_to_lower_left = left_original_neighborhood.get_connections_to_courses(0, original_connection.left_bottom_course)
+        connections_to_lower_left = self.spatial_index.get_connections_to_courses(left_swatch, 0, original_connection.left_bottom_course)
         lower_left_swatch, remaining_left_swatch, left_lost_xfer_pass = left_swatch.split_swatch_at_carriage_pass(original_connection.left_bottom_course,
                                                                                                                   f"{left_swatch.name}c_0_{original_connection.left_bottom_course}",
                                                                                                                   left_swatch.name)
@@ -395,7 +543,7 @@ class Quilt:
             connections_to_lower_left = set()
 
         # split off the lower portion of the right swatch.
-        connections_to_lower_right = right_original_neighborhood.get_connections_to_courses(0, original_connection.right_bottom_course)
+        connections_to_lower_right = self.spatial_index.get_connections_to_courses(right_swatch, 0, original_connection.right_bottom_course)
         lower_right_swatch, remaining_right_swatch, right_lost_xfer_pass = right_swatch.split_swatch_at_carriage_pass(original_connection.right_bottom_course,
                                                                                                                       f"{right_swatch.name}c_0_{original_connection.right_bottom_course}",
                                                                                                                       right_swatch.name)
@@ -407,7 +555,7 @@ class Quilt:
             connections_to_lower_right = set()
 
         # Split off the upper portion of the left swatch.
-        connections_to_upper_left = left_original_neighborhood.get_connections_to_courses(original_connection.left_top_course + 1, left_swatch.height)
+        connections_to_upper_left = self.spatial_index.get_connections_to_courses(left_swatch, original_connection.left_top_course + 1, left_swatch.height)
         assert isinstance(remaining_left_swatch, Swatch)
         remaining_left_swatch, upper_left_swatch, upper_left_lost_xfer_pass = remaining_left_swatch.split_swatch_at_carriage_pass(original_connection.left_top_course - height_removed_from_left,
                                                                                                                                   left_swatch.name,
@@ -418,7 +566,7 @@ class Quilt:
             connections_to_upper_left = set()
 
         # Split off the upper portion of the right swatch.
-        connections_to_upper_right = right_original_neighborhood.get_connections_to_courses(original_connection.right_top_course + 1, right_swatch.height)
+        connections_to_upper_right = self.spatial_index.get_connections_to_courses(right_swatch, original_connection.right_top_course + 1, right_swatch.height)
         assert isinstance(remaining_right_swatch, Swatch)
         (remaining_right_swatch, upper_right_swatch,
          upper_right_lost_xfer_pass) = remaining_right_swatch.split_swatch_at_carriage_pass(original_connection.right_top_course - height_removed_from_right,
@@ -502,6 +650,60 @@ class Quilt:
                 lower_slices.remove(lower_right_swatch)
         return merged_swatch, cast(set[Swatch], upper_slices), cast(set[Swatch], lower_slices)
 
+    def can_merge_row_in_one_pass(self, row: list[Swatch]) -> bool:
+        """
+        Args:
+            row (list[Swatch]): The swatches in a row of course-wise connected swatches, ordered from left to right.
+
+        Returns:
+            bool:
+                True if the row can be merged by one Multi_Course_Merge_Process: the row has at least two uniquely named swatches,
+                each course-wise connection in the row spans every course of both of its swatches, and no swatch in the row is connected course-wise to a swatch outside the row.
+                False, otherwise.
+        """
+        if len(row) < 2 or len(set(s.name for s in row)) < len(row):
+            return False
+        for left_swatch, right_swatch in zip(row, row[1:]):
+            connection = self.get_course_wise_connection(left_swatch, right_swatch)
+            if connection is None or connection.left_bottom_course != 0 or connection.right_bottom_course != 0 or not connection.merge_left_to_end or not connection.merge_right_to_end:
+                return False
+        row_swatches = set(row)
+        return all(neighbor in row_swatches for swatch in row
+                   for neighbor in [*self.course_wise_connections.predecessors(swatch), *self.course_wise_connections.successors(swatch)])
+
+    @Merge_Trace_Exporter.traced("merge_row_course_wise", labels=_row_merge_trace_labels)
+    def merge_row_course_wise(self, row: list[Swatch]) -> Swatch:
+        """
+        Merges a row of course-wise connected swatches in one pass by a Multi_Course_Merge_Process. The merged swatch is re-attached to the quilt in place of the row.
+
+        Args:
+            row (list[Swatch]): The swatches in the row, ordered from left to right. The row must be mergeable in one pass (see can_merge_row_in_one_pass).
+
+        Returns:
+            Swatch: The swatch resulting from the merge.
+
+        Raises:
+            Unconnected_Swatches_Exception: If neighboring swatches in the row are not connected in the quilt.
+        """
+        for left_swatch, right_swatch in zip(row, row[1:]):
+            if self.get_course_wise_connection(left_swatch, right_swatch) is None:
+                raise Unconnected_Swatches_Exception(left_swatch, right_swatch)
+        assert self.can_merge_row_in_one_pass(row), f"Cannot merge the row {[s.name for s in row]} in one pass"
+        merger = Multi_Course_Merge_Process(row)
+        merged_instructions = [i for i in merger.merge_swatches() if not isinstance(i, Knitout_Comment_Line)]
+        for instruction in merged_instructions:
+            instruction.comment = None
+        merged_swatch = Swatch("_cm_".join(s.name for s in row), merged_instructions)
+        wale_wise_connections = [self.spatial_index.get_connections_to_courses(swatch, exclude_left_connection=True, exclude_right_connections=True) for swatch in row]
+        for swatch in row:
+            self._remove_swatch(swatch)
+        self.add_swatch(merged_swatch)
+        # The wale-wise connections of each swatch are shifted rightward by the width of the swatches to its left in the row.
+        for swatch, connections, position_shift in zip(row, wale_wise_connections, merger.position_shifts):
+            if len(connections) > 0:
+                self._reconnect_swatch(merged_swatch, connections, swatch, shift_match_wale_interval=position_shift)
+        return merged_swatch
+
     def _skip_swatch_wale_wise(self, skipped_swatch: Swatch | None) -> bool:
         """
         Skipping a swatch wale-wise means connecting its bottom-wale-connected swatches to its top-wale-connected swatches. For example, to remove cast-on lines from a swatch in the middle of a quilt.
@@ -515,23 +717,24 @@ class Quilt:
         """
         if skipped_swatch is None:
             return False
-        course_connections = self.swatch_neighborhoods[skipped_swatch].get_connections_to_courses(exclude_bottom_connections=True, exclude_top_connections=True)
+        course_connections = self.spatial_index.get_connections_to_courses(skipped_swatch, exclude_bottom_connections=True, exclude_top_connections=True)
         if len(course_connections) == 0:  # skipped is not connected to a band of the quilt. Can be replaced with connections to its upper swatch.
-            top_connections = self.swatch_neighborhoods[skipped_swatch].get_connections_to_courses(exclude_left_connection=True, exclude_right_connections=True,
-                                                                                                   exclude_bottom_connections=True)
+            top_connections = self.spatial_index.get_connections_to_courses(skipped_swatch, exclude_left_connection=True, exclude_right_connections=True,
+                                                                            exclude_bottom_connections=True)
             assert len(top_connections) == 1
             top_connection = [*top_connections][0]
             assert isinstance(top_connection, Wale_Wise_Connection)
             top_shift = top_connection.to_begin
-            bottom_connections = self.swatch_neighborhoods[skipped_swatch].get_connections_to_courses(exclude_left_connection=True, exclude_right_connections=True,
-                                                                                                      exclude_top_connections=True)
+            bottom_connections = self.spatial_index.get_connections_to_courses(skipped_swatch, exclude_left_connection=True, exclude_right_connections=True,
+                                                                               exclude_top_connections=True)
             self._remove_swatch(skipped_swatch)
             self._reconnect_swatch(top_connection.top_swatch, bottom_connections, skipped_swatch, shift_match_wale_interval=top_shift)
             return True
         else:
             return False
 
-    def _merge_course_wise_quilt_layer(self, layer_swatches: set[Swatch], discard_unconnected_lower_courses: bool) -> tuple[set[Swatch], set[Swatch], set[Swatch]]:
+    def _merge_course_wise_quilt_layer(self, layer_swatches: set[Swatch], discard_unconnected_lower_courses: bool,
+                                       balanced_merges: bool = False, multi_course_merges: bool = False) -> tuple[set[Swatch], set[Swatch], set[Swatch]]:
         """
         Merges a set of swatches in a topological generation of wale-wise connections.
         Swatches will be sliced down to the minimum overlapping courses in the layer.
@@ -539,6 +742,13 @@ class Quilt:
 
         Args:
             layer_swatches (set[Swatch]): The wale-wise topological generation of swatches to merge.
+            discard_unconnected_lower_courses (bool): If True, The lower courses of the swatches that have no connections in the quilt will be discarded.
+            balanced_merges (bool, optional):
+                If True, each row of course-wise connected swatches is merged by a balanced pairwise reduction (see _merge_course_wise_row_balanced).
+                Otherwise, each row is merged from left to right. Defaults to False.
+            multi_course_merges (bool, optional):
+                If True, each row that can be merged in one pass is merged by a Multi_Course_Merge_Process (see merge_row_course_wise).
+                Other rows are merged pairwise, and an Unsupported_Merge_Option_Warning is raised for each of them. Defaults to False.
 
         Returns:
             tuple[set[Swatch], set[Swatch], set[Swatch]]:
@@ -582,6 +792,28 @@ class Quilt:
             return swatch_to_merge
 
         merged_swatches = set()
+        if balanced_merges or multi_course_merges:
+            for row_start in [*topological_sort(layer_graph)]:
+                if layer_graph.in_degree(row_start) == 0:
+                    row = [row_start]
+                    successors = [*layer_graph.successors(row_start)]
+                    while len(successors) > 0:
+                        assert len(successors) == 1
+                        row.append(successors[0])
+                        successors = [*layer_graph.successors(successors[0])]
+                    if multi_course_merges and self.can_merge_row_in_one_pass(row):
+                        merged_swatches.add(self.merge_row_course_wise(row))
+                        continue
+                    if multi_course_merges and len(row) > 1:
+                        warnings.warn(Unsupported_Merge_Option_Warning(f"The row {[s.name for s in row]} cannot be merged in one pass, so it is merged pairwise."))
+                    if balanced_merges:
+                        merged_swatch, new_lower_slices, new_upper_slices = self._merge_course_wise_row_balanced(row, discard_unconnected_lower_courses)
+                    else:
+                        merged_swatch, new_lower_slices, new_upper_slices = self._merge_course_wise_row(row, discard_unconnected_lower_courses)
+                    merged_swatches.add(merged_swatch)
+                    lower_slices.update(new_lower_slices)
+                    upper_slices.update(new_upper_slices)
+            return merged_swatches, lower_slices, upper_slices
         while len(layer_graph.edges) > 0:
             for swatch in [*topological_sort(layer_graph)]:
                 if swatch in layer_graph:  # Note, the layer will be destroyed by the merge process, removing nodes from the prior topological sort.
@@ -589,14 +821,93 @@ class Quilt:
         merged_swatches.update(layer_graph.nodes)
         return merged_swatches, lower_slices, upper_slices
 
-    def convert_quilt_to_course_bands(self) -> list[set[Swatch]]:
+    def _merge_course_wise_row(self, row: list[Swatch], discard_unconnected_lower_courses: bool) -> tuple[Swatch, set[Swatch], set[Swatch]]:
+        """
+        Merges a row of course-wise connected swatches from left to right.
+
+        Args:
+            row (list[Swatch]): The swatches in the row, ordered from left to right by their course-wise connections.
+            discard_unconnected_lower_courses (bool): If True, The lower courses of the swatches that have no connections in the quilt will be discarded.
+
+        Returns:
+            tuple[Swatch, set[Swatch], set[Swatch]]:
+                A tuple containing:
+                * The swatch resulting from merging the row.
+                * The set of swatches produced by slicing off the lower portion of the swatches in the row.
+                * The set of swatches produced by slicing off the upper portion of the swatches in the row.
+        """
+        lower_slices: set[Swatch] = set()
+        upper_slices: set[Swatch] = set()
+        merged_swatch = row[0]
+        for right_swatch in row[1:]:
+            merged_swatch, new_upper_slices, new_lower_slices = self.merge_swatches_course_wise(merged_swatch, right_swatch,
+                                                                                                discard_unconnected_lower_courses=discard_unconnected_lower_courses)
+            lower_slices.update(new_lower_slices)
+            upper_slices.update(new_upper_slices)
+        return merged_swatch, lower_slices, upper_slices
+
+    def _merge_course_wise_row_balanced(self, row: list[Swatch], discard_unconnected_lower_courses: bool) -> tuple[Swatch, set[Swatch], set[Swatch]]:
+        """
+        Merges a row of course-wise connected swatches by a balanced pairwise reduction.
+        Neighboring pairs of swatches are merged, then neighboring pairs of the merged swatches, until one swatch remains.
+        Merging from left to right re-processes the growing left swatch in every merge, so a row of k swatches costs O(k^2) swatch sizes.
+        The balanced reduction processes each swatch in O(log k) merges, and the merges at each level are independent of each other.
+
+        Args:
+            row (list[Swatch]): The swatches in the row, ordered from left to right by their course-wise connections.
+            discard_unconnected_lower_courses (bool): If True, The lower courses of the swatches that have no connections in the quilt will be discarded.
+
+        Returns:
+            tuple[Swatch, set[Swatch], set[Swatch]]:
+                A tuple containing:
+                * The swatch resulting from merging the row.
+                * The set of swatches produced by slicing off the lower portion of the swatches in the row.
+                * The set of swatches produced by slicing off the upper portion of the swatches in the row.
+
+        Notes:
+            * merge_swatches_course_wise records the rightward shift of an upper slice relative to the left side of the merged swatch.
+              When a merged swatch is later merged as the right side of a pair, the upper slices positioned within it are shifted by the width of the new left swatch.
+              This keeps the shifts equal to those of a left to right merge, which are relative to the left side of the row.
+        """
+        lower_slices: set[Swatch] = set()
+        upper_slices: set[Swatch] = set()
+        upper_slices_in_swatch: dict[Swatch, set[Swatch]] = {s: set() for s in row}
+        while len(row) > 1:
+            merged_row: list[Swatch] = []
+            for left_index in range(0, len(row) - 1, 2):
+                left_swatch, right_swatch = row[left_index], row[left_index + 1]
+                merged_swatch, new_upper_slices, new_lower_slices = self.merge_swatches_course_wise(left_swatch, right_swatch,
+                                                                                                    discard_unconnected_lower_courses=discard_unconnected_lower_courses)
+                shifted_upper_slices = upper_slices_in_swatch.pop(right_swatch)
+                for upper_slice in shifted_upper_slices:
+                    if upper_slice in self.swatches_to_rightward_shifts:
+                        self.swatches_to_rightward_shifts[upper_slice] += left_swatch.width
+                upper_slices_in_swatch[merged_swatch] = upper_slices_in_swatch.pop(left_swatch) | shifted_upper_slices | new_upper_slices
+                lower_slices.update(new_lower_slices)
+                upper_slices.update(new_upper_slices)
+                merged_row.append(merged_swatch)
+            if len(row) % 2 == 1:
+                merged_row.append(row[-1])
+            row = merged_row
+        return row[0], lower_slices, upper_slices
+
+    @Merge_Trace_Exporter.traced("convert_quilt_to_course_bands", labels=_course_bands_trace_labels)
+    def convert_quilt_to_course_bands(self, balanced_course_merges: bool = False, checkpoint: Quilt_Merge_Checkpoint | None = None,
+                                      converted_layers: list[set[Swatch]] | None = None, multi_course_merges: bool = False) -> list[set[Swatch]]:
         """
         Merge all the swatches in course-wise bands of the quilt until there are no more course wise connections to merge.
 
+        Args:
+            balanced_course_merges (bool, optional): If True, rows of course-wise connected swatches are merged by a balanced pairwise reduction. Defaults to False.
+            checkpoint (Quilt_Merge_Checkpoint, optional): If given, the quilt and the bands converted so far are recorded by this checkpoint after each layer is converted. Defaults to None.
+            converted_layers (list[set[Swatch]], optional): The bands already converted by a resumed merge, sorted from the bottom to the top of the quilt. Defaults to no bands.
+            multi_course_merges (bool, optional): If True, each row of course-wise connected swatches that can be merged in one pass is merged by a Multi_Course_Merge_Process. Defaults to False.
+
         Returns:
             list[set[Swatch]]: The list, sorted from the bottom to the top of the quilt, of course-wise bands resulting from merging the swatches.
         """
-        converted_layers: list[set[Swatch]] = []
+        if converted_layers is None:
+            converted_layers = []
         wale_wise_generations = [*topological_generations(self.wale_wise_connections)]
         while len(wale_wise_generations) > len(converted_layers):
             unmerged_layer = wale_wise_generations[len(converted_layers)]
@@ -607,12 +918,15 @@ class Quilt:
                     discard_lower = False
                 else:
                     discard_lower = True
-                merged_layer, lower_slices, upper_slices = self._merge_course_wise_quilt_layer(unmerged_layer, discard_unconnected_lower_courses=discard_lower)
+                merged_layer, lower_slices, upper_slices = self._merge_course_wise_quilt_layer(unmerged_layer, discard_unconnected_lower_courses=discard_lower,
+                                                                                             balanced_merges=balanced_course_merges, multi_course_merges=multi_course_merges)
                 if len(lower_slices) > 0:
                     converted_layers.append(lower_slices)
                 if len(merged_layer) > 0:
                     converted_layers.append(merged_layer)
                 wale_wise_generations = [*topological_generations(self.wale_wise_connections)]
+            if checkpoint is not None:
+                checkpoint.save_course_bands(self, converted_layers)
         return converted_layers
 
     def _shift_sliced_swatches(self) -> None:
@@ -623,54 +937,310 @@ class Quilt:
             if shift > 0:
                 self._reconnect_swatch(swatch, self.swatch_neighborhoods[swatch].get_all_connections(), swatch, shift_match_wale_interval=shift)
 
-    def merge_quilt(self, compile_merges: bool = False, compile_bands: bool = False) -> set[Swatch]:
+    def _band_column(self, bands: list[set[Swatch]]) -> list[Swatch] | None:
+        """
+        Args:
+            bands (list[set[Swatch]]): The list, sorted from the bottom to the top of the quilt, of course-wise bands.
+
+        Returns:
+            list[Swatch] | None:
+                The swatches of the bands, ordered from bottom to top, if each band is a single swatch that is only connected wale-wise to the swatch in the band above it.
+                Otherwise, None.
+        """
+        if any(len(band) != 1 for band in bands):
+            return None
+        column = [[*band][0] for band in bands]
+        for bottom_swatch, top_swatch in zip(column, column[1:]):
+            if [*self.wale_wise_connections.successors(bottom_swatch)] != [top_swatch] or [*self.wale_wise_connections.predecessors(top_swatch)] != [bottom_swatch]:
+                return None
+        return column
+
+    def _merge_band_column_balanced(self, column: list[Swatch], compile_merges: bool = False, compile_pool: Dat_Compile_Pool | None = None) -> Swatch:
+        """
+        Merges a column of wale-wise connected bands by a balanced pairwise reduction.
+        Neighboring pairs of bands are merged, then neighboring pairs of the merged bands, until one swatch remains.
+        Stacking bands from the bottom up re-consumes the growing bottom swatch in every merge, so a column of k bands costs O(k^2) band sizes.
+        The balanced reduction consumes each band in O(log k) merges.
+
+        Args:
+            column (list[Swatch]): The swatches of the bands, ordered from bottom to top.
+            compile_merges (bool, optional): If set to True, interstitial swatch merges are compiled to DAT files. Defaults to False.
+            compile_pool (Dat_Compile_Pool, optional): If given, the DAT files of interstitial merges are compiled in the background by this pool. Defaults to None.
+
+        Returns:
+            Swatch: The swatch resulting from merging the column.
+
+        Notes:
+            * Each merge is aligned by the wale-wise connection between the top band of the lower merged swatch and the bottom band of the upper merged swatch.
+              As in bottom-up stacking, the needle positions of that connection are used in the merged swatches.
+        """
+        # Each entry is the merged swatch, the band swatch at its bottom, and the band swatch at its top.
+        stacks: list[tuple[Swatch, Swatch, Swatch]] = [(swatch, swatch, swatch) for swatch in column]
+        reduction_round = 0
+        while len(stacks) > 1:
+            merged_stacks: list[tuple[Swatch, Swatch, Swatch]] = []
+            for bottom_index in range(0, len(stacks) - 1, 2):
+                bottom_stack, bottom_of_bottom, top_of_bottom = stacks[bottom_index]
+                top_stack, bottom_of_top, top_of_top = stacks[bottom_index + 1]
+                connection = self.get_wale_wise_connection(top_of_bottom, bottom_of_top)
+                assert isinstance(connection, Wale_Wise_Connection)
+                merger = Wale_Merge_Process(self._stacking_connection(bottom_stack, top_stack, connection))
+                merger.merge_swatches()
+                if compile_merges:
+                    merger.compile_to_dat(compile_pool=compile_pool)
+                merged_stacks.append((Swatch(f"merged_quilt_{reduction_round}_{bottom_index // 2}", merger.get_merged_instructions()), bottom_of_bottom, top_of_top))
+            if len(stacks) % 2 == 1:
+                merged_stacks.append(stacks[-1])
+            stacks = merged_stacks
+            reduction_round += 1
+        return stacks[0][0]
+
+    def save(self, archive_path: str) -> None:
+        """
+        Writes this quilt to a quilt archive (see Quilt_Archive). The quilt is not modified.
+
+        Args:
+            archive_path (str): The path of the archive to write.
+        """
+        from quilt_knit.quilt.Quilt_Archive import Quilt_Archive
+        Quilt_Archive.save(self, archive_path)
+
+    @classmethod
+    def load(cls, archive_path: str) -> Quilt:
+        """
+        Args:
+            archive_path (str): The path of a quilt archive written by save (see Quilt_Archive).
+
+        Returns:
+            Quilt: A new quilt with the swatches, connections and rightward shifts saved in the archive.
+        """
+        from quilt_knit.quilt.Quilt_Archive import Quilt_Archive
+        return Quilt_Archive.load(archive_path)
+
+    def plan_merge(self, cost_model: Merge_Cost_Model | None = None, balanced_course_merges: bool = False, balanced_wale_merges: bool = False,
+                   multi_wale_merges: bool = False, multi_course_merges: bool = False) -> Quilt_Merge_Planner:
+        """
+        Plans the merge of this quilt without merging it. The quilt is not modified.
+
+        Args:
+            cost_model (Merge_Cost_Model, optional): The model used to estimate the time of each merge. Defaults to the default Merge_Cost_Model.
+            balanced_course_merges (bool, optional): Plans the merge as merge_quilt would with the same argument. Defaults to False.
+            balanced_wale_merges (bool, optional): Plans the merge as merge_quilt would with the same argument. Defaults to False.
+            multi_wale_merges (bool, optional): Plans the merge as merge_quilt would with the same argument. Defaults to False.
+            multi_course_merges (bool, optional): Plans the merge as merge_quilt would with the same argument. Defaults to False.
+
+        Returns:
+            Quilt_Merge_Planner: The plan of the merges, expected swatch sizes, estimated time, and peak number of live swatches of merging this quilt.
+        """
+        return Quilt_Merge_Planner(self, cost_model, balanced_course_merges, balanced_wale_merges, multi_wale_merges, multi_course_merges)
+
+    def merge_quilt(self, compile_merges: bool = False, compile_bands: bool = False, balanced_course_merges: bool = False, balanced_wale_merges: bool = False,
+                    multi_wale_merges: bool = False, multi_course_merges: bool = False, profiler: Merge_Profiler | None = None, trace_exporter: Merge_Trace_Exporter | None = None,
+                    compile_pool: Dat_Compile_Pool | None = None, checkpoint_directory: str | None = None, resume_from: str | None = None) -> set[Swatch]:
         """
         Merges all connected swatches in the quilt.
 
         Args:
             compile_merges (bool, optional): If set to True, interstitial swatch merges are compiled to DAT files. Defaults to False.
             compile_bands (bool, optional): If set to True, all bands of merged swatches are compiled to DAT files. Defaults to False.
+            balanced_course_merges (bool, optional): If True, rows of course-wise connected swatches are merged by a balanced pairwise reduction. Defaults to False.
+            balanced_wale_merges (bool, optional):
+                If True and the bands form a single column of swatches, the bands are merged by a balanced pairwise reduction (see _merge_band_column_balanced).
+                Otherwise, bands are stacked from the bottom up, and an Unsupported_Merge_Option_Warning is raised if this option was set. Defaults to False.
+            multi_wale_merges (bool, optional):
+                If True, a swatch with several wale-wise connections above it is merged with all of its top swatches by one Multi_Wale_Merge_Process.
+                Otherwise, each top swatch is merged into the result of the prior merge. Defaults to False.
+            multi_course_merges (bool, optional):
+                If True, a row of course-wise connected swatches is merged in one pass by a Multi_Course_Merge_Process when each connection in the row spans every course of its swatches.
+                Other rows are merged pairwise, and an Unsupported_Merge_Option_Warning is raised for each of them. Defaults to False.
+            profiler (Merge_Profiler, optional): If given, this profiler is active while the quilt is merged and records the phases and events of the merge. Defaults to None.
+            trace_exporter (Merge_Trace_Exporter, optional): If given, this exporter is active while the quilt is merged and records the spans of the merge. Defaults to None.
+            compile_pool (Dat_Compile_Pool, optional):
+                If given, the DAT files of bands and interstitial merges are compiled in the background by this pool while merging continues.
+                The compiles are gathered before returning, and their times are recorded in the pool's compile_seconds. Defaults to None.
+            checkpoint_directory (str, optional):
+                If given, the progress of the merge is recorded in this directory after each course-wise band is converted and after each wale-wise merge of the bands (see Quilt_Merge_Checkpoint).
+                Defaults to the resume_from directory if resuming, otherwise no checkpoints are recorded.
+            resume_from (str, optional):
+                If given, the quilt is replaced by the quilt recorded in this checkpoint directory, and the merge continues from the last step recorded there.
+                The merge options must match those of the checkpointed merge. Defaults to merging this quilt from the start.
 
         Returns:
             set[Swatch]: The set of swatches remaining in the quilt after the merge is complete.
+
+        Raises:
+            ValueError: If resume_from is not a checkpoint directory or the merge options do not match those of the checkpointed merge.
+
+        Notes:
+            * A balanced merge of a column of bands is recorded before it starts, but not after each of its merges.
+            * Each wale-wise merge is named after the step of the merge that made it, so merged swatches that are live at the same time never share a name.
+        """
+        with ExitStack() as active_recorders:
+            if profiler is not None:
+                active_recorders.enter_context(profiler)
+            if trace_exporter is not None:
+                active_recorders.enter_context(trace_exporter)
+            merge_options = {"balanced_course_merges": balanced_course_merges, "balanced_wale_merges": balanced_wale_merges, "multi_wale_merges": multi_wale_merges,
+                             "multi_course_merges": multi_course_merges}
+            resumed_state: Merge_Checkpoint_State | None = None
+            if resume_from is not None:
+                resumed_state = self._restore_checkpoint(resume_from, merge_options)
+                if checkpoint_directory is None:
+                    checkpoint_directory = resume_from
+            checkpoint = None if checkpoint_directory is None else Quilt_Merge_Checkpoint(checkpoint_directory, merge_options)
+            if resumed_state is None or resumed_state.phase is Merge_Checkpoint_Phase.course_bands:
+                converted_layers = None if resumed_state is None else [set(band) for band in resumed_state.bands]
+                bands = self.convert_quilt_to_course_bands(balanced_course_merges, checkpoint, converted_layers, multi_course_merges)
+                if compile_bands:
+                    for band in bands:
+                        for swatch in band:
+                            swatch.compile_to_dat(compile_pool=compile_pool)
+                self._shift_sliced_swatches()
+                # The bands are stacked in a recorded order, because the iteration order of a set of swatches differs between the merge and a resumed merge.
+                stacking_bands = [[*band] for band in bands]
+                if checkpoint is not None:
+                    checkpoint.save_wale_stacking(self, stacking_bands, 0)
+            else:
+                stacking_bands = resumed_state.bands
+            merged_column = self._merge_bands_balanced(stacking_bands, compile_merges, compile_pool) if balanced_wale_merges else None
+            if merged_column is not None:
+                merged_swatches = {merged_column}
+            else:
+                merged_swatches = self._stack_bands(stacking_bands, multi_wale_merges, compile_merges, compile_pool, checkpoint, resumed_state)
+            if compile_pool is not None:
+                compile_pool.gather()
+            return merged_swatches
+
+    def _restore_checkpoint(self, resume_from: str, merge_options: dict[str, bool]) -> Merge_Checkpoint_State:
+        """
+        Replaces the swatches and connections of this quilt with those of the quilt recorded in the given checkpoint directory.
+
+        Args:
+            resume_from (str): The checkpoint directory of the merge to resume.
+            merge_options (dict[str, bool]): The options of the resumed merge.
+
+        Returns:
+            Merge_Checkpoint_State: The progress of the merge recorded in the checkpoint directory.
+
+        Raises:
+            ValueError: If resume_from is not a checkpoint directory or the merge options do not match those of the checkpointed merge.
+        """
+        resumed_state = Quilt_Merge_Checkpoint.load(resume_from, Quilt)
+        if resumed_state.merge_options != merge_options:
+            raise ValueError(f"Cannot resume a merge with options {resumed_state.merge_options} using options {merge_options}")
+        self.course_wise_connections = resumed_state.quilt.course_wise_connections
+        self.wale_wise_connections = resumed_state.quilt.wale_wise_connections
+        self.swatch_neighborhoods = resumed_state.quilt.swatch_neighborhoods
+        self.swatches_to_rightward_shifts = resumed_state.quilt.swatches_to_rightward_shifts
+        self.spatial_index = resumed_state.quilt.spatial_index
+        return resumed_state
+
+    def _merge_bands_balanced(self, stacking_bands: list[list[Swatch]], compile_merges: bool, compile_pool: Dat_Compile_Pool | None) -> Swatch | None:
+        """
+        Args:
+            stacking_bands (list[list[Swatch]]): The swatches of each band, from the bottom to the top of the quilt.
+            compile_merges (bool): If set to True, interstitial swatch merges are compiled to DAT files.
+            compile_pool (Dat_Compile_Pool, optional): If given, the DAT files of interstitial merges are compiled in the background by this pool.
+
+        Returns:
+            Swatch | None:
+                The swatch resulting from merging the bands by a balanced pairwise reduction (see _merge_band_column_balanced) if the bands form a single column of swatches.
+                Otherwise, None, and an Unsupported_Merge_Option_Warning is raised.
+        """
+        column = self._band_column([set(band) for band in stacking_bands])
+        if column is None:
+            warnings.warn(Unsupported_Merge_Option_Warning("balanced_wale_merges requires the bands to form a single column of swatches. The bands are stacked from the bottom up instead."))
+            return None
+        return self._merge_band_column_balanced(column, compile_merges, compile_pool)
+
+    @staticmethod
+    def _stacking_connection(bottom_swatch: Swatch, top_swatch: Swatch, connection: Wale_Wise_Connection) -> Wale_Wise_Connection:
+        """
+        Args:
+            bottom_swatch (Swatch): The merged swatch that holds the bottom swatch of the given connection.
+            top_swatch (Swatch): The merged swatch that holds the top swatch of the given connection.
+            connection (Wale_Wise_Connection): A wale-wise connection between two bands of the quilt.
+
+        Returns:
+            Wale_Wise_Connection: A connection between the given swatches at the needle positions of the given connection, which removes the cast-ons of the top swatch.
+        """
+        return Wale_Wise_Connection(bottom_swatch, top_swatch,
+                                    connection.bottom_left_needle_position, connection.bottom_right_needle_position,
+                                    connection.top_left_needle_position, connection.top_right_needle_position,
+                                    remove_cast_ons=True)
+
+    def _stack_bands(self, stacking_bands: list[list[Swatch]], multi_wale_merges: bool, compile_merges: bool, compile_pool: Dat_Compile_Pool | None,
+                     checkpoint: Quilt_Merge_Checkpoint | None, resumed_state: Merge_Checkpoint_State | None) -> set[Swatch]:
+        """
+        Stacks the bands from the bottom up. Each band swatch, in stacking order, is merged with the swatches connected above it, into the swatch that it has been merged into so far.
+
+        Args:
+            stacking_bands (list[list[Swatch]]): The swatches of each band, from the bottom to the top of the quilt, in the order that they are stacked.
+            multi_wale_merges (bool): If True, a swatch with several wale-wise connections above it is merged with all of its top swatches by one Multi_Wale_Merge_Process.
+            compile_merges (bool): If set to True, interstitial swatch merges are compiled to DAT files.
+            compile_pool (Dat_Compile_Pool, optional): If given, the DAT files of interstitial merges are compiled in the background by this pool.
+            checkpoint (Quilt_Merge_Checkpoint, optional): If given, the merges are recorded by this checkpoint after each band swatch is stacked.
+            resumed_state (Merge_Checkpoint_State, optional): If given, stacking continues after the band swatches stacked in this checkpointed state.
+
+        Returns:
+            set[Swatch]: The swatches remaining after the bands are stacked.
         """
-        bands = self.convert_quilt_to_course_bands()
-        if compile_bands:
-            for band in bands:
-                for swatch in band:
-                    swatch.compile_to_knitout()
-                    swatch.compile_to_dat()
-        self._shift_sliced_swatches()
         resets: dict[Swatch, Swatch] = {}
-        for band in bands:
-            resets.update({s: s for s in band})
-        swatch_includes: dict[Swatch: set[Swatch]] = {s: {s} for s in resets}
-        for band in bands:
-            for swatch in band:
-                update_swatch = resets[swatch]
-                last_position = update_swatch.carriage_passes[update_swatch.height - 1].last_instruction.needle.position
-                included_in_update = swatch_includes[update_swatch]
-                # Sort connections by proximity to the last needle position in the swatch being updated.
-                top_connections = sorted(self.swatch_neighborhoods[swatch].get_connections_to_courses(exclude_left_connection=True, exclude_right_connections=True, exclude_bottom_connections=True),
-                                         key=lambda c: min(abs(c.bottom_left_needle_position - last_position), abs(c.bottom_right_needle_position - last_position)))
-                if len(top_connections) > 0:
-                    del swatch_includes[update_swatch]
+        swatch_includes: dict[Swatch, set[Swatch]] = {}
+        # Merged swatches keyed to the later merge that absorbed them, used to move resets off of absorbed merges.
+        absorbed_into: dict[Swatch, Swatch] = {}
+        stacked_swatches = 0
+        if resumed_state is not None and resumed_state.resets is not None and resumed_state.swatch_includes is not None:
+            resets, swatch_includes, stacked_swatches = resumed_state.resets, resumed_state.swatch_includes, resumed_state.step
+        else:
+            for band in stacking_bands:
+                resets.update({s: s for s in band})
+            swatch_includes = {s: {s} for s in resets}
+        for step, swatch in enumerate(swatch for band in stacking_bands for swatch in band):
+            if step < stacked_swatches:  # Stacked before the merge was resumed.
+                continue
+            update_swatch = resets[swatch]
+            while update_swatch not in swatch_includes:
+                update_swatch = absorbed_into[update_swatch]
+            resets[swatch] = update_swatch
+            last_position = update_swatch.carriage_passes[update_swatch.height - 1].last_instruction.needle.position
+            included_in_update = swatch_includes[update_swatch]
+            # Sort connections by proximity to the last needle position in the swatch being updated.
+            top_connections = cast(list[Wale_Wise_Connection],
+                                   sorted(self.spatial_index.get_connections_to_courses(swatch, exclude_left_connection=True, exclude_right_connections=True, exclude_bottom_connections=True),
+                                          key=lambda c: min(abs(c.bottom_left_needle_position - last_position), abs(c.bottom_right_needle_position - last_position))))
+            if len(top_connections) > 0:
+                del swatch_includes[update_swatch]
+            if multi_wale_merges and len(top_connections) > 1:
+                multi_merger = Multi_Wale_Merge_Process([self._stacking_connection(update_swatch, top_connection.top_swatch, top_connection) for top_connection in top_connections])
+                multi_merger.merge_swatches()
+                if compile_merges:
+                    multi_merger.compile_to_dat(compile_pool=compile_pool)
+                merged_swatch = Swatch(f"merged_quilt_{step}", multi_merger.get_merged_instructions())
+                resets[swatch] = merged_swatch
+                absorbed_into[update_swatch] = merged_swatch
+                included_in_update.add(merged_swatch)
                 for top_connection in top_connections:
-                    assert isinstance(top_connection, Wale_Wise_Connection)
-                    merge_connection = Wale_Wise_Connection(update_swatch, top_connection.top_swatch,
-                                                            top_connection.bottom_left_needle_position, top_connection.bottom_right_needle_position,
-                                                            top_connection.top_left_needle_position, top_connection.top_right_needle_position,
-                                                            remove_cast_ons=True)
-                    merger = Wale_Merge_Process(merge_connection)
+                    resets[top_connection.top_swatch] = merged_swatch
+                    included_in_update.update(swatch_includes[top_connection.top_swatch])
+                    del swatch_includes[top_connection.top_swatch]
+                swatch_includes[merged_swatch] = included_in_update
+            else:
+                for merge_index, top_connection in enumerate(top_connections):
+                    merger = Wale_Merge_Process(self._stacking_connection(update_swatch, top_connection.top_swatch, top_connection))
                     merger.merge_swatches()
                     if compile_merges:
-                        merger.compile_to_dat()
-                    merged_swatch = Swatch(f"merged_quilt", merger.get_merged_instructions())
+                        merger.compile_to_dat(compile_pool=compile_pool)
+                    merged_swatch = Swatch(f"merged_quilt_{step}_{merge_index}", merger.get_merged_instructions())
                     resets[swatch] = merged_swatch
                     resets[top_connection.top_swatch] = merged_swatch
+                    absorbed_into[update_swatch] = merged_swatch
                     included_in_update.add(merged_swatch)
                     included_in_update.update(swatch_includes[top_connection.top_swatch])
                     del swatch_includes[top_connection.top_swatch]
+                    swatch_includes.pop(update_swatch, None)  # The prior merge of this step is absorbed by this merge.
                     swatch_includes[merged_swatch] = included_in_update
                     update_swatch = merged_swatch
-        return set(s for s in swatch_includes)
+            if checkpoint is not None and len(top_connections) > 0:
+                checkpoint.save_wale_stacking(self, stacking_bands, step + 1, resets, swatch_includes)
+        return set(swatch_includes)
@@ -0,0 +1,154 @@
+"""Module containing the Quilt_Archive class used to save quilts to and load quilts from a single zip archive."""
+from __future__ import annotations
+
+import json
+import warnings
+import zipfile
+from typing import Any
+
+from virtual_knitting_machine.knitting_machine_warnings.Needle_Warnings import (
+    Knit_on_Empty_Needle_Warning,
+)
+
+from quilt_knit.quilt.Quilt import Quilt
+from quilt_knit.swatch.course_wise_merging.Course_Wise_Connection import (
+    Course_Wise_Connection,
+)
+from quilt_knit.swatch.Swatch import Swatch
+from quilt_knit.swatch.Swatch_Connection import Swatch_Connection
+from quilt_knit.swatch.wale_wise_merging.Wale_Wise_Connection import (
+    Wale_Wise_Connection,
+)
+
+
+class Quilt_Archive:
+    """
+    Saves a quilt to, and loads a quilt from, a single zip archive.
+    The archive holds the executed program of each swatch as binary knitout (see Binary_Knitout_Codec) and a JSON manifest.
+    The manifest lists each swatch with its rightward shift, and each course-wise and wale-wise connection with its intervals.
+
+    A loaded quilt has the same swatches, connections, neighborhoods and rightward shifts as the saved quilt.
+    Loading decodes each swatch program without parsing knitout and does not repeat the cast-on removal of wale-wise connections.
+
+    Examples:
+        >>> Quilt_Archive.save(quilt, "sweater.quilt")
+        >>> quilt = Quilt_Archive.load("sweater.quilt")  # On a worker machine without the knitout files of the swatches.
+
+    Notes:
+        * Archives are written with fixed entry timestamps, so saving the same quilt twice writes the same bytes.
+        * Swatches are identified by name, so the swatches of a quilt must have distinct names.
+    """
+    FORMAT: str = "quilt_knit.quilt"
+    VERSION: int = 1
+    MANIFEST: str = "quilt.json"
+    SWATCH_DIRECTORY: str = "swatches"
+    _ENTRY_DATE_TIME: tuple[int, int, int, int, int, int] = (1980, 1, 1, 0, 0, 0)
+
+    @staticmethod
+    def _connection_record(connection: Swatch_Connection) -> dict[str, Any]:
+        """
+        Args:
+            connection (Swatch_Connection): The connection to record.
+
+        Returns:
+            dict[str, Any]: The names of the swatches of the connection and the intervals of the connection on each swatch.
+        """
+        return {"from": connection.from_swatch.name, "to": connection.to_swatch.name,
+                "from_interval": [connection.from_begin, connection.from_end], "to_interval": [connection.to_begin, connection.to_end]}
+
+    @staticmethod
+    def manifest(quilt: Quilt) -> dict[str, Any]:
+        """
+        Args:
+            quilt (Quilt): The quilt to describe.
+
+        Returns:
+            dict[str, Any]: The manifest of the archive of the given quilt, with swatches in name order and connections in the order of their swatch names.
+
+        Raises:
+            ValueError: If two swatches in the quilt have the same name.
+        """
+        swatches = sorted(quilt.swatch_neighborhoods, key=lambda s: s.name)
+        for swatch, next_swatch in zip(swatches, swatches[1:]):
+            if swatch.name == next_swatch.name:
+                raise ValueError(f"Cannot archive a quilt with more than one swatch named {swatch.name}")
+        course_wise_connections = sorted((connection for _left, _right, connection in quilt.course_wise_connections.edges(data=Quilt._CONNECTION)),
+                                         key=lambda c: (c.from_swatch.name, c.to_swatch.name))
+        wale_wise_connections = sorted((connection for _bottom, _top, connection in quilt.wale_wise_connections.edges(data=Quilt._CONNECTION)),
+                                       key=lambda c: (c.from_swatch.name, c.to_swatch.name))
+        return {"format": Quilt_Archive.FORMAT, "version": Quilt_Archive.VERSION,
+                "swatches": [{"name": swatch.name, "program": f"{Quilt_Archive.SWATCH_DIRECTORY}/{index}.kb", "rightward_shift": quilt.swatches_to_rightward_shifts[swatch]}
+                             for index, swatch in enumerate(swatches)],
+                "course_wise_connections": [Quilt_Archive._connection_record(c) for c in course_wise_connections],
+                "wale_wise_connections": [Quilt_Archive._connection_record(c) for c in wale_wise_connections]}
+
+    @staticmethod
+    def _write_entry(archive: zipfile.ZipFile, entry_name: str, content: bytes) -> None:
+        """
+        Args:
+            archive (zipfile.ZipFile): The archive to write to.
+            entry_name (str): The name of the entry to write.
+            content (bytes): The content of the entry.
+        """
+        entry = zipfile.ZipInfo(entry_name, date_time=Quilt_Archive._ENTRY_DATE_TIME)
+        entry.compress_type = archive.compression
+        archive.writestr(entry, content)
+
+    @staticmethod
+    def save(quilt: Quilt, archive_path: str, compression: int = zipfile.ZIP_DEFLATED) -> None:
+        """
+        Writes the given quilt to a zip archive. The quilt is not modified.
+
+        Args:
+            quilt (Quilt): The quilt to save.
+            archive_path (str): The path of the archive to write.
+            compression (int, optional): The zipfile compression method of the archive entries. Defaults to zipfile.ZIP_DEFLATED.
+
+        Raises:
+            ValueError: If two swatches in the quilt have the same name.
+        """
+        manifest = Quilt_Archive.manifest(quilt)
+        swatches_by_name = {swatch.name: swatch for swatch in quilt.swatch_neighborhoods}
+        with zipfile.ZipFile(archive_path, "w", compression=compression) as archive:
+            Quilt_Archive._write_entry(archive, Quilt_Archive.MANIFEST, json.dumps(manifest, indent=2).encode("utf-8"))
+            for swatch_record in manifest["swatches"]:
+                Quilt_Archive._write_entry(archive, swatch_record["program"], swatches_by_name[swatch_record["name"]].to_binary_knitout())
+
+    @staticmethod
+    def load(archive_path: str) -> Quilt:
+        """
+        Args:
+            archive_path (str): The path of the archive to read.
+
+        Returns:
+            Quilt: A new quilt with the swatches, connections and rightward shifts saved in the archive.
+
+        Raises:
+            ValueError: If the file is not a quilt archive or was written by an unsupported version of the archive format.
+        """
+        with zipfile.ZipFile(archive_path, "r") as archive:
+            try:
+                manifest = json.loads(archive.read(Quilt_Archive.MANIFEST))
+            except KeyError:
+                raise ValueError(f"{archive_path} is not a quilt archive: it has no {Quilt_Archive.MANIFEST}") from None
+            if manifest.get("format") != Quilt_Archive.FORMAT:
+                raise ValueError(f"{archive_path} is not a quilt archive: its format is {manifest.get('format')}")
+            if manifest.get("version") != Quilt_Archive.VERSION:
+                raise ValueError(f"{archive_path} is a version {manifest.get('version')} quilt archive, but only version {Quilt_Archive.VERSION} can be loaded")
+            quilt = Quilt()
+            swatches_by_name: dict[str, Swatch] = {}
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', category=Knit_on_Empty_Needle_Warning)  # Swatches with their cast-ons removed knit on empty needles.
+                for swatch_record in manifest["swatches"]:
+                    swatch = Swatch(swatch_record["name"], archive.read(swatch_record["program"]))
+                    swatches_by_name[swatch.name] = swatch
+                    quilt.add_swatch(swatch)
+                    quilt.swatches_to_rightward_shifts[swatch] = swatch_record["rightward_shift"]
+        connections: list[Swatch_Connection] = []
+        for record in manifest["course_wise_connections"]:
+            connections.append(Course_Wise_Connection(swatches_by_name[record["from"]], swatches_by_name[record["to"]], *record["from_interval"], *record["to_interval"]))
+        for record in manifest["wale_wise_connections"]:
+            connections.append(Wale_Wise_Connection(swatches_by_name[record["from"]], swatches_by_name[record["to"]], *record["from_interval"], *record["to_interval"],
+                                                    remove_cast_ons=False))
+        quilt._add_connections(connections)
+        return quilt
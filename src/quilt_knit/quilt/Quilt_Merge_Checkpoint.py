@@ -0,0 +1,260 @@
+"""Module containing the Quilt_Merge_Checkpoint class used to persist the progress of a quilt merge so that an interrupted merge can be resumed."""
+from __future__ import annotations
+
+import json
+import os
+import warnings
+import zipfile
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+from virtual_knitting_machine.knitting_machine_warnings.Needle_Warnings import (
+    Knit_on_Empty_Needle_Warning,
+)
+
+from quilt_knit.swatch.Swatch import Swatch
+
+if TYPE_CHECKING:
+    from quilt_knit.quilt.Quilt import Quilt
+
+
+class Merge_Checkpoint_Phase(Enum):
+    """Enumeration of the phases of merge_quilt that are checkpointed."""
+    course_bands = "course_bands"  # Merging each wale-wise layer of the quilt into course-wise bands.
+    wale_stacking = "wale_stacking"  # Stacking the course-wise bands by wale-wise merges.
+
+
+@dataclass
+class Merge_Checkpoint_State:
+    """
+    The progress of a merge loaded from a checkpoint.
+
+    Attributes:
+        phase (Merge_Checkpoint_Phase): The phase of the merge when the checkpoint was written.
+        quilt (Quilt): The quilt when the checkpoint was written.
+        merge_options (dict[str, bool]): The options of merge_quilt that determine the merges, which a resumed merge must match.
+        bands (list[list[Swatch]]):
+            The course-wise bands converted so far, from the bottom to the top of the quilt.
+            In the wale stacking phase, the swatches of each band are in the order that they are stacked.
+        step (int): In the wale stacking phase, the number of band swatches, in stacking order, whose wale-wise merges are complete.
+        resets (dict[Swatch, Swatch]): In the wale stacking phase, the band swatches keyed to the swatch that they have been merged into.
+        swatch_includes (dict[Swatch, set[Swatch]]): In the wale stacking phase, the swatches remaining after the merge keyed to the swatches merged into them.
+    """
+    phase: Merge_Checkpoint_Phase
+    quilt: Quilt
+    merge_options: dict[str, bool]
+    bands: list[list[Swatch]]
+    step: int = 0
+    resets: dict[Swatch, Swatch] | None = None
+    swatch_includes: dict[Swatch, set[Swatch]] | None = None
+
+
+class Quilt_Merge_Checkpoint:
+    """
+    Persists the progress of merge_quilt to a directory after each course-wise band is converted and after each wale-wise merge of the bands.
+    Passing the directory to merge_quilt as resume_from continues an interrupted merge from its last completed step.
+
+    The directory holds:
+        * checkpoint.json: The record of the last completed step. It is replaced atomically once every file it refers to is written, so it always describes a complete step.
+        * quilt_<n>.quilt: A quilt archive (see Quilt_Archive) of the quilt at the step. The quilt does not change while bands are stacked, so it is written once for that phase.
+        * merged_<n>.zip: The binary knitout programs of the merged swatches produced while stacking the bands.
+    Files from earlier steps are removed once a later step is recorded.
+
+    Examples:
+        >>> quilt.merge_quilt(checkpoint_directory="sweater_checkpoint")  # Interrupted.
+        >>> merged = Quilt().merge_quilt(resume_from="sweater_checkpoint")
+
+    Attributes:
+        directory (str): The directory that checkpoints are written to.
+        merge_options (dict[str, bool]): The options of merge_quilt that determine the merges, recorded in each checkpoint.
+        checkpoints_written (int): The number of checkpoints written by this object.
+
+    Notes:
+        * Swatches are identified by name, as in Quilt_Archive. The merged swatches of the stacking phase are identified by their position in the checkpoint, and resets are resolved by the identity of the merged swatches rather than their names.
+        * Every course-band checkpoint writes an archive of the whole quilt, so the cost of each course-band checkpoint grows with the size of the quilt.
+        * Quilts are archived and loaded through Quilt.save and Quilt.load, so this module does not import Quilt and Quilt can import it.
+    """
+    CHECKPOINT_FILE: str = "checkpoint.json"
+    FORMAT: str = "quilt_knit.merge_checkpoint"
+    VERSION: int = 1
+    _MERGED_REFERENCE_PREFIX: str = "#"
+
+    def __init__(self, directory: str, merge_options: dict[str, bool]):
+        """
+        Args:
+            directory (str): The directory to write checkpoints to. A checkpoint already in this directory is kept until this object records a later step.
+            merge_options (dict[str, bool]): The options of merge_quilt that determine the merges.
+        """
+        self.directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+        self.merge_options: dict[str, bool] = merge_options
+        self.checkpoints_written: int = 0
+        try:  # Number new files after those of a checkpoint already in the directory, so that they never replace a file that it refers to.
+            self._sequence: int = self._read_record(directory)["sequence"] + 1
+        except ValueError:
+            self._sequence = 0
+        self._stacking_quilt_file: str | None = None
+
+    def _path(self, file_name: str) -> str:
+        """
+        Args:
+            file_name (str): The name of a file in the checkpoint directory.
+
+        Returns:
+            str: The path of the file.
+        """
+        return os.path.join(self.directory, file_name)
+
+    def _commit(self, record: dict[str, Any]) -> None:
+        """
+        Atomically replaces the checkpoint record with the given record and removes the files of earlier checkpoints.
+
+        Args:
+            record (dict[str, Any]): The record of the completed step. Every file that it refers to must already be written.
+        """
+        record = {"format": self.FORMAT, "version": self.VERSION, "sequence": self._sequence, "merge_options": self.merge_options, **record}
+        partial_path = self._path(f"{self.CHECKPOINT_FILE}.partial")
+        with open(partial_path, "w") as record_file:
+            json.dump(record, record_file)
+        os.replace(partial_path, self._path(self.CHECKPOINT_FILE))
+        referenced_files = {record["quilt"], record.get("merged_swatches", {}).get("file")}
+        for file_name in os.listdir(self.directory):
+            if file_name.startswith(("quilt_", "merged_")) and file_name not in referenced_files:
+                os.remove(self._path(file_name))
+        self._sequence += 1
+        self.checkpoints_written += 1
+
+    def _save_quilt(self, quilt: Quilt) -> str:
+        """
+        Args:
+            quilt (Quilt): The quilt to archive.
+
+        Returns:
+            str: The name of the archive of the quilt in the checkpoint directory.
+        """
+        quilt_file = f"quilt_{self._sequence}.quilt"
+        quilt.save(self._path(quilt_file))
+        return quilt_file
+
+    def save_course_bands(self, quilt: Quilt, converted_layers: list[set[Swatch]]) -> None:
+        """
+        Records the conversion of the given layers of the quilt into course-wise bands.
+
+        Args:
+            quilt (Quilt): The quilt after converting the layers.
+            converted_layers (list[set[Swatch]]): The course-wise bands converted so far, from the bottom to the top of the quilt.
+        """
+        self._stacking_quilt_file = None
+        self._commit({"phase": Merge_Checkpoint_Phase.course_bands.value, "quilt": self._save_quilt(quilt),
+                      "bands": [sorted(swatch.name for swatch in layer) for layer in converted_layers]})
+
+    def save_wale_stacking(self, quilt: Quilt, bands: list[list[Swatch]], step: int,
+                           resets: dict[Swatch, Swatch] | None = None, swatch_includes: dict[Swatch, set[Swatch]] | None = None) -> None:
+        """
+        Records the wale-wise merges of the band swatches stacked so far.
+
+        Only the merged swatches that remain after the merge are written. Band swatches reset to an intermediate merge that has since been merged into another swatch
+        are recorded as reset to the remaining swatch that absorbed the intermediate merge.
+
+        Args:
+            quilt (Quilt): The quilt whose bands are stacked. The quilt is archived with the first stacking checkpoint and is assumed not to change during the phase.
+            bands (list[list[Swatch]]): The swatches of each band, from the bottom to the top of the quilt, in the order that they are stacked.
+            step (int): The number of band swatches, in stacking order, whose wale-wise merges are complete.
+            resets (dict[Swatch, Swatch], optional): The band swatches keyed to the swatch that they have been merged into. Defaults to none, before stacking starts.
+            swatch_includes (dict[Swatch, set[Swatch]], optional): The swatches remaining after the merge keyed to the swatches merged into them. Defaults to none, before stacking starts.
+        """
+        if self._stacking_quilt_file is None:
+            self._stacking_quilt_file = self._save_quilt(quilt)
+        record: dict[str, Any] = {"phase": Merge_Checkpoint_Phase.wale_stacking.value, "quilt": self._stacking_quilt_file,
+                                  "bands": [[swatch.name for swatch in band] for band in bands], "step": step}
+        if resets is not None and swatch_includes is not None:
+            band_swatch_ids = {id(swatch) for band in bands for swatch in band}
+            live_swatch_ids = {id(swatch) for swatch in swatch_includes}
+            absorbing_swatches: dict[int, Swatch] = {id(included): live_swatch for live_swatch, includes in swatch_includes.items() for included in includes}
+            merged_swatches: dict[int, tuple[str, Swatch]] = {}
+
+            def _reference(swatch: Swatch) -> str:
+                """
+                Args:
+                    swatch (Swatch): A band swatch or a merged swatch that remains after the merge.
+
+                Returns:
+                    str: The name of a band swatch or the position of a merged swatch in the checkpoint.
+                """
+                if id(swatch) in band_swatch_ids:
+                    return swatch.name
+                if id(swatch) not in merged_swatches:
+                    merged_swatches[id(swatch)] = (f"{self._MERGED_REFERENCE_PREFIX}{len(merged_swatches)}", swatch)
+                return merged_swatches[id(swatch)][0]
+
+            def _live_reference(swatch: Swatch) -> str:
+                """
+                Args:
+                    swatch (Swatch): A band swatch or a merged swatch, which may be an intermediate merge that has since been merged into another swatch.
+
+                Returns:
+                    str: The reference of the given swatch if it is a band swatch or remains after the merge, otherwise the reference of the remaining swatch that it was merged into.
+                """
+                if id(swatch) in band_swatch_ids or id(swatch) in live_swatch_ids:
+                    return _reference(swatch)
+                return _reference(absorbing_swatches[id(swatch)])
+
+            record["resets"] = [[swatch.name, _live_reference(reset)] for swatch, reset in resets.items()]
+            record["swatch_includes"] = [[_reference(swatch), sorted({_live_reference(included) for included in includes})] for swatch, includes in swatch_includes.items()]
+            merged_file = f"merged_{self._sequence}.zip"
+            with zipfile.ZipFile(self._path(merged_file), "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for index, (_reference_name, merged_swatch) in enumerate(merged_swatches.values()):
+                    archive.writestr(f"{index}.kb", merged_swatch.to_binary_knitout())
+            record["merged_swatches"] = {"file": merged_file, "names": [merged_swatch.name for _reference_name, merged_swatch in merged_swatches.values()]}
+        self._commit(record)
+
+    @staticmethod
+    def _read_record(directory: str) -> dict[str, Any]:
+        """
+        Args:
+            directory (str): A checkpoint directory.
+
+        Returns:
+            dict[str, Any]: The checkpoint record in the directory.
+
+        Raises:
+            ValueError: If the directory has no checkpoint or its checkpoint was written by an unsupported version of the checkpoint format.
+        """
+        record_path = os.path.join(directory, Quilt_Merge_Checkpoint.CHECKPOINT_FILE)
+        if not os.path.exists(record_path):
+            raise ValueError(f"{directory} has no merge checkpoint")
+        with open(record_path) as record_file:
+            record = json.load(record_file)
+        if record.get("format") != Quilt_Merge_Checkpoint.FORMAT or record.get("version") != Quilt_Merge_Checkpoint.VERSION:
+            raise ValueError(f"{record_path} is not a version {Quilt_Merge_Checkpoint.VERSION} merge checkpoint")
+        return record
+
+    @staticmethod
+    def load(directory: str, quilt_type: type[Quilt]) -> Merge_Checkpoint_State:
+        """
+        Args:
+            directory (str): A directory that checkpoints were written to.
+            quilt_type (type[Quilt]): The class that loads the archived quilt of the checkpoint.
+
+        Returns:
+            Merge_Checkpoint_State: The progress of the merge recorded by the last checkpoint in the directory.
+
+        Raises:
+            ValueError: If the directory has no checkpoint or its checkpoint was written by an unsupported version of the checkpoint format.
+        """
+        record = Quilt_Merge_Checkpoint._read_record(directory)
+        quilt = quilt_type.load(os.path.join(directory, record["quilt"]))
+        swatches_by_reference: dict[str, Swatch] = {swatch.name: swatch for swatch in quilt.swatch_neighborhoods}
+        bands = [[swatches_by_reference[name] for name in band] for band in record["bands"]]
+        state = Merge_Checkpoint_State(Merge_Checkpoint_Phase(record["phase"]), quilt, record["merge_options"], bands, record.get("step", 0))
+        if "resets" in record:
+            with zipfile.ZipFile(os.path.join(directory, record["merged_swatches"]["file"]), "r") as archive:
+                with warnings.catch_warnings():
+                    warnings.filterwarnings('ignore', category=Knit_on_Empty_Needle_Warning)  # Merged swatches may have had their cast-ons removed.
+                    for index, name in enumerate(record["merged_swatches"]["names"]):
+                        swatches_by_reference[f"{Quilt_Merge_Checkpoint._MERGED_REFERENCE_PREFIX}{index}"] = Swatch(name, archive.read(f"{index}.kb"))
+            state.resets = {swatches_by_reference[name]: swatches_by_reference[reference] for name, reference in record["resets"]}
+            state.swatch_includes = {swatches_by_reference[reference]: {swatches_by_reference[included] for included in includes}
+                                     for reference, includes in record["swatch_includes"]}
+        return state
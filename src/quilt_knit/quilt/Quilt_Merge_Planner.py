@@ -0,0 +1,349 @@
+"""Module containing the Quilt_Merge_Planner class used to estimate the cost of merging a quilt without merging it."""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from networkx import topological_generations
+
+from quilt_knit.swatch.Swatch import Swatch
+
+if TYPE_CHECKING:
+    from quilt_knit.quilt.Quilt import Quilt
+
+
+@dataclass
+class Merge_Cost_Model:
+    """
+    A per-instruction model of the time taken by a merge.
+    A merge consumes every instruction of the swatches it merges and then re-executes every instruction of the merged program to construct the merged swatch.
+    The time of a merge is estimated as the number of these processed instructions times the seconds spent per instruction.
+    """
+    seconds_per_instruction: float = 0.0007  # The time spent processing one instruction in a merge.
+
+    def estimate_seconds(self, processed_instructions: int) -> float:
+        """
+        Args:
+            processed_instructions (int): The number of instructions consumed and re-executed by a merge.
+
+        Returns:
+            float: The estimated number of seconds to complete the merge.
+        """
+        return processed_instructions * self.seconds_per_instruction
+
+    @staticmethod
+    def calibrate(processed_instructions: int, measured_seconds: float) -> Merge_Cost_Model:
+        """
+        Args:
+            processed_instructions (int): The number of instructions processed by a measured run, such as Quilt_Merge_Planner.processed_instructions of the merged quilt.
+            measured_seconds (float): The number of seconds the measured run took.
+
+        Returns:
+            Merge_Cost_Model: The cost model that predicts the measured run.
+        """
+        assert processed_instructions > 0, "Cannot calibrate a cost model from a run that processed no instructions"
+        return Merge_Cost_Model(seconds_per_instruction=measured_seconds / processed_instructions)
+
+
+@dataclass(eq=False)
+class Swatch_Estimate:
+    """The expected size of a swatch in the quilt or of a swatch produced by a planned merge."""
+    name: str  # The name of the swatch, or the names of the swatches merged to form it.
+    instructions: int  # The expected number of instructions in the swatch program.
+    carriage_passes: int  # The expected number of carriage passes in the swatch program.
+    width: int  # The expected number of needles spanned by the swatch.
+    sources: set[Swatch] = field(default_factory=set)  # The swatches in the quilt that form this swatch.
+
+    @staticmethod
+    def of_swatch(swatch: Swatch) -> Swatch_Estimate:
+        """
+        Args:
+            swatch (Swatch): A swatch in the quilt.
+
+        Returns:
+            Swatch_Estimate: The size of the given swatch.
+        """
+        return Swatch_Estimate(swatch.name, len(swatch.knitout_program), swatch.height, swatch.width, {swatch})
+
+    def report(self) -> dict[str, str | int]:
+        """
+        Returns:
+            dict[str, str | int]: A machine-readable description of this swatch estimate.
+        """
+        return {"name": self.name, "instructions": self.instructions, "carriage_passes": self.carriage_passes, "width": self.width}
+
+
+@dataclass
+class Planned_Merge:
+    """A merge in the schedule of a quilt merge."""
+    merge_process: str  # The name of the merge process class that would perform the merge.
+    merged_swatches: list[Swatch_Estimate]  # The swatches merged, from left to right for course-wise merges and from bottom to top for wale-wise merges.
+    result: Swatch_Estimate  # The swatch produced by the merge.
+    estimated_seconds: float  # The estimated time to complete the merge.
+    live_swatches: int  # The number of swatches held in memory while the merge is completed.
+
+    @property
+    def processed_instructions(self) -> int:
+        """
+        Returns:
+            int: The number of instructions consumed from the merged swatches and re-executed in the merged program.
+        """
+        return sum(s.instructions for s in self.merged_swatches) + self.result.instructions
+
+    def report(self) -> dict[str, object]:
+        """
+        Returns:
+            dict[str, object]: A machine-readable description of this planned merge.
+        """
+        return {"merge_process": self.merge_process, "merged_swatches": [s.report() for s in self.merged_swatches], "result": self.result.report(),
+                "processed_instructions": self.processed_instructions, "estimated_seconds": self.estimated_seconds, "live_swatches": self.live_swatches}
+
+
+class Quilt_Merge_Planner:
+    """
+    Walks the band and merge schedule of Quilt.merge_quilt without executing any merge, to predict the cost of merging a quilt.
+
+    Attributes:
+        planned_merges (list[Planned_Merge]): The merges that would be completed, in the order that merge_quilt would complete them.
+        bands (list[list[Swatch_Estimate]]): The expected course-wise bands of the quilt, sorted from bottom to top.
+        results (list[Swatch_Estimate]): The expected swatches remaining after the merge.
+
+    Notes:
+        * Course-wise merges are expected to combine the courses of their swatches, so the merged swatch has the carriage passes of the taller swatch.
+          Wale-wise merges are expected to stack their swatches, so the merged swatch has the carriage passes of both swatches.
+          Merged swatches have the instructions of both swatches.
+        * Slices cut off of swatches whose course-wise connections do not span all of their courses are not predicted.
+          The slices stay in the band of the swatch they are cut from.
+        * A swatch is live from its construction until it is no longer referenced by the quilt or by the remaining merges.
+          Each merge holds its merged swatches while it constructs the swatch it produces.
+    """
+
+    def __init__(self, quilt: Quilt, cost_model: Merge_Cost_Model | None = None, balanced_course_merges: bool = False,
+                 balanced_wale_merges: bool = False, multi_wale_merges: bool = False, multi_course_merges: bool = False):
+        """
+        Args:
+            quilt (Quilt): The quilt to plan the merge of. The quilt is not modified.
+            cost_model (Merge_Cost_Model, optional): The model used to estimate the time of each merge. Defaults to the default Merge_Cost_Model.
+            balanced_course_merges (bool, optional): Plans the merge as Quilt.merge_quilt would with the same argument. Defaults to False.
+            balanced_wale_merges (bool, optional): Plans the merge as Quilt.merge_quilt would with the same argument. Defaults to False.
+            multi_wale_merges (bool, optional): Plans the merge as Quilt.merge_quilt would with the same argument. Defaults to False.
+            multi_course_merges (bool, optional): Plans the merge as Quilt.merge_quilt would with the same argument. Defaults to False.
+        """
+        self._quilt: Quilt = quilt
+        if cost_model is None:
+            cost_model = Merge_Cost_Model()
+        self.cost_model: Merge_Cost_Model = cost_model
+        self.planned_merges: list[Planned_Merge] = []
+        self._live_swatches: int = len(quilt.swatch_neighborhoods)
+        self._peak_live_swatches: int = self._live_swatches
+        self.bands: list[list[Swatch_Estimate]] = self._plan_course_bands(balanced_course_merges, multi_course_merges)
+        self.results: list[Swatch_Estimate] = self._plan_wale_merges(balanced_wale_merges, multi_wale_merges)
+
+    @property
+    def estimated_seconds(self) -> float:
+        """
+        Returns:
+            float: The estimated time to merge the quilt.
+        """
+        return sum(m.estimated_seconds for m in self.planned_merges)
+
+    @property
+    def processed_instructions(self) -> int:
+        """
+        Returns:
+            int: The number of instructions processed by all the planned merges.
+        """
+        return sum(m.processed_instructions for m in self.planned_merges)
+
+    @property
+    def peak_live_swatches(self) -> int:
+        """
+        Returns:
+            int: The greatest number of swatches held in memory at once while merging the quilt.
+        """
+        return self._peak_live_swatches
+
+    def _plan_merge(self, merge_process: str, merged_swatches: list[Swatch_Estimate], result: Swatch_Estimate, freed_swatches: int) -> Swatch_Estimate:
+        """
+        Adds a merge to the plan.
+
+        Args:
+            merge_process (str): The name of the merge process class that would perform the merge.
+            merged_swatches (list[Swatch_Estimate]): The swatches merged.
+            result (Swatch_Estimate): The swatch produced by the merge.
+            freed_swatches (int): The number of merged swatches that are no longer referenced after the merge.
+
+        Returns:
+            Swatch_Estimate: The swatch produced by the merge.
+        """
+        self._live_swatches += 1
+        planned_merge = Planned_Merge(merge_process, merged_swatches, result, 0.0, self._live_swatches)
+        planned_merge.estimated_seconds = self.cost_model.estimate_seconds(planned_merge.processed_instructions)
+        self.planned_merges.append(planned_merge)
+        self._peak_live_swatches = max(self._peak_live_swatches, self._live_swatches)
+        self._live_swatches -= freed_swatches
+        return result
+
+    def _plan_course_merge(self, left_swatch: Swatch_Estimate, right_swatch: Swatch_Estimate) -> Swatch_Estimate:
+        """
+        Args:
+            left_swatch (Swatch_Estimate): The left swatch to merge.
+            right_swatch (Swatch_Estimate): The right swatch to merge.
+
+        Returns:
+            Swatch_Estimate: The expected swatch produced by merging the given swatches course-wise. The merged swatches are removed from the quilt.
+        """
+        result = Swatch_Estimate(f"{left_swatch.name}+{right_swatch.name}", left_swatch.instructions + right_swatch.instructions,
+                                 max(left_swatch.carriage_passes, right_swatch.carriage_passes), left_swatch.width + right_swatch.width,
+                                 left_swatch.sources | right_swatch.sources)
+        return self._plan_merge("Course_Merge_Process", [left_swatch, right_swatch], result, freed_swatches=2)
+
+    def _plan_wale_merge(self, bottom_swatch: Swatch_Estimate, top_swatches: list[Swatch_Estimate], freed_swatches: int) -> Swatch_Estimate:
+        """
+        Args:
+            bottom_swatch (Swatch_Estimate): The bottom swatch to merge.
+            top_swatches (list[Swatch_Estimate]): The top swatches to merge. If there are several, the merge is planned as a Multi_Wale_Merge_Process.
+            freed_swatches (int): The number of merged swatches that are no longer referenced after the merge.
+
+        Returns:
+            Swatch_Estimate: The expected swatch produced by merging the given swatches wale-wise.
+        """
+        merged_swatches = [bottom_swatch, *top_swatches]
+        result = Swatch_Estimate("^".join(s.name for s in merged_swatches), sum(s.instructions for s in merged_swatches),
+                                 sum(s.carriage_passes for s in merged_swatches), max(s.width for s in merged_swatches),
+                                 set().union(*(s.sources for s in merged_swatches)))
+        merge_process = "Wale_Merge_Process" if len(top_swatches) == 1 else "Multi_Wale_Merge_Process"
+        return self._plan_merge(merge_process, merged_swatches, result, freed_swatches)
+
+    def _plan_row(self, row: list[Swatch_Estimate], balanced_course_merges: bool, multi_course_merges: bool = False) -> Swatch_Estimate:
+        """
+        Args:
+            row (list[Swatch_Estimate]): The swatches in a row of course-wise connected swatches, ordered from left to right.
+            balanced_course_merges (bool): If True, the row is merged by a balanced pairwise reduction. Otherwise, the row is merged from left to right.
+            multi_course_merges (bool, optional):
+                If True and the quilt can merge the row in one pass, the row is merged by one Multi_Course_Merge_Process. Otherwise, the row is merged pairwise. Defaults to False.
+
+        Returns:
+            Swatch_Estimate: The expected swatch produced by merging the row.
+        """
+        if multi_course_merges and self._quilt.can_merge_row_in_one_pass([source for s in row for source in s.sources]):
+            result = Swatch_Estimate("+".join(s.name for s in row), sum(s.instructions for s in row), max(s.carriage_passes for s in row), sum(s.width for s in row),
+                                     set().union(*(s.sources for s in row)))
+            return self._plan_merge("Multi_Course_Merge_Process", row, result, freed_swatches=len(row))
+        if not balanced_course_merges:
+            merged_row = row[0]
+            for right_swatch in row[1:]:
+                merged_row = self._plan_course_merge(merged_row, right_swatch)
+            return merged_row
+        while len(row) > 1:
+            merged_level = [self._plan_course_merge(row[left_index], row[left_index + 1]) for left_index in range(0, len(row) - 1, 2)]
+            if len(row) % 2 == 1:
+                merged_level.append(row[-1])
+            row = merged_level
+        return row[0]
+
+    def _plan_course_bands(self, balanced_course_merges: bool, multi_course_merges: bool = False) -> list[list[Swatch_Estimate]]:
+        """
+        Args:
+            balanced_course_merges (bool): If True, rows of course-wise connected swatches are merged by a balanced pairwise reduction.
+            multi_course_merges (bool, optional): If True, each row that the quilt can merge in one pass is merged by one Multi_Course_Merge_Process. Defaults to False.
+
+        Returns:
+            list[list[Swatch_Estimate]]: The expected course-wise bands of the quilt, sorted from bottom to top.
+        """
+        bands: list[list[Swatch_Estimate]] = []
+        for layer in topological_generations(self._quilt.wale_wise_connections):
+            layer_swatches = set(layer)
+            band: list[Swatch_Estimate] = []
+            row_starts = [s for s in layer if not any(p in layer_swatches for p in self._quilt.course_wise_connections.predecessors(s))]
+            for row_start in sorted(row_starts, key=lambda s: s.name):
+                row = [Swatch_Estimate.of_swatch(row_start)]
+                successors = [s for s in self._quilt.course_wise_connections.successors(row_start) if s in layer_swatches]
+                while len(successors) > 0:
+                    row.append(Swatch_Estimate.of_swatch(successors[0]))
+                    successors = [s for s in self._quilt.course_wise_connections.successors(successors[0]) if s in layer_swatches]
+                band.append(self._plan_row(row, balanced_course_merges, multi_course_merges))
+            bands.append(band)
+        return bands
+
+    def _plan_wale_merges(self, balanced_wale_merges: bool, multi_wale_merges: bool) -> list[Swatch_Estimate]:
+        """
+        Args:
+            balanced_wale_merges (bool): If True and the bands form a single column of swatches, the bands are merged by a balanced pairwise reduction.
+            multi_wale_merges (bool): If True, a swatch with several wale-wise connections above it is merged with all of its top swatches by one Multi_Wale_Merge_Process.
+
+        Returns:
+            list[Swatch_Estimate]: The expected swatches remaining after the merge.
+        """
+        band_of_source: dict[Swatch, Swatch_Estimate] = {source: band_swatch for band in self.bands for band_swatch in band for source in band_swatch.sources}
+
+        def _top_swatches(band_swatch: Swatch_Estimate) -> list[Swatch_Estimate]:
+            """
+            Args:
+                band_swatch (Swatch_Estimate): A swatch in a band.
+
+            Returns:
+                list[Swatch_Estimate]: The swatches in higher bands that the given swatch is connected to wale-wise.
+            """
+            tops: list[Swatch_Estimate] = []
+            for source in band_swatch.sources:
+                for top_source in self._quilt.wale_wise_connections.successors(source):
+                    top_swatch = band_of_source[top_source]
+                    if top_swatch is not band_swatch and top_swatch not in tops:
+                        tops.append(top_swatch)
+            return sorted(tops, key=lambda s: s.name)
+
+        if balanced_wale_merges and all(len(band) == 1 for band in self.bands) and all(_top_swatches(bottom[0]) == top for bottom, top in zip(self.bands, self.bands[1:])):
+            stacks = [band[0] for band in self.bands]
+            while len(stacks) > 1:
+                merged_stacks = [self._plan_wale_merge(stacks[bottom_index], [stacks[bottom_index + 1]],
+                                                       freed_swatches=sum(1 for s in stacks[bottom_index: bottom_index + 2] if s not in band_of_source.values()))
+                                 for bottom_index in range(0, len(stacks) - 1, 2)]
+                if len(stacks) % 2 == 1:
+                    merged_stacks.append(stacks[-1])
+                stacks = merged_stacks
+            return stacks
+        resets: dict[Swatch_Estimate, Swatch_Estimate] = {band_swatch: band_swatch for band in self.bands for band_swatch in band}
+        remaining: list[Swatch_Estimate] = [*resets]
+        for band in self.bands:
+            for band_swatch in band:
+                update_swatch = resets[band_swatch]
+                top_swatches = _top_swatches(band_swatch)
+                if multi_wale_merges and len(top_swatches) > 1:
+                    top_swatches = [top_swatches]
+                else:
+                    top_swatches = [[top_swatch] for top_swatch in top_swatches]
+                for merged_tops in top_swatches:
+                    freed_swatches = 0 if update_swatch in resets else 1  # Band swatches stay in the quilt. A prior merged swatch is only referenced by this merge.
+                    merged_swatch = self._plan_wale_merge(update_swatch, merged_tops, freed_swatches)
+                    remaining = [s for s in remaining if s is not update_swatch and s not in merged_tops]
+                    remaining.append(merged_swatch)
+                    resets[band_swatch] = merged_swatch
+                    for top_swatch in merged_tops:
+                        resets[top_swatch] = merged_swatch
+                    update_swatch = merged_swatch
+        return remaining
+
+    def report(self) -> dict[str, object]:
+        """
+        Returns:
+            dict[str, object]: A machine-readable report of the planned merges, the expected bands and results, the estimated time, and the peak number of live swatches.
+        """
+        return {"planned_merges": [m.report() for m in self.planned_merges],
+                "bands": [[s.report() for s in band] for band in self.bands],
+                "results": [s.report() for s in self.results],
+                "processed_instructions": self.processed_instructions,
+                "estimated_seconds": self.estimated_seconds,
+                "seconds_per_instruction": self.cost_model.seconds_per_instruction,
+                "peak_live_swatches": self.peak_live_swatches}
+
+    def write_report(self, report_name: str) -> None:
+        """
+        Writes the report of this plan to a JSON file.
+
+        Args:
+            report_name (str): The name of the JSON file to write, without the .json extension.
+        """
+        with open(f"{report_name}.json", "w") as report_file:
+            json.dump(self.report(), report_file, indent=2)
@@ -0,0 +1,349 @@
+"""Module containing the Quilt_Spatial_Index class."""
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from collections.abc import Iterable
+
+from intervaltree import Interval, IntervalTree
+from networkx import DiGraph, NetworkXUnfeasible, topological_sort
+
+from quilt_knit.swatch.course_wise_merging.Course_Wise_Connection import (
+    Course_Wise_Connection,
+)
+from quilt_knit.swatch.Swatch import Swatch
+from quilt_knit.swatch.Swatch_Connection import Swatch_Connection
+from quilt_knit.swatch.wale_wise_merging.Wale_Wise_Connection import (
+    Wale_Wise_Connection,
+)
+
+Seam = tuple[bool, int]  # Whether the seam is a needle boundary between course-wise neighbors (True) or a course boundary between wale-wise neighbors (False), and its position in the quilt frame.
+
+
+class Quilt_Spatial_Index:
+    """
+    A quilt-wide index of the placements of swatches and the connections between them on a common needle by course frame.
+
+    Connected swatches are placed so that they abut in the frame: a right swatch starts on the needle after the last needle of its left swatch, aligned by the courses of their connection,
+    and a top swatch starts on the course after the last course of its bottom swatch, aligned by the needles of their connection.
+    Each batch of connections is placed from the swatches that are already placed. The remaining swatches are placed in topological order of the connections, bottom-up and left-to-right,
+    with each unplaced swatch that has no placed neighbor starting at its rightward shift and course 0.
+
+    Each connection is indexed on the seams of its two swatches: course-wise connections on the needle boundary at the side of each swatch, over the frame courses that they connect,
+    and wale-wise connections on the course boundary at the side of each swatch, over the frame needles that they connect.
+    Each seam holds an interval tree, so a query for the connections on part of a seam takes logarithmic time in the number of connections on the seam plus the number of connections found.
+
+    Attributes:
+        placements (dict[Swatch, tuple[int, int]]): The connected swatches keyed to the needle and course of the frame that their needle 0 and first course are placed at.
+
+    Notes:
+        * A swatch keeps its placement while it has connections in the index. A swatch whose last connection is removed is placed again when it is next connected.
+        * The connections of a swatch are indexed against the swatch's own placement, so the connections found for a swatch match those in its Swatch_Neighborhood even if
+          the placements of a cycle of connected swatches disagree.
+    """
+
+    def __init__(self) -> None:
+        self.placements: dict[Swatch, tuple[int, int]] = {}
+        self._edges: dict[Swatch, tuple[int, int, int, int]] = {}
+        self._seams: dict[Seam, IntervalTree] = {}
+        self._swatch_entries: dict[Swatch, set[tuple[Seam, Interval]]] = {}
+
+    def _place(self, swatch: Swatch, needle: int, course: int) -> None:
+        """
+        Places the given swatch in the frame.
+
+        Args:
+            swatch (Swatch): The swatch to place.
+            needle (int): The needle of the frame to place needle 0 of the swatch at.
+            course (int): The course of the frame to place the first course of the swatch at.
+        """
+        self.placements[swatch] = (needle, course)
+        self._edges[swatch] = (needle + swatch.min_needle, needle + swatch.max_needle + 1, course, course + swatch.height)
+
+    def _place_neighbor(self, connection: Swatch_Connection, placed_is_from: bool) -> Swatch:
+        """
+        Places the unplaced swatch of the given connection so that it abuts the placed swatch of the connection.
+
+        Args:
+            connection (Swatch_Connection): A connection between a placed and an unplaced swatch.
+            placed_is_from (bool): True if the from-swatch of the connection is the placed swatch, False if the to-swatch is the placed swatch.
+
+        Returns:
+            Swatch: The newly placed swatch.
+        """
+        placed_swatch, neighbor = (connection.from_swatch, connection.to_swatch) if placed_is_from else (connection.to_swatch, connection.from_swatch)
+        needle, course = self.placements[placed_swatch]
+        left_edge, right_edge, bottom_edge, top_edge = self._edges[placed_swatch]
+        if isinstance(connection, Course_Wise_Connection):
+            course_shift = connection.left_bottom_course - connection.right_bottom_course
+            if placed_is_from:
+                self._place(neighbor, right_edge - neighbor.min_needle, course + course_shift)
+            else:
+                self._place(neighbor, left_edge - neighbor.max_needle - 1, course - course_shift)
+        else:
+            assert isinstance(connection, Wale_Wise_Connection)
+            needle_shift = connection.bottom_left_needle_position - connection.top_left_needle_position
+            if placed_is_from:
+                self._place(neighbor, needle + needle_shift, top_edge)
+            else:
+                self._place(neighbor, needle - needle_shift, bottom_edge - neighbor.height)
+        return neighbor
+
+    def _place_swatches(self, connections: list[Swatch_Connection], rightward_shifts: dict[Swatch, int]) -> None:
+        """
+        Places the unplaced swatches of the given connections, outward from the swatches that are already placed.
+
+        Args:
+            connections (list[Swatch_Connection]): The connections whose swatches must be placed.
+            rightward_shifts (dict[Swatch, int]): The rightward shifts of the swatches, which give the needle that an unplaced swatch with no placed neighbors is placed at.
+        """
+        unplaced = set(s for c in connections for s in (c.from_swatch, c.to_swatch) if s not in self.placements)
+        if len(unplaced) == 0:
+            return
+        connection_graph = DiGraph()
+        connection_graph.add_edges_from((c.from_swatch, c.to_swatch, {"connection": c}) for c in connections)
+        try:
+            placement_order = [*topological_sort(connection_graph)]
+        except NetworkXUnfeasible:  # Cycles of connections are placed in the order that their swatches were connected.
+            placement_order = [*connection_graph.nodes]
+        frontier = deque(s for s in placement_order if s not in unplaced)
+        roots = iter(placement_order)
+        while len(unplaced) > 0:
+            if len(frontier) == 0:
+                root = next(s for s in roots if s in unplaced)
+                self._place(root, rightward_shifts.get(root, 0), 0)
+                unplaced.remove(root)
+                frontier.append(root)
+            swatch = frontier.popleft()
+            for placed_is_from, neighbor in [*((True, s) for s in connection_graph.successors(swatch)), *((False, p) for p in connection_graph.predecessors(swatch))]:
+                if neighbor in unplaced:
+                    edge = (swatch, neighbor) if placed_is_from else (neighbor, swatch)
+                    unplaced.remove(self._place_neighbor(connection_graph.edges[edge]["connection"], placed_is_from))
+                    frontier.append(neighbor)
+
+    def _seam(self, swatch: Swatch, course_wise: bool, from_side: bool) -> Seam:
+        """
+        Args:
+            swatch (Swatch): A placed swatch.
+            course_wise (bool): True for the seam of course-wise connections on the left or right of the swatch, False for the seam of wale-wise connections below or above it.
+            from_side (bool): True for the seam of the connections that the swatch is the from-swatch of (its right or top), False for the seam of the connections to the swatch (its left or bottom).
+
+        Returns:
+            Seam: The seam on the given side of the swatch.
+        """
+        left_edge, right_edge, bottom_edge, top_edge = self._edges[swatch]
+        if course_wise:
+            return True, right_edge if from_side else left_edge
+        return False, top_edge if from_side else bottom_edge
+
+    def _frame_offset(self, swatch: Swatch, course_wise: bool) -> int:
+        """
+        Args:
+            swatch (Swatch): A placed swatch.
+            course_wise (bool): True for the offset of the courses of course-wise connections, False for the offset of the needles of wale-wise connections.
+
+        Returns:
+            int: The offset from the positions in the swatch to the positions of the frame along the seams of the given kind of connection.
+        """
+        needle, course = self.placements[swatch]
+        return course if course_wise else needle
+
+    def _entry(self, connection: Swatch_Connection, from_side: bool) -> tuple[Seam, Interval]:
+        """
+        Args:
+            connection (Swatch_Connection): A connection with a placed from-swatch, if from_side is True, or a placed to-swatch otherwise.
+            from_side (bool): True for the entry of the connection on the seam of its from-swatch, False for the entry on the seam of its to-swatch.
+
+        Returns:
+            tuple[Seam, Interval]: The seam of the connection on the given side and the interval of the connection on that seam. The data of the interval is the connection and the given side.
+        """
+        swatch, interval = (connection.from_swatch, connection.from_interval) if from_side else (connection.to_swatch, connection.to_interval)
+        course_wise = isinstance(connection, Course_Wise_Connection)
+        offset = self._frame_offset(swatch, course_wise)
+        return self._seam(swatch, course_wise, from_side), Interval(interval.begin + offset, interval.end + offset, (connection, from_side))
+
+    @staticmethod
+    def _entry_swatch(entry: Interval) -> Swatch:
+        """
+        Args:
+            entry (Interval): The interval of a connection on a seam.
+
+        Returns:
+            Swatch: The swatch whose side of the connection is on the seam.
+        """
+        connection, from_side = entry.data
+        return connection.from_swatch if from_side else connection.to_swatch
+
+    def make_connections(self, connections: Iterable[Swatch_Connection], rightward_shifts: dict[Swatch, int] | None = None) -> None:
+        """
+        Adds the given connections to the index in one batch, placing their unplaced swatches first. Each seam's interval tree is updated once and is bulk loaded if it is empty.
+
+        Args:
+            connections (Iterable[Swatch_Connection]): The connections to add to the index.
+            rightward_shifts (dict[Swatch, int], optional): The rightward shifts of the swatches, which give the needle that an unplaced swatch with no placed neighbors is placed at. Defaults to no shifts.
+
+        Notes:
+            This method does not verify that the connections are not blocked by each other or by connections in the index.
+        """
+        connections = list(connections)
+        self._place_swatches(connections, {} if rightward_shifts is None else rightward_shifts)
+        seam_intervals: dict[Seam, list[Interval]] = defaultdict(list)
+        for connection in connections:
+            for from_side in (True, False):
+                seam, interval = self._entry(connection, from_side)
+                seam_intervals[seam].append(interval)
+                self._swatch_entries.setdefault(self._entry_swatch(interval), set()).add((seam, interval))
+        for seam, intervals in seam_intervals.items():
+            if seam not in self._seams or len(self._seams[seam]) == 0:
+                self._seams[seam] = IntervalTree(intervals)
+            else:
+                self._seams[seam].update(intervals)
+
+    def remove_connections(self, prior_connections: Iterable[Swatch_Connection]) -> None:
+        """
+        Removes the given connections from the index in one batch. Connections that are not in the index are ignored.
+        Swatches left without connections lose their placement.
+
+        Args:
+            prior_connections (Iterable[Swatch_Connection]): The connections to remove from the index.
+        """
+        seam_intervals: dict[Seam, list[Interval]] = defaultdict(list)
+        for connection in prior_connections:
+            for from_side, swatch in ((True, connection.from_swatch), (False, connection.to_swatch)):
+                if swatch not in self._swatch_entries:
+                    continue
+                seam, interval = self._entry(connection, from_side)
+                seam_intervals[seam].append(interval)
+                swatch_entries = self._swatch_entries[swatch]
+                swatch_entries.discard((seam, interval))
+                if len(swatch_entries) == 0:
+                    del self._swatch_entries[swatch]
+                    del self.placements[swatch]
+                    del self._edges[swatch]
+        for seam, intervals in seam_intervals.items():
+            if seam in self._seams:
+                self._seams[seam].difference_update(intervals)
+
+    def _side_entries(self, swatch: Swatch, course_wise: bool, from_side: bool, begin: int | None = None, end: int | None = None) -> set[Interval]:
+        """
+        Args:
+            swatch (Swatch): The swatch to find connections of.
+            course_wise (bool): True to find course-wise connections on the left or right of the swatch, False to find wale-wise connections below or above it.
+            from_side (bool): True to find the connections from the swatch (on its right or top), False to find the connections to the swatch (on its left or bottom).
+            begin (int, optional): The first course or needle of the swatch to find connections that overlap. Defaults to finding every connection on the side of the swatch.
+            end (int, optional): The course or needle of the swatch after the last to find connections that overlap. Required if begin is given.
+
+        Returns:
+            set[Interval]: The entries of the swatch's connections on the given side that overlap the given courses or needles of the swatch.
+        """
+        if swatch not in self._swatch_entries:
+            return set()
+        seam = self._seam(swatch, course_wise, from_side)
+        if begin is None:
+            return set(interval for entry_seam, interval in self._swatch_entries[swatch] if entry_seam == seam and interval.data[1] == from_side)
+        assert end is not None
+        if seam not in self._seams:
+            return set()
+        offset = self._frame_offset(swatch, course_wise)
+        return set(interval for interval in self._seams[seam].overlap(begin + offset, end + offset) if interval.data[1] == from_side and self._entry_swatch(interval) == swatch)
+
+    def _connection_side_entries(self, swatch: Swatch, connection: Swatch_Connection) -> tuple[set[Interval], set[Interval]]:
+        """
+        Args:
+            swatch (Swatch): A swatch in the given connection.
+            connection (Swatch_Connection): A connection to compare to the connections on the same side of the swatch.
+
+        Returns:
+            tuple[set[Interval], set[Interval]]:
+                The entries of the swatch's connections on the side of the given connection that overlap the interval of the given connection on the swatch,
+                and the subset of those entries that lie within the interval of the given connection.
+
+        Raises:
+            ValueError: If the given connection does not involve the given swatch.
+        """
+        if swatch not in connection:
+            raise ValueError(f"{connection} does not involve swatch {swatch}")
+        from_side = connection.from_swatch == swatch
+        if swatch not in self._swatch_entries:
+            return set(), set()
+        seam, interval = self._entry(connection, from_side)
+        if seam not in self._seams:
+            return set(), set()
+        seam_tree = self._seams[seam]
+        overlaps = set(i for i in seam_tree.overlap(interval.begin, interval.end) if i.data[1] == from_side and self._entry_swatch(i) == swatch)
+        return overlaps, set(i for i in overlaps if interval.begin <= i.begin and i.end <= interval.end)
+
+    def blocking_connections(self, swatch: Swatch, connection: Swatch_Connection) -> set[Swatch_Connection]:
+        """
+        A connection blocks connections on the same side of a swatch if they do not connect the same swatches and the intervals of the connections overlap but are not enveloped by the given connection.
+
+        Args:
+            swatch (Swatch): A swatch in the given connection.
+            connection (Swatch_Connection): The connection that may block connections on its side of the swatch.
+
+        Returns:
+            set[Swatch_Connection]: The set of connections of the swatch that are blocked by the given connection.
+        """
+        overlaps, enveloped = self._connection_side_entries(swatch, connection)
+        return set(i.data[0] for i in overlaps.difference(enveloped) if not i.data[0].connects_same_swatches(connection))
+
+    def enveloped_connections(self, swatch: Swatch, connection: Swatch_Connection) -> set[Swatch_Connection]:
+        """
+        Args:
+            swatch (Swatch): A swatch in the given connection.
+            connection (Swatch_Connection): The connection that may envelop connections on its side of the swatch.
+
+        Returns:
+            set[Swatch_Connection]: The set of connections of the swatch that are enveloped by the given connection.
+        """
+        return set(i.data[0] for i in self._connection_side_entries(swatch, connection)[1])
+
+    def get_connections_to_courses(self, swatch: Swatch, lower_course: int = 0, upper_course: int | None = None,
+                                   exclude_right_connections: bool = False,
+                                   exclude_left_connection: bool = False,
+                                   exclude_bottom_connections: bool = False,
+                                   exclude_top_connections: bool = False) -> set[Swatch_Connection]:
+        """
+        Args:
+            swatch (Swatch): The swatch to find connections of.
+            lower_course (int, optional): The lowest course to find connections to. If this is 0, the connections will include bottom wale-wise connections. Defaults to 0.
+            upper_course (int, optional):
+                The highest course to find connections to. If this is the height of the swatch, the connections will include top wale-wise connections. Defaults to the height of the swatch.
+            exclude_right_connections (bool, optional): Whether to exclude course-wise connections to the right of the swatch. Defaults to False.
+            exclude_left_connection (bool, optional): Whether to exclude course-wise connections to the left of the swatch. Defaults to False.
+            exclude_bottom_connections (bool, optional): Whether to exclude connections to the bottom of the swatch. Defaults to False.
+            exclude_top_connections (bool, optional): Whether to exclude connections to the top of the swatch. Defaults to False.
+
+        Returns:
+            set[Swatch_Connection]: The set of all connections of the swatch that match the given specification, as found by Swatch_Neighborhood.get_connections_to_courses.
+        """
+        if upper_course is None:
+            upper_course = swatch.height
+        lower_course = max(lower_course, 0)
+        upper_course = min(upper_course, swatch.height)
+        entries: set[Interval] = set()
+        if not exclude_top_connections and upper_course >= (swatch.height - 1):  # Do this before skipping out on mismatch lower and upper courses
+            entries.update(self._side_entries(swatch, course_wise=False, from_side=True))
+        if lower_course <= upper_course:
+            if not exclude_left_connection:
+                entries.update(self._side_entries(swatch, course_wise=True, from_side=False, begin=lower_course, end=upper_course))
+            if not exclude_right_connections:
+                entries.update(self._side_entries(swatch, course_wise=True, from_side=True, begin=lower_course, end=upper_course))
+            if not exclude_bottom_connections and lower_course == 0:
+                entries.update(self._side_entries(swatch, course_wise=False, from_side=False))
+        return set(i.data[0] for i in entries)
+
+    def seam_connections(self, course_wise: bool, position: int, begin: int, end: int) -> set[Swatch_Connection]:
+        """
+        Args:
+            course_wise (bool): True to find course-wise connections on a needle boundary of the frame, False to find wale-wise connections on a course boundary of the frame.
+            position (int): The needle or course of the frame that the boundary is before.
+            begin (int): The first course, for a needle boundary, or needle, for a course boundary, of the frame to find connections that overlap.
+            end (int): The course or needle of the frame after the last to find connections that overlap.
+
+        Returns:
+            set[Swatch_Connection]: The connections on the given boundary of the frame that overlap the given courses or needles.
+        """
+        seam = (course_wise, position)
+        if seam not in self._seams:
+            return set()
+        return set(i.data[0] for i in self._seams[seam].overlap(begin, end))
@@ -0,0 +1,238 @@
+"""Module containing the Quilt_Spec class used to build quilts from declarative JSON or TOML specifications."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tomllib
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from quilt_knit.LRU_Cache import LRU_Cache
+from quilt_knit.profiling.Merge_Profiler import Merge_Profiler
+from quilt_knit.profiling.Merge_Trace_Exporter import Merge_Trace_Exporter
+from quilt_knit.quilt.Quilt import Quilt
+from quilt_knit.swatch.Swatch import Swatch
+from quilt_knit.swatch.Swatch_Cache import Swatch_Cache
+
+if TYPE_CHECKING:
+    from quilt_knit.swatch.Dat_Compile_Pool import Dat_Compile_Pool
+
+_COURSE_WISE_OPTIONS: set[str] = {"first_carriage_pass_on_left", "last_carriage_pass_on_left", "first_carriage_pass_on_right", "last_carriage_pass_on_right"}
+_WALE_WISE_OPTIONS: set[str] = {"bottom_leftmost_needle_position", "bottom_rightmost_needle_position", "top_leftmost_needle_position", "top_rightmost_needle_position",
+                                "remove_cast_ons"}
+_MERGE_OPTIONS: set[str] = {"balanced_course_merges", "balanced_wale_merges", "multi_wale_merges", "multi_course_merges"}
+
+
+@dataclass
+class Quilt_Spec:
+    """
+    A declarative specification of a quilt: the knitout files of its swatches, their placement in a grid, the connection intervals between them, and how to merge them.
+
+    A specification is a JSON or TOML document of the form::
+
+        name = "garment"
+        grid = [["left_bottom", "right_bottom"], ["left_top", ""]]
+
+        [swatches]
+        left_bottom = "jersey.k"
+        right_bottom = "rib.k"
+        left_top = "seed.k"
+
+        [[course_wise]]
+        left = "left_top"
+        right = "right_top"
+        last_carriage_pass_on_left = 6
+
+        [merge]
+        balanced_course_merges = true
+
+    Grid rows are ordered from the bottom of the quilt to the top, and an empty string or null marks an empty cell.
+    Course-wise and wale-wise connections are added to the connections of the grid and accept the keyword arguments of Quilt.connect_swatches_course_wise and Quilt.connect_swatches_wale_wise.
+    Relative swatch paths are resolved from the directory of the specification.
+    """
+    name: str  # The name of the quilt, used to name its output files.
+    swatch_files: dict[str, str]  # The path of the knitout file of each swatch, keyed by the name of the swatch.
+    grid: list[list[str | None]] = field(default_factory=list)  # The names of the swatches in each row of the grid, from bottom to top.
+    course_wise_connections: list[dict[str, Any]] = field(default_factory=list)  # The "left" and "right" swatch names and interval of each course-wise connection.
+    wale_wise_connections: list[dict[str, Any]] = field(default_factory=list)  # The "bottom" and "top" swatch names and interval of each wale-wise connection.
+    merge_options: dict[str, bool] = field(default_factory=dict)  # Keyword arguments passed to Quilt.merge_quilt.
+    compile_dat: bool = True  # If True, the merged swatches are compiled to DAT files.
+
+    def __post_init__(self) -> None:
+        """
+        Raises:
+            ValueError: If the specification refers to an unknown swatch or option.
+        """
+        for row in self.grid:
+            for swatch_name in row:
+                self._check_swatch_name(swatch_name)
+        for connection in self.course_wise_connections:
+            self._check_connection(connection, ("left", "right"), _COURSE_WISE_OPTIONS)
+        for connection in self.wale_wise_connections:
+            self._check_connection(connection, ("bottom", "top"), _WALE_WISE_OPTIONS)
+        unknown_options = set(self.merge_options) - _MERGE_OPTIONS
+        if len(unknown_options) > 0:
+            raise ValueError(f"Quilt {self.name} has unknown merge options {sorted(unknown_options)}")
+
+    def _check_swatch_name(self, swatch_name: str | None) -> None:
+        """
+        Args:
+            swatch_name (str | None): A swatch name used in the specification or None for an empty grid cell.
+
+        Raises:
+            ValueError: If the swatch name is not one of the swatches of the specification.
+        """
+        if swatch_name is not None and swatch_name not in self.swatch_files:
+            raise ValueError(f"Quilt {self.name} refers to unknown swatch {swatch_name}")
+
+    def _check_connection(self, connection: dict[str, Any], swatch_keys: tuple[str, str], options: set[str]) -> None:
+        """
+        Args:
+            connection (dict[str, Any]): The specification of a connection.
+            swatch_keys (tuple[str, str]): The keys naming the two swatches in the connection.
+            options (set[str]): The other keys allowed in the connection.
+
+        Raises:
+            ValueError: If the connection is missing a swatch, refers to an unknown swatch, or has an unknown option.
+        """
+        for swatch_key in swatch_keys:
+            if swatch_key not in connection:
+                raise ValueError(f"Connection {connection} in quilt {self.name} is missing its {swatch_key} swatch")
+            self._check_swatch_name(connection[swatch_key])
+        unknown_options = set(connection) - options - set(swatch_keys)
+        if len(unknown_options) > 0:
+            raise ValueError(f"Connection {connection} in quilt {self.name} has unknown options {sorted(unknown_options)}")
+
+    @staticmethod
+    def from_dict(specification: dict[str, Any], base_directory: str = ".", default_name: str = "quilt") -> Quilt_Spec:
+        """
+        Args:
+            specification (dict[str, Any]): The parsed JSON or TOML specification.
+            base_directory (str, optional): The directory that relative swatch paths are resolved from. Defaults to the working directory.
+            default_name (str, optional): The name of the quilt if the specification does not name it. Defaults to "quilt".
+
+        Returns:
+            Quilt_Spec: The quilt specification.
+        """
+        swatch_files = {swatch_name: os.path.join(base_directory, swatch_file) for swatch_name, swatch_file in specification.get("swatches", {}).items()}
+        grid = [[swatch_name if swatch_name else None for swatch_name in row] for row in specification.get("grid", [])]
+        return Quilt_Spec(specification.get("name", default_name), swatch_files, grid,
+                          list(specification.get("course_wise", [])), list(specification.get("wale_wise", [])),
+                          dict(specification.get("merge", {})), bool(specification.get("compile_dat", True)))
+
+    @staticmethod
+    def load(spec_path: str, base_directory: str | None = None) -> Quilt_Spec:
+        """
+        Args:
+            spec_path (str): The path of a JSON or TOML specification file. Files ending in .toml are read as TOML and all other files as JSON.
+            base_directory (str, optional): The directory that relative swatch paths are resolved from. Defaults to the directory of the specification file.
+
+        Returns:
+            Quilt_Spec: The quilt specification in the file, named after the file if the specification does not name it.
+        """
+        if spec_path.endswith(".toml"):
+            with open(spec_path, "rb") as spec_file:
+                specification = tomllib.load(spec_file)
+        else:
+            with open(spec_path) as spec_file:
+                specification = json.load(spec_file)
+        default_name = os.path.splitext(os.path.basename(spec_path))[0]
+        if base_directory is None:
+            base_directory = os.path.dirname(spec_path)
+        return Quilt_Spec.from_dict(specification, base_directory, default_name)
+
+    def content_digest(self) -> str:
+        """
+        Returns:
+            str:
+                The SHA-256 hex digest of the content of the swatch files, the grid, the connections and the merge options of this specification.
+                Specifications with the same digest merge to the same swatches. The name of the quilt and whether it is compiled to DAT files are not included.
+        """
+        description = {"swatches": {swatch_name: Swatch_Cache.file_digest(swatch_file) for swatch_name, swatch_file in self.swatch_files.items()},
+                       "grid": self.grid, "course_wise": self.course_wise_connections, "wale_wise": self.wale_wise_connections, "merge": self.merge_options}
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def build_quilt(self, swatch_cache: Swatch_Cache | None = None) -> Quilt:
+        """
+        Args:
+            swatch_cache (Swatch_Cache, optional): The cache used to load the swatches. Defaults to loading every swatch from its knitout file.
+
+        Returns:
+            Quilt: The quilt of the specified swatches, grid and connections.
+        """
+        swatches: dict[str, Swatch] = {}
+        for swatch_name, swatch_file in self.swatch_files.items():
+            if swatch_cache is None:
+                swatches[swatch_name] = Swatch(swatch_name, swatch_file)
+            else:
+                swatches[swatch_name] = swatch_cache.load_swatch(swatch_name, swatch_file)
+        quilt = Quilt.from_grid([[None if swatch_name is None else swatches[swatch_name] for swatch_name in row] for row in self.grid])
+        for swatch in swatches.values():
+            if swatch not in quilt:
+                quilt.add_swatch(swatch)
+        for connection in self.wale_wise_connections:
+            intervals = {option: value for option, value in connection.items() if option in _WALE_WISE_OPTIONS}
+            quilt.connect_swatches_wale_wise(swatches[connection["bottom"]], swatches[connection["top"]], **intervals)
+        for connection in self.course_wise_connections:
+            intervals = {option: value for option, value in connection.items() if option in _COURSE_WISE_OPTIONS}
+            quilt.connect_swatches_course_wise(swatches[connection["left"]], swatches[connection["right"]], **intervals)
+        return quilt
+
+    def merge(self, output_directory: str, swatch_cache: Swatch_Cache | None = None, compile_pool: Dat_Compile_Pool | None = None,
+              profile: bool = False, trace: bool = False, merge_results: LRU_Cache[str, list[tuple[str, bytes]]] | None = None) -> dict[str, object]:
+        """
+        Merges the quilt of this specification and writes the knitout, and optionally DAT, files of the merged swatches.
+
+        Args:
+            output_directory (str): The directory to write output files to.
+            swatch_cache (Swatch_Cache, optional): The cache used to load the swatches of the quilt. Defaults to loading every swatch from its knitout file.
+            compile_pool (Dat_Compile_Pool, optional): The pool that compiles DAT files in the background. Defaults to compiling DAT files before returning.
+            profile (bool, optional): If True, the merge is profiled and the profile is included in the returned metrics. Defaults to False.
+            trace (bool, optional): If True, the spans of the merge are written to a Chrome Trace Event JSON file in the output directory. Defaults to False.
+            merge_results (LRU_Cache[str, list[tuple[str, bytes]]], optional):
+                A cache of the names and binary knitout programs of merged swatches, keyed by the content digest of their specification.
+                If given, a cached merge is reused instead of building and merging the quilt, and new merges are added to the cache. Defaults to always merging the quilt.
+
+        Returns:
+            dict[str, object]:
+                The metrics of the merge: the time to build and merge the quilt, whether the merge was reused from the cache, the output files and size of each merged swatch,
+                and the profile, if recorded.
+        """
+        start = perf_counter()
+        digest: str | None = None
+        cached_merge: list[tuple[str, bytes]] | None = None
+        if merge_results is not None:
+            digest = self.content_digest()
+            cached_merge = merge_results.get(digest)
+        profiler = Merge_Profiler() if profile else None
+        trace_exporter = Merge_Trace_Exporter() if trace else None
+        if cached_merge is not None:
+            build_seconds = perf_counter() - start
+            merged_swatches = [Swatch(name, program) for name, program in cached_merge]
+        else:
+            quilt = self.build_quilt(swatch_cache)
+            build_seconds = perf_counter() - start
+            merged_swatches = sorted(quilt.merge_quilt(profiler=profiler, trace_exporter=trace_exporter, **self.merge_options), key=lambda s: (s.name, -s.width))
+            if merge_results is not None and digest is not None:
+                merge_results.put(digest, [(swatch.name, swatch.to_binary_knitout()) for swatch in merged_swatches])
+        merge_seconds = perf_counter() - start - build_seconds
+        swatch_metrics: list[dict[str, object]] = []
+        for index, swatch in enumerate(merged_swatches):
+            output_name = os.path.join(output_directory, self.name if len(merged_swatches) == 1 else f"{self.name}_{index}")
+            if self.compile_dat:
+                swatch.compile_to_dat(output_name, compile_pool=compile_pool)
+            else:
+                swatch.compile_to_knitout(output_name)
+            swatch_metrics.append({"name": swatch.name, "knitout": f"{output_name}.k", "dat": f"{output_name}.dat" if self.compile_dat else None,
+                                   "width": swatch.width, "height": swatch.height, "instructions": len(swatch.knitout_program), "carriage_passes": len(swatch.carriage_passes)})
+        metrics: dict[str, object] = {"name": self.name, "build_seconds": build_seconds, "merge_seconds": merge_seconds, "merge_cached": cached_merge is not None,
+                                      "output_seconds": perf_counter() - start - build_seconds - merge_seconds, "swatches": swatch_metrics}
+        if profiler is not None:
+            metrics["profile"] = profiler.report()
+        if trace_exporter is not None:
+            trace_name = os.path.join(output_directory, f"{self.name}_trace")
+            trace_exporter.write_trace(trace_name)
+            metrics["trace"] = f"{trace_name}.json"
+        return metrics
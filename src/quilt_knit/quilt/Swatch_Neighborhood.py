@@ -1,4 +1,7 @@
 """The Module containing the Swatch_Neighborhood class."""
+from collections import defaultdict
+from collections.abc import Iterable
+
 from quilt_knit.quilt.Connection_Interval_Tree import Connection_Interval_Tree
 from quilt_knit.swatch.course_wise_merging.Course_Wise_Connection import (
     Course_Wise_Connection,
@@ -152,3 +155,42 @@ class Swatch_Neighborhood:
         interval_tree = self.get_interval_tree(connection)
         if interval_tree is not None:
             self.get_interval_tree(connection).make_connection(connection)
+
+    def _connections_by_interval_tree(self, connections: Iterable[Swatch_Connection]) -> dict[Connection_Interval_Tree, list[Swatch_Connection]]:
+        """
+        Args:
+            connections (Iterable[Swatch_Connection]): The connections to group by the interval tree they belong to in this neighborhood.
+
+        Returns:
+            dict[Connection_Interval_Tree, list[Swatch_Connection]]: The given connections keyed by their interval tree. Connections that are not in this neighborhood are ignored.
+        """
+        connections_by_tree: dict[Connection_Interval_Tree, list[Swatch_Connection]] = defaultdict(list)
+        for connection in connections:
+            try:
+                connections_by_tree[self.get_interval_tree(connection)].append(connection)
+            except ValueError:
+                pass
+        return connections_by_tree
+
+    def remove_connections(self, prior_connections: Iterable[Swatch_Connection]) -> None:
+        """
+        Remove the given connections from the swatch's neighborhood in one batch. Connections that are not in the neighborhood are ignored.
+
+        Args:
+            prior_connections (Iterable[Swatch_Connection]): The connections to remove, if present.
+        """
+        for interval_tree, tree_connections in self._connections_by_interval_tree(prior_connections).items():
+            interval_tree.remove_connections(tree_connections)
+
+    def make_connections(self, connections: Iterable[Swatch_Connection]) -> None:
+        """
+        Add the given connections to this neighborhood in one batch. Each interval tree is updated once with all of its new connections.
+
+        Args:
+            connections (Iterable[Swatch_Connection]): The connections to add to the swatch neighborhood trees.
+
+        Notes:
+            This method does not verify that the connections should be added to the neighborhood and does not override or overlap existing connections.
+        """
+        for interval_tree, tree_connections in self._connections_by_interval_tree(connections).items():
+            interval_tree.make_connections(tree_connections)
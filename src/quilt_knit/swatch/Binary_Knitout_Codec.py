@@ -0,0 +1,507 @@
+"""Module containing the Binary_Knitout_Codec class used to cache and transport knitout programs without formatting or parsing knitout text."""
+from __future__ import annotations
+
+import struct
+from collections.abc import Iterable
+from enum import IntEnum, IntFlag
+
+from knitout_interpreter.knitout_operations.carrier_instructions import (
+    Releasehook_Instruction,
+    Yarn_Carrier_Instruction,
+)
+from knitout_interpreter.knitout_operations.Header_Line import (
+    Carriers_Header_Line,
+    Gauge_Header_Line,
+    Knitout_Header_Line,
+    Knitout_Header_Line_Type,
+    Machine_Header_Line,
+    Position_Header_Line,
+    Yarn_Header_Line,
+)
+from knitout_interpreter.knitout_operations.kick_instruction import Kick_Instruction
+from knitout_interpreter.knitout_operations.knitout_instruction import (
+    Knitout_Instruction,
+    Knitout_Instruction_Type,
+)
+from knitout_interpreter.knitout_operations.knitout_instruction_factory import (
+    build_instruction,
+)
+from knitout_interpreter.knitout_operations.Knitout_Line import (
+    Knitout_Comment_Line,
+    Knitout_Line,
+    Knitout_Version_Line,
+)
+from knitout_interpreter.knitout_operations.needle_instructions import (
+    Needle_Instruction,
+)
+from knitout_interpreter.knitout_operations.Pause_Instruction import Pause_Instruction
+from knitout_interpreter.knitout_operations.Rack_Instruction import Rack_Instruction
+from virtual_knitting_machine.machine_components.carriage_system.Carriage_Pass_Direction import (
+    Carriage_Pass_Direction,
+)
+from virtual_knitting_machine.machine_components.needles.Needle import Needle
+from virtual_knitting_machine.machine_components.needles.Slider_Needle import (
+    Slider_Needle,
+)
+from virtual_knitting_machine.machine_components.yarn_management.Yarn_Carrier_Set import (
+    Yarn_Carrier_Set,
+)
+
+
+class Binary_Knitout_Opcode(IntEnum):
+    """Enumeration of the kinds of records in a binary knitout program. Values are part of the format and must not be reordered."""
+    version = 0
+    comment = 1
+    machine_header = 2
+    gauge_header = 3
+    position_header = 4
+    carriers_header = 5
+    yarn_header = 6
+    carrier_in = 7
+    inhook = 8
+    releasehook = 9
+    carrier_out = 10
+    outhook = 11
+    rack = 12
+    knit = 13
+    tuck = 14
+    split = 15
+    drop = 16
+    xfer = 17
+    miss = 18
+    kick = 19
+    pause = 20
+
+
+class Binary_Knitout_Flag(IntFlag):
+    """Enumeration of the per-record flags that mark which optional fields follow the opcode of a record."""
+    has_comment = 1
+    back_needle = 2
+    slider_needle = 4
+    has_second_needle = 8
+    back_second_needle = 16
+    slider_second_needle = 32
+    has_carrier_set = 64
+    has_direction = 128
+    rightward = 256
+    integer_weight = 512
+
+
+_Instruction_Opcodes: dict[Knitout_Instruction_Type, Binary_Knitout_Opcode] = {
+    Knitout_Instruction_Type.In: Binary_Knitout_Opcode.carrier_in,
+    Knitout_Instruction_Type.Inhook: Binary_Knitout_Opcode.inhook,
+    Knitout_Instruction_Type.Releasehook: Binary_Knitout_Opcode.releasehook,
+    Knitout_Instruction_Type.Out: Binary_Knitout_Opcode.carrier_out,
+    Knitout_Instruction_Type.Outhook: Binary_Knitout_Opcode.outhook,
+    Knitout_Instruction_Type.Rack: Binary_Knitout_Opcode.rack,
+    Knitout_Instruction_Type.Knit: Binary_Knitout_Opcode.knit,
+    Knitout_Instruction_Type.Tuck: Binary_Knitout_Opcode.tuck,
+    Knitout_Instruction_Type.Split: Binary_Knitout_Opcode.split,
+    Knitout_Instruction_Type.Drop: Binary_Knitout_Opcode.drop,
+    Knitout_Instruction_Type.Xfer: Binary_Knitout_Opcode.xfer,
+    Knitout_Instruction_Type.Miss: Binary_Knitout_Opcode.miss,
+    Knitout_Instruction_Type.Kick: Binary_Knitout_Opcode.kick,
+    Knitout_Instruction_Type.Pause: Binary_Knitout_Opcode.pause,
+}
+_Opcode_Instructions: dict[Binary_Knitout_Opcode, Knitout_Instruction_Type] = {opcode: instruction_type for instruction_type, opcode in _Instruction_Opcodes.items()}
+_Needle_Opcodes: set[Binary_Knitout_Opcode] = {Binary_Knitout_Opcode.knit, Binary_Knitout_Opcode.tuck, Binary_Knitout_Opcode.split, Binary_Knitout_Opcode.drop,
+                                              Binary_Knitout_Opcode.xfer, Binary_Knitout_Opcode.miss, Binary_Knitout_Opcode.kick}
+_Header_Opcodes: dict[Knitout_Header_Line_Type, Binary_Knitout_Opcode] = {
+    Knitout_Header_Line_Type.Machine: Binary_Knitout_Opcode.machine_header,
+    Knitout_Header_Line_Type.Gauge: Binary_Knitout_Opcode.gauge_header,
+    Knitout_Header_Line_Type.Position: Binary_Knitout_Opcode.position_header,
+    Knitout_Header_Line_Type.Carriers: Binary_Knitout_Opcode.carriers_header,
+    Knitout_Header_Line_Type.Yarn: Binary_Knitout_Opcode.yarn_header,
+}
+
+_RECORD_HEAD = struct.Struct("<BH")  # opcode, flags
+_TABLE_ID = struct.Struct("<I")  # string id or table size
+_SHORT = struct.Struct("<H")  # carrier-set id or gauge
+_NEEDLE = struct.Struct("<h")  # needle position
+_BYTE = struct.Struct("<B")  # carrier id or version
+_RACK = struct.Struct("<d")  # rack value
+_YARN = struct.Struct("<BHdI")  # carrier id, plies, weight (an int if flagged with integer_weight), color string id
+_PROGRAM_HEAD = struct.Struct("<4sIII")  # magic, string count, carrier-set count, record count
+
+
+class Binary_Knitout_Codec:
+    """
+    Encodes knitout programs into a compact binary form and decodes them back into knitout lines.
+
+    A binary knitout program starts with a header, followed by an interned string table, an interned carrier-set table, and one record per knitout line.
+    Each record holds an opcode, a set of flags, and only the fields marked present by those flags: needle positions, a carrier-set id, a comment id, or the values of a rack or header.
+
+    Examples:
+        >>> encoded = Binary_Knitout_Codec.encode(swatch.knitout_program)
+        >>> knitout_program = Binary_Knitout_Codec.decode(encoded)
+
+    Notes:
+        * Only the knitout lines are encoded. Follow comments and line numbers of the original program are not kept.
+    """
+    MAGIC: bytes = b"QKB1"
+
+    def __init__(self) -> None:
+        self._strings: dict[str, int] = {}
+        self._carrier_sets: dict[tuple[int, ...], int] = {}
+        self._records: bytearray = bytearray()
+        self._record_count: int = 0
+
+    def _string_id(self, value: str) -> int:
+        """
+        Args:
+            value (str): The string to intern.
+
+        Returns:
+            int: The id of the given string in the string table.
+        """
+        if value not in self._strings:
+            self._strings[value] = len(self._strings)
+        return self._strings[value]
+
+    def _carrier_set_id(self, carrier_set: Yarn_Carrier_Set) -> int:
+        """
+        Args:
+            carrier_set (Yarn_Carrier_Set): The carrier set to intern.
+
+        Returns:
+            int: The id of the given carrier set in the carrier-set table.
+        """
+        carrier_ids = tuple(carrier_set.carrier_ids)
+        if carrier_ids not in self._carrier_sets:
+            self._carrier_sets[carrier_ids] = len(self._carrier_sets)
+        return self._carrier_sets[carrier_ids]
+
+    @staticmethod
+    def _needle_flags(needle: Needle, back_flag: Binary_Knitout_Flag, slider_flag: Binary_Knitout_Flag) -> Binary_Knitout_Flag:
+        """
+        Args:
+            needle (Needle): The needle to describe.
+            back_flag (Binary_Knitout_Flag): The flag that marks a back-bed needle.
+            slider_flag (Binary_Knitout_Flag): The flag that marks a slider needle.
+
+        Returns:
+            Binary_Knitout_Flag: The flags describing the bed of the given needle.
+        """
+        flags = Binary_Knitout_Flag(0)
+        if needle.is_back:
+            flags |= back_flag
+        if needle.is_slider:
+            flags |= slider_flag
+        return flags
+
+    @staticmethod
+    def _direction_flags(direction: Carriage_Pass_Direction | None) -> Binary_Knitout_Flag:
+        """
+        Args:
+            direction (Carriage_Pass_Direction | None): The direction to describe.
+
+        Returns:
+            Binary_Knitout_Flag: The flags describing the given direction.
+        """
+        if direction is None:
+            return Binary_Knitout_Flag(0)
+        elif direction is Carriage_Pass_Direction.Rightward:
+            return Binary_Knitout_Flag.has_direction | Binary_Knitout_Flag.rightward
+        return Binary_Knitout_Flag.has_direction
+
+    def _add_record(self, opcode: Binary_Knitout_Opcode, flags: Binary_Knitout_Flag, knitout_line: Knitout_Line, fields: bytes = b"") -> None:
+        """
+        Adds a record to the encoded program.
+
+        Args:
+            opcode (Binary_Knitout_Opcode): The opcode of the record.
+            flags (Binary_Knitout_Flag): The flags of the record, not including the comment flag.
+            knitout_line (Knitout_Line): The knitout line encoded by the record.
+            fields (bytes, optional): The encoded fields of the record that follow its comment. Defaults to no fields.
+        """
+        if knitout_line.comment is not None:
+            flags |= Binary_Knitout_Flag.has_comment
+        self._records += _RECORD_HEAD.pack(opcode, flags)
+        if knitout_line.comment is not None:
+            self._records += _TABLE_ID.pack(self._string_id(knitout_line.comment))
+        self._records += fields
+        self._record_count += 1
+
+    def _add_instruction(self, instruction: Knitout_Instruction) -> None:
+        """
+        Adds a record encoding the given instruction.
+
+        Args:
+            instruction (Knitout_Instruction): The instruction to encode.
+
+        Raises:
+            ValueError: If the instruction type has no binary encoding.
+        """
+        if instruction.instruction_type not in _Instruction_Opcodes:
+            raise ValueError(f"Cannot encode {instruction.instruction_type} instructions in binary knitout")
+        opcode = _Instruction_Opcodes[instruction.instruction_type]
+        if isinstance(instruction, Needle_Instruction):
+            flags = self._direction_flags(instruction.direction)
+            fields = bytearray()
+            if isinstance(instruction, Kick_Instruction):
+                fields += _NEEDLE.pack(instruction.position)
+            else:
+                flags |= self._needle_flags(instruction.needle, Binary_Knitout_Flag.back_needle, Binary_Knitout_Flag.slider_needle)
+                fields += _NEEDLE.pack(instruction.needle.position)
+            if instruction.needle_2 is not None:
+                flags |= Binary_Knitout_Flag.has_second_needle
+                flags |= self._needle_flags(instruction.needle_2, Binary_Knitout_Flag.back_second_needle, Binary_Knitout_Flag.slider_second_needle)
+                fields += _NEEDLE.pack(instruction.needle_2.position)
+            if instruction.carrier_set is not None:
+                flags |= Binary_Knitout_Flag.has_carrier_set
+                fields += _SHORT.pack(self._carrier_set_id(instruction.carrier_set))
+            self._add_record(opcode, flags, instruction, bytes(fields))
+        elif isinstance(instruction, Releasehook_Instruction):
+            self._add_record(opcode, self._direction_flags(instruction._preferred_release_direction), instruction, _BYTE.pack(instruction.carrier_id))
+        elif isinstance(instruction, Yarn_Carrier_Instruction):
+            self._add_record(opcode, Binary_Knitout_Flag(0), instruction, _BYTE.pack(instruction.carrier_id))
+        elif isinstance(instruction, Rack_Instruction):
+            self._add_record(opcode, Binary_Knitout_Flag(0), instruction, _RACK.pack(instruction.rack_value))
+        else:
+            self._add_record(opcode, Binary_Knitout_Flag(0), instruction)
+
+    def _add_header(self, header_line: Knitout_Header_Line) -> None:
+        """
+        Adds a record encoding the given header line.
+
+        Args:
+            header_line (Knitout_Header_Line): The header line to encode.
+        """
+        opcode = _Header_Opcodes[header_line.header_type]
+        header_value = header_line._header_value  # Header values are not exposed publicly by the knitout interpreter.
+        flags = Binary_Knitout_Flag(0)
+        if isinstance(header_line, Yarn_Header_Line):
+            if isinstance(header_value.weight, int):  # The knitout parser reads integer weights, so their type is kept to write them back without a decimal point.
+                flags |= Binary_Knitout_Flag.integer_weight
+            fields = _YARN.pack(header_line._carrier_id, header_value.plies, header_value.weight, self._string_id(header_value.color))
+        elif isinstance(header_line, Gauge_Header_Line):
+            fields = _SHORT.pack(header_value)
+        elif isinstance(header_line, Carriers_Header_Line):
+            fields = _SHORT.pack(self._carrier_set_id(header_value))
+        else:
+            fields = _TABLE_ID.pack(self._string_id(header_value.name))
+        self._add_record(opcode, flags, header_line, fields)
+
+    def add_line(self, knitout_line: Knitout_Line) -> None:
+        """
+        Adds the given knitout line to the end of the encoded program.
+
+        Args:
+            knitout_line (Knitout_Line): The knitout line to encode.
+
+        Raises:
+            ValueError: If the knitout line has no binary encoding.
+        """
+        if isinstance(knitout_line, Knitout_Instruction):
+            self._add_instruction(knitout_line)
+        elif isinstance(knitout_line, Knitout_Header_Line):
+            self._add_header(knitout_line)
+        elif isinstance(knitout_line, Knitout_Version_Line):
+            self._add_record(Binary_Knitout_Opcode.version, Binary_Knitout_Flag(0), knitout_line, _BYTE.pack(knitout_line.version))
+        elif isinstance(knitout_line, Knitout_Comment_Line):
+            self._add_record(Binary_Knitout_Opcode.comment, Binary_Knitout_Flag(0), knitout_line)
+        else:
+            raise ValueError(f"Cannot encode {type(knitout_line).__name__} lines in binary knitout")
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns:
+            bytes: The binary knitout program formed by the lines added to this codec.
+        """
+        encoded = bytearray(_PROGRAM_HEAD.pack(self.MAGIC, len(self._strings), len(self._carrier_sets), self._record_count))
+        for value in self._strings:
+            encoded_value = value.encode()
+            encoded += _TABLE_ID.pack(len(encoded_value))
+            encoded += encoded_value
+        for carrier_ids in self._carrier_sets:
+            encoded += _BYTE.pack(len(carrier_ids))
+            encoded += bytes(carrier_ids)
+        encoded += self._records
+        return bytes(encoded)
+
+    @staticmethod
+    def encode(knitout_program: Iterable[Knitout_Line]) -> bytes:
+        """
+        Args:
+            knitout_program (Iterable[Knitout_Line]): The knitout lines to encode, in order.
+
+        Returns:
+            bytes: The binary knitout program encoding the given lines.
+        """
+        codec = Binary_Knitout_Codec()
+        for knitout_line in knitout_program:
+            codec.add_line(knitout_line)
+        return codec.to_bytes()
+
+    @staticmethod
+    def is_binary_knitout(encoded: bytes) -> bool:
+        """
+        Args:
+            encoded (bytes): The data to check, or at least its first bytes.
+
+        Returns:
+            bool: True if the given data starts with the binary knitout header.
+        """
+        return encoded[:len(Binary_Knitout_Codec.MAGIC)] == Binary_Knitout_Codec.MAGIC
+
+    @staticmethod
+    def is_binary_knitout_file(file_name: str) -> bool:
+        """
+        Args:
+            file_name (str): The path of the file to check.
+
+        Returns:
+            bool: True if the file is a binary knitout program.
+        """
+        with open(file_name, "rb") as file:
+            return Binary_Knitout_Codec.is_binary_knitout(file.read(len(Binary_Knitout_Codec.MAGIC)))
+
+    @staticmethod
+    def _decode_needle(position: int, flags: int, back_flag: Binary_Knitout_Flag, slider_flag: Binary_Knitout_Flag) -> Needle:
+        """
+        Args:
+            position (int): The position of the needle.
+            flags (int): The flags of the record holding the needle.
+            back_flag (Binary_Knitout_Flag): The flag that marks a back-bed needle.
+            slider_flag (Binary_Knitout_Flag): The flag that marks a slider needle.
+
+        Returns:
+            Needle: The needle described by the given position and flags.
+        """
+        is_front = not flags & back_flag
+        if flags & slider_flag:
+            return Slider_Needle(is_front, position)
+        return Needle(is_front, position)
+
+    @staticmethod
+    def _decode_direction(flags: int) -> Carriage_Pass_Direction | None:
+        """
+        Args:
+            flags (int): The flags of a record.
+
+        Returns:
+            Carriage_Pass_Direction | None: The direction described by the given flags or None if the record has no direction.
+        """
+        if not flags & Binary_Knitout_Flag.has_direction:
+            return None
+        elif flags & Binary_Knitout_Flag.rightward:
+            return Carriage_Pass_Direction.Rightward
+        return Carriage_Pass_Direction.Leftward
+
+    @staticmethod
+    def decode(encoded: bytes) -> list[Knitout_Line]:
+        """
+        Args:
+            encoded (bytes): A binary knitout program.
+
+        Returns:
+            list[Knitout_Line]: The knitout lines encoded in the given program, in order.
+
+        Raises:
+            ValueError: If the given data is not a binary knitout program.
+        """
+        if not Binary_Knitout_Codec.is_binary_knitout(encoded):
+            raise ValueError("Data is not a binary knitout program")
+        _magic, string_count, carrier_set_count, record_count = _PROGRAM_HEAD.unpack_from(encoded, 0)
+        offset = _PROGRAM_HEAD.size
+        strings: list[str] = []
+        for _ in range(string_count):
+            length = _TABLE_ID.unpack_from(encoded, offset)[0]
+            offset += _TABLE_ID.size
+            strings.append(encoded[offset:offset + length].decode())
+            offset += length
+        carrier_sets: list[list[int]] = []
+        for _ in range(carrier_set_count):
+            length = encoded[offset]
+            carrier_sets.append(list(encoded[offset + 1:offset + 1 + length]))
+            offset += 1 + length
+        knitout_program: list[Knitout_Line] = []
+        for _ in range(record_count):
+            opcode, flags = _RECORD_HEAD.unpack_from(encoded, offset)
+            offset += _RECORD_HEAD.size
+            comment: str | None = None
+            if flags & Binary_Knitout_Flag.has_comment:
+                comment = strings[_TABLE_ID.unpack_from(encoded, offset)[0]]
+                offset += _TABLE_ID.size
+            opcode = Binary_Knitout_Opcode(opcode)
+            if opcode in _Opcode_Instructions:
+                instruction_type = _Opcode_Instructions[opcode]
+                if opcode in _Needle_Opcodes:
+                    first_needle = Binary_Knitout_Codec._decode_needle(_NEEDLE.unpack_from(encoded, offset)[0], flags, Binary_Knitout_Flag.back_needle, Binary_Knitout_Flag.slider_needle)
+                    offset += _NEEDLE.size
+                    second_needle = None
+                    if flags & Binary_Knitout_Flag.has_second_needle:
+                        second_needle = Binary_Knitout_Codec._decode_needle(_NEEDLE.unpack_from(encoded, offset)[0], flags,
+                                                                            Binary_Knitout_Flag.back_second_needle, Binary_Knitout_Flag.slider_second_needle)
+                        offset += _NEEDLE.size
+                    carrier_set = None
+                    if flags & Binary_Knitout_Flag.has_carrier_set:
+                        carrier_set = Yarn_Carrier_Set(carrier_sets[_SHORT.unpack_from(encoded, offset)[0]])
+                        offset += _SHORT.size
+                    knitout_line: Knitout_Line = build_instruction(instruction_type, first_needle, Binary_Knitout_Codec._decode_direction(flags), carrier_set, second_needle, comment=comment)
+                elif instruction_type is Knitout_Instruction_Type.Releasehook:
+                    knitout_line = Releasehook_Instruction(encoded[offset], comment, Binary_Knitout_Codec._decode_direction(flags))
+                    offset += _BYTE.size
+                elif instruction_type.is_carrier_instruction:
+                    knitout_line = build_instruction(instruction_type, carrier_set=encoded[offset], comment=comment)
+                    offset += _BYTE.size
+                elif instruction_type is Knitout_Instruction_Type.Rack:
+                    knitout_line = Rack_Instruction(_RACK.unpack_from(encoded, offset)[0], comment)
+                    offset += _RACK.size
+                else:
+                    knitout_line = Pause_Instruction(comment)
+            elif opcode is Binary_Knitout_Opcode.version:
+                knitout_line = Knitout_Version_Line(encoded[offset], comment)
+                offset += _BYTE.size
+            elif opcode is Binary_Knitout_Opcode.comment:
+                knitout_line = Knitout_Comment_Line(comment)
+            elif opcode is Binary_Knitout_Opcode.yarn_header:
+                carrier_id, plies, weight, color_id = _YARN.unpack_from(encoded, offset)
+                if flags & Binary_Knitout_Flag.integer_weight:
+                    weight = int(weight)
+                knitout_line = Yarn_Header_Line(carrier_id, plies, weight, strings[color_id], comment)
+                offset += _YARN.size
+            elif opcode is Binary_Knitout_Opcode.gauge_header:
+                knitout_line = Gauge_Header_Line(_SHORT.unpack_from(encoded, offset)[0], comment)
+                offset += _SHORT.size
+            elif opcode is Binary_Knitout_Opcode.carriers_header:
+                knitout_line = Carriers_Header_Line(carrier_sets[_SHORT.unpack_from(encoded, offset)[0]], comment)
+                offset += _SHORT.size
+            else:
+                header_name = strings[_TABLE_ID.unpack_from(encoded, offset)[0]]
+                if opcode is Binary_Knitout_Opcode.machine_header:
+                    knitout_line = Machine_Header_Line(header_name, comment)
+                else:
+                    knitout_line = Position_Header_Line(header_name, comment)
+                offset += _TABLE_ID.size
+            knitout_program.append(knitout_line)
+        return knitout_program
+
+    @staticmethod
+    def write(knitout_program: Iterable[Knitout_Line], file_name: str) -> bytes:
+        """
+        Writes the given knitout program to a binary knitout file.
+
+        Args:
+            knitout_program (Iterable[Knitout_Line]): The knitout lines to encode, in order.
+            file_name (str): The path of the binary knitout file to write.
+
+        Returns:
+            bytes: The binary knitout program written to the file.
+        """
+        encoded = Binary_Knitout_Codec.encode(knitout_program)
+        with open(file_name, "wb") as binary_file:
+            binary_file.write(encoded)
+        return encoded
+
+    @staticmethod
+    def read(file_name: str) -> list[Knitout_Line]:
+        """
+        Args:
+            file_name (str): The path of the binary knitout file to read.
+
+        Returns:
+            list[Knitout_Line]: The knitout lines encoded in the file, in order.
+        """
+        with open(file_name, "rb") as binary_file:
+            return Binary_Knitout_Codec.decode(binary_file.read())
@@ -0,0 +1,115 @@
+"""Module containing the Carrier_Timeline class"""
+from knitout_interpreter.knitout_execution_structures.Carriage_Pass import Carriage_Pass
+from knitout_interpreter.knitout_operations.needle_instructions import (
+    Loop_Making_Instruction,
+    Miss_Instruction,
+    Needle_Instruction,
+)
+from virtual_knitting_machine.machine_components.carriage_system.Carriage_Pass_Direction import (
+    Carriage_Pass_Direction,
+)
+
+
+class Carrier_Timeline:
+    """
+    Precomputed record of how each yarn carrier is used over the carriage passes of a swatch.
+    All values are indexed by the carriage pass index in the swatch so that float queries across ranges of carriage passes are answered without walking the swatch program.
+
+    The timeline records:
+    * For each carriage pass that starts with a loop-making instruction, the needle position, direction, and carriers of that first instruction.
+    * For each carriage pass, the next carriage pass at or after it whose first instruction forms loops with each carrier.
+    * For each carriage pass, the needle position and direction that each carrier was left at by the prior carriage passes in the swatch.
+
+    Notes:
+        * Carrier positions are derived only from carriage passes, so a carrier that was taken out keeps the position of its last carriage pass.
+    """
+
+    def __init__(self, carriage_passes: list[Carriage_Pass]):
+        self._height: int = len(carriage_passes)
+        self._loop_positions: list[tuple[int, Carriage_Pass_Direction] | None] = []
+        self._loop_carrier_ids: list[tuple[int, ...]] = []
+        self._positions_at_start: list[dict[int, tuple[int, Carriage_Pass_Direction]]] = []
+        carrier_positions: dict[int, tuple[int, Carriage_Pass_Direction]] = {}
+        for carriage_pass in carriage_passes:
+            self._positions_at_start.append(carrier_positions)
+            first_instruction = carriage_pass.first_instruction
+            if isinstance(first_instruction, Loop_Making_Instruction) and first_instruction.carrier_set is not None and len(first_instruction.carrier_set) > 0:
+                assert isinstance(first_instruction.direction, Carriage_Pass_Direction)
+                self._loop_positions.append((int(first_instruction.needle.position), first_instruction.direction))
+                self._loop_carrier_ids.append(tuple(first_instruction.carrier_set.carrier_ids))
+            else:
+                self._loop_positions.append(None)
+                self._loop_carrier_ids.append(tuple())
+            last_instruction = carriage_pass.last_instruction
+            if (isinstance(last_instruction, Loop_Making_Instruction) or isinstance(last_instruction, Miss_Instruction)) and last_instruction.carrier_set is not None and len(last_instruction.carrier_set) > 0:
+                assert isinstance(last_instruction, Needle_Instruction) and isinstance(last_instruction.direction, Carriage_Pass_Direction)
+                carrier_positions = dict(carrier_positions)
+                for carrier_id in last_instruction.carrier_set.carrier_ids:
+                    carrier_positions[carrier_id] = (int(last_instruction.needle.position), last_instruction.direction)
+        self._positions_at_start.append(carrier_positions)  # Positions after the last carriage pass of the swatch.
+        self._next_loop_pass: list[dict[int, int]] = [{} for _ in range(self._height)]
+        next_loop_pass: dict[int, int] = {}
+        for cp_index in range(self._height - 1, -1, -1):
+            if len(self._loop_carrier_ids[cp_index]) > 0:
+                next_loop_pass = dict(next_loop_pass)
+                for carrier_id in self._loop_carrier_ids[cp_index]:
+                    next_loop_pass[carrier_id] = cp_index
+            self._next_loop_pass[cp_index] = next_loop_pass
+
+    @property
+    def height(self) -> int:
+        """
+        Returns:
+            int: The number of carriage passes covered by the timeline.
+        """
+        return self._height
+
+    def loop_position(self, cp_index: int) -> tuple[int, Carriage_Pass_Direction] | None:
+        """
+        Args:
+            cp_index (int): The index of the carriage pass.
+
+        Returns:
+            tuple[int, Carriage_Pass_Direction] | None:
+                The needle position and direction of the first instruction in the carriage pass or None if the carriage pass does not start by forming loops with carriers.
+        """
+        return self._loop_positions[cp_index]
+
+    def loop_carrier_ids(self, cp_index: int) -> tuple[int, ...]:
+        """
+        Args:
+            cp_index (int): The index of the carriage pass.
+
+        Returns:
+            tuple[int, ...]: The ids of the carriers used by the first instruction of the carriage pass if that instruction forms loops. Otherwise, an empty tuple.
+        """
+        return self._loop_carrier_ids[cp_index]
+
+    def first_loop_pass(self, carrier_id: int, start_cp_index: int, end_cp_index: int | None = None) -> int | None:
+        """
+        Args:
+            carrier_id (int): The id of the carrier to find.
+            start_cp_index (int): The first carriage pass index to search from.
+            end_cp_index (int, optional): The carriage pass index to stop searching before. Defaults to the end of the swatch.
+
+        Returns:
+            int | None: The index of the first carriage pass in the given range whose first instruction forms loops with the given carrier or None if no such carriage pass exists.
+        """
+        if start_cp_index >= self._height:
+            return None
+        cp_index = self._next_loop_pass[start_cp_index].get(carrier_id, None)
+        if cp_index is None or (end_cp_index is not None and cp_index >= end_cp_index):
+            return None
+        return cp_index
+
+    def carrier_position_at_start(self, carrier_id: int, cp_index: int) -> tuple[int, Carriage_Pass_Direction] | None:
+        """
+        Args:
+            carrier_id (int): The id of the carrier.
+            cp_index (int): The index of the carriage pass. Indices at or beyond the height of the timeline give the positions left by the last carriage pass.
+
+        Returns:
+            tuple[int, Carriage_Pass_Direction] | None:
+                The needle position and direction that the carrier was left at by the carriage passes prior to the given carriage pass or None if the carrier has not been used yet.
+        """
+        return self._positions_at_start[min(cp_index, self._height)].get(carrier_id, None)
@@ -0,0 +1,105 @@
+"""Module containing the Dat_Compile_Pool class used to compile DAT files in background processes."""
+from __future__ import annotations
+
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from time import perf_counter
+from types import TracebackType
+
+from quilt_knit.swatch.dat_compilation import write_knitout_to_dat
+
+
+def _timed_dat_compile(knitout_program: str, dat_path: str) -> float:
+    """
+    Args:
+        knitout_program (str): The content of the knitout program to compile.
+        dat_path (str): The path of the DAT file to write.
+
+    Returns:
+        float: The number of seconds taken to compile the DAT file.
+    """
+    start = perf_counter()
+    write_knitout_to_dat(knitout_program, dat_path)
+    return perf_counter() - start
+
+
+class Dat_Compile_Pool:
+    """
+    A pool of background processes that compile knitout programs to DAT files while the calling process continues merging.
+
+    Examples:
+        >>> with Dat_Compile_Pool() as compile_pool:
+        ...     quilt.merge_quilt(compile_merges=True, compile_bands=True, compile_pool=compile_pool)
+        >>> compile_pool.compile_seconds
+
+    Attributes:
+        compile_seconds (dict[str, float]): The number of seconds taken to compile each gathered DAT file, keyed by the path of the DAT file.
+
+    Notes:
+        * A DAT file submitted again before its prior compile is gathered waits for the prior compile, so the last submission of a path is the one left on disk.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        """
+        Args:
+            max_workers (int, optional): The maximum number of compiling processes. Defaults to the number of processors on the machine.
+        """
+        self._executor: ProcessPoolExecutor = ProcessPoolExecutor(max_workers=max_workers)
+        self._pending_compiles: dict[str, Future[float]] = {}
+        self.compile_seconds: dict[str, float] = {}
+
+    def submit(self, knitout_program: str, dat_path: str) -> None:
+        """
+        Schedules the compilation of the given knitout program to a DAT file.
+
+        Args:
+            knitout_program (str): The content of the knitout program to compile.
+            dat_path (str): The path of the DAT file to write.
+        """
+        if dat_path in self._pending_compiles:
+            self.compile_seconds[dat_path] = self._pending_compiles.pop(dat_path).result()
+        self._pending_compiles[dat_path] = self._executor.submit(_timed_dat_compile, knitout_program, dat_path)
+
+    def gather(self) -> dict[str, float]:
+        """
+        Waits for all scheduled compiles to finish and records the compile time of each one that succeeded, even if another compile failed.
+
+        Returns:
+            dict[str, float]: The compile_seconds of this pool, holding the number of seconds taken to compile every DAT file gathered by this pool so far, keyed by the path of the DAT file.
+
+        Raises:
+            Exception: The exception raised by the first failed compile, in the order the compiles were submitted.
+        """
+        pending_compiles, self._pending_compiles = self._pending_compiles, {}
+        wait(pending_compiles.values())
+        first_failure: BaseException | None = None
+        for dat_path, compile_future in pending_compiles.items():
+            failure = compile_future.exception()
+            if failure is None:
+                self.compile_seconds[dat_path] = compile_future.result()
+            elif first_failure is None:
+                first_failure = failure
+        if first_failure is not None:
+            raise first_failure
+        return self.compile_seconds
+
+    def shutdown(self) -> None:
+        """
+        Gathers all scheduled compiles and stops the compiling processes.
+        """
+        try:
+            self.gather()
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self) -> Dat_Compile_Pool:
+        """
+        Returns:
+            Dat_Compile_Pool: This pool.
+        """
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None) -> None:
+        """
+        Shuts down this pool after gathering its compiles.
+        """
+        self.shutdown()
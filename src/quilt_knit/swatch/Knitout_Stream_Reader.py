@@ -0,0 +1,83 @@
+"""Module containing the Knitout_Stream_Reader class."""
+from __future__ import annotations
+
+import copy
+import mmap
+import os
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+from knitout_interpreter.knitout_operations.Knitout_Line import Knitout_Line
+
+if TYPE_CHECKING:
+    from knitout_interpreter.knitout_language.Knitout_Parser import Knitout_Parser
+
+
+class Knitout_Stream_Reader:
+    """
+    Parses a knitout file one line at a time, so that neither the text of the file nor a list of its raw lines is held in memory.
+
+    Examples:
+        >>> knitout_program = [*Knitout_Stream_Reader("garment.k", memory_map=True)]
+
+    Notes:
+        * Only the parsed knitout lines are kept by the caller. Each raw line is discarded once it is parsed.
+        * The knitout parser is imported and its grammar is built when the first reader is iterated. Each iteration parses with its own copy of that parser and resets the copy before the first line,
+          so readers never share parser state, even when they are iterated at the same time or from several threads.
+    """
+    _template_parser: Knitout_Parser | None = None
+
+    def __init__(self, knitout_file_name: str, memory_map: bool = False):
+        """
+        Args:
+            knitout_file_name (str): The path of the knitout file to read.
+            memory_map (bool, optional): If True, the file is memory-mapped and lines are decoded from the mapped pages instead of being read through a buffered text file. Defaults to False.
+        """
+        self.knitout_file_name: str = knitout_file_name
+        self.memory_map: bool = memory_map
+
+    @staticmethod
+    def _new_parser() -> Knitout_Parser:
+        """
+        Returns:
+            Knitout_Parser: A knitout parser that shares the grammar of the template parser built for all readers. The parser must be reset before it parses its first line.
+        """
+        if Knitout_Stream_Reader._template_parser is None:
+            from knitout_interpreter.knitout_language.Knitout_Parser import (
+                Knitout_Parser,
+            )
+            Knitout_Stream_Reader._template_parser = Knitout_Parser()
+        return copy.copy(Knitout_Stream_Reader._template_parser)
+
+    def _raw_lines(self) -> Iterator[str]:
+        """
+        Returns:
+            Iterator[str]: Iterator over the raw lines of the knitout file.
+        """
+        if not self.memory_map:
+            with open(self.knitout_file_name, "r") as knitout_file:
+                yield from knitout_file
+        elif os.path.getsize(self.knitout_file_name) > 0:  # Empty files cannot be memory-mapped.
+            with open(self.knitout_file_name, "rb") as knitout_file, mmap.mmap(knitout_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                for raw_line in iter(mapped_file.readline, b""):
+                    yield raw_line.decode()
+
+    def __iter__(self) -> Iterator[Knitout_Line]:
+        """
+        Returns:
+            Iterator[Knitout_Line]: Iterator over the knitout lines parsed from the file, in order. Blank lines are skipped.
+
+        Raises:
+            Exception: Any error raised while parsing a line is re-raised with a note giving the file and the (1-based) line number of the line that failed to parse.
+        """
+        parser = self._new_parser()
+        reset_parser = True
+        for line_number, raw_line in enumerate(self._raw_lines(), start=1):
+            if raw_line.isspace() or len(raw_line) == 0:
+                continue
+            try:
+                yield from parser.parse_knitout_to_instructions(raw_line, reset_parser=reset_parser)
+            except Exception as error:
+                error.add_note(f"Knitout Parsing Error at line {line_number} of {self.knitout_file_name}: {raw_line.rstrip()}")
+                raise
+            reset_parser = False
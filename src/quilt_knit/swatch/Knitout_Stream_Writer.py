@@ -0,0 +1,121 @@
+"""Module containing the Knitout_Stream_Writer class."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from types import TracebackType
+from typing import TextIO
+
+from knitout_interpreter.knitout_operations.carrier_instructions import (
+    Outhook_Instruction,
+)
+from knitout_interpreter.knitout_operations.Header_Line import (
+    Knitout_Header_Line,
+    get_machine_header,
+)
+from knitout_interpreter.knitout_operations.Knitout_Line import (
+    Knitout_Line,
+    Knitout_Version_Line,
+)
+from virtual_knitting_machine.Knitting_Machine import Knitting_Machine
+
+
+class Knitout_Stream_Writer:
+    """
+    Writes knitout lines to a file or file-like object in buffered chunks, without building the whole program as a list of strings.
+
+    Examples:
+        >>> with Knitout_Stream_Writer("swatch.k") as writer:
+        ...     writer.write_program(swatch.knitout_program, swatch.execution_knitting_machine)
+
+    Notes:
+        * A writer opened on a path owns the file and closes it on exit. A writer given a file-like object only flushes its buffer on exit.
+    """
+
+    def __init__(self, destination: str | TextIO, buffer_lines: int = 1024):
+        """
+        Args:
+            destination (str | TextIO): The path of the knitout file to write or a file-like object to write to.
+            buffer_lines (int, optional): The number of lines buffered before they are written as one chunk. Defaults to 1024.
+        """
+        self._owns_file: bool = isinstance(destination, str)
+        if isinstance(destination, str):
+            self._file: TextIO = open(destination, "w")
+        else:
+            self._file = destination
+        self._buffer_lines: int = max(1, buffer_lines)
+        self._buffer: list[str] = []
+
+    @staticmethod
+    def format_line(knitout_line: Knitout_Line) -> str:
+        """
+        Args:
+            knitout_line (Knitout_Line): The knitout line to format.
+
+        Returns:
+            str: The first line of the string of the given knitout line, ending in a newline.
+        """
+        line = str(knitout_line)
+        newline_index = line.find("\n")
+        if newline_index < 0:
+            return f"{line}\n"
+        return line[:newline_index + 1]
+
+    def write_line(self, knitout_line: Knitout_Line) -> None:
+        """
+        Args:
+            knitout_line (Knitout_Line): The knitout line to write.
+        """
+        self._buffer.append(self.format_line(knitout_line))
+        if len(self._buffer) >= self._buffer_lines:
+            self.flush()
+
+    def write_lines(self, knitout_lines: Iterable[Knitout_Line]) -> None:
+        """
+        Args:
+            knitout_lines (Iterable[Knitout_Line]): The knitout lines to write, in order.
+        """
+        for knitout_line in knitout_lines:
+            self.write_line(knitout_line)
+
+    def write_program(self, knitout_program: Iterable[Knitout_Line], final_machine_state: Knitting_Machine, outhook_comment: str | None = None) -> None:
+        """
+        Writes a complete knitout program: a header describing the given machine, the instructions of the program, and outhooks of the carriers left active by the program.
+        Version and header lines in the given program are replaced by the header of the given machine.
+
+        Args:
+            knitout_program (Iterable[Knitout_Line]): The program to write.
+            final_machine_state (Knitting_Machine): The state of the machine after executing the given program.
+            outhook_comment (str, optional): The comment added to the outhooks of the carriers left active by the program. Defaults to no comment.
+        """
+        self.write_lines(get_machine_header(final_machine_state))
+        self.write_lines(line for line in knitout_program if not isinstance(line, (Knitout_Version_Line, Knitout_Header_Line)))
+        self.write_lines(Outhook_Instruction(carrier, outhook_comment) for carrier in final_machine_state.carrier_system.active_carriers)
+
+    def flush(self) -> None:
+        """
+        Writes the buffered lines to the destination.
+        """
+        if len(self._buffer) > 0:
+            self._file.write("".join(self._buffer))
+            self._buffer.clear()
+
+    def close(self) -> None:
+        """
+        Writes the buffered lines and closes the destination file if this writer opened it.
+        """
+        self.flush()
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self) -> Knitout_Stream_Writer:
+        """
+        Returns:
+            Knitout_Stream_Writer: This writer.
+        """
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None) -> None:
+        """
+        Closes this writer.
+        """
+        self.close()
@@ -1,6 +1,9 @@
 """Module containing the Merge_Process class"""
+from __future__ import annotations
+
 import warnings
-from typing import cast
+from io import StringIO
+from typing import TYPE_CHECKING, cast
 
 from knitout_interpreter.knitout_execution import Knitout_Executer
 from knitout_interpreter.knitout_operations.carrier_instructions import (
@@ -23,9 +26,9 @@ from knitout_interpreter.knitout_operations.needle_instructions import (
     Miss_Instruction,
     Needle_Instruction,
     Tuck_Instruction,
+    Xfer_Instruction,
 )
 from knitout_interpreter.knitout_operations.Rack_Instruction import Rack_Instruction
-from knitout_to_dat_python.knitout_to_dat import knitout_to_dat
 from virtual_knitting_machine.Knitting_Machine import Knitting_Machine
 from virtual_knitting_machine.knitting_machine_exceptions.Knitting_Machine_Exception import (
     Knitting_Machine_Exception,
@@ -51,13 +54,27 @@ from virtual_knitting_machine.machine_components.yarn_management.Yarn_Carrier_Se
     Yarn_Carrier_Set,
 )
 
+from quilt_knit.profiling.Merge_Profiler import (
+    Merge_Event,
+    Merge_Phase,
+    Merge_Profiler,
+)
 from quilt_knit.swatch.course_boundary_instructions import Course_Side
+from quilt_knit.swatch.dat_compilation import (
+    compile_knitout_file_to_dat,
+    compile_knitout_to_dat,
+)
+from quilt_knit.swatch.Knitout_Stream_Writer import Knitout_Stream_Writer
 from quilt_knit.swatch.Seam_Search_Space import Seam_Search_Space
+from quilt_knit.swatch.Shadow_Machine_State import Shadow_Machine_State
 from quilt_knit.swatch.Swatch import Swatch
 from quilt_knit.swatch.Swatch_Connection import Swatch_Connection
 from quilt_knit.swatch.Swatch_Side import Swatch_Side
 from quilt_knit.swatch.wale_boundary_instructions import Wale_Side
 
+if TYPE_CHECKING:
+    from quilt_knit.swatch.Dat_Compile_Pool import Dat_Compile_Pool
+
 
 class Failed_Merge_Release_Exception(Knitting_Machine_Exception):
     """ Exception raised when a release required by the merge program cannot be executed."""
@@ -79,9 +96,9 @@ class Merge_Process:
         self._seam_search_space: Seam_Search_Space = seam_search_space
         self.merged_instructions: list[Knitout_Line] = [i for i in get_machine_header(self._merged_program_machine_state)]
         if isinstance(starting_swatch_side, Course_Side):
-            self._source_machine_states: dict[Swatch_Side, Knitting_Machine] = {Course_Side.Left: Knitting_Machine(), Course_Side.Right: Knitting_Machine()}
+            self._source_machine_states: dict[Swatch_Side, Shadow_Machine_State] = {Course_Side.Left: Shadow_Machine_State(), Course_Side.Right: Shadow_Machine_State()}
         else:
-            self._source_machine_states: dict[Swatch_Side, Knitting_Machine] = {Wale_Side.Top: Knitting_Machine(), Wale_Side.Bottom: Knitting_Machine()}
+            self._source_machine_states: dict[Swatch_Side, Shadow_Machine_State] = {Wale_Side.Top: Shadow_Machine_State(), Wale_Side.Bottom: Shadow_Machine_State()}
         self._merged_instructions_to_source: dict[Knitout_Line, tuple[Swatch_Side, Knitout_Line] | None] = {i: None for i in self.merged_instructions}
         self._current_merge_side: Swatch_Side = starting_swatch_side
 
@@ -108,7 +125,7 @@ class Merge_Process:
         Returns:
             int: The rack value of the machine state of the current swatch.
         """
-        return int(self._source_machine_states[self._current_merge_side].rack)
+        return self._source_machine_states[self._current_merge_side].rack
 
     @property
     def current_swatch_all_needle_rack(self) -> bool:
@@ -116,7 +133,7 @@ class Merge_Process:
         Returns:
             bool: True if the machine state of the current swatch is set to all needle rack. False, otherwise.
         """
-        return bool(self._source_machine_states[self._current_merge_side].all_needle_rack)
+        return self._source_machine_states[self._current_merge_side].all_needle_rack
 
     @property
     def merged_and_current_racks_match(self) -> bool:
@@ -154,6 +171,7 @@ class Merge_Process:
             return True
         return False
 
+    @Merge_Profiler.profiled(Merge_Phase.release_injection)
     def _release_to_merge_instruction(self, instruction: Knitout_Line, instruction_source: Swatch_Side | None) -> None:
         """
         Inserts a necessary releasehook in order to execute the given instruction in the merged program. If a release is not needed, nothing happens.
@@ -210,6 +228,7 @@ class Merge_Process:
         self._add_instruction_to_merge(cut_float, instruction_source)
         insert_float_yarn = Inhook_Instruction(carrier, 'Bring in for merge alignment')
         self._add_instruction_to_merge(insert_float_yarn, instruction_source)
+        Merge_Profiler.count_event(Merge_Event.cut_injected)
 
     def _inhook_missing_carriers(self, instruction: Loop_Making_Instruction, instruction_source: Swatch_Side | None, original_instruction: Loop_Making_Instruction | None) -> None:
         """
@@ -230,33 +249,33 @@ class Merge_Process:
             insert_float_yarn = Inhook_Instruction(missing_carrier, 'Bring in carrier from merge')
             self._release_to_merge_instruction(insert_float_yarn, instruction_source)
             self._add_instruction_to_merge(insert_float_yarn, instruction_source)
+        Merge_Profiler.count_event(Merge_Event.inhook_injected, len(missing_carriers))
         if len(rightward_carriers) > 0:
             self._tuck_float_leftward(Yarn_Carrier_Set(rightward_carriers), instruction.needle)
         if instruction_source is not None:
             assert original_instruction is not None
-            source_machine = self._source_machine_states[instruction_source]
-            missing_carriers = source_machine.carrier_system[source_machine.carrier_system.missing_carriers(instruction.carrier_set.carrier_ids)]
-            if not isinstance(missing_carriers, list):
-                missing_carriers = [missing_carriers]
-            if len(missing_carriers) > 0 and not source_machine.carrier_system.inserting_hook_available:
-                source_machine.carrier_system.releasehook()
-            for missing_carrier in missing_carriers:
-                Inhook_Instruction(missing_carrier).execute(source_machine)
+            source_state = self._source_machine_states[instruction_source]
+            missing_carrier_ids = source_state.missing_carriers(instruction.carrier_set.carrier_ids)
+            if len(missing_carrier_ids) > 0 and not source_state.inserting_hook_available:
+                source_state.releasehook()
+            for missing_carrier_id in missing_carrier_ids:
+                source_state.inhook(missing_carrier_id)
             if original_instruction.direction is Carriage_Pass_Direction.Rightward:
-                self._tuck_float_leftward(Yarn_Carrier_Set(missing_carriers), original_instruction.needle, source_machine)
+                self._tuck_float_leftward(Yarn_Carrier_Set(missing_carrier_ids), original_instruction.needle, source_state)
 
-    def _tuck_float_leftward(self, carrier_set: Yarn_Carrier_Set, start_needle: Needle, machine: Knitting_Machine | None = None, tuck_spacing: int = 3) -> None:
+    def _tuck_float_leftward(self, carrier_set: Yarn_Carrier_Set, start_needle: Needle, source_state: Shadow_Machine_State | None = None, tuck_spacing: int = 3) -> None:
         """
         Adds tuck instructions in a leftward direction onto existing loops to move cut yarns into place to prevent rightward insertions of yarns.
         Args:
             carrier_set (Yarn_Carrier_Set): The set of carriers to tuck with.
             start_needle (Needle): The needle that the next knit instruction will be executed on. The tucks are added up to this location.
-            machine (Knitting_Machine, optional): The machine to add the tucked loops to. Default to the Merged-Program knitting machine.
+            source_state (Shadow_Machine_State, optional): The state of a source swatch to find existing loops in. Defaults to finding loops in the Merged-Program knitting machine.
             tuck_spacing (int, optional): The spacing of between tucks on existing loops. Defaults to 3.
         """
-        if machine is None:
-            machine = self._merged_program_machine_state
-        tuck_needles = Carriage_Pass_Direction.Leftward.sort_needles(machine.all_loops(), machine.rack)
+        if source_state is None:
+            tuck_needles = Carriage_Pass_Direction.Leftward.sort_needles(self._merged_program_machine_state.all_loops(), self._merged_program_machine_state.rack)
+        else:
+            tuck_needles = Carriage_Pass_Direction.Leftward.sort_needles(source_state.loop_holding_needles(), source_state.rack)
         tuck_needles = [n for n in tuck_needles if n.position >= start_needle.position]
         tuck_needles = tuck_needles[0::tuck_spacing]
         for needle in tuck_needles:
@@ -294,20 +313,10 @@ class Merge_Process:
         if instruction is None:
             instruction = merge_instruction
         if instruction_source is not None:
-
-            with warnings.catch_warnings():
-                warnings.filterwarnings("ignore", category=In_Active_Carrier_Warning)
-                warnings.filterwarnings("ignore", category=Out_Inactive_Carrier_Warning)
-                warnings.filterwarnings("ignore", category=Mismatched_Releasehook_Warning)
-                warnings.filterwarnings('ignore', category=Knit_on_Empty_Needle_Warning)
-                source_machine = self._source_machine_states[instruction_source]
-                if isinstance(instruction, Hook_Instruction) and not source_machine.carrier_system.inserting_hook_available:
-                    source_machine.carrier_system.releasehook()
-                if isinstance(instruction, Loop_Making_Instruction) and instruction.direction is Carriage_Pass_Direction.Rightward and source_machine.carrier_system.searching_for_position:
-                    source_machine.carrier_system._hook_position = instruction.needle.position + 1  # Position yarn inserting hook at the needle slot to the right of the needle.
-                    source_machine.carrier_system.hook_input_direction = Carriage_Pass_Direction.Leftward
-                    source_machine.carrier_system._searching_for_position = False
-                instruction.execute(source_machine)
+            source_state = self._source_machine_states[instruction_source]
+            if isinstance(instruction, Hook_Instruction) and not source_state.inserting_hook_available:
+                source_state.releasehook()
+            source_state.execute(instruction)
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=In_Active_Carrier_Warning)
             warnings.filterwarnings("ignore", category=Out_Inactive_Carrier_Warning)
@@ -321,6 +330,10 @@ class Merge_Process:
             self.merged_instructions[-1] = merge_instruction
         else:
             self.merged_instructions.append(merge_instruction)
+            if isinstance(merge_instruction, Rack_Instruction):
+                Merge_Profiler.count_event(Merge_Event.rack)
+        if isinstance(merge_instruction, Xfer_Instruction):
+            Merge_Profiler.count_event(Merge_Event.transfer)
         if instruction_source is not None:
             source = (instruction_source, instruction)
         else:
@@ -340,6 +353,7 @@ class Merge_Process:
         """
         return needle_instruction
 
+    @Merge_Profiler.profiled(Merge_Phase.float_analysis)
     def _get_floats_to_instruction(self, merge_instruction: Loop_Making_Instruction) -> dict[Yarn_Carrier: tuple[int, Carriage_Pass_Direction]]:
         """
         Args:
@@ -416,7 +430,7 @@ class Merge_Process:
         """
         Consumes the given instruction in the specified swatch.
         This will update the merged program and merged program machine state and inject any necessary operations to keep the merged program aligned.
-        The source swatch's machine state is also updated by the consumption of the instruction.
+        The shadow state of the source swatch is also updated by the consumption of the instruction.
 
         Args:
             instruction (Knitout_Line): The instruction to add to the merged program.
@@ -424,18 +438,13 @@ class Merge_Process:
             remove_connections (bool, optional): If True, any connections found in the consumed instruction are removed from the search space. Defaults to False.
             max_float (int, optional): Maximum number yarn-floating distances allowed between operations without introducing a cut and reinsert. Defaults to 15.
         """
-        if (isinstance(instruction, Knitout_Header_Line) or isinstance(instruction, Knitout_Version_Line)
-                or (isinstance(instruction, Knitout_Comment_Line) and "No-Op:" in str(instruction))):  # Todo: Update knitout interpreter to have subclass of comments for no-ops
+        if self._instruction_is_excluded_from_merge(instruction):
             return  # Do not consume header, version lines, or no-op comments
         if self._instruction_is_no_op_in_merged_program(instruction) and instruction_source is not None:  # No op inhook or releasehook in the merged program.
-            if (isinstance(instruction, Hook_Instruction) and not isinstance(instruction, Releasehook_Instruction)
-                    and not self._source_machine_states[instruction_source].carrier_system.inserting_hook_available):
-                self._source_machine_states[instruction_source].carrier_system.releasehook()
-            if isinstance(instruction_source, Swatch_Side):
-                with warnings.catch_warnings():
-                    warnings.filterwarnings('ignore', category=Knit_on_Empty_Needle_Warning)
-                    warnings.filterwarnings('ignore', category=Mismatched_Releasehook_Warning)
-                    instruction.execute(self._source_machine_states[instruction_source])  # update carrier in the swatch's machine, but ignore its addition to the merged program
+            source_state = self._source_machine_states[instruction_source]
+            if isinstance(instruction, Hook_Instruction) and not isinstance(instruction, Releasehook_Instruction) and not source_state.inserting_hook_available:
+                source_state.releasehook()
+            source_state.execute(instruction)  # update carrier in the swatch's state, but ignore its addition to the merged program
             return
         if remove_connections:
             self._seam_search_space.remove_boundary(instruction)
@@ -461,6 +470,42 @@ class Merge_Process:
             merge_instruction = instruction  # There is no difference between the merged instruction and its source.
         self._add_instruction_to_merge(merge_instruction, instruction_source, instruction)
 
+    @staticmethod
+    def _instruction_is_excluded_from_merge(instruction: Knitout_Line) -> bool:
+        """
+        Args:
+            instruction (Knitout_Line): The instruction from a source swatch.
+
+        Returns:
+            bool: True if the instruction is a header line, version line, or no-op comment that is not added to the merged program. False, otherwise.
+        """
+        return (isinstance(instruction, Knitout_Header_Line) or isinstance(instruction, Knitout_Version_Line)
+                or (isinstance(instruction, Knitout_Comment_Line) and "No-Op:" in str(instruction)))  # Todo: Update knitout interpreter to have subclass of comments for no-ops
+
+    def _copy_instruction(self, instruction: Knitout_Line, instruction_source: Swatch_Side) -> None:
+        """
+        Copies an instruction from a source swatch into the merged program without the float and missing carrier checks of _consume_instruction.
+        This is only valid while the merged program machine state is in sync with the source swatch, so that the instruction forms the same floats in both programs.
+        Hook instructions are always consumed in full because they may be no-ops or require releases in the merged program.
+
+        Args:
+            instruction (Knitout_Line): The instruction to copy into the merged program.
+            instruction_source (Swatch_Side): Specifies the source swatch for this instruction.
+        """
+        if isinstance(instruction, Hook_Instruction):
+            self._consume_instruction(instruction, instruction_source)
+            return
+        if self._instruction_is_excluded_from_merge(instruction):
+            return
+        self._release_to_merge_instruction(instruction, instruction_source)
+        if not isinstance(instruction, Rack_Instruction):
+            self._rack_to_current_swatch(instruction_source)
+        if isinstance(instruction, Needle_Instruction):
+            merge_instruction = self._needle_instruction_in_merged_swatch(instruction, instruction_source)
+        else:
+            merge_instruction = instruction
+        self._add_instruction_to_merge(merge_instruction, instruction_source, instruction)
+
     def _restart_merge_machine(self) -> None:
         """
         Restarts the merged tracking knitting machine and re-executes the current merged program.
@@ -489,9 +534,26 @@ class Merge_Process:
             list[Knitout_Line]: List of instructions in the merged program.
         """
         self._specify_sources_in_merged_instructions()
-        merge_execution = Knitout_Executer(self.merged_instructions, Knitting_Machine())
+        merge_execution = self._execute_merged_instructions()
         return cast(list[Knitout_Line], merge_execution.executed_instructions)
 
+    @Merge_Profiler.profiled(Merge_Phase.final_re_execution)
+    def _execute_merged_instructions(self) -> Knitout_Executer:
+        """
+        Executes the merged instructions on a new knitting machine to clean and reorganize the merged program.
+
+        Returns:
+            Knitout_Executer: The execution of the merged instructions.
+        """
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=In_Active_Carrier_Warning)
+            warnings.filterwarnings("ignore", category=Out_Inactive_Carrier_Warning)
+            warnings.filterwarnings("ignore", category=Mismatched_Releasehook_Warning)
+            warnings.filterwarnings('ignore', category=Knit_on_Empty_Needle_Warning)
+            merge_execution = Knitout_Executer(self.merged_instructions, Knitting_Machine())
+        Merge_Profiler.count_event(Merge_Event.carriage_pass, len(merge_execution.carriage_passes))
+        return merge_execution
+
     def write_knitout(self, merge_name: str | None = None) -> None:
         """
         Creates a knitout file of the given merge name of the merged instructions from this merger.
@@ -501,18 +563,49 @@ class Merge_Process:
         """
         if merge_name is None:
             merge_name = f"{self.from_swatch.name}_{self.to_swatch.name}"
-        with open(f'{merge_name}.k', 'w') as merge_file:
-            clean_merged_instructions = [f"{str(instruction).splitlines()[0]}\n" for instruction in self.merged_instructions]
-            merge_file.writelines(clean_merged_instructions)
+        with Knitout_Stream_Writer(f'{merge_name}.k') as writer:
+            writer.write_lines(self.merged_instructions)
 
-    def compile_to_dat(self, merge_name: str | None = None) -> None:
+    @Merge_Profiler.profiled(Merge_Phase.dat_compilation)
+    def compile_to_dat(self, merge_name: str | None = None, compile_pool: Dat_Compile_Pool | None = None) -> None:
         """
         Creates a knitout file and compiled DAT file of the given merge name of the merged instructions from this merger.
 
         Args:
             merge_name (str, optional): The name of the merged swatch knitout file. Defaults to cwm_<the left_swatch's name>_to_<the right_swatch's name>.
+            compile_pool (Dat_Compile_Pool, optional):
+                If given, the knitout file is written and the DAT file is compiled in the background by the given pool. Otherwise, the DAT file is written before returning. Defaults to None.
         """
         if merge_name is None:
             merge_name = f"{self.from_swatch.name}_{self.to_swatch.name}"
-        self.write_knitout(merge_name)
-        knitout_to_dat(f"{merge_name}.k", f"{merge_name}.dat")
+        if compile_pool is None:
+            self.write_knitout(merge_name)
+            compile_knitout_file_to_dat(f"{merge_name}.k", f"{merge_name}.dat")
+            return
+        knitout_program = self._knitout_program_text()
+        with open(f"{merge_name}.k", "w") as knitout_file:
+            knitout_file.write(knitout_program)
+        compile_pool.submit(knitout_program, f"{merge_name}.dat")
+
+    @Merge_Profiler.profiled(Merge_Phase.dat_compilation)
+    def compile_dat(self, dat_path: str | None = None) -> bytes:
+        """
+        Compiles the merged instructions from this merger to a DAT file without writing a knitout file.
+
+        Args:
+            dat_path (str, optional): The path of the DAT file to write. If None, no file is left behind and only the DAT content is returned. Defaults to None.
+
+        Returns:
+            bytes: The content of the compiled DAT file.
+        """
+        return compile_knitout_to_dat(self._knitout_program_text(), dat_path)
+
+    def _knitout_program_text(self) -> str:
+        """
+        Returns:
+            str: The content of the knitout program of the merged instructions from this merger.
+        """
+        knitout_buffer = StringIO()
+        with Knitout_Stream_Writer(knitout_buffer) as writer:
+            writer.write_lines(self.merged_instructions)
+        return knitout_buffer.getvalue()
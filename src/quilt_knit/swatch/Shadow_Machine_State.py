@@ -0,0 +1,158 @@
+"""Module containing the Shadow_Machine_State class"""
+from knitout_interpreter.knitout_operations.carrier_instructions import (
+    In_Instruction,
+    Inhook_Instruction,
+    Out_Instruction,
+    Outhook_Instruction,
+    Releasehook_Instruction,
+)
+from knitout_interpreter.knitout_operations.Knitout_Line import Knitout_Line
+from knitout_interpreter.knitout_operations.needle_instructions import (
+    Drop_Instruction,
+    Knit_Instruction,
+    Split_Instruction,
+    Tuck_Instruction,
+    Xfer_Instruction,
+)
+from knitout_interpreter.knitout_operations.Rack_Instruction import Rack_Instruction
+from virtual_knitting_machine.machine_components.needles.Needle import Needle
+
+
+class Shadow_Machine_State:
+    """
+    A compact stand-in for the Knitting_Machine that tracks the state of a source swatch during a merge process.
+
+    The merge processes only read the racking, the active carriers, the availability of the yarn-inserting hook and the needles that hold loops from the machine state of a source swatch.
+    The shadow state tracks exactly those values and ignores everything else a full machine simulation maintains (e.g., the knit graph, loop histories, carrier positions, and float tracking).
+
+    Attributes:
+        rack (int): The current integer racking of the source machine.
+        all_needle_rack (bool): True if the source machine is set to all-needle racking.
+        active_carrier_ids (set[int]): The ids of the carriers that are currently active in the source machine.
+        hooked_carrier_id (int | None): The id of the carrier held on the yarn-inserting hook or None if the hook is available.
+    """
+
+    def __init__(self) -> None:
+        self.rack: int = 0
+        self.all_needle_rack: bool = False
+        self.active_carrier_ids: set[int] = set()
+        self.hooked_carrier_id: int | None = None
+        self._loop_holding_needles: set[Needle] = set()
+
+    @property
+    def inserting_hook_available(self) -> bool:
+        """
+        Returns:
+            bool: True if the yarn-inserting hook is not holding a carrier. False, otherwise.
+        """
+        return self.hooked_carrier_id is None
+
+    def missing_carriers(self, carrier_ids: list[int]) -> list[int]:
+        """
+        Args:
+            carrier_ids (list[int]): The carrier ids to check for inactive carriers.
+
+        Returns:
+            list[int]: The ids from the given carrier ids that are not active in the source machine.
+        """
+        return [cid for cid in carrier_ids if cid not in self.active_carrier_ids]
+
+    def releasehook(self) -> None:
+        """
+        Releases the yarn-inserting hook from whatever carrier is currently using it.
+        """
+        self.hooked_carrier_id = None
+
+    def inhook(self, carrier_id: int) -> None:
+        """
+        Activates the given carrier and holds it on the yarn-inserting hook.
+
+        Args:
+            carrier_id (int): The id of the carrier to bring in.
+        """
+        self.active_carrier_ids.add(carrier_id)
+        self.hooked_carrier_id = carrier_id
+
+    def loop_holding_needles(self) -> list[Needle]:
+        """
+        Returns:
+            list[Needle]: The needles that currently hold loops, ordered by position with front bed needles given first. Slider needles are excluded.
+        """
+        front_needles = sorted((n for n in self._loop_holding_needles if n.is_front and not n.is_slider), key=lambda n: n.position)
+        back_needles = sorted((n for n in self._loop_holding_needles if n.is_back and not n.is_slider), key=lambda n: n.position)
+        return [*front_needles, *back_needles]
+
+    def _move_loops(self, starting_needle: Needle, target_needle: Needle) -> bool:
+        """
+        Args:
+            starting_needle (Needle): The needle to move loops from.
+            target_needle (Needle): The needle to move loops to.
+
+        Returns:
+            bool: True if the starting needle held loops that were moved. False, otherwise.
+        """
+        if starting_needle not in self._loop_holding_needles:
+            return False
+        self._loop_holding_needles.remove(starting_needle)
+        self._loop_holding_needles.add(target_needle)
+        return True
+
+    def execute(self, instruction: Knitout_Line) -> bool:
+        """
+        Updates the shadow state by the execution of the given instruction.
+
+        Args:
+            instruction (Knitout_Line): The instruction to execute.
+
+        Returns:
+            bool: True if the instruction changed the shadow state. False, otherwise.
+
+        Notes:
+            * The instruction is assumed to be valid in the source swatch's program, so the machine-level validation of the instruction is not repeated.
+        """
+        if isinstance(instruction, Rack_Instruction):
+            if self.rack == instruction.rack and self.all_needle_rack == instruction.all_needle_rack:
+                return False
+            self.rack = instruction.rack
+            self.all_needle_rack = instruction.all_needle_rack
+            return True
+        elif isinstance(instruction, Inhook_Instruction):
+            self.inhook(instruction.carrier_id)
+            return True
+        elif isinstance(instruction, Releasehook_Instruction):
+            if self.inserting_hook_available:
+                return False
+            self.releasehook()
+            return True
+        elif isinstance(instruction, Outhook_Instruction) or isinstance(instruction, Out_Instruction):
+            if instruction.carrier_id not in self.active_carrier_ids:
+                return False
+            self.active_carrier_ids.remove(instruction.carrier_id)
+            return True
+        elif isinstance(instruction, In_Instruction):
+            self.active_carrier_ids.add(instruction.carrier_id)
+            return True
+        elif isinstance(instruction, Xfer_Instruction):
+            assert isinstance(instruction.needle_2, Needle)
+            return self._move_loops(instruction.needle, instruction.needle_2)
+        elif isinstance(instruction, Split_Instruction):
+            assert isinstance(instruction.needle_2, Needle)
+            moved_loops = self._move_loops(instruction.needle, instruction.needle_2)
+            if len(instruction.carrier_set) > 0:
+                self._loop_holding_needles.add(instruction.needle)
+                return True
+            return moved_loops
+        elif isinstance(instruction, Knit_Instruction):
+            self._loop_holding_needles.discard(instruction.needle)
+            if len(instruction.carrier_set) > 0:
+                self._loop_holding_needles.add(instruction.needle)
+            return True
+        elif isinstance(instruction, Tuck_Instruction):
+            if len(instruction.carrier_set) == 0:
+                return False
+            self._loop_holding_needles.add(instruction.needle)
+            return True
+        elif isinstance(instruction, Drop_Instruction):
+            self._loop_holding_needles.discard(instruction.needle)
+            return True
+        return False  # Misses, kicks, pauses, comments and headers do not change the tracked state.
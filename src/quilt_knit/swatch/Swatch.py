@@ -2,16 +2,16 @@
 from __future__ import annotations
 
 import warnings
-from typing import cast
+from collections.abc import Iterable
+from io import StringIO
+from typing import TYPE_CHECKING, TextIO, cast
 
 from knit_graphs.Knit_Graph import Knit_Graph
 from knit_graphs.Loop import Loop
 from knitout_interpreter.knitout_execution import Knitout_Executer
 from knitout_interpreter.knitout_execution_structures.Carriage_Pass import Carriage_Pass
-from knitout_interpreter.knitout_language.Knitout_Context import Knitout_Context
 from knitout_interpreter.knitout_operations.carrier_instructions import (
     Inhook_Instruction,
-    Outhook_Instruction,
     Releasehook_Instruction,
 )
 from knitout_interpreter.knitout_operations.Header_Line import (
@@ -22,6 +22,7 @@ from knitout_interpreter.knitout_operations.knitout_instruction_factory import (
     build_instruction,
 )
 from knitout_interpreter.knitout_operations.Knitout_Line import (
+    Knitout_Comment_Line,
     Knitout_Line,
     Knitout_Version_Line,
 )
@@ -33,7 +34,6 @@ from knitout_interpreter.knitout_operations.needle_instructions import (
     Xfer_Instruction,
 )
 from knitout_interpreter.knitout_operations.Rack_Instruction import Rack_Instruction
-from knitout_to_dat_python.knitout_to_dat import knitout_to_dat
 from virtual_knitting_machine.Knitting_Machine import Knitting_Machine
 from virtual_knitting_machine.knitting_machine_warnings.Needle_Warnings import (
     Knit_on_Empty_Needle_Warning,
@@ -46,12 +46,25 @@ from virtual_knitting_machine.machine_constructed_knit_graph.Machine_Knit_Loop i
     Machine_Knit_Loop,
 )
 
+from quilt_knit.profiling.Merge_Profiler import Merge_Phase, Merge_Profiler
+from quilt_knit.profiling.Merge_Trace_Exporter import Merge_Trace_Exporter
+from quilt_knit.swatch.Binary_Knitout_Codec import Binary_Knitout_Codec
+from quilt_knit.swatch.Carrier_Timeline import Carrier_Timeline
 from quilt_knit.swatch.course_boundary_instructions import (
     Course_Boundary_Instruction,
     Course_Boundary_Type,
 )
+from quilt_knit.swatch.dat_compilation import (
+    compile_knitout_file_to_dat,
+    compile_knitout_to_dat,
+)
+from quilt_knit.swatch.Knitout_Stream_Reader import Knitout_Stream_Reader
+from quilt_knit.swatch.Knitout_Stream_Writer import Knitout_Stream_Writer
 from quilt_knit.swatch.wale_boundary_instructions import Wale_Boundary_Instruction
 
+if TYPE_CHECKING:
+    from quilt_knit.swatch.Dat_Compile_Pool import Dat_Compile_Pool
+
 
 class Swatch:
     """
@@ -64,12 +77,22 @@ class Swatch:
             wale_exits (list[Wale_Boundary_Instruction]): The instructions on the top boundary of the swatch.
     """
 
-    def __init__(self, name: str, knitout_program: str | list[Knitout_Line], prior_machine_state: Knitting_Machine | None = None):
+    @Merge_Trace_Exporter.traced("Swatch", category="swatch",
+                                 labels=lambda _result, swatch, *_args, **_kwargs: Merge_Trace_Exporter.swatch_labels("swatch", swatch))
+    def __init__(self, name: str, knitout_program: str | bytes | list[Knitout_Line], prior_machine_state: Knitting_Machine | None = None, memory_map: bool = False):
+        """
+        Args:
+            name (str): The name of the swatch.
+            knitout_program (str | bytes | list[Knitout_Line]):
+                The path of a knitout or binary knitout file, a binary knitout program, or the list of knitout lines that form the swatch program.
+            prior_machine_state (Knitting_Machine, optional): The machine state to execute the swatch program from. Defaults to an empty machine.
+            memory_map (bool, optional): If True and a knitout text file is given, the file is memory-mapped while it is parsed. Defaults to False.
+        """
         self._name: str = name
-        knitout_context: Knitout_Context = Knitout_Context()
         if isinstance(knitout_program, str):
-            knitout_program, _knitting_machine, _knit_graph = knitout_context.process_knitout_file(knitout_program)
-            self.knitout_program: list[Knitout_Line] = cast(list[Knitout_Line], knitout_program)
+            self.knitout_program: list[Knitout_Line] = self._read_knitout_file(knitout_program, memory_map)
+        elif isinstance(knitout_program, bytes):
+            self.knitout_program: list[Knitout_Line] = self._number_knitout_lines(Binary_Knitout_Codec.decode(knitout_program))
         else:
             self.knitout_program: list[Knitout_Line] = knitout_program
         if prior_machine_state is None:
@@ -84,6 +107,7 @@ class Swatch:
             self._carriage_pass_to_index[cp] = i
             for instruction in cp:
                 self._instruction_to_carriage_pass[instruction] = cp
+        self._carrier_timeline: Carrier_Timeline | None = None
         self._process_course_boundaries()
         self.wale_entrances: list[Wale_Boundary_Instruction] = self._get_wale_entrances()
         self.wale_exits: list[Wale_Boundary_Instruction] = self._get_wale_exits()
@@ -101,6 +125,39 @@ class Swatch:
         self.wale_exits: list[Wale_Boundary_Instruction] = updated_exits
         self._instructions_on_wale_boundary.update({wb.instruction: wb for wb in self.wale_exits if wb not in exits_from_entrances})
 
+    @staticmethod
+    def _read_knitout_file(knitout_file_name: str, memory_map: bool = False) -> list[Knitout_Line]:
+        """
+        Reads a knitout text file one line at a time or decodes a binary knitout file, keeping only the knitout lines that are not comments.
+
+        Args:
+            knitout_file_name (str): The path of the knitout or binary knitout file to read.
+            memory_map (bool, optional): If True, a knitout text file is memory-mapped while it is parsed. Defaults to False.
+
+        Returns:
+            list[Knitout_Line]: The knitout lines of the file, numbered by their position in the program.
+        """
+        if Binary_Knitout_Codec.is_binary_knitout_file(knitout_file_name):
+            return Swatch._number_knitout_lines(Binary_Knitout_Codec.read(knitout_file_name))
+        return Swatch._number_knitout_lines(Knitout_Stream_Reader(knitout_file_name, memory_map))
+
+    @staticmethod
+    def _number_knitout_lines(knitout_lines: Iterable[Knitout_Line]) -> list[Knitout_Line]:
+        """
+        Args:
+            knitout_lines (Iterable[Knitout_Line]): The knitout lines of a program, in order.
+
+        Returns:
+            list[Knitout_Line]: The given knitout lines without comment lines, numbered by their position in the program.
+        """
+        knitout_program: list[Knitout_Line] = []
+        for knitout_line in knitout_lines:
+            if not isinstance(knitout_line, Knitout_Comment_Line):
+                knitout_line.original_line_number = len(knitout_program)
+                knitout_program.append(knitout_line)
+        return knitout_program
+
+    @Merge_Profiler.profiled(Merge_Phase.boundary_analysis)
     def _process_course_boundaries(self) -> None:
         """
         Processes all the carriage passes in the program into data structures for efficient reference.
@@ -156,6 +213,7 @@ class Swatch:
                                                                            carriage_pass_rack=carriage_pass.rack, carriage_pass_is_all_needle=carriage_pass.all_needle_rack,
                                                                            carriage_pass_index=cp_index))
 
+    @Merge_Profiler.profiled(Merge_Phase.swatch_execution)
     def _execute_knitout(self, prior_machine_state: Knitting_Machine) -> None:
         """
         Sets the _knitout_execution property.
@@ -170,6 +228,7 @@ class Swatch:
             self._knitout_execution: Knitout_Executer = Knitout_Executer(self.knitout_program, first_pass_prior_machine_state)
         self.knitout_program = self._knitout_execution.executed_instructions  # set the knitout program to be the program that is produced by successful execution.
 
+    @Merge_Profiler.profiled(Merge_Phase.boundary_analysis)
     def _get_wale_entrances(self) -> list[Wale_Boundary_Instruction]:
         if len(self.execution_knit_graph.stitch_graph.nodes) == 0:  # the program does not result in a knitgraph to merge
             return []
@@ -201,6 +260,7 @@ class Swatch:
         # assert len(entrance_needles) == 0, f"Entrance needles is not empty: {entrance_needles}"
         return [*entrances_to_needles.values()]
 
+    @Merge_Profiler.profiled(Merge_Phase.boundary_analysis)
     def _get_wale_exits(self) -> list[Wale_Boundary_Instruction]:
         if len(self.execution_knit_graph.stitch_graph.nodes) == 0:  # the program does not result in a knitgraph to merge
             return []
@@ -283,6 +343,16 @@ class Swatch:
         """
         return self._knitout_execution.knitting_machine
 
+    @property
+    def carrier_timeline(self) -> Carrier_Timeline:
+        """
+        Returns:
+            Carrier_Timeline: The timeline of carrier usage over the carriage passes of this swatch. The timeline is built on first access.
+        """
+        if self._carrier_timeline is None:
+            self._carrier_timeline = Carrier_Timeline(self.carriage_passes)
+        return self._carrier_timeline
+
     @property
     def execution_knit_graph(self) -> Knit_Graph:
         """
@@ -552,6 +622,18 @@ class Swatch:
         top_swatch = Swatch(top_swatch_name, top_program)
         return bottom_swatch, top_swatch, lost_starting_xfers
 
+    def write_knitout(self, destination: str | TextIO, buffer_lines: int = 1024) -> None:
+        """
+        Streams the knitout program of this swatch to the given destination. The swatch is not modified.
+        The program is written with a header for the machine that executed it and outhooks for the carriers left active at the end of the program.
+
+        Args:
+            destination (str | TextIO): The path of the knitout file to write or a file-like object to write to.
+            buffer_lines (int, optional): The number of lines buffered before they are written as one chunk. Defaults to 1024.
+        """
+        with Knitout_Stream_Writer(destination, buffer_lines) as writer:
+            writer.write_program(self.knitout_program, self.execution_knitting_machine, f"Take out remaining carriers from {self.name}")
+
     def compile_to_knitout(self, knitout_name: str | None = None) -> None:
         """
         Writes a knitout file of the given name that executes this swatch program.
@@ -560,27 +642,65 @@ class Swatch:
         """
         if knitout_name is None:
             knitout_name = self.name
-        context = Knitout_Context()
-        executed_instructions, execution_machine, _knitgraph = context.execute_knitout_instructions(self.knitout_program)
-        self.knitout_program = get_machine_header(self.execution_knitting_machine)
-        self.knitout_program.extend(executed_instructions)
-        for cid in execution_machine.carrier_system.active_carriers:
-            self.knitout_program.append(Outhook_Instruction(cid, f"Take out remaining carriers from {self.name}"))
-        with open(f'{knitout_name}.k', 'w') as knitout_file:
-            clean_instructions = [f"{str(i).splitlines()[0]}\n" for i in self.knitout_program]
-            knitout_file.writelines(clean_instructions)
-
-    def compile_to_dat(self, dat_name: str | None = None) -> None:
+        self.write_knitout(f'{knitout_name}.k')
+
+    @Merge_Profiler.profiled(Merge_Phase.dat_compilation)
+    def compile_to_dat(self, dat_name: str | None = None, compile_pool: Dat_Compile_Pool | None = None) -> None:
         """
         Writes a shima-seiki dat file of the given name that executes this swatch program.
 
         Args:
             dat_name (str, optional): The name of the dat to write. Defaults to the name of the swatch.
+            compile_pool (Dat_Compile_Pool, optional):
+                If given, the knitout file is written and the dat file is compiled in the background by the given pool. Otherwise, the dat file is written before returning. Defaults to None.
         """
         if dat_name is None:
             dat_name = self.name
-        self.compile_to_knitout(dat_name)
-        knitout_to_dat(f"{dat_name}.k", f"{dat_name}.dat", knitout_in_file=True)
+        if compile_pool is None:
+            self.compile_to_knitout(dat_name)
+            compile_knitout_file_to_dat(f"{dat_name}.k", f"{dat_name}.dat")
+            return
+        knitout_program = self._knitout_program_text()
+        with open(f"{dat_name}.k", "w") as knitout_file:
+            knitout_file.write(knitout_program)
+        compile_pool.submit(knitout_program, f"{dat_name}.dat")
+
+    @Merge_Profiler.profiled(Merge_Phase.dat_compilation)
+    def compile_dat(self, dat_path: str | None = None) -> bytes:
+        """
+        Compiles this swatch program to a DAT file without writing a knitout file. The swatch is not modified.
+
+        Args:
+            dat_path (str, optional): The path of the DAT file to write. If None, no file is left behind and only the DAT content is returned. Defaults to None.
+
+        Returns:
+            bytes: The content of the compiled DAT file.
+        """
+        return compile_knitout_to_dat(self._knitout_program_text(), dat_path)
+
+    def to_binary_knitout(self, file_name: str | None = None) -> bytes:
+        """
+        Encodes the knitout program of this swatch as a binary knitout program. The swatch is not modified.
+        A swatch constructed from the binary knitout program executes the same program as this swatch.
+
+        Args:
+            file_name (str, optional): The path of the binary knitout file to write. If None, no file is written. Defaults to None.
+
+        Returns:
+            bytes: The binary knitout program of this swatch.
+        """
+        if file_name is None:
+            return Binary_Knitout_Codec.encode(self.knitout_program)
+        return Binary_Knitout_Codec.write(self.knitout_program, file_name)
+
+    def _knitout_program_text(self) -> str:
+        """
+        Returns:
+            str: The content of the knitout file that executes this swatch program.
+        """
+        knitout_buffer = StringIO()
+        self.write_knitout(knitout_buffer)
+        return knitout_buffer.getvalue()
 
     def __hash__(self) -> int:
         """
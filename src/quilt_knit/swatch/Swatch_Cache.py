@@ -0,0 +1,127 @@
+"""Module containing the Swatch_Cache class used to share executed swatch programs between quilts."""
+from __future__ import annotations
+
+import hashlib
+import os
+
+from quilt_knit.LRU_Cache import LRU_Cache
+from quilt_knit.swatch.Swatch import Swatch
+
+
+class Swatch_Cache:
+    """
+    A cache of the executed programs of swatches loaded from knitout files, keyed by the content of the knitout files.
+    Programs are kept in memory as binary knitout and, if a cache directory is given, are also written to that directory to be shared with later runs.
+    The number of programs kept in memory can be bounded, in which case the least recently used programs are evicted from memory but kept in the cache directory.
+
+    Examples:
+        >>> swatch_cache = Swatch_Cache("quilt_cache")
+        >>> left = swatch_cache.load_swatch("left", "jersey.k")
+        >>> right = swatch_cache.load_swatch("right", "jersey.k")  # Decoded from the cache without parsing jersey.k.
+
+    Attributes:
+        cache_directory (str | None): The directory that binary knitout programs are written to and read from, or None if programs are only cached in memory.
+        hits (int): The number of swatches loaded from a cached program.
+        misses (int): The number of swatches loaded by parsing their knitout file.
+
+    Notes:
+        * Every call to load_swatch returns a new swatch, so swatches loaded from the same file can be placed in the same quilt.
+    """
+
+    def __init__(self, cache_directory: str | None = None, max_programs: int | None = None):
+        """
+        Args:
+            cache_directory (str, optional): The directory to write binary knitout programs to. Defaults to caching programs only in memory.
+            max_programs (int, optional): The maximum number of programs kept in memory. Defaults to keeping every loaded program in memory.
+        """
+        self.cache_directory: str | None = cache_directory
+        if cache_directory is not None:
+            os.makedirs(cache_directory, exist_ok=True)
+        self._programs: LRU_Cache[str, bytes] = LRU_Cache(max_programs)
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def file_digest(file_name: str) -> str:
+        """
+        Args:
+            file_name (str): The path of the file to digest.
+
+        Returns:
+            str: The SHA-256 hex digest of the content of the file.
+        """
+        with open(file_name, "rb") as file:
+            return hashlib.file_digest(file, "sha256").hexdigest()
+
+    def _cache_path(self, digest: str) -> str | None:
+        """
+        Args:
+            digest (str): The digest of a knitout file.
+
+        Returns:
+            str | None: The path of the binary knitout program cached for the given digest or None if there is no cache directory.
+        """
+        if self.cache_directory is None:
+            return None
+        return os.path.join(self.cache_directory, f"{digest}.kb")
+
+    def _cached_program(self, digest: str) -> bytes | None:
+        """
+        Args:
+            digest (str): The digest of a knitout file.
+
+        Returns:
+            bytes | None: The binary knitout program cached for the given digest or None if it is not cached.
+        """
+        program = self._programs.get(digest)
+        if program is not None:
+            return program
+        cache_path = self._cache_path(digest)
+        if cache_path is None or not os.path.exists(cache_path):
+            return None
+        with open(cache_path, "rb") as cache_file:
+            program = cache_file.read()
+        self._programs.put(digest, program)
+        return program
+
+    def _cache_program(self, digest: str, program: bytes) -> None:
+        """
+        Caches the given binary knitout program for the given digest.
+
+        Args:
+            digest (str): The digest of a knitout file.
+            program (bytes): The binary knitout program of the swatch loaded from that file.
+        """
+        self._programs.put(digest, program)
+        cache_path = self._cache_path(digest)
+        if cache_path is not None:
+            partial_path = f"{cache_path}.{os.getpid()}.partial"
+            with open(partial_path, "wb") as cache_file:
+                cache_file.write(program)
+            os.replace(partial_path, cache_path)  # Readers in other processes never see a partially written program.
+
+    def load_swatch(self, name: str, knitout_file_name: str) -> Swatch:
+        """
+        Args:
+            name (str): The name of the swatch.
+            knitout_file_name (str): The path of the knitout file of the swatch.
+
+        Returns:
+            Swatch: A new swatch executing the program of the given knitout file.
+        """
+        digest = self.file_digest(knitout_file_name)
+        program = self._cached_program(digest)
+        if program is not None:
+            self.hits += 1
+            return Swatch(name, program)
+        self.misses += 1
+        swatch = Swatch(name, knitout_file_name)
+        self._cache_program(digest, swatch.to_binary_knitout())
+        return swatch
+
+    def report(self) -> dict[str, int]:
+        """
+        Returns:
+            dict[str, int]: The number of hits, misses, programs cached in memory and programs evicted from memory by this cache.
+        """
+        return {"hits": self.hits, "misses": self.misses, "cached_programs": len(self._programs), "evicted_programs": self._programs.evictions}
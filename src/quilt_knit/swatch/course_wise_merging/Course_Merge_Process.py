@@ -1,7 +1,6 @@
 """Module for linking Swatches by vertical seams"""
-import warnings
+from collections import deque
 
-from knitout_interpreter.knitout_execution import Knitout_Executer
 from knitout_interpreter.knitout_execution_structures.Carriage_Pass import Carriage_Pass
 from knitout_interpreter.knitout_operations.carrier_instructions import (
     Inhook_Instruction,
@@ -13,20 +12,9 @@ from knitout_interpreter.knitout_operations.knitout_instruction_factory import (
 from knitout_interpreter.knitout_operations.Knitout_Line import Knitout_Line
 from knitout_interpreter.knitout_operations.needle_instructions import (
     Loop_Making_Instruction,
-    Miss_Instruction,
     Needle_Instruction,
     Xfer_Instruction,
 )
-from virtual_knitting_machine.knitting_machine_warnings.carrier_operation_warnings import (
-    Mismatched_Releasehook_Warning,
-)
-from virtual_knitting_machine.knitting_machine_warnings.Needle_Warnings import (
-    Knit_on_Empty_Needle_Warning,
-)
-from virtual_knitting_machine.knitting_machine_warnings.Yarn_Carrier_System_Warning import (
-    In_Active_Carrier_Warning,
-    Out_Inactive_Carrier_Warning,
-)
 from virtual_knitting_machine.machine_components.carriage_system.Carriage_Pass_Direction import (
     Carriage_Pass_Direction,
 )
@@ -34,6 +22,7 @@ from virtual_knitting_machine.machine_components.yarn_management.Yarn_Carrier im
     Yarn_Carrier,
 )
 
+from quilt_knit.profiling.Merge_Profiler import Merge_Phase, Merge_Profiler
 from quilt_knit.swatch.course_boundary_instructions import (
     Course_Boundary_Instruction,
     Course_Side,
@@ -41,6 +30,9 @@ from quilt_knit.swatch.course_boundary_instructions import (
 from quilt_knit.swatch.course_wise_merging.Course_Seam_Connection import (
     Course_Seam_Connection,
 )
+from quilt_knit.swatch.course_wise_merging.Course_Seam_Planner import (
+    Course_Seam_Planner,
+)
 from quilt_knit.swatch.course_wise_merging.Course_Seam_Search_Space import (
     Course_Seam_Search_Space,
 )
@@ -62,6 +54,8 @@ class Course_Merge_Process(Merge_Process):
         super().__init__(swatch_connection, Course_Side.Left, seam_search_space)
         self.seam_search_space.remove_boundaries_beyond_course_connections(self.course_wise_connection)
         self._next_instruction_index_by_side: dict[Course_Side, int | None] = {Course_Side.Left: 0, Course_Side.Right: 0}
+        self._seam_plan: deque[tuple[Course_Boundary_Instruction, Course_Seam_Connection | None]] | None = None
+        self.seam_plan_diverged: bool = False
         self._set_merge_direction()
 
     @property
@@ -494,6 +488,19 @@ class Course_Merge_Process(Merge_Process):
         """
         return self._next_instruction_index_by_side[Course_Side.Right] is None
 
+    def _merged_position_shift(self, swatch_side: Course_Side) -> int:
+        """
+        Args:
+            swatch_side (Course_Side): The side of the merge to find the needle shift of.
+
+        Returns:
+            int: The number of needles that instructions from the given side are shifted rightward in the merged program.
+        """
+        if swatch_side is Course_Side.Left:
+            return 0
+        else:
+            return self.left_swatch.width
+
     def _needle_instruction_in_merged_swatch(self, needle_instruction: Needle_Instruction, source_swatch_side: Course_Side) -> Needle_Instruction:
         """
         Args:
@@ -503,17 +510,20 @@ class Course_Merge_Process(Merge_Process):
         Returns:
             Needle_Instruction:
                 The needle instruction adjusted for the position in the merged program.
-                This is the same instruction from the left swatch and a copy shifted by the width of the left swatch for instructions from the right swatch.
+                This is the same instruction if its side is not shifted and a copy shifted by the position shift of its side otherwise (the width of the left swatch for instructions from the right swatch).
 
         """
-        if source_swatch_side is None or source_swatch_side is Course_Side.Left:
+        if source_swatch_side is None:
+            return needle_instruction
+        position_shift = self._merged_position_shift(source_swatch_side)
+        if position_shift == 0:
             return needle_instruction
         else:
-            shifted_needle = needle_instruction.needle + self.left_swatch.width
+            shifted_needle = needle_instruction.needle + position_shift
             if needle_instruction.needle_2 is None:
                 shifted_needle_2 = None
             else:
-                shifted_needle_2 = needle_instruction.needle_2 + self.left_swatch.width
+                shifted_needle_2 = needle_instruction.needle_2 + position_shift
             shifted_instruction = build_instruction(needle_instruction.instruction_type, shifted_needle,
                                                     needle_instruction.direction, needle_instruction.carrier_set, shifted_needle_2,
                                                     comment="Right Shifted for Merge")
@@ -684,6 +694,7 @@ class Course_Merge_Process(Merge_Process):
         floats_cut = self.floats_requires_cut(connection)
         return connection.different_carriers, floats_cut, jump_distance
 
+    @Merge_Profiler.profiled(Merge_Phase.connection_selection)
     def best_connection(self, boundary_instruction: Course_Boundary_Instruction) -> Course_Seam_Connection | None:
         """
         Args:
@@ -784,18 +795,24 @@ class Course_Merge_Process(Merge_Process):
                 A dictionary that maps carriers to a tuple containing the required float length and direction that the float will be formed by the connection.
                 Only non-zero floats will be included.
         """
-        carriage_passes_to_instruction = self._get_carriage_passes_upto_connection(connection)
+        next_swatch_current_cp, target_cp = self._get_carriage_pass_range_upto_connection(connection)
+        timeline = self.next_swatch.carrier_timeline
+        position_shift = self._merged_position_shift(self.current_course_merge_side)  # Matches the shift applied by _instruction_creates_float.
         floats_by_carrier: dict[Yarn_Carrier, tuple[int, Carriage_Pass_Direction]] = {}
         found_carriers: set[Yarn_Carrier] = set()
-        for cp in carriage_passes_to_instruction:
-            next_instruction = cp.first_instruction
-            if isinstance(next_instruction, Loop_Making_Instruction):
-                new_floats = self._instruction_creates_float(next_instruction, ignore_carriers=found_carriers)
-                if not isinstance(next_instruction, Miss_Instruction):
-                    found_carriers.update(next_instruction.get_carriers(self._merged_program_machine_state).values())  # Any carriers that have formed loops can be ignored from now on
-                floats_by_carrier.update(new_floats)
-                if len(floats_by_carrier) >= len(self._merged_program_machine_state.carrier_system.active_carriers):
-                    return floats_by_carrier  # All possible floats found.
+        for carrier in self._merged_program_machine_state.carrier_system.carriers:
+            if carrier.position is None:
+                continue  # Inactive carriers do not form floats.
+            cp_index = timeline.first_loop_pass(carrier.carrier_id, next_swatch_current_cp, target_cp)
+            if cp_index is None:
+                continue
+            found_carriers.add(carrier)  # Only the first loops formed by a carrier in the jumped carriage passes can form a float from the current carrier position.
+            loop_position = timeline.loop_position(cp_index)
+            assert loop_position is not None
+            float_length = abs(loop_position[0] + position_shift - carrier.position)
+            if float_length > 0:
+                float_direction = Carriage_Pass_Direction.Leftward if loop_position[0] + position_shift < carrier.position else Carriage_Pass_Direction.Rightward
+                floats_by_carrier[carrier] = (float_length, float_direction)
         if connection.exit_instruction.source_swatch_name == self.current_swatch.name and isinstance(connection.entrance_instruction.instruction, Loop_Making_Instruction):  # exiting current swatch
             floats_by_carrier.update(self._instruction_creates_float(connection.entrance_instruction.instruction, ignore_carriers=found_carriers))
         return floats_by_carrier
@@ -898,14 +915,41 @@ class Course_Merge_Process(Merge_Process):
             self._consume_to_instruction(connection.entrance_instruction.instruction, remove_connections=True)
             self._consume_next_instruction(remove_connections=True)  # Consume the entrance instruction.
 
-    def merge_swatches(self) -> [Knitout_Line]:
+    def _planned_connection(self, boundary_instruction: Course_Boundary_Instruction) -> Course_Seam_Connection | None:
+        """
+        Args:
+            boundary_instruction (Course_Boundary_Instruction): The boundary instruction that the merge process stopped at.
+
+        Returns:
+            Course_Seam_Connection | None:
+                The planned connection from the given boundary instruction or None if the plan skips this boundary.
+                If the merge process has diverged from the plan or the planned connection is no longer available, the plan is dropped, seam_plan_diverged is set, and the best connection is returned.
+                Once the plan is exhausted, the best connection is returned without marking the plan as diverged.
+        """
+        if self._seam_plan is not None and len(self._seam_plan) > 0:
+            planned_boundary, planned_connection = self._seam_plan.popleft()
+            if planned_boundary == boundary_instruction and (planned_connection is None or planned_connection in self._available_connections(boundary_instruction)):
+                return planned_connection
+            self.seam_plan_diverged = True
+        self._seam_plan = None
+        return self.best_connection(boundary_instruction)
+
+    def merge_swatches(self, plan_seam: bool = False) -> [Knitout_Line]:
         """
         Merges the left and right swatch and forms a merged swatch program and updates the machine state according to that merged program.
 
+        Args:
+            plan_seam (bool, optional):
+                If True, the sequence of connections is planned by a Course_Seam_Planner before merging and replayed during the merge.
+                Otherwise, the best connection is chosen greedily at each boundary. Defaults to False.
+
         Returns:
             list[Knitout_Line]: A list of instructions in the merged program.
         """
         self._consume_up_to_first_courses()
+        if plan_seam:
+            planner = Course_Seam_Planner(self.course_wise_connection, self.seam_search_space, self.current_course_merge_side)
+            self._seam_plan = deque(planner.plan())
         # Start Merge process
         while not self.left_swatch_is_consumed and not self.right_swatch_is_consumed:
             # Consume up to next boundary instruction or until reaching top course to merge.
@@ -918,7 +962,10 @@ class Course_Merge_Process(Merge_Process):
             if self.next_instruction_is_boundary_entrance or self.next_instruction_is_boundary_exit:
                 boundary_instruction = self.current_swatch.get_course_boundary_instruction(self.next_instruction)
                 assert isinstance(boundary_instruction, Course_Boundary_Instruction)
-                best_connection = self.best_connection(boundary_instruction)
+                if self._seam_plan is not None:
+                    best_connection = self._planned_connection(boundary_instruction)
+                else:
+                    best_connection = self.best_connection(boundary_instruction)
                 if best_connection is not None:  # Otherwise continue in the current swatch, ignoring that possible connection.
                     self._consume_connection(best_connection)
                     continue
@@ -935,13 +982,7 @@ class Course_Merge_Process(Merge_Process):
             self._add_instruction_to_merge(outhook, self.current_course_merge_side)
         self._specify_sources_in_merged_instructions()
         # Clean and reorganize instructions
-        with warnings.catch_warnings():
-            warnings.filterwarnings("ignore", category=In_Active_Carrier_Warning)
-            warnings.filterwarnings("ignore", category=Out_Inactive_Carrier_Warning)
-            warnings.filterwarnings("ignore", category=Mismatched_Releasehook_Warning)
-            warnings.filterwarnings('ignore', category=Knit_on_Empty_Needle_Warning)
-            executer = Knitout_Executer(self.merged_instructions)
-        self.merged_instructions = executer.executed_instructions
+        self.merged_instructions = self._execute_merged_instructions().executed_instructions
         return self.merged_instructions
 
     def _current_swatch_consumed(self) -> bool:
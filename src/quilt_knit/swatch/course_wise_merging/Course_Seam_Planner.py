@@ -0,0 +1,311 @@
+"""Module containing the Course_Seam_Planner class."""
+from knitout_interpreter.knitout_operations.needle_instructions import Xfer_Instruction
+from virtual_knitting_machine.machine_components.carriage_system.Carriage_Pass_Direction import (
+    Carriage_Pass_Direction,
+)
+
+from quilt_knit.profiling.Merge_Profiler import Merge_Phase, Merge_Profiler
+from quilt_knit.swatch.course_boundary_instructions import (
+    Course_Boundary_Instruction,
+    Course_Side,
+)
+from quilt_knit.swatch.course_wise_merging.Course_Seam_Connection import (
+    Course_Seam_Connection,
+)
+from quilt_knit.swatch.course_wise_merging.Course_Seam_Search_Space import (
+    Course_Seam_Search_Space,
+)
+from quilt_knit.swatch.course_wise_merging.Course_Wise_Connection import (
+    Course_Wise_Connection,
+)
+from quilt_knit.swatch.Swatch import Swatch
+
+# A planning state is the side being consumed, the carriage pass of the boundary the merge is stopped at on that side,
+# and the next carriage pass to consume on the other side.
+_Plan_State = tuple[Course_Side, int, int]
+# Plan costs are compared lexicographically: (negated connection count, carrier differences, cut floats, carriage pass jumps).
+_Plan_Cost = tuple[int, int, int, int]
+
+
+class Course_Seam_Planner:
+    """
+    Plans the full sequence of course-wise connections formed by a Course_Merge_Process before any instructions are merged.
+
+    The greedy merge picks the preferred connection at each boundary and checks that it does not skip a cheaper connection.
+    The planner instead finds the sequence of connections and skipped boundaries that forms the most connections with the lowest summed connection costs.
+    The merge process is modeled as a path through states of the form (current side, boundary carriage pass on the current side, next carriage pass on the other side).
+    Every step consumes at least one boundary, so the states form a directed acyclic graph that is solved by dynamic programming in order of consumed carriage passes.
+
+    Notes:
+        * Float lengths are estimated from the carrier timelines of the swatches, so the planned costs may differ from the costs measured while merging.
+        * States whose courses drift more than the maximum course drift apart are not expanded further. The merge process falls back to greedy merging after the plan is exhausted.
+    """
+
+    def __init__(self, course_wise_connection: Course_Wise_Connection, seam_search_space: Course_Seam_Search_Space, starting_side: Course_Side,
+                 max_cp_jumps: int = 4, max_float_length: int = 15, max_course_drift: int | None = None):
+        """
+        Args:
+            course_wise_connection (Course_Wise_Connection): The connection between the swatches being merged.
+            seam_search_space (Course_Seam_Search_Space): The seam search space between the swatches, narrowed to the courses in the connection.
+            starting_side (Course_Side): The side of the merge that the merge process starts consuming from.
+            max_cp_jumps (int, optional): The maximum number carriage passes allowed to be jumped to form a connection. Defaults to 4.
+            max_float_length (int, optional): The maximum length of allowed floats. Defaults to 15.
+            max_course_drift (int, optional):
+                The maximum difference in the number of consumed courses between the two swatches in an expanded state.
+                Defaults to twice the maximum carriage pass jumps plus the difference in the number of courses being merged from each swatch.
+        """
+        self._course_wise_connection: Course_Wise_Connection = course_wise_connection
+        self._seam_search_space: Course_Seam_Search_Space = seam_search_space
+        self._starting_side: Course_Side = starting_side
+        self.max_cp_jumps: int = max_cp_jumps
+        self.max_float_length: int = max_float_length
+        self._first_course: dict[Course_Side, int] = {Course_Side.Left: course_wise_connection.left_bottom_course, Course_Side.Right: course_wise_connection.right_bottom_course}
+        self._last_course: dict[Course_Side, int] = {Course_Side.Left: course_wise_connection.left_top_course, Course_Side.Right: course_wise_connection.right_top_course}
+        if max_course_drift is None:
+            left_courses = self._last_course[Course_Side.Left] - self._first_course[Course_Side.Left]
+            right_courses = self._last_course[Course_Side.Right] - self._first_course[Course_Side.Right]
+            max_course_drift = 2 * max_cp_jumps + abs(left_courses - right_courses)
+        self.max_course_drift: int = max_course_drift
+        self._loop_pass_counts: dict[Course_Side, list[int]] = {side: self._count_loop_passes(self._swatch(side)) for side in Course_Side}
+        self._carrier_ids: set[int] = set()
+        for side in Course_Side:
+            timeline = self._swatch(side).carrier_timeline
+            self._carrier_ids.update(cid for cp_index in range(timeline.height) for cid in timeline.loop_carrier_ids(cp_index))
+        self._connections_by_boundary: dict[Course_Boundary_Instruction, list[tuple[int, Course_Seam_Connection]]] = {}
+
+    @staticmethod
+    def _count_loop_passes(swatch: Swatch) -> list[int]:
+        """
+        Args:
+            swatch (Swatch): The swatch to count carriage passes in.
+
+        Returns:
+            list[int]: The prefix counts of non-xfer carriage passes in the swatch. The value at index i is the number of non-xfer carriage passes before carriage pass i.
+        """
+        counts = [0]
+        for carriage_pass in swatch.carriage_passes:
+            counts.append(counts[-1] + (0 if carriage_pass.xfer_pass else 1))
+        return counts
+
+    def _swatch(self, side: Course_Side) -> Swatch:
+        """
+        Args:
+            side (Course_Side): The side of the merge.
+
+        Returns:
+            Swatch: The swatch on the given side of the merge.
+        """
+        if side is Course_Side.Left:
+            return self._course_wise_connection.left_swatch
+        else:
+            return self._course_wise_connection.right_swatch
+
+    def _boundary(self, side: Course_Side, cp_index: int) -> Course_Boundary_Instruction | None:
+        """
+        Args:
+            side (Course_Side): The side of the merge that owns the boundary.
+            cp_index (int): The carriage pass index of the boundary.
+
+        Returns:
+            Course_Boundary_Instruction | None: The boundary instruction of the carriage pass that faces the seam or None if the carriage pass has no boundary on the seam.
+        """
+        if side is Course_Side.Left:
+            return self._seam_search_space.left_swatch_boundaries_by_course_index.get(cp_index, None)
+        else:
+            return self._seam_search_space.right_swatch_boundaries_by_course_index.get(cp_index, None)
+
+    def _connections_from_boundary(self, boundary: Course_Boundary_Instruction) -> list[tuple[int, Course_Seam_Connection]]:
+        """
+        Args:
+            boundary (Course_Boundary_Instruction): The boundary to find connections from.
+
+        Returns:
+            list[tuple[int, Course_Seam_Connection]]: The connections in the seam search space that include the boundary, paired with and sorted by the carriage pass index of their other boundary.
+        """
+        if boundary not in self._connections_by_boundary:
+            connections = []
+            for connection in self._seam_search_space.available_connections(boundary):
+                assert isinstance(connection, Course_Seam_Connection)
+                other_boundary = connection.entrance_instruction if connection.exit_instruction == boundary else connection.exit_instruction
+                connections.append((other_boundary.carriage_pass_index, connection))
+            connections.sort(key=lambda c: c[0])
+            self._connections_by_boundary[boundary] = connections
+        return self._connections_by_boundary[boundary]
+
+    def _merged_shift(self, side: Course_Side) -> int:
+        """
+        Args:
+            side (Course_Side): The side of the merge.
+
+        Returns:
+            int: The amount needle positions from the given side are shifted by in the merged program.
+        """
+        if side is Course_Side.Right:
+            return self._course_wise_connection.left_swatch.width
+        return 0
+
+    def _estimated_carrier_position(self, carrier_id: int, current_side: Course_Side, current_cp: int, boundary_consumed: bool, other_cp: int) -> int | None:
+        """
+        Args:
+            carrier_id (int): The id of the carrier to estimate the position of.
+            current_side (Course_Side): The side of the merge being consumed.
+            current_cp (int): The carriage pass of the boundary on the current side.
+            boundary_consumed (bool): True if the carriage pass of the boundary is consumed before the carrier position is needed.
+            other_cp (int): The next carriage pass to consume on the other side.
+
+        Returns:
+            int | None:
+                The estimated needle position of the carrier in the merged program or None if the carrier is not expected to be active.
+                The carrier is expected to be where the current side left it. If the current side has not used the carrier, it is expected to be where the other side left it.
+        """
+        current_position = self._swatch(current_side).carrier_timeline.carrier_position_at_start(carrier_id, current_cp + 1 if boundary_consumed else current_cp)
+        if current_position is not None:
+            return current_position[0] + self._merged_shift(current_side)
+        other_position = self._swatch(~current_side).carrier_timeline.carrier_position_at_start(carrier_id, other_cp)
+        if other_position is not None:
+            return other_position[0] + self._merged_shift(~current_side)
+        return None
+
+    def _estimated_floats(self, current_side: Course_Side, current_cp: int, boundary_is_exit: bool, other_cp: int, target_cp: int) -> list[tuple[int, Carriage_Pass_Direction]]:
+        """
+        Args:
+            current_side (Course_Side): The side of the merge being consumed.
+            current_cp (int): The carriage pass of the boundary on the current side.
+            boundary_is_exit (bool): True if the boundary on the current side is the exit of the connection.
+            other_cp (int): The next carriage pass to consume on the other side.
+            target_cp (int): The carriage pass of the connection's boundary on the other side.
+
+        Returns:
+            list[tuple[int, Carriage_Pass_Direction]]: The estimated lengths and directions of the non-zero floats formed by jumping to the connection.
+
+        Notes:
+            * Positions in the other swatch are shifted the same way that Course_Merge_Process._get_floats_upto_connection shifts them, so that planned connections pass the safety checks of the merge process.
+        """
+        other_timeline = self._swatch(~current_side).carrier_timeline
+        instruction_shift = self._merged_shift(current_side)
+        floats = []
+        for carrier_id in self._carrier_ids:
+            loop_cp = other_timeline.first_loop_pass(carrier_id, other_cp, target_cp)
+            if loop_cp is None and boundary_is_exit and carrier_id in other_timeline.loop_carrier_ids(target_cp):
+                loop_cp = target_cp  # Floats formed by the entrance instruction.
+            if loop_cp is None:
+                continue
+            carrier_position = self._estimated_carrier_position(carrier_id, current_side, current_cp, boundary_is_exit, other_cp)
+            if carrier_position is None:
+                continue
+            loop_position = other_timeline.loop_position(loop_cp)
+            assert loop_position is not None
+            needle_position = loop_position[0] + instruction_shift
+            if needle_position != carrier_position:
+                floats.append((abs(needle_position - carrier_position), Carriage_Pass_Direction.Leftward if needle_position < carrier_position else Carriage_Pass_Direction.Rightward))
+        return floats
+
+    def _is_terminal(self, state: _Plan_State) -> bool:
+        """
+        Args:
+            state (_Plan_State): The planning state.
+
+        Returns:
+            bool: True if the merge process stops forming connections in this state. False, otherwise.
+        """
+        current_side, current_cp, other_cp = state
+        return (current_cp >= self._last_course[current_side] or current_cp >= self._swatch(current_side).height
+                or other_cp >= self._swatch(~current_side).height)
+
+    def _drifted(self, state: _Plan_State) -> bool:
+        """
+        Args:
+            state (_Plan_State): The planning state.
+
+        Returns:
+            bool: True if the courses consumed on each side of the state have drifted too far apart to expand the state. False, otherwise.
+        """
+        current_side, current_cp, other_cp = state
+        current_progress = current_cp - self._first_course[current_side]
+        other_progress = other_cp - self._first_course[~current_side]
+        return abs(current_progress - other_progress) > self.max_course_drift
+
+    def _transitions(self, state: _Plan_State) -> list[tuple[_Plan_State, _Plan_Cost, Course_Seam_Connection]]:
+        """
+        Args:
+            state (_Plan_State): The planning state to transition from.
+
+        Returns:
+            list[tuple[_Plan_State, _Plan_Cost, Course_Seam_Connection]]: The states reached by forming each safe connection from the boundary of the given state, paired with the cost and the connection formed.
+        """
+        current_side, current_cp, other_cp = state
+        boundary = self._boundary(current_side, current_cp)
+        if boundary is None or boundary not in self._seam_search_space.seam_network:
+            return []
+        max_cp_jumps = 0 if isinstance(boundary.instruction, Xfer_Instruction) else self.max_cp_jumps
+        max_cp = max(current_cp, other_cp) + max_cp_jumps
+        other_loop_pass_counts = self._loop_pass_counts[~current_side]
+        transitions = []
+        for target_cp, connection in self._connections_from_boundary(boundary):
+            if target_cp < other_cp:
+                continue  # Boundary was already consumed.
+            elif target_cp > max_cp:
+                break
+            jump_distance = other_loop_pass_counts[target_cp] - other_loop_pass_counts[other_cp]
+            if jump_distance > max_cp_jumps:
+                break
+            boundary_is_exit = connection.exit_instruction == boundary
+            floats = self._estimated_floats(current_side, current_cp, boundary_is_exit, other_cp, target_cp)
+            if any(float_length >= self.max_float_length and float_direction is Carriage_Pass_Direction.Rightward for float_length, float_direction in floats):
+                continue  # Dangerous float.
+            floats_cut = len([f for f, _ in floats if f >= self.max_float_length])
+            cost: _Plan_Cost = (-1, connection.different_carriers, floats_cut, jump_distance)
+            if connection.xfer_connection:  # The left boundary is consumed first and the merge continues from the right swatch.
+                left_cp = current_cp if current_side is Course_Side.Left else target_cp
+                right_cp = target_cp if current_side is Course_Side.Left else current_cp
+                next_state = (Course_Side.Right, right_cp + 1, left_cp + 1)
+            elif boundary_is_exit:  # Continue from the entrance in the other swatch.
+                next_state = (~current_side, target_cp + 1, current_cp + 1)
+            else:  # The other swatch is consumed through the exit, and the merge continues from the entrance in the current swatch.
+                next_state = (current_side, current_cp + 1, target_cp + 1)
+            transitions.append((next_state, cost, connection))
+        return transitions
+
+    @Merge_Profiler.profiled(Merge_Phase.connection_selection)
+    def plan(self) -> list[tuple[Course_Boundary_Instruction, Course_Seam_Connection | None]]:
+        """
+        Returns:
+            list[tuple[Course_Boundary_Instruction, Course_Seam_Connection | None]]:
+                The planned sequence of boundaries that the merge process will stop at, paired with the connection to form from that boundary or None if the boundary should be skipped.
+        """
+        start: _Plan_State = (self._starting_side, self._first_course[self._starting_side], self._first_course[~self._starting_side])
+        best_costs: dict[_Plan_State, _Plan_Cost] = {start: (0, 0, 0, 0)}
+        parents: dict[_Plan_State, tuple[_Plan_State, Course_Seam_Connection | None]] = {}
+        states_by_progress: dict[int, list[_Plan_State]] = {start[1] + start[2]: [start]}
+        best_end: _Plan_State | None = None
+        progress = start[1] + start[2]
+        max_progress = self._swatch(Course_Side.Left).height + self._swatch(Course_Side.Right).height + 2
+        while progress <= max_progress:
+            for state in states_by_progress.pop(progress, []):
+                state_cost = best_costs[state]
+                if self._is_terminal(state) or self._drifted(state):
+                    if best_end is None or state_cost < best_costs[best_end]:
+                        best_end = state
+                    continue
+                skip_state = (state[0], state[1] + 1, state[2])
+                options: list[tuple[_Plan_State, _Plan_Cost, Course_Seam_Connection | None]] = [(skip_state, (0, 0, 0, 0), None)]
+                options.extend(self._transitions(state))
+                for next_state, cost, connection in options:
+                    next_cost = (state_cost[0] + cost[0], state_cost[1] + cost[1], state_cost[2] + cost[2], state_cost[3] + cost[3])
+                    if next_state not in best_costs:
+                        states_by_progress.setdefault(next_state[1] + next_state[2], []).append(next_state)
+                    elif best_costs[next_state] <= next_cost:
+                        continue
+                    best_costs[next_state] = next_cost
+                    parents[next_state] = (state, connection)
+            progress += 1
+        steps: list[tuple[Course_Boundary_Instruction, Course_Seam_Connection | None]] = []
+        state = best_end
+        while state in parents:
+            parent, connection = parents[state]
+            boundary = self._boundary(parent[0], parent[1])
+            if boundary is not None:  # Carriage passes without a boundary on the seam are consumed without stopping.
+                steps.append((boundary, connection))
+            state = parent
+        steps.reverse()
+        return steps
@@ -1,5 +1,6 @@
 """Module containing the Course_Seam_Search_Space class."""
 
+from quilt_knit.profiling.Merge_Profiler import Merge_Phase, Merge_Profiler
 from quilt_knit.swatch.course_boundary_instructions import Course_Boundary_Instruction
 from quilt_knit.swatch.course_wise_merging.Course_Seam_Connection import (
     Course_Seam_Connection,
@@ -20,6 +21,7 @@ class Course_Seam_Search_Space(Seam_Search_Space):
             right_swatch_boundaries_by_course_index (dict[int, Course_Boundary_Instruction]): Right-swatch boundaries keyed to the boundary of that course.
     """
 
+    @Merge_Profiler.profiled(Merge_Phase.seam_search_construction)
     def __init__(self, left_swatch: Swatch, right_swatch: Swatch):
         super().__init__(left_swatch, right_swatch)
         for left_exit in self.right_swatch.left_exits:
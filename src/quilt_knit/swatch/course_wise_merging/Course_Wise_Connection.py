@@ -146,7 +146,7 @@ class Course_Wise_Connection(Swatch_Connection):
         Returns:
             Course_Wise_Connection: The connection formed by swapping the right swatch with the given new swatch and adjusting the interval by the given specification.
         """
-        return Course_Wise_Connection(new_swatch, self.right_swatch,
+        return Course_Wise_Connection(self.left_swatch, new_swatch,
                                       first_carriage_pass_on_left=self.left_bottom_course, last_carriage_pass_on_left=self.left_top_course,
                                       first_carriage_pass_on_right=interval_shift[self.right_bottom_course], last_carriage_pass_on_right=interval_shift[self.right_top_course])
 
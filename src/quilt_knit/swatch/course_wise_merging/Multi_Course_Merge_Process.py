@@ -0,0 +1,498 @@
+"""Module containing the Multi_Course_Merge_Process class."""
+from __future__ import annotations
+
+from collections.abc import Iterator, MutableMapping
+
+from knitout_interpreter.knitout_execution_structures.Carriage_Pass import Carriage_Pass
+from knitout_interpreter.knitout_operations.carrier_instructions import (
+    Inhook_Instruction,
+    Outhook_Instruction,
+)
+from knitout_interpreter.knitout_operations.Knitout_Line import Knitout_Line
+from knitout_interpreter.knitout_operations.needle_instructions import (
+    Needle_Instruction,
+    Xfer_Instruction,
+)
+from virtual_knitting_machine.machine_components.carriage_system.Carriage_Pass_Direction import (
+    Carriage_Pass_Direction,
+)
+
+from quilt_knit.swatch.course_boundary_instructions import (
+    Course_Boundary_Instruction,
+    Course_Side,
+)
+from quilt_knit.swatch.course_wise_merging.Course_Merge_Process import (
+    Course_Merge_Process,
+)
+from quilt_knit.swatch.course_wise_merging.Course_Seam_Connection import (
+    Course_Seam_Connection,
+)
+from quilt_knit.swatch.course_wise_merging.Course_Seam_Search_Space import (
+    Course_Seam_Search_Space,
+)
+from quilt_knit.swatch.course_wise_merging.Course_Wise_Connection import (
+    Course_Wise_Connection,
+)
+from quilt_knit.swatch.Merge_Process import Merge_Process
+from quilt_knit.swatch.Shadow_Machine_State import Shadow_Machine_State
+from quilt_knit.swatch.Swatch import Swatch
+from quilt_knit.swatch.Swatch_Side import Swatch_Side
+
+
+class _Row_Seam_Indices(MutableMapping):
+    """A view of the next instruction indices of the two swatches on a seam of a row, keyed by their side of the seam."""
+
+    def __init__(self, row_indices: list[int | None], left_position: int):
+        """
+        Args:
+            row_indices (list[int | None]): The next instruction index of each swatch in the row.
+            left_position (int): The position in the row of the swatch on the left side of the seam.
+        """
+        self._row_indices: list[int | None] = row_indices
+        self._left_position: int = left_position
+
+    def _row_position(self, side: Course_Side) -> int:
+        """
+        Args:
+            side (Course_Side): The side of the seam.
+
+        Returns:
+            int: The position in the row of the swatch on the given side of the seam.
+        """
+        return self._left_position if side is Course_Side.Left else self._left_position + 1
+
+    def __getitem__(self, side: Course_Side) -> int | None:
+        return self._row_indices[self._row_position(side)]
+
+    def __setitem__(self, side: Course_Side, index: int | None) -> None:
+        self._row_indices[self._row_position(side)] = index
+
+    def __delitem__(self, side: Course_Side) -> None:
+        raise TypeError("Cannot remove a side of a seam.")
+
+    def __iter__(self) -> Iterator[Course_Side]:
+        return iter((Course_Side.Left, Course_Side.Right))
+
+    def __len__(self) -> int:
+        return 2
+
+
+class _Row_Seam_Merge_Process(Course_Merge_Process):
+    """
+    Merges the seam between two neighboring swatches in a Multi_Course_Merge_Process.
+    The merged program, the merged program machine state, the shadow states of the swatches, and the progress through each swatch are shared with the row.
+    """
+
+    def __init__(self, row_merge: Multi_Course_Merge_Process, left_position: int, seam_search_space: Course_Seam_Search_Space | None = None):
+        """
+        Args:
+            row_merge (Multi_Course_Merge_Process): The row merge process that this seam belongs to.
+            left_position (int): The position in the row of the swatch on the left side of the seam.
+            seam_search_space (Course_Seam_Search_Space, optional): The search space of the seam. Defaults to a new search space between the swatches of the seam.
+        """
+        super().__init__(Course_Wise_Connection(row_merge.swatches[left_position], row_merge.swatches[left_position + 1]), seam_search_space)
+        self._row_merge: Multi_Course_Merge_Process = row_merge
+        self.left_position: int = left_position
+        self._merged_program_machine_state = row_merge._merged_program_machine_state
+        self.merged_instructions = row_merge.merged_instructions
+        self._merged_instructions_to_source = row_merge._merged_instructions_to_source
+        self._source_machine_states = {side: row_merge.row_source_machine_states[self.row_position(side)] for side in Course_Side}
+        self._next_instruction_index_by_side = _Row_Seam_Indices(row_merge._next_instruction_index_by_swatch, left_position)
+
+    def row_position(self, side: Course_Side) -> int:
+        """
+        Args:
+            side (Course_Side): The side of the seam.
+
+        Returns:
+            int: The position in the row of the swatch on the given side of the seam.
+        """
+        return self.left_position if side is Course_Side.Left else self.left_position + 1
+
+    def _merged_position_shift(self, swatch_side: Course_Side) -> int:
+        """
+        Args:
+            swatch_side (Course_Side): The side of the seam to find the needle shift of.
+
+        Returns:
+            int: The number of needles that instructions from the given side are shifted rightward in the merged row. This is the width of the swatches to the left of that side.
+        """
+        return self._row_merge.position_shifts[self.row_position(swatch_side)]
+
+    def _add_instruction_to_merge(self, merge_instruction: Knitout_Line, instruction_source: Swatch_Side | None = None, instruction: Knitout_Line | None = None) -> bool:
+        """
+        Adds the given merge instruction to the merged row program. The source of the instruction is recorded by the name of its swatch, since the sides of a seam are ambiguous in the row.
+
+        Args:
+            merge_instruction (Knitout_Line): The instruction to add to the merged program.
+            instruction_source (Swatch_Side, optional): Specifies the side of the seam of the merged instruction. If this isn't provided, this is assumed to be a merge-only instruction.
+            instruction (Knitout_Line, optional): The instruction from the original swatch to execute on its corresponding machine state. Defaults to the merged_instruction.
+
+        Returns:
+            bool: True if the given merged instruction updates the machine state and is added to the merged program. False otherwise.
+        """
+        added = super()._add_instruction_to_merge(merge_instruction, instruction_source, instruction)
+        if added and isinstance(instruction_source, Course_Side):
+            source_swatch = self.left_swatch if instruction_source is Course_Side.Left else self.right_swatch
+            self._merged_instructions_to_source[merge_instruction] = (source_swatch.name, merge_instruction if instruction is None else instruction)
+        return added
+
+    def _consume_instruction(self, instruction: Knitout_Line, instruction_source: Swatch_Side | None = None, remove_connections: bool = False, max_float: int = 15) -> None:
+        """
+        Consumes the given instruction in the specified swatch. Consumed boundaries are removed from the search spaces of both seams of the swatch.
+
+        Args:
+            instruction (Knitout_Line): The instruction to add to the merged program.
+            instruction_source (Swatch_Side, optional): Specifies the side of the seam of the instruction.
+            remove_connections (bool, optional): If True, any connections found in the consumed instruction are removed from the search spaces. Defaults to False.
+            max_float (int, optional): Maximum number yarn-floating distances allowed between operations without introducing a cut and reinsert. Defaults to 15.
+        """
+        if remove_connections and isinstance(instruction_source, Course_Side):
+            self._row_merge.remove_boundary(instruction, self.row_position(instruction_source))
+        super()._consume_instruction(instruction, instruction_source, remove_connections, max_float)
+
+    def _consume_to_instruction(self, target_instruction: Knitout_Line, remove_connections: bool = True) -> None:
+        """
+        Consumes from the current swatch until the target instruction is found or the swatch is fully consumed.
+        Transfer passes passed over on the other seam of the current swatch are merged with the transfer passes they connect to on that seam.
+
+        Args:
+            target_instruction (Knitout_Line): The instruction to consume up to.
+            remove_connections (bool, optional): If true, removes any possible connections between swatches using the consumed instructions. Defaults to True.
+        """
+        current_side = self.current_course_merge_side
+        while self.next_instruction is not None and self.next_instruction != target_instruction:
+            if not self._row_merge.consume_transfer_detour(self, self.next_instruction):
+                self._consume_next_instruction(remove_connections)
+            self.current_course_merge_side = current_side
+
+    def _other_swatch_expects_carrier(self, carrier_id: int) -> bool:
+        return self._row_merge.other_swatch_expects_carrier(carrier_id, self.row_position(self.current_course_merge_side))
+
+
+class Multi_Course_Merge_Process(Merge_Process):
+    """
+    Class to manage a horizontal merge of a row of side-by-side swatches in a single pass.
+
+    The carriage passes of all swatches in the row are interleaved into one merged program, tracked by a single merged machine state.
+    Each seam between neighboring swatches has its own search space. When the merge reaches a boundary of the current swatch, the connection is chosen on the seam of that boundary by the same rules as a Course_Merge_Process.
+    Merging a row of k swatches by pairwise merges simulates k-1 merges and creates a swatch for each intermediate merge. This process simulates the row once.
+
+    Attributes:
+        swatches (list[Swatch]): The swatches in the row, ordered from left to right.
+        position_shifts (list[int]): The number of needles that each swatch is shifted rightward in the merged row.
+        row_source_machine_states (list[Shadow_Machine_State]):
+            The shadow machine state of each swatch in the row, ordered from left to right. Each seam keys the states of its two swatches by their side of the seam.
+
+    Notes:
+        * Connections are only formed between neighboring swatches. A pairwise merge can also align the transfer passes of two swatches that are separated by a swatch without transfers at that point.
+        * Every swatch is merged along its full height. Rows in a quilt are sliced to their overlapping courses before they are merged.
+    """
+
+    def __init__(self, swatches: list[Swatch]):
+        """
+        Args:
+            swatches (list[Swatch]): The swatches in the row, ordered from left to right. Every swatch is merged along its full height.
+        """
+        assert len(swatches) >= 2, f"A row merge requires at least two swatches, got {len(swatches)}"
+        assert len(set(s.name for s in swatches)) == len(swatches), "Swatches in a row merge must have unique names"
+        self.swatches: list[Swatch] = list(swatches)
+        first_seam_search_space = Course_Seam_Search_Space(self.swatches[0], self.swatches[1])
+        super().__init__(Course_Wise_Connection(self.swatches[0], self.swatches[-1]), Course_Side.Left, first_seam_search_space)
+        self.row_source_machine_states: list[Shadow_Machine_State] = [Shadow_Machine_State() for _ in self.swatches]
+        self._source_machine_states[Course_Side.Left] = self.row_source_machine_states[0]
+        self._source_machine_states[Course_Side.Right] = self.row_source_machine_states[-1]
+        self.position_shifts: list[int] = [0]
+        for swatch in self.swatches[:-1]:
+            self.position_shifts.append(self.position_shifts[-1] + swatch.width)
+        self._next_instruction_index_by_swatch: list[int | None] = [0 if len(s.knitout_program) > 0 else None for s in self.swatches]
+        self._seam_merges: list[_Row_Seam_Merge_Process] = [_Row_Seam_Merge_Process(self, 0, first_seam_search_space)]
+        self._seam_merges.extend(_Row_Seam_Merge_Process(self, left_position) for left_position in range(1, len(self.swatches) - 1))
+        self._current_position: int = 0
+        self._set_merge_direction()
+
+    def _set_merge_direction(self) -> None:
+        """
+        Determine the swatch to start merging from. If the first carriage pass of the rightmost swatch is leftward, the merge starts from the rightmost swatch. Otherwise, it starts from the leftmost swatch.
+        """
+        last_seam = self._seam_merges[-1]
+        if last_seam.course_wise_connection.right_start_direction is Carriage_Pass_Direction.Leftward:
+            self._current_position = len(self.swatches) - 1
+        else:
+            self._current_position = 0
+
+    @property
+    def current_swatch(self) -> Swatch:
+        """
+        Returns:
+            Swatch: The current swatch to consume instructions from.
+        """
+        return self.swatches[self._current_position]
+
+    @property
+    def next_instruction(self) -> Knitout_Line | None:
+        """
+        Returns:
+            Knitout_Line | None: The next instruction to consume from the current swatch or None if the current swatch is fully consumed.
+        """
+        next_index = self._next_instruction_index_by_swatch[self._current_position]
+        if next_index is None:
+            return None
+        return self.current_swatch.knitout_program[next_index]
+
+    @property
+    def row_is_consumed(self) -> bool:
+        """
+        Returns:
+            bool: True if every swatch in the row is consumed. False, otherwise.
+        """
+        return all(i is None for i in self._next_instruction_index_by_swatch)
+
+    def remove_boundary(self, instruction: Knitout_Line, row_position: int) -> None:
+        """
+        Removes the boundary instruction of the given instruction from the search spaces of the seams on either side of its swatch.
+
+        Args:
+            instruction (Knitout_Line): The instruction that may be on the boundary of its swatch.
+            row_position (int): The position in the row of the swatch that owns the instruction.
+        """
+        if row_position > 0:
+            self._seam_merges[row_position - 1].seam_search_space.remove_boundary(instruction)
+        if row_position < len(self._seam_merges):
+            self._seam_merges[row_position].seam_search_space.remove_boundary(instruction)
+
+    def other_swatch_expects_carrier(self, carrier_id: int, row_position: int) -> bool:
+        """
+        Args:
+            carrier_id (int): The id of the carrier to check.
+            row_position (int): The position in the row of the swatch that is releasing the carrier.
+
+        Returns:
+            bool: True if any other swatch in the row will use the carrier before bringing it in with its own inhook. False, otherwise.
+        """
+        for position, swatch in enumerate(self.swatches):
+            next_index = self._next_instruction_index_by_swatch[position]
+            if position == row_position or next_index is None:
+                continue
+            for instruction in swatch.knitout_program[next_index:]:
+                if isinstance(instruction, Inhook_Instruction) and instruction.carrier_id == carrier_id:
+                    break  # found inhook in this swatch
+                elif isinstance(instruction, Needle_Instruction) and instruction.carrier_set is not None and carrier_id in instruction.carrier_set:
+                    return True
+        return False
+
+    def _seam_of_current_swatch(self) -> _Row_Seam_Merge_Process:
+        """
+        Returns:
+            _Row_Seam_Merge_Process: A seam of the current swatch, set to consume from the current swatch.
+        """
+        if self._current_position < len(self._seam_merges):
+            seam = self._seam_merges[self._current_position]
+            seam.current_course_merge_side = Course_Side.Left
+        else:
+            seam = self._seam_merges[self._current_position - 1]
+            seam.current_course_merge_side = Course_Side.Right
+        return seam
+
+    def _seams_at_boundary(self, instruction: Knitout_Line) -> list[tuple[_Row_Seam_Merge_Process, Course_Side]]:
+        """
+        Args:
+            instruction (Knitout_Line): The next instruction of the current swatch.
+
+        Returns:
+            list[tuple[_Row_Seam_Merge_Process, Course_Side]]:
+                The seams that the given instruction is a boundary of, paired with the side of the current swatch on that seam.
+                Exits are listed before entrances and the boundaries of the swatch's right seam are listed before those of its left seam.
+        """
+        swatch = self.current_swatch
+        has_right_seam = self._current_position < len(self._seam_merges)
+        has_left_seam = self._current_position > 0
+        seams = []
+        if has_right_seam and swatch.instruction_is_right_exit(instruction):
+            seams.append((self._seam_merges[self._current_position], Course_Side.Left))
+        if has_left_seam and swatch.instruction_is_left_exit(instruction):
+            seams.append((self._seam_merges[self._current_position - 1], Course_Side.Right))
+        if has_right_seam and swatch.instruction_is_right_entrance(instruction):
+            seams.append((self._seam_merges[self._current_position], Course_Side.Left))
+        if has_left_seam and swatch.instruction_is_left_entrance(instruction):
+            seams.append((self._seam_merges[self._current_position - 1], Course_Side.Right))
+        return seams
+
+    def _consume_next_instruction(self, remove_connections: bool = False) -> None:
+        """
+        Consumes the next instruction in the current swatch.
+
+        Args:
+            remove_connections (bool, optional): If True, any connections found in the consumed instruction are removed from the search spaces. Defaults to False.
+        """
+        self._seam_of_current_swatch()._consume_next_instruction(remove_connections=remove_connections)
+
+    def _consume_from_current_swatch(self, end_on_boundaries: bool = True, remove_connections: bool = True) -> None:
+        """
+        Consumes instructions from the current swatch up to the specified stopping points.
+
+        Args:
+            end_on_boundaries (bool, optional): If true, stops consuming before any entrance or exit on a seam of the current swatch.
+            remove_connections (bool, optional): If true, removes any possible connections between swatches using the consumed instructions. Defaults to True.
+        """
+        while self.next_instruction is not None:
+            if end_on_boundaries and len(self._seams_at_boundary(self.next_instruction)) > 0:
+                return  # Do not consume next instruction.
+            self._consume_next_instruction(remove_connections=remove_connections)
+
+    def _move_to_unconsumed_swatch(self) -> None:
+        """
+        Moves the merge to the nearest swatch in the row that is not consumed. Ties are broken to the right.
+        """
+        unconsumed_positions = [p for p, i in enumerate(self._next_instruction_index_by_swatch) if i is not None]
+        self._current_position = min(unconsumed_positions, key=lambda p: (abs(p - self._current_position), -p))
+
+    def _connect_at_boundary(self) -> bool:
+        """
+        Forms the best connection from the next instruction of the current swatch on one of the seams it is a boundary of.
+
+        Returns:
+            bool: True if a connection was formed and the merge moved to the swatch it entered. False, otherwise.
+        """
+        boundary_instruction = self.current_swatch.get_course_boundary_instruction(self.next_instruction)
+        assert isinstance(boundary_instruction, Course_Boundary_Instruction)
+        for seam, current_side in self._seams_at_boundary(self.next_instruction):
+            seam.current_course_merge_side = current_side
+            best_connection = seam.best_connection(boundary_instruction)
+            if best_connection is not None:
+                self._consume_connection(seam, best_connection)
+                self._current_position = seam.row_position(seam.current_course_merge_side)
+                return True
+        return False
+
+    def _consume_connection(self, seam: _Row_Seam_Merge_Process, connection: Course_Seam_Connection) -> None:
+        """
+        Consumes instructions from the swatches of the given seam to form the given connection.
+        A transfer connection consumes the transfer pass of the left swatch before the transfer pass of the right swatch.
+        If the left swatch's transfer pass is also connected to a transfer pass on its left seam, that connection is formed first, so a transfer course that spans several seams is consumed from left to right.
+
+        Args:
+            seam (_Row_Seam_Merge_Process): The seam of the connection.
+            connection (Course_Seam_Connection): The connection to merge into the row.
+        """
+        if connection.xfer_connection and seam.left_position > 0:
+            left_seam = self._seam_merges[seam.left_position - 1]
+            left_seam.current_course_merge_side = Course_Side.Right
+            next_needle_instruction = left_seam.next_right_needle_instruction
+            if next_needle_instruction is not None and seam.left_swatch.instruction_on_course_boundary(next_needle_instruction):
+                left_boundary = seam.left_swatch.get_course_boundary_instruction(next_needle_instruction)
+                assert isinstance(left_boundary, Course_Boundary_Instruction)
+                connection_left_boundary = connection.exit_instruction if seam.boundary_in_left_swatch(connection.exit_instruction) else connection.entrance_instruction
+                if left_boundary.carriage_pass_index == connection_left_boundary.carriage_pass_index:  # The transfer pass of the connection is next in the left swatch.
+                    left_connection = left_seam.best_connection(left_boundary)
+                    if left_connection is not None and left_connection.xfer_connection:
+                        self._consume_connection(left_seam, left_connection)
+        seam._consume_connection(connection)
+
+    def consume_transfer_detour(self, seam: _Row_Seam_Merge_Process, instruction: Knitout_Line) -> bool:
+        """
+        Merges a transfer pass of the current swatch of the given seam with the transfer pass it connects to on the other seam of that swatch.
+        If the connected transfer pass belongs to the right neighbor, the neighbor's transfer passes are consumed until one connects back to the current swatch.
+        This matches the order of a pairwise merge of the swatches on the left of the neighbor with the neighbor.
+
+        Args:
+            seam (_Row_Seam_Merge_Process): The seam that is consuming its current swatch.
+            instruction (Knitout_Line): The next instruction in the current swatch of the seam.
+
+        Returns:
+            bool: True if the instruction was consumed by a transfer connection on the other seam of the swatch. False, otherwise.
+        """
+        if not isinstance(instruction, Xfer_Instruction):
+            return False
+        position = seam.row_position(seam.current_course_merge_side)
+        if seam.current_course_merge_side is Course_Side.Left:
+            if position == 0:
+                return False
+            other_seam = self._seam_merges[position - 1]
+            other_seam.current_course_merge_side = Course_Side.Right
+        else:
+            if position == len(self._seam_merges):
+                return False
+            other_seam = self._seam_merges[position]
+            other_seam.current_course_merge_side = Course_Side.Left
+        boundary_instruction = self.swatches[position].get_course_boundary_instruction(instruction)
+        if boundary_instruction is None:
+            return False
+        connection = other_seam.best_connection(boundary_instruction)
+        if connection is None or not connection.xfer_connection:
+            return False
+        other_seam._consume_connection(connection)
+        if other_seam.current_course_merge_side is Course_Side.Right and other_seam.row_position(Course_Side.Right) != position:
+            # The right neighbor was entered at a transfer pass. Continue through its transfer passes until one connects back to this swatch.
+            neighbor = other_seam.right_swatch
+            while isinstance(other_seam.next_needle_instruction_in_current_swatch, Xfer_Instruction):
+                next_instruction = other_seam.next_instruction
+                if isinstance(next_instruction, Xfer_Instruction):
+                    boundary_instruction = neighbor.get_course_boundary_instruction(next_instruction)
+                    if boundary_instruction is not None and other_seam.best_connection(boundary_instruction) is not None:
+                        break
+                    if self.consume_transfer_detour(other_seam, next_instruction):
+                        other_seam.current_course_merge_side = Course_Side.Right
+                        continue
+                other_seam._consume_next_instruction(remove_connections=True)
+        return True
+
+    def get_original_cp_indices(self, carriage_pass: Carriage_Pass) -> list[int | None]:
+        """
+        Args:
+            carriage_pass (Carriage_Pass): A carriage pass in the swatch resulting from this merge.
+
+        Returns:
+            list[int | None]:
+                The carriage pass index in each swatch of the row that created this carriage pass, ordered from left to right.
+                An index is None if the carriage pass does not contain instructions from that swatch.
+
+        Raises
+            KeyError: If the carriage pass does not belong to the merged swatch.
+        """
+        positions = {s.name: p for p, s in enumerate(self.swatches)}
+        cp_indices: list[int | None] = [None for _ in self.swatches]
+        for instruction in carriage_pass:
+            if instruction not in self._merged_instructions_to_source:
+                raise KeyError(f"Instruction {instruction} not found in merged swatch")
+            source = self._merged_instructions_to_source[instruction]
+            if source is not None:
+                position = positions[source[0]]
+                if cp_indices[position] is None:
+                    cp_indices[position] = self.swatches[position].get_cp_index_of_instruction(source[1])
+        return cp_indices
+
+    def merge_swatches(self) -> list[Knitout_Line]:
+        """
+        Merges the swatches of the row into a merged program and updates the machine state according to that merged program.
+
+        Returns:
+            list[Knitout_Line]: A list of instructions in the merged program.
+        """
+        while not self.row_is_consumed:
+            if self.next_instruction is None:
+                self._move_to_unconsumed_swatch()
+            # Consume up to next boundary instruction on a seam of the current swatch.
+            self._consume_from_current_swatch(end_on_boundaries=True, remove_connections=False)
+            if self.next_instruction is None:  # Swatch is fully consumed.
+                continue
+            if not self._connect_at_boundary():  # Otherwise continue in the current swatch, ignoring those possible connections.
+                self._consume_next_instruction(remove_connections=True)
+        seam = self._seam_of_current_swatch()
+        for active_carrier in self._merged_program_machine_state.carrier_system.active_carriers:
+            outhook = Outhook_Instruction(active_carrier, 'Outhook remaining active carriers')
+            seam._release_to_merge_instruction(outhook, seam.current_course_merge_side)
+            seam._add_instruction_to_merge(outhook, seam.current_course_merge_side)
+        self._specify_sources_in_merged_instructions()
+        # Clean and reorganize instructions
+        self.merged_instructions = self._execute_merged_instructions().executed_instructions
+        return self.merged_instructions
+
+    def get_merged_instructions(self) -> list[Knitout_Line]:
+        """
+        The sources of the merged instructions are specified once, when the row is merged, so the merged program is returned without updating its comments again.
+
+        Returns:
+            list[Knitout_Line]: List of instructions in the merged program.
+        """
+        return list(self.merged_instructions)
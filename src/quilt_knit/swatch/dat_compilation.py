@@ -0,0 +1,52 @@
+"""Module containing functions that compile knitout programs to DAT files without writing knitout files to the working directory.
+The DAT backend is imported when the first DAT file is compiled, so importing this module does not import the DAT backend."""
+import os
+from tempfile import TemporaryDirectory
+
+
+def compile_knitout_to_dat(knitout_program: str, dat_path: str | None = None) -> bytes:
+    """
+    Compiles the given knitout program to a DAT file.
+    The knitout program is handed to the DAT backend in memory, so no knitout file is written.
+
+    Args:
+        knitout_program (str): The content of the knitout program to compile.
+        dat_path (str, optional): The path of the DAT file to write. If None, the DAT file is written to a temporary directory owned by this call and removed after it is read. Defaults to None.
+
+    Returns:
+        bytes: The content of the compiled DAT file.
+
+    Notes:
+        * The DAT backend only writes DAT files to a path, so compiling without a DAT path writes through a private temporary directory.
+          Concurrent compiles never share a path unless they are given the same DAT path.
+    """
+    if dat_path is not None:
+        write_knitout_to_dat(knitout_program, dat_path)
+        with open(dat_path, "rb") as dat_file:
+            return dat_file.read()
+    with TemporaryDirectory(prefix="quilt_dat_") as job_directory:
+        return compile_knitout_to_dat(knitout_program, os.path.join(job_directory, "program.dat"))
+
+
+def write_knitout_to_dat(knitout_program: str, dat_path: str) -> None:
+    """
+    Compiles the given knitout program to a DAT file at the given path without reading the DAT file back.
+
+    Args:
+        knitout_program (str): The content of the knitout program to compile.
+        dat_path (str): The path of the DAT file to write.
+    """
+    from knitout_to_dat_python.knitout_to_dat import knitout_to_dat
+    knitout_to_dat(knitout_program, dat_path, knitout_in_file=False)
+
+
+def compile_knitout_file_to_dat(knitout_file_name: str, dat_file_name: str) -> None:
+    """
+    Compiles the given knitout file to a DAT file.
+
+    Args:
+        knitout_file_name (str): The path of the knitout file to compile.
+        dat_file_name (str): The path of the DAT file to write.
+    """
+    from knitout_to_dat_python.knitout_to_dat import knitout_to_dat
+    knitout_to_dat(knitout_file_name, dat_file_name, knitout_in_file=True)
@@ -0,0 +1,167 @@
+"""Module containing the Multi_Wale_Merge_Process class."""
+from collections import defaultdict
+
+from knitout_interpreter.knitout_operations.carrier_instructions import (
+    Inhook_Instruction,
+    Outhook_Instruction,
+)
+from knitout_interpreter.knitout_operations.needle_instructions import Xfer_Instruction
+from virtual_knitting_machine.machine_components.needles.Needle import Needle
+
+from quilt_knit.profiling.Merge_Trace_Exporter import Merge_Trace_Exporter
+from quilt_knit.swatch.Shadow_Machine_State import Shadow_Machine_State
+from quilt_knit.swatch.wale_boundary_instructions import Wale_Side
+from quilt_knit.swatch.wale_wise_merging.Wale_Merge_Process import (
+    Post_Merge_Comment,
+    Pre_Merge_Comment,
+    Wale_Merge_Process,
+)
+from quilt_knit.swatch.wale_wise_merging.Wale_Seam_Search_Space import (
+    Wale_Seam_Search_Space,
+)
+from quilt_knit.swatch.wale_wise_merging.Wale_Transfer_Planner import (
+    Wale_Transfer_Planner,
+)
+from quilt_knit.swatch.wale_wise_merging.Wale_Wise_Connection import (
+    Wale_Wise_Connection,
+)
+
+
+class Multi_Wale_Merge_Process(Wale_Merge_Process):
+    """
+    Class to manage the merging of several top swatches onto one bottom swatch in a single pass.
+
+    The bottom swatch is consumed once. The alignment transfers of every seam are planned against their own seam search space and are then scheduled together,
+    so the exits of all seams share the same racking passes and the unconnected exits of all seams are dropped in one pass.
+    The top swatches are then consumed one after the other, in the order of the given connections.
+    Before each top swatch, the last outhooks of carriers it needs are removed from the merged program, as they would be if the top swatch was merged into the swatch formed by the prior merges.
+
+    Notes:
+        * The bottom needle intervals of the connections must not overlap, so that each exit belongs to at most one seam.
+        * The top swatches are consumed sequentially. The knitting of side by side top swatches is not interleaved.
+    """
+
+    def __init__(self, wale_wise_connections: list[Wale_Wise_Connection], max_rack: int = 3):
+        """
+        Args:
+            wale_wise_connections (list[Wale_Wise_Connection]): The connections from the shared bottom swatch to each top swatch, in the order that the top swatches are merged.
+            max_rack (int, optional): The maximum racking allowed to align exits with entrances. Defaults to 3.
+        """
+        assert len(wale_wise_connections) > 0, "Expected at least one top swatch to merge"
+        bottom_swatch = wale_wise_connections[0].bottom_swatch
+        assert all(c.bottom_swatch is bottom_swatch for c in wale_wise_connections), "Expected all connections to share the same bottom swatch"
+        by_position = sorted(wale_wise_connections, key=lambda c: c.bottom_left_needle_position)
+        for left_connection, right_connection in zip(by_position, by_position[1:]):
+            assert left_connection.bottom_right_needle_position < right_connection.bottom_left_needle_position, \
+                f"Bottom intervals of {left_connection} and {right_connection} overlap"
+        self._wale_wise_connections: list[Wale_Wise_Connection] = list(wale_wise_connections)
+        self._seam_search_spaces: list[Wale_Seam_Search_Space] = []
+        for connection in self._wale_wise_connections:
+            seam_search_space = Wale_Seam_Search_Space(connection.bottom_swatch, connection.top_swatch, max_rack=max_rack)
+            seam_search_space.remove_excluded_boundary(connection)
+            self._seam_search_spaces.append(seam_search_space)
+        super().__init__(self._wale_wise_connections[0], self._seam_search_spaces[0])
+
+    @property
+    def wale_wise_connections(self) -> list[Wale_Wise_Connection]:
+        """
+        Returns:
+            list[Wale_Wise_Connection]: The connections from the bottom swatch to each top swatch, in merge order.
+        """
+        return self._wale_wise_connections
+
+    def _set_current_seam(self, seam_index: int) -> None:
+        """
+        Sets the connection and seam search space used by the inherited single seam methods.
+
+        Args:
+            seam_index (int): The index of the connection to the top swatch being planned or merged.
+        """
+        self._swatch_connection = self._wale_wise_connections[seam_index]
+        self._seam_search_space = self._seam_search_spaces[seam_index]
+
+    def _keep_carriers_for_top_swatch(self) -> None:
+        """
+        Removes the last outhook of each carrier needed by the current top swatch from the merged program, unless the carrier was reinserted after it.
+        The merged program machine is restarted if any outhook is removed.
+        """
+        top_needed_carriers = self._top_needed_carriers()
+        last_outhook_instruction: dict[int, int] = {}
+        for index, instruction in enumerate(self.merged_instructions):
+            if isinstance(instruction, Inhook_Instruction) and instruction.carrier_id in last_outhook_instruction:
+                del last_outhook_instruction[instruction.carrier_id]
+            elif isinstance(instruction, Outhook_Instruction) and instruction.carrier_id in top_needed_carriers:
+                last_outhook_instruction[instruction.carrier_id] = index
+        if len(last_outhook_instruction) > 0:
+            for removal_index in sorted(last_outhook_instruction.values(), reverse=True):
+                del self.merged_instructions[removal_index]
+            self._restart_merge_machine()
+
+    def _plan_seams(self, plan_seam: bool) -> tuple[dict[int, list[Xfer_Instruction]], list[Xfer_Instruction], set[Needle]]:
+        """
+        Plans the alignment transfers of each seam and combines them into one plan.
+
+        Args:
+            plan_seam (bool): If True, each seam is planned by a Wale_Transfer_Planner. Otherwise, each seam is planned by stratified connections.
+
+        Returns:
+            tuple[dict[int, list[Xfer_Instruction]], list[Xfer_Instruction], set[Needle]]:
+                A tuple containing:
+                * Dictionary of racking values mapped to the list of transfer instructions of all seams to execute at that racking.
+                * List of transfer instructions of all seams needed to align exit instructions with the slider bed.
+                * Set of needles, across all seams, that still hold loops to be bound off.
+        """
+        alignment_transfers_by_racking: dict[int, list[Xfer_Instruction]] = defaultdict(list)
+        slider_transfers: list[Xfer_Instruction] = []
+        exit_needles_need_bo: set[Needle] = set()
+        for seam_index in range(len(self._wale_wise_connections)):
+            self._set_current_seam(seam_index)
+            if plan_seam:
+                seam_transfers_by_racking, seam_slider_transfers, seam_needles_need_bo = Wale_Transfer_Planner(self.seam_search_space, maximum_stacked_connections=2).plan()
+            else:
+                seam_transfers_by_racking, seam_slider_transfers, seam_needles_need_bo = self._stratified_connections(maximum_stacked_connections=2)
+            for racking, transfers in seam_transfers_by_racking.items():
+                alignment_transfers_by_racking[racking].extend(transfers)
+            slider_transfers.extend(seam_slider_transfers)
+            exit_needles_need_bo.update(seam_needles_need_bo)
+        return alignment_transfers_by_racking, slider_transfers, exit_needles_need_bo
+
+    def _trace_labels(self) -> dict[str, object]:
+        """
+        Returns:
+            dict[str, object]: Labels of the merged swatches and the size of the merged program for the trace span of this merge.
+        """
+        labels = Merge_Trace_Exporter.swatch_labels("bottom_swatch", self.bottom_swatch)
+        for top_index, connection in enumerate(self._wale_wise_connections):
+            labels.update(Merge_Trace_Exporter.swatch_labels(f"top_swatch_{top_index}", connection.top_swatch))
+        labels["merged_instructions"] = len(self.merged_instructions)
+        return labels
+
+    @Merge_Trace_Exporter.traced("Multi_Wale_Merge_Process", labels=lambda _result, merger, *_args, **_kwargs: merger._trace_labels())
+    def merge_swatches(self, plan_seam: bool = False, seam_window: int | None = None) -> None:
+        """
+        Merges the bottom swatch with all top swatches.
+        The resulting program is written to self.merged_instructions and the machine state of the merge program is updated as the merge is completed.
+
+        Args:
+            plan_seam (bool, optional):
+                If True, the alignment transfers of each seam are planned by a Wale_Transfer_Planner as a minimum cost order-preserving matching.
+                Otherwise, the alignment transfers are found greedily by stratified connections. Defaults to False.
+            seam_window (int, optional):
+                If given, only the last seam_window carriage passes of the bottom swatch are consumed instruction by instruction and the rest of the bottom swatch is copied.
+                The top swatches are always consumed in full, since the merged program is not in sync with a top swatch that follows another top swatch. Defaults to None.
+        """
+        self._set_current_seam(0)
+        self._consume_bottom_swatch(seam_window)
+        self._consume_instruction(Pre_Merge_Comment())
+        alignment_transfers_by_racking, slider_transfers, exit_needles_need_bo = self._plan_seams(plan_seam)
+        self._repair_unaligned_boundaries(exit_needles_need_bo)
+        self._align_by_transfers(alignment_transfers_by_racking, slider_transfers)
+        for seam_index in range(len(self._wale_wise_connections)):
+            self._set_current_seam(seam_index)
+            if seam_index > 0:
+                self._keep_carriers_for_top_swatch()
+                self._source_machine_states[Wale_Side.Top] = Shadow_Machine_State()
+            self._reset_knitting_direction_for_top_swatch()
+            self._consume_instruction(Post_Merge_Comment())
+            self._consume_top_swatch()
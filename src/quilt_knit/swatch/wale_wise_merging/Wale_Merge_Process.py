@@ -27,6 +27,12 @@ from virtual_knitting_machine.machine_components.yarn_management.Yarn_Carrier_Se
     Yarn_Carrier_Set,
 )
 
+from quilt_knit.profiling.Merge_Profiler import (
+    Merge_Event,
+    Merge_Phase,
+    Merge_Profiler,
+)
+from quilt_knit.profiling.Merge_Trace_Exporter import Merge_Trace_Exporter
 from quilt_knit.swatch.Merge_Process import Merge_Process
 from quilt_knit.swatch.Seam_Connection import Seam_Connection
 from quilt_knit.swatch.Swatch import Swatch
@@ -40,6 +46,12 @@ from quilt_knit.swatch.wale_wise_merging.Wale_Seam_Connection import (
 from quilt_knit.swatch.wale_wise_merging.Wale_Seam_Search_Space import (
     Wale_Seam_Search_Space,
 )
+from quilt_knit.swatch.wale_wise_merging.Wale_Transfer_Planner import (
+    Wale_Transfer_Planner,
+)
+from quilt_knit.swatch.wale_wise_merging.Wale_Transfer_Scheduler import (
+    Wale_Transfer_Scheduler,
+)
 from quilt_knit.swatch.wale_wise_merging.Wale_Wise_Connection import (
     Wale_Wise_Connection,
 )
@@ -105,20 +117,39 @@ class Wale_Merge_Process(Merge_Process):
         """
         return self.wale_wise_connection.bottom_swatch
 
-    def _consume_bottom_swatch(self) -> None:
+    def _consume_bottom_swatch(self, seam_window: int | None = None) -> None:
         """
         Add all instructions from the bottom swatch into the new merged program.
         Update the merged tracking machine to the execution point at the end of the swatch.
         Removes all outhook operations from the program that would outhook a needed carrier in the top swatch.
+
+        Args:
+            seam_window (int, optional):
+                If given, instructions before the last seam_window carriage passes of the bottom swatch are copied into the merged program (see _copy_instruction).
+                The merged program starts in sync with the bottom swatch, so copied instructions have the same effect as in the bottom swatch.
+                Otherwise, all instructions are consumed. Defaults to None.
         """
         top_needed_carriers = self._top_needed_carriers()
         last_outhook_instruction: dict[int, int] = {}
+        if seam_window is None:
+            first_seam_cp = 0
+        else:
+            first_seam_cp = max(0, self.bottom_swatch.height - seam_window)
+        in_seam = first_seam_cp == 0
         for instruction in self.bottom_swatch.knitout_program:
-            if isinstance(instruction, Outhook_Instruction) and instruction.carrier_id in top_needed_carriers:  # record location of an outhook that wale_entrance may remove.
-                last_outhook_instruction[instruction.carrier_id] = len(self.merged_instructions)
-            elif isinstance(instruction, Inhook_Instruction) and instruction.carrier_id in last_outhook_instruction:  # record the record of the last outhook, because it was reinserted
+            if isinstance(instruction, Inhook_Instruction) and instruction.carrier_id in last_outhook_instruction:  # record the record of the last outhook, because it was reinserted
                 del last_outhook_instruction[instruction.carrier_id]
-            self._consume_instruction(instruction, Wale_Side.Bottom, remove_connections=False)
+            if not in_seam:
+                cp_index = self.bottom_swatch.get_cp_index_of_instruction(instruction)
+                in_seam = cp_index is not None and cp_index >= first_seam_cp
+            if in_seam:
+                self._consume_instruction(instruction, Wale_Side.Bottom, remove_connections=False)
+            else:
+                self._copy_instruction(instruction, Wale_Side.Bottom)
+            if (isinstance(instruction, Outhook_Instruction) and instruction.carrier_id in top_needed_carriers
+                    and len(self.merged_instructions) > 0 and self.merged_instructions[-1] is instruction):  # record location of an outhook that wale_entrance may remove.
+                # The location is recorded after the outhook is consumed because releasehooks may be injected before it.
+                last_outhook_instruction[instruction.carrier_id] = len(self.merged_instructions) - 1
         if len(last_outhook_instruction) > 0:
             reverse_removal_indices = sorted(last_outhook_instruction.values(), reverse=True)
             for removal_index in reverse_removal_indices:
@@ -168,6 +199,7 @@ class Wale_Merge_Process(Merge_Process):
         assert len(carriers_to_align) == 0, f"Carriers to align are not complete: {carriers_to_align}"
         for carrier_to_cut in carriers_to_cut:
             self._consume_instruction(Outhook_Instruction(carrier_to_cut, "Cut to prevent long float after merge"))
+        Merge_Profiler.count_event(Merge_Event.cut_injected, len(carriers_to_cut))
         return carriers_to_reverse, reverse_carrier_is_all_needle
 
     def _reset_knitting_direction_for_top_swatch(self, knit_to_align: bool = True, max_float: int = 4, max_reverse: int = 2) -> None:
@@ -201,15 +233,61 @@ class Wale_Merge_Process(Merge_Process):
                 self._consume_instruction(instruction)
         self._consume_instruction(Rack_Instruction(0, "Re-Zero Rack for Top Swatch"))
 
-    def _consume_top_swatch(self) -> None:
+    def _top_swatch_in_sync(self, cp_index: int) -> bool:
+        """
+        Args:
+            cp_index (int): The index of the next carriage pass to merge from the top swatch.
+
+        Returns:
+            bool:
+                True if the merged program machine state is in sync with the top swatch before the given carriage pass. False, otherwise.
+                The states are in sync if the racking and the yarn-inserting hook match and every carrier used from the given carriage pass onward
+                is either inactive in both programs or is active at the same needle position in both programs.
+        """
+        if not self.merged_and_current_racks_match:
+            return False
+        top_state = self._source_machine_states[Wale_Side.Top]
+        merged_carrier_system = self._merged_program_machine_state.carrier_system
+        if merged_carrier_system.inserting_hook_available != top_state.inserting_hook_available:
+            return False
+        timeline = self.top_swatch.carrier_timeline
+        carrier_ids = set(cid for cp in range(cp_index, timeline.height) for cid in timeline.loop_carrier_ids(cp))
+        for carrier_id in carrier_ids:
+            top_position = timeline.carrier_position_at_start(carrier_id, cp_index)
+            merged_carrier = merged_carrier_system[carrier_id]
+            if top_position is None:
+                if merged_carrier.is_active:
+                    return False
+            elif not merged_carrier.is_active or merged_carrier.position != top_position[0]:
+                return False
+        return True
+
+    def _consume_top_swatch(self, seam_window: int | None = None) -> None:
         """
         Consume instructions from the top swatch and extend the merged swatch program and update the merged swatch machine state.
         As instructions are added, releasehook instructions are introduced at opportune moments aligned with the inhook operations for new carriers.
+
+        Args:
+            seam_window (int, optional):
+                If given, the first seam_window carriage passes of the top swatch are consumed.
+                Once the merged program is in sync with the top swatch at the start of a later carriage pass, the remaining instructions are copied into the merged program (see _copy_instruction).
+                Otherwise, all instructions are consumed. Defaults to None.
         """
         self._current_merge_side = Wale_Side.Top
+        in_sync = False
         for instruction in self.top_swatch.knitout_program:
-            self._consume_instruction(instruction, Wale_Side.Top, remove_connections=False)
+            if seam_window is not None and not in_sync:
+                carriage_pass = self.top_swatch.get_instruction_pass(instruction)
+                if carriage_pass is not None and carriage_pass.first_instruction is instruction:
+                    cp_index = self.top_swatch.get_cp_index_of_instruction(instruction)
+                    assert cp_index is not None
+                    in_sync = cp_index >= seam_window and self._top_swatch_in_sync(cp_index)
+            if in_sync:
+                self._copy_instruction(instruction, Wale_Side.Top)
+            else:
+                self._consume_instruction(instruction, Wale_Side.Top, remove_connections=False)
 
+    @Merge_Profiler.profiled(Merge_Phase.connection_selection)
     def _stratified_connections(self, maximum_stacked_connections: int = 2) -> tuple[dict[int, list[Xfer_Instruction]], list[Xfer_Instruction], set[Needle]]:
         """
         This method uses a greedy approach to develop a transfer plan for aligning as many exit operations with entrance operations as possible
@@ -243,6 +321,16 @@ class Wale_Merge_Process(Merge_Process):
                 self.seam_search_space.remove_boundary(connection.entrance_instruction.instruction)
             decrease_bias += connection.required_rack()
 
+        def _least_biased_connection(available_connections: set[Wale_Seam_Connection]) -> Wale_Seam_Connection:
+            """
+            Args:
+                available_connections (set[Wale_Seam_Connection]): The connections available to an exit or an entrance.
+
+            Returns:
+                Wale_Seam_Connection: The connection that adds the least decrease bias to the current bias. Ties go to the leftmost exit and then the leftmost entrance, so the plan does not depend on the iteration order of the set.
+            """
+            return min(available_connections, key=lambda c: (abs(decrease_bias + c.required_rack()), c.exit_instruction.needle.position, c.entrance_instruction.needle.position))
+
         # Find and align all exits that can go directly into an entrance or require only a direct xfer. Remove exits with no possible connections from search space to increase efficiency
         aligned_xfers: list[Xfer_Instruction] = []
         sorted_exits = sorted(self.seam_search_space.exit_instructions)  # hold current state because exit_instruction will update from within the loop
@@ -272,7 +360,7 @@ class Wale_Merge_Process(Merge_Process):
             available_connections = cast(set[Wale_Seam_Connection], self.seam_search_space.available_connections(entrance_instruction))
             if len(available_connections) == 0:  # Prior connections formed in this loop may have made this entrance impossible to connect
                 continue
-            connection = min(available_connections, key=lambda c: abs(decrease_bias + c.required_rack()))  # Connection that adds the least decrease bias to the current bias.
+            connection = _least_biased_connection(available_connections)
             _establish_connection(connection)
             alignment_instructions = connection.minimum_instructions_to_connect_to_entrance()
             assert isinstance(alignment_instructions, list)
@@ -291,7 +379,7 @@ class Wale_Merge_Process(Merge_Process):
             available_connections = cast(set[Wale_Seam_Connection], self.seam_search_space.available_connections(exit_instruction))
             if len(available_connections) == 0:  # Prior connections formed in this loop may have made this exit impossible to connect
                 continue
-            connection = min(available_connections, key=lambda c: abs(decrease_bias + c.required_rack()))  # Connection that adds the least decrease bias to the current bias
+            connection = _least_biased_connection(available_connections)
             _establish_connection(connection)
             alignment_instructions = connection.minimum_instructions_to_connect_to_entrance()
             assert isinstance(alignment_instructions, list)
@@ -312,35 +400,23 @@ class Wale_Merge_Process(Merge_Process):
         """
         Update the merged swatch program and machine state with the specified alignments between boundary instructions.
         Align the wales from the bottom swatch to wales in the top swatch using the given instructions.
+        The transfers are ordered into carriage passes by a Wale_Transfer_Scheduler and racking instructions are only introduced when the racking changes.
         After execution of the alignment, the racking of the machine state is returned to 0.
 
         Args:
             alignment_transfers_by_racking (dict[int, list[Xfer_Instruction]]): Dictionary mapping racking values to the transfer instructions to execute at the racking.
             slider_transfers (list[Xfer_Instruction]): List of transfer instructions at racking 0 to align loops with the opposite bed before alignment.
         """
-        alignment_transfers_by_racking = {r: xfers for r, xfers in alignment_transfers_by_racking.items() if len(xfers) > 0}
-        if len(alignment_transfers_by_racking) == 0:
-            assert len(slider_transfers) == 0
+        transfer_passes = Wale_Transfer_Scheduler(alignment_transfers_by_racking, slider_transfers).schedule()
+        if len(transfer_passes) == 0:
             return
-        self._consume_instruction(Rack_Instruction(0, f"Start alignment at racking 0"))
-        if len(slider_transfers) > 0:  # Create a carriage pass of slider transfers
-            first_slider_xfer = slider_transfers.pop(0)
-            slider_transfer_pass = Carriage_Pass(first_slider_xfer, rack=0, all_needle_rack=False)
-            for slider_xfer in slider_transfers:
-                added_to_cp = slider_transfer_pass.add_instruction(slider_xfer, rack=0, all_needle_rack=False)
-                assert added_to_cp, f"Couldn't add {slider_xfer} to Slider Transfer Pass"
-            for slider_xfer in slider_transfer_pass:
-                self._consume_instruction(slider_xfer)
-        for rack_value, alignment_xfers_at_rack in alignment_transfers_by_racking.items():
-            self._consume_instruction(Rack_Instruction(rack_value, comment="Racking to align exit-entrances."))
-            first_xfer = alignment_xfers_at_rack.pop(0)
-            alignment_transfer_pass = Carriage_Pass(first_xfer, rack=rack_value, all_needle_rack=False)
-            for xfer in alignment_xfers_at_rack:
-                added_to_cp = alignment_transfer_pass.add_instruction(xfer, rack=rack_value, all_needle_rack=False)
-                assert added_to_cp, f"Couldn't add {added_to_cp} to Alignment Transfer Pass with rack {rack_value}."
-            for xfer in alignment_transfer_pass:
+        for transfer_pass in transfer_passes:
+            if self._merged_program_machine_state.rack != transfer_pass.rack or self._merged_program_machine_state.all_needle_rack:
+                self._consume_instruction(Rack_Instruction(transfer_pass.rack, comment="Racking to align exit-entrances."))
+            for xfer in transfer_pass:
                 self._consume_instruction(xfer)
-        self._consume_instruction(Rack_Instruction(0, comment="Return alignment racking to 0."))
+        if self._merged_program_machine_state.rack != 0:
+            self._consume_instruction(Rack_Instruction(0, comment="Return alignment racking to 0."))
 
     def _repair_unaligned_boundaries(self, unconnected_exits: set[Needle]) -> None:
         """
@@ -357,16 +433,39 @@ class Wale_Merge_Process(Merge_Process):
             for drop in drop_pass:
                 self._consume_instruction(drop)
 
-    def merge_swatches(self) -> None:
+    def _trace_labels(self) -> dict[str, object]:
+        """
+        Returns:
+            dict[str, object]: Labels of the merged swatches and the size of the merged program for the trace span of this merge.
+        """
+        return {**Merge_Trace_Exporter.swatch_labels("bottom_swatch", self.bottom_swatch), **Merge_Trace_Exporter.swatch_labels("top_swatch", self.top_swatch),
+                "merged_instructions": len(self.merged_instructions)}
+
+    @Merge_Trace_Exporter.traced("Wale_Merge_Process", labels=lambda _result, merger, *_args, **_kwargs: merger._trace_labels())
+    def merge_swatches(self, plan_seam: bool = False, seam_window: int | None = None) -> None:
         """
         Merges the swatches.
         The resulting program is written to self.merged_instructions and the machine state of the merge program is updated as the merge is completed.
+
+        Args:
+            plan_seam (bool, optional):
+                If True, the alignment transfers are planned by a Wale_Transfer_Planner as a minimum cost order-preserving matching.
+                Otherwise, the alignment transfers are found greedily by stratified connections. Defaults to False.
+            seam_window (int, optional):
+                If given, only the last seam_window carriage passes of the bottom swatch and the first seam_window carriage passes of the top swatch are consumed instruction by instruction.
+                The rest of each swatch is copied into the merged program without float and carrier checks. Defaults to None.
+
+        Notes:
+            * Copied instructions keep the floats of their source swatch. Long floats within the copied body of a swatch are not cut.
         """
-        self._consume_bottom_swatch()
+        self._consume_bottom_swatch(seam_window)
         self._consume_instruction(Pre_Merge_Comment())
-        alignment_transfers_by_racking, slider_transfers, exit_needles_need_bo = self._stratified_connections(maximum_stacked_connections=2)
+        if plan_seam:
+            alignment_transfers_by_racking, slider_transfers, exit_needles_need_bo = Wale_Transfer_Planner(self.seam_search_space, maximum_stacked_connections=2).plan()
+        else:
+            alignment_transfers_by_racking, slider_transfers, exit_needles_need_bo = self._stratified_connections(maximum_stacked_connections=2)
         self._repair_unaligned_boundaries(exit_needles_need_bo)
         self._align_by_transfers(alignment_transfers_by_racking, slider_transfers)
         self._reset_knitting_direction_for_top_swatch()
         self._consume_instruction(Post_Merge_Comment())
-        self._consume_top_swatch()
+        self._consume_top_swatch(seam_window)
@@ -3,6 +3,7 @@ from typing import cast
 
 from knitout_interpreter.knitout_operations.Knitout_Line import Knitout_Line
 
+from quilt_knit.profiling.Merge_Profiler import Merge_Phase, Merge_Profiler
 from quilt_knit.swatch.Seam_Search_Space import Seam_Search_Space
 from quilt_knit.swatch.Swatch import Swatch
 from quilt_knit.swatch.swatch_boundary_instruction import Swatch_Boundary_Instruction
@@ -25,6 +26,7 @@ class Wale_Seam_Search_Space(Seam_Search_Space):
     """
     _NEEDED_INSTRUCTIONS = "needed_instructions"
 
+    @Merge_Profiler.profiled(Merge_Phase.seam_search_construction)
     def __init__(self, bottom_swatch: Swatch, top_swatch: Swatch, max_rack: int = 2) -> None:
         """
         Initializes the Wale_Seam_Search_Space between the bottom and top swatches.
@@ -81,8 +83,12 @@ class Wale_Seam_Search_Space(Seam_Search_Space):
             list[Wale_Boundary_Instruction]: All boundary instructions that were removed by this process.
         """
         bad_instructions = set(boundary for boundary in self.instructions_to_boundary_instruction.values() if len(self.available_connections(boundary)) == 0)
+        # Boundaries that never formed a connection are not in the seam network, but are still exits or entrances of the seam.
+        bad_instructions.update(boundary for boundary in self.exit_instructions | self.entrance_instructions if boundary not in self.seam_network)
         for bad_instruction in bad_instructions:
             self.remove_boundary(bad_instruction.instruction)
+            self.exit_instructions.discard(bad_instruction)
+            self.entrance_instructions.discard(bad_instruction)
         return cast(set[Wale_Boundary_Instruction], bad_instructions)
 
     def remove_boundary(self, instruction: Knitout_Line) -> Swatch_Boundary_Instruction | None:
@@ -110,12 +116,14 @@ class Wale_Seam_Search_Space(Seam_Search_Space):
         Args:
             connection (Wale_Seam_Connection): The wale wise connection interval to exclude boundary instructions outside its connection interval.
         """
-        excluded_boundary = set(e.instruction for e in self.entrance_instructions
+        excluded_boundary = set(e for e in self.entrance_instructions
                                 if connection.top_left_needle_position > e.needle.position or e.needle.position > connection.top_right_needle_position)
-        excluded_boundary.update(e.instruction for e in self.exit_instructions
+        excluded_boundary.update(e for e in self.exit_instructions
                                  if connection.bottom_left_needle_position > e.needle.position or e.needle.position > connection.bottom_right_needle_position)
         for boundary in excluded_boundary:
-            self.remove_boundary(boundary)
+            self.remove_boundary(boundary.instruction)
+            self.exit_instructions.discard(boundary)  # Boundaries that never formed a connection are not found by their instruction.
+            self.entrance_instructions.discard(boundary)
 
     def needed_instructions(self, exit_instruction: Wale_Boundary_Instruction, entrance_instruction: Wale_Boundary_Instruction) -> int:
         """
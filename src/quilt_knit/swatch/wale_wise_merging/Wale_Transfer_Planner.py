@@ -0,0 +1,206 @@
+"""Module containing the Wale_Transfer_Planner class."""
+from collections import defaultdict
+from typing import cast
+
+from knitout_interpreter.knitout_operations.needle_instructions import Xfer_Instruction
+from virtual_knitting_machine.machine_components.needles.Needle import Needle
+
+from quilt_knit.profiling.Merge_Profiler import Merge_Phase, Merge_Profiler
+from quilt_knit.swatch.wale_boundary_instructions import Wale_Boundary_Instruction
+from quilt_knit.swatch.wale_wise_merging.Wale_Seam_Connection import (
+    Wale_Seam_Connection,
+)
+from quilt_knit.swatch.wale_wise_merging.Wale_Seam_Search_Space import (
+    Wale_Seam_Search_Space,
+)
+
+# A matching state is the index of the last entrance that received a connection (-1 if no reachable entrance has),
+# the number of connections made into that entrance, and the racking of the transfer into that entrance (None if no transfer was needed).
+_Match_State = tuple[int, int, int | None]
+# Matching costs are compared lexicographically: (dropped exits, negated connected entrances, total rack distance, stacked connections, alignment instructions).
+_Match_Cost = tuple[int, int, int, int, int]
+
+
+class Wale_Transfer_Planner:
+    """
+    Plans the alignment of exit loops in the bottom swatch with entrances in the top swatch as an order-preserving matching.
+
+    Exits and entrances are ordered by needle position. A connection can only align an exit with an entrance within the racking limit, so each exit has a small band of candidate entrances.
+    The planner uses dynamic programming over the sorted exits to find the matching that drops the fewest exits and leaves the fewest entrances without loops.
+    Ties are broken by the total racking distance, the number of stacked connections (decreases), and the number of alignment instructions.
+    The matching is first solved with every non-zero racking allowed. Rackings used by the plan are then removed one at a time, starting from the least used,
+    and the matching is solved again without them. A removal is kept if the new plan drops no more exits and leaves no more entrances without loops, so the plan uses fewer alignment racks and transfer passes.
+    Each racking is removed at most once, so planning solves at most one matching more than the number of rackings used by the connections.
+
+    Notes:
+        * Connections do not cross, so the loops of the bottom swatch keep their order when transferred to the top swatch.
+        * Two transfers at the same racking cannot stack into the same entrance, since they would be executed in the same carriage pass.
+    """
+
+    def __init__(self, seam_search_space: Wale_Seam_Search_Space, maximum_stacked_connections: int = 2):
+        """
+        Args:
+            seam_search_space (Wale_Seam_Search_Space): The seam search space between the bottom and top swatch.
+            maximum_stacked_connections (int, optional): The maximum number of loops allowed to be stitched into an entrance wale. Defaults to 2.
+        """
+        self._seam_search_space: Wale_Seam_Search_Space = seam_search_space
+        self.maximum_stacked_connections: int = maximum_stacked_connections
+
+    @staticmethod
+    def _order_key(boundary: Wale_Boundary_Instruction) -> tuple[int, bool]:
+        """
+        Args:
+            boundary (Wale_Boundary_Instruction): The boundary instruction to order.
+
+        Returns:
+            tuple[int, bool]: The position of the boundary's needle and whether it is on the back bed.
+        """
+        return int(boundary.needle.position), bool(boundary.needle.is_back)
+
+    def _match(self, exits: list[Wale_Boundary_Instruction], required_entrances: list[bool],
+               candidates: list[list[tuple[int, int, int, Wale_Seam_Connection]]], allowed_racks: set[int]) -> tuple[_Match_Cost, list[Wale_Seam_Connection | None]]:
+        """
+        Args:
+            exits (list[Wale_Boundary_Instruction]): The exits to match, sorted by needle position.
+            required_entrances (list[bool]): True for each sorted entrance that requires a loop to be connected.
+            candidates (list[list[tuple[int, int, int, Wale_Seam_Connection]]]):
+                For each exit, the connections it can form as tuples of the entrance index, the required racking, the number of alignment instructions, and the connection.
+            allowed_racks (set[int]): The non-zero rackings that transfers are allowed to use.
+
+        Returns:
+            tuple[_Match_Cost, list[Wale_Seam_Connection | None]]: The cost of the best matching and the connection assigned to each exit or None if the exit is dropped.
+        """
+        first_reachable_entrance = [len(required_entrances) for _ in range(len(candidates) + 1)]
+        for exit_position in range(len(candidates) - 1, -1, -1):
+            first_reachable_entrance[exit_position] = min([first_reachable_entrance[exit_position + 1], *(c[0] for c in candidates[exit_position])])
+        states: dict[_Match_State, _Match_Cost] = {(-1, 0, None): (0, 0, 0, 0, 0)}
+        parents: list[dict[_Match_State, tuple[_Match_State, Wale_Seam_Connection | None]]] = []
+        for exit_position, exit_candidates in enumerate(candidates):
+            next_states: dict[_Match_State, _Match_Cost] = {}
+            layer_parents: dict[_Match_State, tuple[_Match_State, Wale_Seam_Connection | None]] = {}
+
+            def _relax(state: _Match_State, cost: _Match_Cost, parent: _Match_State, connection: Wale_Seam_Connection | None) -> None:
+                if state[0] < first_reachable_entrance[exit_position + 1]:
+                    state = (-1, 0, None)  # No later exit can reach the last connected entrance, so it no longer constrains the matching.
+                if state not in next_states or cost < next_states[state]:
+                    next_states[state] = cost
+                    layer_parents[state] = (parent, connection)
+
+            for state, cost in states.items():
+                last_entrance, connections_made, last_rack = state
+                _relax(state, (cost[0] + 1, cost[1], cost[2], cost[3], cost[4]), state, None)
+                for entrance, rack, instruction_count, connection in exit_candidates:
+                    if rack != 0 and rack not in allowed_racks:
+                        continue
+                    transfer_rack = None if instruction_count == 0 else rack
+                    if entrance == last_entrance:
+                        if connections_made >= self.maximum_stacked_connections or (transfer_rack is not None and transfer_rack == last_rack):
+                            continue
+                        _relax((entrance, connections_made + 1, transfer_rack if last_rack is None else last_rack),
+                               (cost[0], cost[1], cost[2] + abs(rack), cost[3] + 1, cost[4] + instruction_count), state, connection)
+                    elif entrance > last_entrance:
+                        connected = -1 if required_entrances[entrance] else 0
+                        _relax((entrance, 1, transfer_rack),
+                               (cost[0], cost[1] + connected, cost[2] + abs(rack), cost[3], cost[4] + instruction_count), state, connection)
+            states = next_states
+            parents.append(layer_parents)
+        best_state = min(states, key=lambda s: states[s])
+        assignment: list[Wale_Seam_Connection | None] = [None for _ in exits]
+        state = best_state
+        for exit_position in range(len(exits) - 1, -1, -1):
+            state, connection = parents[exit_position][state]
+            assignment[exit_position] = connection
+        return states[best_state], assignment
+
+    @staticmethod
+    def _rack_uses(assignment: list[Wale_Seam_Connection | None]) -> dict[int, int]:
+        """
+        Args:
+            assignment (list[Wale_Seam_Connection | None]): The connection assigned to each exit or None if the exit is dropped.
+
+        Returns:
+            dict[int, int]: The non-zero rackings of the transfers in the assignment keyed to the number of transfers at each racking.
+        """
+        rack_uses: dict[int, int] = defaultdict(int)
+        for connection in assignment:
+            if connection is not None and len(cast(list, connection.minimum_instructions_to_connect_to_entrance())) > 1:
+                rack_uses[connection.required_rack()] += 1
+        return rack_uses
+
+    @staticmethod
+    def _plan_key(cost: _Match_Cost, assignment: list[Wale_Seam_Connection | None]) -> tuple[int, int, int, int, int, int]:
+        """
+        Args:
+            cost (_Match_Cost): The cost of a matching.
+            assignment (list[Wale_Seam_Connection | None]): The connection assigned to each exit by the matching.
+
+        Returns:
+            tuple[int, int, int, int, int, int]: The key that plans are compared by: the matching cost with the number of alignment rackings after the dropped exits and connected entrances.
+        """
+        return cost[0], cost[1], len(Wale_Transfer_Planner._rack_uses(assignment)), cost[2], cost[3], cost[4]
+
+    @Merge_Profiler.profiled(Merge_Phase.connection_selection)
+    def plan(self) -> tuple[dict[int, list[Xfer_Instruction]], list[Xfer_Instruction], set[Needle]]:
+        """
+        Plans the alignment transfers between the bottom and top swatch. Boundaries that cannot form any connection are removed from the seam search space.
+
+        Returns:
+            tuple[dict[int, list[Xfer_Instruction]], list[Xfer_Instruction], set[Needle]]:
+                A tuple containing:
+                * Dictionary of racking values mapped to the list of transfer instructions to execute at that racking in order to align exit instructions.
+                * List of transfer instructions need to align exit instructions with the slider bed for same side alignments.
+                * Set of needles that still hold loops to be bound off.
+        """
+        boundaries_with_no_alignment = self._seam_search_space.clean_connections()
+        exits_need_bo: set[Needle] = set(b.needle for b in boundaries_with_no_alignment if b.is_exit)
+        exits = sorted(self._seam_search_space.exit_instructions, key=self._order_key)
+        entrances = sorted(self._seam_search_space.entrance_instructions, key=self._order_key)
+        entrance_index = {entrance: i for i, entrance in enumerate(entrances)}
+        required_entrances = [entrance.requires_entrance_connection for entrance in entrances]
+        candidates: list[list[tuple[int, int, int, Wale_Seam_Connection]]] = []
+        used_racks: set[int] = set()
+        for exit_instruction in exits:
+            exit_candidates = []
+            for connection in cast(set[Wale_Seam_Connection], self._seam_search_space.available_connections(exit_instruction)):
+                alignment_instructions = connection.minimum_instructions_to_connect_to_entrance()
+                assert isinstance(alignment_instructions, list)
+                rack = 0 if len(alignment_instructions) <= 1 else connection.required_rack()
+                exit_candidates.append((entrance_index[connection.entrance_instruction], rack, len(alignment_instructions), connection))
+                if rack != 0:
+                    used_racks.add(rack)
+            exit_candidates.sort(key=lambda c: (c[0], c[2]))
+            candidates.append(exit_candidates)
+        allowed_racks = set(used_racks)
+        best_cost, best_assignment = self._match(exits, required_entrances, candidates, allowed_racks)
+        best_key = self._plan_key(best_cost, best_assignment)
+        rack_uses = self._rack_uses(best_assignment)
+        for rack in sorted(rack_uses, key=lambda r: (rack_uses[r], abs(r), r)):
+            if rack == 0 or rack not in self._rack_uses(best_assignment):
+                continue  # Racking 0 is always allowed, and an earlier removal may have already dropped the racking.
+            cost, assignment = self._match(exits, required_entrances, candidates, allowed_racks - {rack})
+            key = self._plan_key(cost, assignment)
+            if key < best_key:
+                allowed_racks.discard(rack)
+                best_key = key
+                best_assignment = assignment
+        alignment_transfers_by_racking: dict[int, list[Xfer_Instruction]] = defaultdict(list)
+        slider_transfers: list[Xfer_Instruction] = []
+        for exit_instruction, connection in zip(exits, best_assignment):
+            if connection is None:
+                exits_need_bo.add(exit_instruction.needle)
+                continue
+            self._seam_search_space.remove_boundary(exit_instruction.instruction)
+            connection.entrance_instruction.add_connection()
+            alignment_instructions = connection.minimum_instructions_to_connect_to_entrance()
+            assert isinstance(alignment_instructions, list)
+            if len(alignment_instructions) == 0:
+                continue  # Already aligned
+            if len(alignment_instructions) == 3:  # slider transfer
+                slider_xfer = alignment_instructions.pop(0)
+                assert isinstance(slider_xfer, Xfer_Instruction)
+                slider_transfers.append(slider_xfer)
+            transfer = alignment_instructions[-1]
+            assert isinstance(transfer, Xfer_Instruction)
+            racking = 0 if len(alignment_instructions) == 1 else connection.required_rack()
+            alignment_transfers_by_racking[racking].append(transfer)
+        return alignment_transfers_by_racking, slider_transfers, exits_need_bo
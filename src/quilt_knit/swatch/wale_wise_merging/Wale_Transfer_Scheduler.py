@@ -0,0 +1,59 @@
+"""Module containing the Wale_Transfer_Scheduler class."""
+from knitout_interpreter.knitout_execution_structures.Carriage_Pass import Carriage_Pass
+from knitout_interpreter.knitout_operations.needle_instructions import Xfer_Instruction
+
+
+class Wale_Transfer_Scheduler:
+    """
+    Schedules the transfers that align exits of a bottom swatch with entrances in a top swatch into carriage passes.
+
+    The schedule starts at racking 0 with the slider transfers and the transfers that need no racking, so that loops are moved to the slider bed before they are transferred from it.
+    The remaining rackings are then visited in a single sweep: first the positive rackings in increasing order, then the negative rackings in decreasing order, then back to racking 0.
+    Every racking is visited once, and the total rack travel is twice the span of the rackings, which is the minimum for any tour that starts and ends at racking 0.
+    Transfers at the same racking that conflict are split into the fewest carriage passes found by a first-fit assignment.
+    """
+
+    def __init__(self, alignment_transfers_by_racking: dict[int, list[Xfer_Instruction]], slider_transfers: list[Xfer_Instruction]):
+        """
+        Args:
+            alignment_transfers_by_racking (dict[int, list[Xfer_Instruction]]): Dictionary mapping racking values to the transfer instructions to execute at the racking.
+            slider_transfers (list[Xfer_Instruction]): List of transfer instructions at racking 0 to align loops with the opposite bed before alignment.
+        """
+        self._transfers_by_racking: dict[int, list[Xfer_Instruction]] = {r: list(xfers) for r, xfers in alignment_transfers_by_racking.items() if len(xfers) > 0}
+        self._slider_transfers: list[Xfer_Instruction] = list(slider_transfers)
+
+    def rack_order(self) -> list[int]:
+        """
+        Returns:
+            list[int]: The non-zero rackings with transfers, in the order that they are visited after the transfers at racking 0.
+        """
+        positive_racks = sorted(r for r in self._transfers_by_racking if r > 0)
+        negative_racks = sorted((r for r in self._transfers_by_racking if r < 0), reverse=True)
+        return positive_racks + negative_racks
+
+    @staticmethod
+    def _passes_at_rack(transfers: list[Xfer_Instruction], rack: int) -> list[Carriage_Pass]:
+        """
+        Args:
+            transfers (list[Xfer_Instruction]): The transfers to execute at the given racking.
+            rack (int): The racking to execute the transfers at.
+
+        Returns:
+            list[Carriage_Pass]: The carriage passes that execute the given transfers. Each transfer is added to the first carriage pass that it does not conflict with.
+        """
+        carriage_passes: list[Carriage_Pass] = []
+        for xfer in sorted(transfers, key=lambda x: (int(x.needle.position), bool(x.needle.is_back))):
+            if not any(carriage_pass.add_instruction(xfer, rack=rack, all_needle_rack=False) for carriage_pass in carriage_passes):
+                carriage_passes.append(Carriage_Pass(xfer, rack=rack, all_needle_rack=False))
+        return carriage_passes
+
+    def schedule(self) -> list[Carriage_Pass]:
+        """
+        Returns:
+            list[Carriage_Pass]: The transfer carriage passes in the order they should be executed. The racking of each carriage pass is given by its rack attribute.
+        """
+        carriage_passes = self._passes_at_rack(self._slider_transfers, rack=0)
+        carriage_passes.extend(self._passes_at_rack(self._transfers_by_racking.get(0, []), rack=0))
+        for rack in self.rack_order():
+            carriage_passes.extend(self._passes_at_rack(self._transfers_by_racking[rack], rack))
+        return carriage_passes
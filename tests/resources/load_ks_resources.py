@@ -6,6 +6,7 @@ from knitout_interpreter.knitout_execution import Knitout_Executer
 from knitout_interpreter.knitout_operations.Knitout_Line import Knitout_Comment_Line
 from knitout_to_dat_python.knitout_to_dat import knitout_to_dat
 
+from quilt_knit.swatch.Swatch import Swatch
 from tests.resources.load_test_resources import load_test_resource
 
 
@@ -53,3 +54,18 @@ def load_test_knitscript_to_knitout_to_dat(test_knitscript_filename: str, test_k
     clean_k_name = load_test_knitscript_to_knitout(test_knitscript_filename, test_knitout_filename, **python_variables)
     knitout_to_dat(test_knitout_filename, test_dat_name)
     return clean_k_name
+
+
+def load_test_swatch(knitscript_name: str, swatch_name: str, **python_variables) -> Swatch:
+    """
+    Generates the knitout and dat files of the given knitscript in the current directory and loads the generated knitout as a swatch.
+    Args:
+        knitscript_name: The name, without the .ks extension, of the knitscript to run from the test/resources package. The generated files are named after it.
+        swatch_name: The name of the swatch.
+        **python_variables: The keyword parameters to pass to the knitscript run.
+
+    Returns:
+        The swatch of the cleaned knitout generated by the knitscript.
+    """
+    swatch_k = load_test_knitscript_to_knitout_to_dat(f"{knitscript_name}.ks", f"{knitscript_name}.k", f"{knitscript_name}.dat", **python_variables)
+    return Swatch(swatch_name, swatch_k)
@@ -0,0 +1,82 @@
+import os
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from knitout_interpreter.knitout_operations.carrier_instructions import (
+    Releasehook_Instruction,
+)
+from knitout_interpreter.knitout_language.Knitout_Parser import parse_knitout
+from knitout_interpreter.knitout_operations.Header_Line import (
+    Yarn_Header_Line,
+    get_machine_header,
+)
+from knitout_interpreter.knitout_operations.kick_instruction import Kick_Instruction
+from knitout_interpreter.knitout_operations.Knitout_Line import Knitout_Comment_Line
+from knitout_interpreter.knitout_operations.needle_instructions import (
+    Split_Instruction,
+    Xfer_Instruction,
+)
+from knitout_interpreter.knitout_operations.Rack_Instruction import Rack_Instruction
+from resources.load_ks_resources import load_test_swatch
+from virtual_knitting_machine.Knitting_Machine import Knitting_Machine
+from virtual_knitting_machine.machine_components.carriage_system.Carriage_Pass_Direction import (
+    Carriage_Pass_Direction,
+)
+from virtual_knitting_machine.machine_components.needles.Needle import Needle
+from virtual_knitting_machine.machine_components.needles.Slider_Needle import (
+    Slider_Needle,
+)
+from virtual_knitting_machine.machine_components.yarn_management.Yarn_Carrier_Set import (
+    Yarn_Carrier_Set,
+)
+
+from quilt_knit.swatch.Binary_Knitout_Codec import Binary_Knitout_Codec
+from quilt_knit.swatch.Swatch import Swatch
+
+
+class TestBinary_Knitout_Codec(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+
+    def test_round_trip_of_uncommon_lines(self):
+        knitout_program = [*get_machine_header(Knitting_Machine()),
+                           Knitout_Comment_Line("a standalone comment"),
+                           Rack_Instruction(-1.75, "all needle rack"),
+                           Xfer_Instruction(Needle(True, 3), Slider_Needle(False, 4)),
+                           Split_Instruction(Needle(False, 2), Carriage_Pass_Direction.Rightward, Needle(True, 2), Yarn_Carrier_Set([3, 1])),
+                           Kick_Instruction(5, Carriage_Pass_Direction.Leftward, Yarn_Carrier_Set([2])),
+                           Releasehook_Instruction(3, preferred_release_direction=Carriage_Pass_Direction.Rightward)]
+        decoded_program = Binary_Knitout_Codec.decode(Binary_Knitout_Codec.encode(knitout_program))
+        self.assertEqual([str(line) for line in decoded_program], [str(line) for line in knitout_program])
+        self.assertIs(decoded_program[-1].preferred_release_direction, Carriage_Pass_Direction.Rightward)
+        self.assertIsInstance(decoded_program[-4].needle_2, Slider_Needle)
+
+    def test_round_trip_of_yarn_headers(self):
+        knitout_program = [*get_machine_header(Knitting_Machine()),
+                           *parse_knitout(";;Yarn-5: 50-50 Rust\n", pattern_is_file=False),
+                           Yarn_Header_Line(6, 2, 25.5, "Blue")]
+        decoded_program = Binary_Knitout_Codec.decode(Binary_Knitout_Codec.encode(knitout_program))
+        decoded_text = [str(line) for line in decoded_program]
+        self.assertEqual(decoded_text, [str(line) for line in knitout_program])
+        self.assertIsInstance(decoded_program[-2]._header_value.weight, int)
+        self.assertIsInstance(decoded_program[-1]._header_value.weight, float)
+        self.assertEqual([str(line) for line in parse_knitout(decoded_text[-2], pattern_is_file=False)], [";;Yarn-5: 50-50 Rust\n"])
+
+    def test_swatch_round_trip(self):
+        swatch = load_test_swatch("cable", "cable_swatch", c=1, width=8, height=6)
+        encoded = swatch.to_binary_knitout()
+        self.assertTrue(Binary_Knitout_Codec.is_binary_knitout(encoded))
+        self.assertLess(len(encoded), len(swatch._knitout_program_text().encode()))
+        decoded_swatch = Swatch("decoded", encoded)
+        self.assertEqual([str(line) for line in decoded_swatch.knitout_program], [str(line) for line in swatch.knitout_program])
+        self.assertEqual(len(decoded_swatch.carriage_passes), len(swatch.carriage_passes))
+        self.assertEqual(decoded_swatch.height, swatch.height)
+        swatch.to_binary_knitout("cable_swatch.kb")
+        file_swatch = Swatch("file", "cable_swatch.kb")
+        os.remove("cable_swatch.kb")
+        self.assertEqual([str(line) for line in file_swatch.knitout_program], [str(line) for line in swatch.knitout_program])
+
+    def test_decode_rejects_text_knitout(self):
+        swatch = load_test_swatch("jersey", "jersey_swatch", c=1, width=4, height=2)
+        with self.assertRaises(ValueError):
+            Binary_Knitout_Codec.decode(swatch._knitout_program_text().encode())
@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from knitout_interpreter.knitout_operations.needle_instructions import (
+    Loop_Making_Instruction,
+)
+from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+
+from quilt_knit.swatch.Swatch import Swatch
+
+
+class TestCarrier_Timeline(TestCase):
+
+    def setUp(self):
+        cleanup_test_files()
+
+    def _assert_timeline_matches_carriage_passes(self, swatch_ks: str, **python_vars) -> None:
+        swatch_k = load_test_knitscript_to_knitout_to_dat(f"{swatch_ks}.ks", f"{swatch_ks}.k", f"{swatch_ks}.dat", **python_vars)
+        swatch = Swatch(swatch_ks, swatch_k)
+        timeline = swatch.carrier_timeline
+        self.assertIs(timeline, swatch.carrier_timeline)
+        self.assertEqual(timeline.height, len(swatch.carriage_passes))
+        carrier_ids = {cid for cp_index in range(timeline.height) for cid in timeline.loop_carrier_ids(cp_index)}
+        self.assertTrue(len(carrier_ids) > 0)
+        for start_cp in range(timeline.height):
+            for carrier_id in carrier_ids:
+                expected = None
+                for cp_index in range(start_cp, timeline.height):
+                    first_instruction = swatch.carriage_passes[cp_index].first_instruction
+                    if isinstance(first_instruction, Loop_Making_Instruction) and carrier_id in first_instruction.carrier_set.carrier_ids:
+                        expected = cp_index
+                        break
+                self.assertEqual(timeline.first_loop_pass(carrier_id, start_cp), expected)
+                if expected is not None:
+                    self.assertIsNone(timeline.first_loop_pass(carrier_id, start_cp, expected))
+                    loop_position = timeline.loop_position(expected)
+                    assert loop_position is not None
+                    first_instruction = swatch.carriage_passes[expected].first_instruction
+                    self.assertEqual(loop_position, (first_instruction.needle.position, first_instruction.direction))
+        for cp_index, carriage_pass in enumerate(swatch.carriage_passes):
+            last_instruction = carriage_pass.last_instruction
+            if isinstance(last_instruction, Loop_Making_Instruction):
+                for carrier_id in last_instruction.carrier_set.carrier_ids:
+                    self.assertEqual(timeline.carrier_position_at_start(carrier_id, cp_index + 1), (last_instruction.needle.position, last_instruction.direction))
+
+    def test_jersey(self):
+        self._assert_timeline_matches_carriage_passes('jersey', c=1, width=6, height=4)
+
+    def test_lace(self):
+        self._assert_timeline_matches_carriage_passes('lace', c=1, width=8, height=6)
@@ -0,0 +1,53 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from knitout_interpreter.knitout_language.Knitout_Context import Knitout_Context
+from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+
+from quilt_knit.swatch.Knitout_Stream_Reader import Knitout_Stream_Reader
+from quilt_knit.swatch.Swatch import Swatch
+
+
+class TestKnitout_Stream_Reader(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+
+    def test_memory_mapped_reader_matches_buffered_reader(self):
+        load_test_knitscript_to_knitout_to_dat("cable.ks", "cable.k", "cable.dat", c=1, width=8, height=6)
+        buffered_lines = [str(line) for line in Knitout_Stream_Reader("cable.k")]
+        mapped_lines = [str(line) for line in Knitout_Stream_Reader("cable.k", memory_map=True)]
+        self.assertGreater(len(buffered_lines), 0)
+        self.assertEqual(mapped_lines, buffered_lines)
+
+    def test_streamed_swatch_matches_context_execution(self):
+        for swatch_ks in ["lace", "seed"]:
+            load_test_knitscript_to_knitout_to_dat(f"{swatch_ks}.ks", f"{swatch_ks}.k", f"{swatch_ks}.dat", c=1, width=8, height=6)
+            context_program, _machine, _knit_graph = Knitout_Context().process_knitout_file(f"{swatch_ks}.k")
+            context_swatch = Swatch("context", context_program)
+            for memory_map in [False, True]:
+                streamed_swatch = Swatch("streamed", f"{swatch_ks}.k", memory_map=memory_map)
+                self.assertEqual([str(i) for i in streamed_swatch.knitout_program], [str(i) for i in context_swatch.knitout_program])
+                self.assertEqual(streamed_swatch.height, context_swatch.height)
+                self.assertEqual(len(streamed_swatch.wale_exits), len(context_swatch.wale_exits))
+
+    def test_parse_error_notes_file_and_line(self):
+        with TemporaryDirectory() as knitout_directory:
+            knitout_file_name = os.path.join(knitout_directory, "malformed.k")
+            with open(knitout_file_name, "w") as knitout_file:
+                knitout_file.write(";!knitout-2\n;;Machine: SWG091N2\n\nknit + f1 q\n")
+            for memory_map in [False, True]:
+                with self.assertRaises(Exception) as raised:
+                    list(Knitout_Stream_Reader(knitout_file_name, memory_map=memory_map))
+                self.assertEqual(raised.exception.__notes__, [f"Knitout Parsing Error at line 4 of {knitout_file_name}: knit + f1 q"])
+
+    def test_readers_do_not_share_parser_state(self):
+        load_test_knitscript_to_knitout_to_dat("cable.ks", "cable.k", "cable.dat", c=1, width=8, height=6)
+        expected_lines = [str(line) for line in Knitout_Stream_Reader("cable.k")]
+        interleaved_lines = [(str(first), str(second)) for first, second in zip(Knitout_Stream_Reader("cable.k"), Knitout_Stream_Reader("cable.k", memory_map=True))]
+        self.assertEqual(interleaved_lines, [(line, line) for line in expected_lines])
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            threaded_lines = [*executor.map(lambda _: [str(line) for line in Knitout_Stream_Reader("cable.k")], range(8))]
+        self.assertEqual(threaded_lines, [expected_lines] * 8)
@@ -0,0 +1,55 @@
+import io
+import os
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from resources.load_ks_resources import load_test_swatch
+
+from quilt_knit.swatch.Knitout_Stream_Writer import Knitout_Stream_Writer
+from quilt_knit.swatch.Swatch import Swatch
+
+
+class TestKnitout_Stream_Writer(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+
+    def test_swatch_is_not_modified(self):
+        swatch = load_test_swatch("lace", "lace_swatch", c=1, width=6, height=3)
+        original_program = list(swatch.knitout_program)
+        swatch.compile_to_knitout("streamed_lace")
+        self.assertEqual(swatch.knitout_program, original_program)
+        with open("streamed_lace.k") as knitout_file:
+            knitout_lines = knitout_file.read().splitlines()
+        self.assertEqual(sum(1 for line in knitout_lines if line.startswith(";!knitout")), 1)
+        reloaded_swatch = Swatch("reloaded", "streamed_lace.k")
+        os.remove("streamed_lace.k")
+        self.assertEqual(reloaded_swatch.height, swatch.height)
+
+    def test_stream_to_file_object_in_chunks(self):
+        swatch = load_test_swatch("jersey", "jersey_swatch", c=1, width=4, height=2)
+        unbuffered = io.StringIO()
+        swatch.write_knitout(unbuffered, buffer_lines=1)
+        chunked = io.StringIO()
+        swatch.write_knitout(chunked, buffer_lines=7)
+        self.assertFalse(chunked.closed)
+        self.assertEqual(chunked.getvalue(), unbuffered.getvalue())
+        lines = chunked.getvalue().splitlines()
+        self.assertEqual(lines[0], ";!knitout-2")
+        self.assertEqual(len(lines), len(swatch.knitout_program) + len(swatch.execution_knitting_machine.carrier_system.active_carriers))
+
+    def test_format_line(self):
+        swatch = load_test_swatch("jersey", "jersey_swatch", c=1, width=4, height=2)
+        for instruction in swatch.knitout_program:
+            self.assertEqual(Knitout_Stream_Writer.format_line(instruction), f"{str(instruction).splitlines()[0]}\n")
+
+    def test_compile_dat_in_memory(self):
+        swatch = load_test_swatch("jersey", "jersey_swatch", c=1, width=4, height=2)
+        swatch.compile_to_dat("jersey_file_compile")
+        with open("jersey_file_compile.dat", "rb") as dat_file:
+            file_dat = dat_file.read()
+        dat_bytes = swatch.compile_dat()
+        self.assertEqual(dat_bytes, file_dat)
+        self.assertFalse(os.path.exists("jersey_swatch.k"))
+        self.assertEqual(swatch.compile_dat("jersey_path_compile.dat"), file_dat)
+        self.assertTrue(os.path.exists("jersey_path_compile.dat"))
+        self.assertFalse(os.path.exists("jersey_path_compile.k"))
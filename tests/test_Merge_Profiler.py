@@ -0,0 +1,64 @@
+import json
+import os
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from resources.load_ks_resources import load_test_swatch
+
+from quilt_knit.profiling.Merge_Profiler import (
+    Merge_Event,
+    Merge_Phase,
+    Merge_Profiler,
+)
+from quilt_knit.quilt.Quilt import Quilt
+from quilt_knit.swatch.wale_wise_merging.Wale_Merge_Process import Wale_Merge_Process
+from quilt_knit.swatch.wale_wise_merging.Wale_Wise_Connection import (
+    Wale_Wise_Connection,
+)
+
+
+class TestMerge_Profiler(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+
+    def test_profile_wale_merge(self):
+        with Merge_Profiler() as profiler:
+            bottom_swatch = load_test_swatch("jersey", "bottom", c=1, width=6, height=3)
+            top_swatch = load_test_swatch("lace", "top", c=1, width=6, height=3)
+            merger = Wale_Merge_Process(Wale_Wise_Connection(bottom_swatch, top_swatch))
+            merger.merge_swatches()
+            merger.get_merged_instructions()
+        self.assertIsNone(Merge_Profiler.active_profiler())
+        for phase in [Merge_Phase.swatch_execution, Merge_Phase.boundary_analysis, Merge_Phase.seam_search_construction,
+                      Merge_Phase.connection_selection, Merge_Phase.final_re_execution]:
+            self.assertGreater(profiler.phase_calls[phase], 0, phase)
+        self.assertGreaterEqual(profiler.phase_calls[Merge_Phase.swatch_execution], 2)
+        self.assertGreater(profiler.event_counts[Merge_Event.carriage_pass], 0)
+        report = json.loads(json.dumps(profiler.report()))
+        self.assertEqual(set(report["phases"]), {phase.value for phase in Merge_Phase})
+        self.assertEqual(set(report["events"]), {event.value for event in Merge_Event})
+
+    def test_inactive_profiler_records_nothing(self):
+        profiler = Merge_Profiler()
+        load_test_swatch("jersey", "unprofiled", c=1, width=4, height=2)
+        self.assertEqual(sum(profiler.phase_calls.values()), 0)
+        with profiler:
+            with Merge_Profiler() as inner_profiler:
+                load_test_swatch("jersey", "inner", c=1, width=4, height=2)
+            self.assertIs(Merge_Profiler.active_profiler(), profiler)
+        self.assertEqual(sum(profiler.phase_calls.values()), 0)
+        self.assertEqual(inner_profiler.phase_calls[Merge_Phase.swatch_execution], 1)
+
+    def test_profile_quilt_merge(self):
+        quilt = Quilt()
+        left_swatch = load_test_swatch("jersey", "left", c=1, width=4, height=2)
+        right_swatch = load_test_swatch("jersey", "right", c=1, width=4, height=2)
+        quilt.connect_swatches_course_wise(left_swatch, right_swatch)
+        profiler = Merge_Profiler()
+        quilt.merge_quilt(profiler=profiler)
+        self.assertGreater(profiler.phase_calls[Merge_Phase.connection_selection], 0)
+        self.assertGreater(profiler.phase_calls[Merge_Phase.final_re_execution], 0)
+        profiler.write_report("quilt_merge_profile")
+        with open("quilt_merge_profile.json") as report_file:
+            self.assertEqual(json.load(report_file), profiler.report())
+        os.remove("quilt_merge_profile.json")
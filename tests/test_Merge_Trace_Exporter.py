@@ -0,0 +1,69 @@
+import json
+import os
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from resources.load_ks_resources import load_test_swatch
+
+from quilt_knit.profiling.Merge_Profiler import Merge_Phase, Merge_Profiler
+from quilt_knit.profiling.Merge_Trace_Exporter import Merge_Trace_Exporter
+from quilt_knit.quilt.Quilt import Quilt
+from quilt_knit.swatch.Swatch import Swatch
+
+
+class TestMerge_Trace_Exporter(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+
+    def test_trace_quad_quilt_merge(self):
+        trace_exporter = Merge_Trace_Exporter()
+        with trace_exporter:
+            left_bottom = load_test_swatch("jersey", "left bottom", c=1, width=4, height=2)
+            right_bottom = load_test_swatch("jersey", "right bottom", c=1, width=4, height=2)
+            left_top = load_test_swatch("rib", "left top", c=1, width=4, height=2)
+            right_top = load_test_swatch("rib", "right top", c=1, width=4, height=2)
+        quilt = Quilt()
+        quilt.connect_swatches_wale_wise(left_bottom, left_top)
+        quilt.connect_swatches_wale_wise(right_bottom, right_top)
+        quilt.connect_swatches_course_wise(left_bottom, right_bottom)
+        quilt.connect_swatches_course_wise(left_top, right_top)
+        quilt.merge_quilt(trace_exporter=trace_exporter)
+        self.assertIsNone(Merge_Trace_Exporter.active_exporter())
+        spans_by_name: dict[str, list[dict]] = {}
+        for event in trace_exporter.trace_events:
+            self.assertEqual(event["ph"], "X")
+            self.assertGreaterEqual(event["dur"], 0)
+            spans_by_name.setdefault(event["name"], []).append(event)
+        self.assertEqual(len(spans_by_name["convert_quilt_to_course_bands"]), 1)
+        self.assertEqual(len(spans_by_name["merge_swatches_course_wise"]), 2)
+        self.assertEqual(len(spans_by_name["Wale_Merge_Process"]), 1)
+        self.assertIn("left bottom", {span["args"]["swatch"] for span in spans_by_name["Swatch"]})
+        for course_span in spans_by_name["merge_swatches_course_wise"]:
+            self.assertEqual(course_span["args"]["merged_swatch_width"], 8)
+        bands_span = spans_by_name["convert_quilt_to_course_bands"][0]
+        for course_span in spans_by_name["merge_swatches_course_wise"]:  # course merges are nested in the band conversion
+            self.assertGreaterEqual(course_span["ts"], bands_span["ts"])
+            self.assertLessEqual(course_span["ts"] + course_span["dur"], bands_span["ts"] + bands_span["dur"])
+        trace_exporter.write_trace("quad_quilt_trace")
+        with open("quad_quilt_trace.json") as trace_file:
+            trace = json.load(trace_file)
+        os.remove("quad_quilt_trace.json")
+        self.assertEqual(len(trace["traceEvents"]), len(trace_exporter.trace_events) + 1)
+
+    def test_inactive_exporter_records_nothing(self):
+        trace_exporter = Merge_Trace_Exporter()
+        load_test_swatch("jersey", "untraced", c=1, width=4, height=2)
+        self.assertEqual(trace_exporter.trace_events, [])
+
+    def test_exporter_and_profiler_record_independently(self):
+        with Merge_Profiler() as profiler, Merge_Trace_Exporter() as outer_exporter:
+            with Merge_Trace_Exporter() as inner_exporter:
+                self.assertIs(Merge_Trace_Exporter.active_exporter(), inner_exporter)
+                self.assertIs(Merge_Profiler.active_profiler(), profiler)
+                load_test_swatch("jersey", "traced", c=1, width=4, height=2)
+            self.assertIs(Merge_Trace_Exporter.active_exporter(), outer_exporter)
+        self.assertIsNone(Merge_Trace_Exporter.active_exporter())
+        self.assertIsNone(Merge_Profiler.active_profiler())
+        self.assertIn("Swatch", {event["name"] for event in inner_exporter.trace_events})
+        self.assertEqual(outer_exporter.trace_events, [])
+        self.assertGreater(profiler.phase_calls[Merge_Phase.swatch_execution], 0)
@@ -3,6 +3,7 @@ from unittest import TestCase
 from clean_up_tests import cleanup_test_files
 from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
 
+from quilt_knit.profiling.Merge_Profiler import Merge_Event, Merge_Profiler
 from quilt_knit.swatch.course_wise_merging.Course_Merge_Process import (
     Course_Merge_Process,
 )
@@ -232,3 +233,36 @@ class TestCourse_Merge_Process(TestCase):
         merger.merge_swatches()
         merger.compile_to_dat('jacquard_seed')
         self.assertEqual(len(merger.merged_instructions), 77)
+
+    def test_merge_cable_with_seam_plan(self):
+        connection = self._make_connection('cable', 'cable',
+                                           first_carriage_pass_on_left=2, first_carriage_pass_on_right=0,
+                                           c=1, width=7, height=8)
+        greedy_merger = Course_Merge_Process(connection)
+        greedy_merger.merge_swatches()
+        connection = self._make_connection('cable', 'cable',
+                                           first_carriage_pass_on_left=2, first_carriage_pass_on_right=0,
+                                           c=1, width=7, height=8)
+        merger = Course_Merge_Process(connection)
+        merger.merge_swatches(plan_seam=True)
+        merger.compile_to_dat('cable_planned_merge')
+        self.assertFalse(merger.seam_plan_diverged)
+        self.assertLess(len(merger.merged_instructions), len(greedy_merger.merged_instructions))
+
+    def test_seam_plan_avoids_cuts(self):
+        connection = self._make_connection('jacquard', 'seed',
+                                           first_carriage_pass_on_left=0, first_carriage_pass_on_right=2,
+                                           c=1, white=1, black=2, width=16, height=8)
+        greedy_merger = Course_Merge_Process(connection)
+        with Merge_Profiler() as greedy_profiler:
+            greedy_merger.merge_swatches()
+        connection = self._make_connection('jacquard', 'seed',
+                                           first_carriage_pass_on_left=0, first_carriage_pass_on_right=2,
+                                           c=1, white=1, black=2, width=16, height=8)
+        merger = Course_Merge_Process(connection)
+        with Merge_Profiler() as planned_profiler:
+            merger.merge_swatches(plan_seam=True)
+        merger.compile_to_dat('jacquard_seed_planned_merge')
+        self.assertFalse(merger.seam_plan_diverged)
+        self.assertEqual(greedy_profiler.event_counts[Merge_Event.cut_injected], 1)
+        self.assertEqual(planned_profiler.event_counts[Merge_Event.cut_injected], 0)
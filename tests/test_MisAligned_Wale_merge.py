@@ -2,6 +2,9 @@ import warnings
 from unittest import TestCase
 
 from clean_up_tests import cleanup_test_files
+from knitout_interpreter.knitout_language.Knitout_Parser import parse_knitout
+from knitout_interpreter.knitout_operations.needle_instructions import Drop_Instruction
+from knitout_interpreter.knitout_operations.Rack_Instruction import Rack_Instruction
 from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
 from virtual_knitting_machine.knitting_machine_warnings.Needle_Warnings import (
     Knit_on_Empty_Needle_Warning,
@@ -266,3 +269,67 @@ class TestWale_Merge_Process(TestCase):
             merger.merge_swatches()
             merger.compile_to_dat('jacquard_seed')
             self.assertEqual(len(merger.merged_instructions), 75)
+
+    def test_merge_swatches_with_transfer_plan(self):
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', category=Knit_on_Empty_Needle_Warning)
+            connection = self._make_connection('cable', 'cable',
+                                               shift=2,
+                                               c=1, width=7, height=4)
+            merger = Wale_Merge_Process(connection)
+            merger.merge_swatches()
+            greedy_length = len(merger.merged_instructions)
+            connection = self._make_connection('cable', 'cable',
+                                               shift=2,
+                                               c=1, width=7, height=4)
+            merger = Wale_Merge_Process(connection)
+            merger.merge_swatches(plan_seam=True)
+            merger.compile_to_dat('cable_merge')
+            self.assertEqual(len(merger.merged_instructions), greedy_length)
+
+            # Exits beyond the racking limit of every entrance are dropped by the planner instead of failing the merge.
+            # The greedy merge also drops f5, which the planner stacks into the last entrance of the narrower top swatch.
+            greedy_drops = self._drops(self._merge_narrowing_jersey(plan_seam=False))
+            planned_drops = self._drops(self._merge_narrowing_jersey(plan_seam=True))
+            self.assertEqual(planned_drops, ["f6", "f7"])
+            self.assertLess(len(planned_drops), len(greedy_drops))
+
+    def test_transfer_plan_uses_fewer_rackings(self):
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', category=Knit_on_Empty_Needle_Warning)
+            greedy_racks = self._alignment_racks(self._merge_jersey_into_half_gauge(plan_seam=False))
+            planned_racks = self._alignment_racks(self._merge_jersey_into_half_gauge(plan_seam=True))
+            # The greedy merge balances the racking of each odd exit to the left and right, while the plan stacks every odd exit into the entrance on its left.
+            self.assertEqual(greedy_racks, [1, -1])
+            self.assertEqual(planned_racks, [-1])
+
+    @staticmethod
+    def _merge_narrowing_jersey(plan_seam: bool) -> Wale_Merge_Process:
+        bottom_swatch = Swatch("bottom swatch", load_test_knitscript_to_knitout_to_dat("jersey.ks", "jersey.k", "jersey.dat", c=1, width=8, height=2))
+        top_swatch = Swatch("top swatch", load_test_knitscript_to_knitout_to_dat("jersey.ks", "jersey.k", "jersey.dat", c=1, width=4, height=2))
+        merger = Wale_Merge_Process(Wale_Wise_Connection(bottom_swatch, top_swatch))
+        merger.merge_swatches(plan_seam=plan_seam)
+        return merger
+
+    @staticmethod
+    def _merge_jersey_into_half_gauge(plan_seam: bool) -> Wale_Merge_Process:
+        bottom_swatch = Swatch("bottom swatch", load_test_knitscript_to_knitout_to_dat("jersey.ks", "jersey.k", "jersey.dat", c=1, width=7, height=2))
+        needles = [0, 2, 4, 6]
+        half_gauge_program = [";!knitout-2", ";;Machine: SWG091N2", ";;Gauge: 15", ";;Position: Right", ";;Carriers: 1 2 3 4 5 6 7 8 9 10",
+                              "inhook 1", "tuck - f6 1", "tuck - f2 1", "tuck + f0 1", "tuck + f4 1", "releasehook 1"]
+        for _ in range(2):
+            half_gauge_program.extend(f"knit - f{n} 1" for n in reversed(needles))
+            half_gauge_program.extend(f"knit + f{n} 1" for n in needles)
+        half_gauge_program.append("outhook 1")
+        top_swatch = Swatch("top swatch", parse_knitout("\n".join(half_gauge_program) + "\n", pattern_is_file=False))
+        merger = Wale_Merge_Process(Wale_Wise_Connection(bottom_swatch, top_swatch))
+        merger.merge_swatches(plan_seam=plan_seam)
+        return merger
+
+    @staticmethod
+    def _drops(merger: Wale_Merge_Process) -> list[str]:
+        return [str(instruction.needle) for instruction in merger.merged_instructions if isinstance(instruction, Drop_Instruction)]
+
+    @staticmethod
+    def _alignment_racks(merger: Wale_Merge_Process) -> list[int]:
+        return [int(instruction.rack) for instruction in merger.merged_instructions if isinstance(instruction, Rack_Instruction) and int(instruction.rack) != 0]
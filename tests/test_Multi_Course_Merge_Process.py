@@ -0,0 +1,72 @@
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from knitout_interpreter.knitout_operations.Knitout_Line import Knitout_Comment_Line
+from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+
+from quilt_knit.swatch.course_wise_merging.Course_Merge_Process import (
+    Course_Merge_Process,
+)
+from quilt_knit.swatch.course_wise_merging.Course_Wise_Connection import (
+    Course_Wise_Connection,
+)
+from quilt_knit.swatch.course_wise_merging.Multi_Course_Merge_Process import (
+    Multi_Course_Merge_Process,
+)
+from quilt_knit.swatch.Swatch import Swatch
+
+
+class TestMulti_Course_Merge_Process(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+
+    @staticmethod
+    def _make_row(swatch_ks_names: list[str], **python_vars) -> list[Swatch]:
+        row = []
+        for i, swatch_ks in enumerate(swatch_ks_names):
+            swatch_k = load_test_knitscript_to_knitout_to_dat(f"{swatch_ks}.ks", f"{swatch_ks}.k", f"{swatch_ks}.dat", **python_vars)
+            row.append(Swatch(f"swatch_{i}", swatch_k))
+        return row
+
+    @staticmethod
+    def _program_lines(instructions) -> list[str]:
+        return [str(i).split(";")[0].strip() for i in instructions if not isinstance(i, Knitout_Comment_Line)]
+
+    def test_two_swatch_row_matches_course_merge(self):
+        left_swatch, right_swatch = self._make_row(['jersey', 'rib'], c=1, width=4, height=3)
+        pairwise_merger = Course_Merge_Process(Course_Wise_Connection(left_swatch, right_swatch))
+        pairwise_instructions = pairwise_merger.merge_swatches()
+        row_merger = Multi_Course_Merge_Process([left_swatch, right_swatch])
+        row_instructions = row_merger.merge_swatches()
+        self.assertEqual(self._program_lines(row_instructions), self._program_lines(pairwise_instructions))
+
+    def test_merge_row(self):
+        row = self._make_row(['rib', 'rib', 'rib'], c=1, width=4, height=3)
+        merger = Multi_Course_Merge_Process(row)
+        merger.merge_swatches()
+        merger.compile_to_dat('rib_row_merge')
+        merged_swatch = Swatch("merged_row", [i for i in merger.merged_instructions if not isinstance(i, Knitout_Comment_Line)])
+        self.assertEqual(merged_swatch.width, 12)
+        self.assertEqual(merged_swatch.height, row[0].height)
+        for cp_index, carriage_pass in enumerate(merged_swatch.carriage_passes):
+            self.assertEqual(merger.get_original_cp_indices(carriage_pass), [cp_index, cp_index, cp_index])
+
+    def test_merge_row_with_transfers(self):
+        row = self._make_row(['jersey', 'lace', 'cable', 'jersey'], c=1, width=6, height=4)
+        merger = Multi_Course_Merge_Process(row)
+        merger.merge_swatches()
+        merger.compile_to_dat('transfer_row_merge')
+        merged_swatch = Swatch("merged_row", [i for i in merger.merged_instructions if not isinstance(i, Knitout_Comment_Line)])
+        self.assertEqual(merged_swatch.width, 24)
+        self.assertEqual(merged_swatch.height, max(s.height for s in row))
+
+    def test_merged_instruction_sources_are_specified_once(self):
+        row = self._make_row(['jersey', 'rib', 'jersey'], c=1, width=4, height=2)
+        merger = Multi_Course_Merge_Process(row)
+        merger.merge_swatches()
+        merged_instructions = merger.get_merged_instructions()
+        sourced_comments = [i.comment for i in merged_instructions if i.comment is not None and " from line " in i.comment]
+        self.assertGreater(len(sourced_comments), 0)
+        self.assertTrue(all(comment.count(" from line ") == 1 for comment in sourced_comments))
+        self.assertTrue(any("swatch_1" in comment for comment in sourced_comments))
+        self.assertEqual(self._program_lines(merged_instructions), self._program_lines(merger.merged_instructions))
@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from knitout_interpreter.knitout_operations.Knitout_Line import Knitout_Comment_Line
+from knitout_interpreter.knitout_operations.needle_instructions import Xfer_Instruction
+from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+
+from quilt_knit.swatch.Swatch import Swatch
+from quilt_knit.swatch.wale_wise_merging.Multi_Wale_Merge_Process import (
+    Multi_Wale_Merge_Process,
+)
+from quilt_knit.swatch.wale_wise_merging.Wale_Merge_Process import (
+    Post_Merge_Comment,
+    Wale_Merge_Process,
+)
+from quilt_knit.swatch.wale_wise_merging.Wale_Wise_Connection import (
+    Wale_Wise_Connection,
+)
+
+
+class TestMulti_Wale_Merge_Process(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+
+    @staticmethod
+    def _make_fork(bottom_ks: str, top_ks_names: list[str], top_width: int, **python_vars) -> tuple[Swatch, list[Swatch]]:
+        bottom_k = load_test_knitscript_to_knitout_to_dat(f"{bottom_ks}.ks", f"{bottom_ks}.k", f"{bottom_ks}.dat", width=top_width * len(top_ks_names), **python_vars)
+        bottom_swatch = Swatch("bottom", bottom_k)
+        top_swatches = []
+        for i, top_ks in enumerate(top_ks_names):
+            top_k = load_test_knitscript_to_knitout_to_dat(f"{top_ks}.ks", f"{top_ks}.k", f"{top_ks}.dat", width=top_width, **python_vars)
+            top_swatches.append(Swatch(f"top_{i}", top_k).shift_swatch_rightward_on_needle_bed(i * top_width))
+        return bottom_swatch, top_swatches
+
+    @staticmethod
+    def _connections(bottom_swatch: Swatch, top_swatches: list[Swatch], top_width: int) -> list[Wale_Wise_Connection]:
+        return [Wale_Wise_Connection(bottom_swatch, top_swatch, i * top_width, (i + 1) * top_width - 1, i * top_width, (i + 1) * top_width - 1)
+                for i, top_swatch in enumerate(top_swatches)]
+
+    @staticmethod
+    def _program_lines(instructions) -> list[str]:
+        return [str(i).split(";")[0].strip() for i in instructions if not isinstance(i, Knitout_Comment_Line)]
+
+    def test_matches_sequential_merges(self):
+        # Only the first seam needs alignment transfers, so the joint schedule matches the sequential merges.
+        bottom_swatch, top_swatches = self._make_fork('jersey', ['rib', 'jersey', 'jersey'], 4, c=1, height=4)
+        merged_swatch = bottom_swatch
+        for connection in self._connections(bottom_swatch, top_swatches, 4):
+            merger = Wale_Merge_Process(Wale_Wise_Connection(merged_swatch, connection.top_swatch,
+                                                             connection.bottom_left_needle_position, connection.bottom_right_needle_position,
+                                                             connection.top_left_needle_position, connection.top_right_needle_position))
+            merger.merge_swatches()
+            merged_swatch = Swatch("merged", merger.get_merged_instructions())
+        bottom_swatch, top_swatches = self._make_fork('jersey', ['rib', 'jersey', 'jersey'], 4, c=1, height=4)
+        multi_merger = Multi_Wale_Merge_Process(self._connections(bottom_swatch, top_swatches, 4))
+        multi_merger.merge_swatches()
+        multi_merger.compile_to_dat('multi_wale_merge')
+        self.assertEqual(self._program_lines(multi_merger.get_merged_instructions()), self._program_lines(merged_swatch.knitout_program))
+
+    def test_alignment_transfers_precede_top_swatches(self):
+        bottom_swatch, top_swatches = self._make_fork('jersey', ['lace', 'cable', 'seed'], 6, c=1, height=4)
+        multi_merger = Multi_Wale_Merge_Process(self._connections(bottom_swatch, top_swatches, 6))
+        multi_merger.merge_swatches(plan_seam=True)
+        first_top = next(i for i, instruction in enumerate(multi_merger.merged_instructions) if isinstance(instruction, Post_Merge_Comment))
+        alignment_needles = set(int(instruction.needle.position) for instruction in multi_merger.merged_instructions[:first_top] if isinstance(instruction, Xfer_Instruction))
+        self.assertTrue(any(position >= 12 for position in alignment_needles))  # The seed seam is aligned before the lace swatch is knit.
+        merged_swatch = Swatch("merged", [i for i in multi_merger.merged_instructions if not isinstance(i, Knitout_Comment_Line)])
+        self.assertEqual(merged_swatch.width, 18)
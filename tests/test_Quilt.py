@@ -1,27 +1,29 @@
+import glob
+import json
+import os
 from unittest import TestCase
 
 from clean_up_tests import cleanup_test_files
-from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+from resources.load_ks_resources import (
+    load_test_knitscript_to_knitout_to_dat,
+    load_test_swatch,
+)
 
-from quilt_knit.quilt.Quilt import Quilt
-from quilt_knit.swatch.Swatch import Swatch
+from quilt_knit.quilt.Quilt import Quilt, Unsupported_Merge_Option_Warning
+from quilt_knit.quilt.Quilt_Merge_Planner import Merge_Cost_Model
+from quilt_knit.swatch.Dat_Compile_Pool import Dat_Compile_Pool
 
 
 class TestQuilt(TestCase):
     def setUp(self):
         cleanup_test_files()
 
-    @staticmethod
-    def _swatch(ks: str, swatch_name: str, **python_vars) -> Swatch:
-        swatch_k = load_test_knitscript_to_knitout_to_dat(f"{ks}.ks", f"{ks}.k", f"{ks}.dat", **python_vars)
-        return Swatch(swatch_name, swatch_k)
-
     @staticmethod
     def _quad_quilt(left_bottom_ks: str, right_bottom_ks: str, left_top_ks: str, right_top_ks: str, **python_vars) -> Quilt:
-        left_bottom = TestQuilt._swatch(left_bottom_ks, "left bottom", **python_vars)
-        right_bottom = TestQuilt._swatch(right_bottom_ks, "right bottom", **python_vars)
-        left_top = TestQuilt._swatch(left_top_ks, "left top", **python_vars)
-        right_top = TestQuilt._swatch(right_top_ks, "right top", **python_vars)
+        left_bottom = load_test_swatch(left_bottom_ks, "left bottom", **python_vars)
+        right_bottom = load_test_swatch(right_bottom_ks, "right bottom", **python_vars)
+        left_top = load_test_swatch(left_top_ks, "left top", **python_vars)
+        right_top = load_test_swatch(right_top_ks, "right top", **python_vars)
         quilt = Quilt()
         quilt.connect_swatches_wale_wise(left_bottom, left_top)
         quilt.connect_swatches_wale_wise(right_bottom, right_top)
@@ -29,6 +31,21 @@ class TestQuilt(TestCase):
         quilt.connect_swatches_course_wise(left_top, right_top)
         return quilt
 
+    def test_batched_connection_updates(self):
+        quilt = self._quad_quilt("jersey", "jersey", "jersey", "jersey", c=1, width=4, height=2)
+        left_bottom = [s for s in quilt.swatch_neighborhoods if s.name == "left bottom"][0]
+        left_bottom_connections = quilt.swatch_neighborhoods[left_bottom].get_all_connections()
+        self.assertEqual(len(left_bottom_connections), 2)
+        quilt._remove_swatch(left_bottom)
+        self.assertNotIn(left_bottom, quilt)
+        self.assertTrue(all(len(n.get_all_connections()) == 1 for n in quilt.swatch_neighborhoods.values() if n.swatch.name == "left top"))
+        self.assertEqual(sum(len(n.get_all_connections()) for n in quilt.swatch_neighborhoods.values()), 4)
+        quilt._add_connections(left_bottom_connections)
+        self.assertEqual(quilt.swatch_neighborhoods[left_bottom].get_all_connections(), left_bottom_connections)
+        for connection in left_bottom_connections:
+            self.assertIn(connection, quilt)
+        self.assertEqual(sum(len(n.get_all_connections()) for n in quilt.swatch_neighborhoods.values()), 8)
+
     def test_jersey_quad_quilt(self):
         quilt = self._quad_quilt("jersey", "jersey", "jersey", "jersey", c=1, width=4, height=2)
         # quilt.print_bottom_up_leftward_traversal()
@@ -37,7 +54,7 @@ class TestQuilt(TestCase):
         for swatch in swatches:
             swatch.compile_to_dat('jersey_merge')
             self.assertEqual(len(swatch.carriage_passes), 6)
-            self.assertEqual(len(swatch.knitout_program), 53)
+            self.assertEqual(len(swatch.knitout_program), 50)
 
     def test_rib_quad_quilt(self):
         quilt = self._quad_quilt("rib", "rib", "rib", "rib", c=1, width=4, height=2)
@@ -47,7 +64,7 @@ class TestQuilt(TestCase):
         for swatch in swatches:
             swatch.compile_to_dat('rib_merge')
             self.assertEqual(len(swatch.carriage_passes), 7)
-            self.assertEqual(len(swatch.knitout_program), 57)
+            self.assertEqual(len(swatch.knitout_program), 54)
 
     def test_seed_quad_quilt(self):
         quilt = self._quad_quilt("seed", "seed", "seed", "seed", c=1, width=4, height=2)
@@ -57,7 +74,7 @@ class TestQuilt(TestCase):
         for swatch in swatches:
             swatch.compile_to_dat('seed_merge')
             self.assertEqual(len(swatch.carriage_passes), 10)
-            self.assertEqual(len(swatch.knitout_program), 81)
+            self.assertEqual(len(swatch.knitout_program), 78)
 
     def test_lace_quad_quilt(self):
         quilt = self._quad_quilt("lace", "left_lace", "right_lace", "lace", c=1, width=7, height=4)
@@ -67,7 +84,7 @@ class TestQuilt(TestCase):
         for swatch in swatches:
             swatch.compile_to_dat('lace_merge')
             self.assertEqual(len(swatch.carriage_passes), 30)
-            self.assertEqual(len(swatch.knitout_program), 189)
+            self.assertEqual(len(swatch.knitout_program), 186)
 
     def test_cable_quad_quilt(self):
         quilt = self._quad_quilt("cable", "left_cable", "right_cable", "cable", c=1, width=7, height=2)
@@ -77,7 +94,7 @@ class TestQuilt(TestCase):
         for swatch in swatches:
             swatch.compile_to_dat('cable_merge')
             self.assertEqual(len(swatch.carriage_passes), 17)
-            self.assertEqual(len(swatch.knitout_program), 126)
+            self.assertEqual(len(swatch.knitout_program), 123)
 
     def test_jacquard_quad_quilt(self):
         quilt = self._quad_quilt("jacquard", "jacquard", "jacquard", "jacquard", white=1, black=2, c=1, width=4, height=2)
@@ -87,4 +104,196 @@ class TestQuilt(TestCase):
         for swatch in swatches:
             swatch.compile_to_dat('jacquard_merge')
             self.assertEqual(len(swatch.carriage_passes), 8)
-            self.assertEqual(len(swatch.knitout_program), 86)
+            self.assertEqual(len(swatch.knitout_program), 83)
+
+    def test_grid_quilt_matches_connected_quilt(self):
+        connected_quilt = self._quad_quilt("rib", "rib", "rib", "rib", c=1, width=4, height=2)
+        names = [["left bottom", "right bottom"], ["left top", "right top"]]
+        grid = [[load_test_swatch("rib", name, c=1, width=4, height=2) for name in row] for row in names]
+        grid_quilt = Quilt.from_grid(grid)
+        self.assertEqual(set(grid_quilt.swatch_neighborhoods), set(connected_quilt.swatch_neighborhoods))
+        for swatch, neighborhood in connected_quilt.swatch_neighborhoods.items():
+            self.assertEqual(grid_quilt.swatch_neighborhoods[swatch].get_all_connections(), neighborhood.get_all_connections())
+        grid_swatch = [*grid_quilt.merge_quilt()][0]
+        connected_swatch = [*connected_quilt.merge_quilt()][0]
+        self.assertEqual(len(grid_swatch.knitout_program), len(connected_swatch.knitout_program))
+
+    def test_grid_quilt_with_gaps(self):
+        swatches = [load_test_swatch("jersey", f"swatch {i}", c=1, width=4, height=2) for i in range(4)]
+        quilt = Quilt.from_grid([[swatches[0], None, swatches[1]], [swatches[2]], [None, swatches[3]]])
+        self.assertEqual(len(quilt.swatch_neighborhoods), 4)
+        self.assertIsNotNone(quilt.get_wale_wise_connection(swatches[0], swatches[2]))
+        self.assertEqual(quilt.swatch_neighborhoods[swatches[1]].get_all_connections(), set())
+        self.assertEqual(quilt.swatch_neighborhoods[swatches[3]].get_all_connections(), set())
+        with self.assertRaises(ValueError):
+            Quilt.from_grid([[swatches[0], swatches[0]]])
+
+    @staticmethod
+    def _row_quilt(ks: str, row_length: int, **python_vars) -> Quilt:
+        swatches = [load_test_swatch(ks, f"swatch {i}", **python_vars) for i in range(row_length)]
+        quilt = Quilt()
+        for left_swatch, right_swatch in zip(swatches, swatches[1:]):
+            quilt.connect_swatches_course_wise(left_swatch, right_swatch)
+        return quilt
+
+    def test_balanced_row_merge(self):
+        sequential_swatches = self._row_quilt("rib", 5, c=1, width=4, height=2).merge_quilt()
+        balanced_swatches = self._row_quilt("rib", 5, c=1, width=4, height=2).merge_quilt(balanced_course_merges=True)
+        self.assertEqual(len(balanced_swatches), 1)
+        sequential_swatch = [*sequential_swatches][0]
+        for swatch in balanced_swatches:
+            self.assertEqual(swatch.width, 20)
+            self.assertEqual(swatch.height, sequential_swatch.height)
+            self.assertEqual(len(swatch.knitout_program), len(sequential_swatch.knitout_program))
+            swatch.compile_to_dat('rib_row_merge')
+
+    @staticmethod
+    def _column_quilt(ks: str, column_height: int, **python_vars) -> Quilt:
+        swatches = [load_test_swatch(ks, f"swatch {i}", **python_vars) for i in range(column_height)]
+        quilt = Quilt()
+        for bottom_swatch, top_swatch in zip(swatches, swatches[1:]):
+            quilt.connect_swatches_wale_wise(bottom_swatch, top_swatch)
+        return quilt
+
+    def test_balanced_column_merge(self):
+        sequential_swatches = self._column_quilt("rib", 5, c=1, width=4, height=3).merge_quilt()
+        balanced_swatches = self._column_quilt("rib", 5, c=1, width=4, height=3).merge_quilt(balanced_wale_merges=True)
+        self.assertEqual(len(balanced_swatches), 1)
+        sequential_swatch = [*sequential_swatches][0]
+        for swatch in balanced_swatches:
+            self.assertEqual(swatch.width, 4)
+            self.assertEqual(swatch.height, sequential_swatch.height)
+            self.assertEqual(len(swatch.knitout_program), len(sequential_swatch.knitout_program))
+            swatch.compile_to_dat('rib_column_merge')
+
+    @staticmethod
+    def _fork_quilt(bottom_ks: str, left_top_ks: str, right_top_ks: str, **python_vars) -> Quilt:
+        bottom = load_test_swatch(bottom_ks, "bottom", width=8, **python_vars)
+        left_top = load_test_swatch(left_top_ks, "left top", width=4, **python_vars)
+        right_top = load_test_swatch(right_top_ks, "right top", width=4, **python_vars).shift_swatch_rightward_on_needle_bed(4)
+        quilt = Quilt()
+        quilt.connect_swatches_wale_wise(bottom, left_top, 0, 3, 0, 3)
+        quilt.connect_swatches_wale_wise(bottom, right_top, 4, 7, 4, 7)
+        return quilt
+
+    def test_sequential_wale_merge_returns_last_merge(self):
+        quilt = self._fork_quilt("jersey", "rib", "seed", c=1, height=3)
+        source_height = sum(s.height for s in quilt.swatch_neighborhoods)
+        swatches = quilt.merge_quilt()
+        self.assertEqual(len(swatches), 1)
+        # The right top is stacked onto the merge of the bottom and the left top, so returning the earlier merge would drop the right top.
+        for swatch in swatches:
+            self.assertGreaterEqual(swatch.height, source_height)
+
+    @staticmethod
+    def _separate_columns_quilt(columns: dict[str, str], **python_vars) -> Quilt:
+        quilt = Quilt()
+        for column, ks in columns.items():
+            quilt.connect_swatches_wale_wise(load_test_swatch(ks, f"{column} bottom", **python_vars), load_test_swatch(ks, f"{column} top", **python_vars))
+        return quilt
+
+    def test_separate_columns_merge_to_separate_swatches(self):
+        columns = {"left": "jersey", "right": "rib"}
+        swatches = self._separate_columns_quilt(columns, c=1, width=4, height=2).merge_quilt()
+        self.assertEqual(len(swatches), 2)
+        self.assertEqual(len({swatch.name for swatch in swatches}), 2)
+        column_heights = [[*self._separate_columns_quilt({column: ks}, c=1, width=4, height=2).merge_quilt()][0].height for column, ks in columns.items()]
+        self.assertEqual(sorted(swatch.height for swatch in swatches), sorted(column_heights))
+
+    def test_multi_wale_merge(self):
+        sequential_swatches = self._fork_quilt("jersey", "rib", "seed", c=1, height=3).merge_quilt()
+        multi_swatches = self._fork_quilt("jersey", "rib", "seed", c=1, height=3).merge_quilt(multi_wale_merges=True)
+        self.assertEqual(len(sequential_swatches), 1)
+        self.assertEqual(len(multi_swatches), 1)
+        sequential_swatch = [*sequential_swatches][0]
+        for swatch in multi_swatches:
+            self.assertEqual(swatch.width, 8)
+            self.assertLessEqual(swatch.height, sequential_swatch.height)
+            swatch.compile_to_dat('fork_merge')
+
+    def test_balanced_wale_merge_warns_without_column(self):
+        sequential_swatches = self._fork_quilt("jersey", "rib", "seed", c=1, height=3).merge_quilt()
+        with self.assertWarns(Unsupported_Merge_Option_Warning):
+            balanced_swatches = self._fork_quilt("jersey", "rib", "seed", c=1, height=3).merge_quilt(balanced_wale_merges=True)
+        self.assertEqual([(s.width, s.height) for s in balanced_swatches], [(s.width, s.height) for s in sequential_swatches])
+
+    def test_multi_course_row_merge(self):
+        pairwise_swatch = [*self._row_quilt("rib", 4, c=1, width=4, height=2).merge_quilt()][0]
+        quilt = self._row_quilt("rib", 4, c=1, width=4, height=2)
+        plan = quilt.plan_merge(multi_course_merges=True)
+        self.assertEqual([m.merge_process for m in plan.planned_merges], ["Multi_Course_Merge_Process"])
+        swatches = quilt.merge_quilt(multi_course_merges=True)
+        self.assertEqual(len(swatches), 1)
+        for swatch in swatches:
+            swatch.compile_to_dat('rib_row_merge')
+            self.assertEqual(swatch.name, pairwise_swatch.name)
+            self.assertEqual(swatch.width, 16)
+            self.assertEqual(swatch.height, pairwise_swatch.height)
+            self.assertEqual(len(swatch.knitout_program), len(pairwise_swatch.knitout_program))
+
+    def test_multi_course_quad_quilt(self):
+        quilt = self._quad_quilt("rib", "rib", "rib", "rib", c=1, width=4, height=2)
+        swatches = quilt.merge_quilt(multi_course_merges=True)
+        self.assertEqual(len(swatches), 1)
+        for swatch in swatches:
+            swatch.compile_to_dat('rib_merge')
+            self.assertEqual(len(swatch.carriage_passes), 7)
+            self.assertEqual(len(swatch.knitout_program), 54)
+
+    def test_plan_quad_quilt_merge(self):
+        quilt = self._quad_quilt("jersey", "jersey", "rib", "rib", c=1, width=4, height=2)
+        plan = quilt.plan_merge()
+        self.assertEqual(len(quilt.swatch_neighborhoods), 4)
+        self.assertEqual([m.merge_process for m in plan.planned_merges], ["Course_Merge_Process", "Course_Merge_Process", "Wale_Merge_Process"])
+        self.assertEqual([len(band) for band in plan.bands], [1, 1])
+        self.assertEqual(plan.bands[0][0].width, 8)
+        self.assertEqual(plan.peak_live_swatches, 5)
+        self.assertEqual(len(plan.results), 1)
+        merged_swatch = [*quilt.merge_quilt()][0]
+        self.assertAlmostEqual(plan.results[0].carriage_passes, merged_swatch.height, delta=1)  # Alignment transfers between the bands are not predicted.
+        calibrated_plan = self._quad_quilt("jersey", "jersey", "rib", "rib", c=1, width=4, height=2).plan_merge(Merge_Cost_Model.calibrate(plan.processed_instructions, 2.0))
+        self.assertAlmostEqual(calibrated_plan.estimated_seconds, 2.0)
+        self.assertEqual(json.loads(json.dumps(plan.report()))["peak_live_swatches"], 5)
+
+    def test_plan_multi_wale_merge(self):
+        plan = self._fork_quilt("jersey", "rib", "seed", c=1, height=3).plan_merge(multi_wale_merges=True)
+        self.assertEqual([m.merge_process for m in plan.planned_merges], ["Multi_Wale_Merge_Process"])
+        self.assertEqual(len(plan.planned_merges[0].merged_swatches), 3)
+        sequential_plan = self._fork_quilt("jersey", "rib", "seed", c=1, height=3).plan_merge()
+        self.assertEqual([m.merge_process for m in sequential_plan.planned_merges], ["Wale_Merge_Process", "Wale_Merge_Process"])
+        self.assertGreater(sequential_plan.processed_instructions, plan.processed_instructions)
+
+    @staticmethod
+    def _read_dat_files(dat_paths: set[str]) -> dict[str, bytes]:
+        dat_files = {}
+        for dat_path in dat_paths:
+            with open(dat_path, "rb") as dat_file:
+                dat_files[dat_path] = dat_file.read()
+        return dat_files
+
+    def test_background_compiles_match_inline_compiles(self):
+        quilt = self._quad_quilt("jersey", "jersey", "rib", "rib", c=1, width=4, height=2)
+        existing_dats = set(glob.glob("*.dat"))
+        quilt.merge_quilt(compile_merges=True, compile_bands=True)
+        inline_dats = self._read_dat_files(set(glob.glob("*.dat")) - existing_dats)
+        for dat_path in inline_dats:
+            os.remove(dat_path)
+        quilt = self._quad_quilt("jersey", "jersey", "rib", "rib", c=1, width=4, height=2)
+        with Dat_Compile_Pool(max_workers=2) as compile_pool:
+            quilt.merge_quilt(compile_merges=True, compile_bands=True, compile_pool=compile_pool)
+            self.assertEqual(set(compile_pool.compile_seconds), set(inline_dats))
+        self.assertTrue(all(seconds > 0 for seconds in compile_pool.compile_seconds.values()))
+        self.assertEqual(self._read_dat_files(set(inline_dats)), inline_dats)
+
+    def test_gather_records_successful_compiles_before_raising(self):
+        jersey_k = load_test_knitscript_to_knitout_to_dat("jersey.ks", "jersey.k", "jersey.dat", c=1, width=4, height=2)
+        with open(jersey_k) as knitout_file:
+            jersey_program = knitout_file.read()
+        with Dat_Compile_Pool(max_workers=2) as compile_pool:
+            compile_pool.submit("not knitout", "broken.dat")
+            compile_pool.submit(jersey_program, "jersey_background.dat")
+            with self.assertRaises(Exception):
+                compile_pool.gather()
+            self.assertEqual(set(compile_pool.compile_seconds), {"jersey_background.dat"})
+            self.assertEqual(compile_pool.gather(), compile_pool.compile_seconds)
+        self.assertTrue(os.path.exists("jersey_background.dat"))
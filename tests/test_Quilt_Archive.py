@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+
+from quilt_knit.quilt.Quilt import Quilt
+from quilt_knit.quilt.Quilt_Archive import Quilt_Archive
+from quilt_knit.swatch.Swatch import Swatch
+
+
+class TestQuilt_Archive(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+
+    @staticmethod
+    def _quad_quilt() -> Quilt:
+        rib_k = load_test_knitscript_to_knitout_to_dat("rib.ks", "rib.k", "rib.dat", c=1, width=4, height=4)
+        return Quilt.from_grid([[Swatch("left bottom", rib_k), Swatch("right bottom", rib_k)], [Swatch("left top", rib_k), Swatch("right top", rib_k)]])
+
+    def test_round_trip_preserves_quilt(self):
+        quilt = self._quad_quilt()
+        quilt.swatches_to_rightward_shifts[next(s for s in quilt.swatch_neighborhoods if s.name == "left top")] = 2
+        with tempfile.TemporaryDirectory() as archive_directory:
+            archive_path = os.path.join(archive_directory, "quad.quilt")
+            quilt.save(archive_path)
+            with open(archive_path, "rb") as archive_file:
+                archive_bytes = archive_file.read()
+            Quilt_Archive.save(quilt, archive_path)
+            with open(archive_path, "rb") as archive_file:
+                self.assertEqual(archive_file.read(), archive_bytes)
+            loaded_quilt = Quilt.load(archive_path)
+        self.assertEqual(Quilt_Archive.manifest(loaded_quilt), Quilt_Archive.manifest(quilt))
+        self.assertEqual(loaded_quilt.course_wise_connections.number_of_edges(), 2)
+        self.assertEqual(loaded_quilt.wale_wise_connections.number_of_edges(), 2)
+        for swatch, neighborhood in quilt.swatch_neighborhoods.items():
+            loaded_neighborhood = loaded_quilt.swatch_neighborhoods[swatch]
+            self.assertEqual(loaded_neighborhood.swatch.height, swatch.height)
+            self.assertEqual(loaded_neighborhood.swatch.width, swatch.width)
+            self.assertEqual(loaded_neighborhood.get_all_connections(), neighborhood.get_all_connections())
+        loaded_quilt.swatches_to_rightward_shifts = {swatch: 0 for swatch in loaded_quilt.swatch_neighborhoods}
+        quilt.swatches_to_rightward_shifts = {swatch: 0 for swatch in quilt.swatch_neighborhoods}
+        loaded_merge = sorted(loaded_quilt.merge_quilt(), key=lambda s: s.name)
+        merge = sorted(quilt.merge_quilt(), key=lambda s: s.name)
+        self.assertEqual([(s.name, s.width, s.height) for s in loaded_merge], [(s.name, s.width, s.height) for s in merge])
+
+    def test_load_rejects_other_archives(self):
+        with tempfile.TemporaryDirectory() as archive_directory:
+            archive_path = os.path.join(archive_directory, "other.zip")
+            with zipfile.ZipFile(archive_path, "w") as archive:
+                archive.writestr("readme.txt", "not a quilt")
+            with self.assertRaises(ValueError):
+                Quilt_Archive.load(archive_path)
+            with zipfile.ZipFile(archive_path, "w") as archive:
+                archive.writestr(Quilt_Archive.MANIFEST, json.dumps({"format": Quilt_Archive.FORMAT, "version": Quilt_Archive.VERSION + 1}))
+            with self.assertRaises(ValueError):
+                Quilt_Archive.load(archive_path)
@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from clean_up_tests import cleanup_test_files
+from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+
+from quilt_knit.quilt.Quilt import Quilt
+from quilt_knit.quilt.Quilt_Merge_Checkpoint import Quilt_Merge_Checkpoint
+from quilt_knit.swatch.Swatch import Swatch
+
+
+class _Interrupted_Merge(Exception):
+    pass
+
+
+class TestQuilt_Merge_Checkpoint(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+        self.jersey_k = load_test_knitscript_to_knitout_to_dat("jersey.ks", "jersey.k", "jersey.dat", c=1, width=4, height=2)
+
+    def _grid_quilt(self, separate_columns: bool = False) -> Quilt:
+        rows = [[Swatch(f"swatch {row} {column}", self.jersey_k) for column in range(2)] for row in range(3)]
+        if separate_columns:  # A gap between the columns leaves them without course-wise connections, so each column is stacked into its own swatch.
+            return Quilt.from_grid([[left, None, right] for left, right in rows])
+        return Quilt.from_grid(rows)
+
+    def _interrupted_merge(self, checkpoint_directory: str, interrupted_method: str, interrupt_after: int, separate_columns: bool = False) -> None:
+        saved_checkpoints = []
+        save_checkpoint = getattr(Quilt_Merge_Checkpoint, interrupted_method)
+
+        def _save_then_interrupt(checkpoint: Quilt_Merge_Checkpoint, *args, **kwargs):
+            save_checkpoint(checkpoint, *args, **kwargs)
+            saved_checkpoints.append(args)
+            if len(saved_checkpoints) == interrupt_after:
+                raise _Interrupted_Merge()
+
+        with mock.patch.object(Quilt_Merge_Checkpoint, interrupted_method, _save_then_interrupt), self.assertRaises(_Interrupted_Merge):
+            self._grid_quilt(separate_columns).merge_quilt(checkpoint_directory=checkpoint_directory)
+
+    def _assert_matches_uninterrupted_merge(self, resumed_swatches: set[Swatch], separate_columns: bool = False) -> None:
+        merged_swatches = self._grid_quilt(separate_columns).merge_quilt()
+        self.assertEqual(sorted((s.name, s.width, s.height, len(s.carriage_passes)) for s in resumed_swatches),
+                         sorted((s.name, s.width, s.height, len(s.carriage_passes)) for s in merged_swatches))
+
+    def test_resume_from_course_band_checkpoint(self):
+        with tempfile.TemporaryDirectory() as checkpoint_directory:
+            self._interrupted_merge(checkpoint_directory, "save_course_bands", 1)
+            with open(os.path.join(checkpoint_directory, Quilt_Merge_Checkpoint.CHECKPOINT_FILE)) as checkpoint_file:
+                self.assertEqual(json.load(checkpoint_file)["phase"], "course_bands")
+            resumed_swatches = Quilt().merge_quilt(resume_from=checkpoint_directory)
+            with open(os.path.join(checkpoint_directory, Quilt_Merge_Checkpoint.CHECKPOINT_FILE)) as checkpoint_file:
+                checkpoint_record = json.load(checkpoint_file)
+            self.assertEqual(checkpoint_record["phase"], "wale_stacking")
+            self.assertEqual(sorted(os.listdir(checkpoint_directory)), sorted([Quilt_Merge_Checkpoint.CHECKPOINT_FILE, checkpoint_record["quilt"],
+                                                                               checkpoint_record["merged_swatches"]["file"]]))
+        self._assert_matches_uninterrupted_merge(resumed_swatches)
+
+    def test_resume_from_wale_stacking_checkpoint(self):
+        with tempfile.TemporaryDirectory() as checkpoint_directory:
+            self._interrupted_merge(checkpoint_directory, "save_wale_stacking", 2)
+            state = Quilt_Merge_Checkpoint.load(checkpoint_directory, Quilt)
+            self.assertGreater(state.step, 0)
+            self.assertTrue(any(s.name.startswith("merged_quilt_") for s in state.resets.values()))
+            with self.assertRaises(ValueError):
+                Quilt().merge_quilt(multi_wale_merges=True, resume_from=checkpoint_directory)
+            resumed_swatches = Quilt().merge_quilt(resume_from=checkpoint_directory)
+        self._assert_matches_uninterrupted_merge(resumed_swatches)
+
+    def test_wale_stacking_checkpoint_keeps_only_remaining_merges(self):
+        with tempfile.TemporaryDirectory() as checkpoint_directory:
+            self._interrupted_merge(checkpoint_directory, "save_wale_stacking", 3)
+            with open(os.path.join(checkpoint_directory, Quilt_Merge_Checkpoint.CHECKPOINT_FILE)) as checkpoint_file:
+                checkpoint_record = json.load(checkpoint_file)
+            self.assertEqual(checkpoint_record["merged_swatches"]["names"], ["merged_quilt_1_0"])
+            state = Quilt_Merge_Checkpoint.load(checkpoint_directory, Quilt)
+            merged_swatch = next(iter(state.swatch_includes))
+            self.assertEqual(len(state.swatch_includes), 1)
+            self.assertTrue(all(reset is merged_swatch for reset in state.resets.values()))
+            resumed_swatches = Quilt().merge_quilt(resume_from=checkpoint_directory)
+        self._assert_matches_uninterrupted_merge(resumed_swatches)
+
+    def test_resume_with_several_live_merged_swatches(self):
+        with tempfile.TemporaryDirectory() as checkpoint_directory:
+            self._interrupted_merge(checkpoint_directory, "save_wale_stacking", 3, separate_columns=True)
+            state = Quilt_Merge_Checkpoint.load(checkpoint_directory, Quilt)
+            assert state.swatch_includes is not None
+            live_merged_swatches = [swatch for swatch in state.swatch_includes if swatch.name.startswith("merged_quilt_")]
+            self.assertEqual(len(live_merged_swatches), 2)
+            self.assertNotEqual(live_merged_swatches[0].name, live_merged_swatches[1].name)
+            resumed_swatches = Quilt().merge_quilt(resume_from=checkpoint_directory)
+        self.assertEqual(len(resumed_swatches), 2)
+        self._assert_matches_uninterrupted_merge(resumed_swatches, separate_columns=True)
@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+
+from quilt_knit.LRU_Cache import LRU_Cache
+from quilt_knit.Quilt_Merge_Worker import Quilt_Merge_Worker
+
+
+class TestQuilt_Merge_Worker(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+        self.jersey_k = os.path.abspath(load_test_knitscript_to_knitout_to_dat("jersey.ks", "jersey.k", "jersey.dat", c=1, width=4, height=2))
+
+    def test_lru_cache_evicts_least_recently_used(self):
+        cache: LRU_Cache[str, int] = LRU_Cache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.report(), {"entries": 2, "max_entries": 2, "hits": 1, "misses": 1, "evictions": 1})
+
+    def test_spool_reuses_merges_between_jobs(self):
+        with tempfile.TemporaryDirectory() as spool_directory, Quilt_Merge_Worker(max_cached_swatches=1, workers=1) as worker:
+            incoming_directory = os.path.join(spool_directory, Quilt_Merge_Worker.INCOMING)
+            os.makedirs(incoming_directory)
+            shutil.copy(self.jersey_k, os.path.join(incoming_directory, "jersey.k"))
+            column_spec = {"swatches": {"bottom": "jersey.k", "top": "jersey.k"}, "grid": [["bottom"], ["top"]]}
+            for job_name, spec in [("a_column", column_spec), ("b_column", {**column_spec, "compile_dat": False}),
+                                   ("c_broken", {"swatches": {"left": "jersey.k"}, "grid": [["left", "right"]]})]:
+                with open(os.path.join(incoming_directory, f"{job_name}.json"), "w") as spec_file:
+                    json.dump(spec, spec_file)
+            self.assertEqual(worker.process_spool(spool_directory), 3)
+            self.assertEqual(worker.compile_pool.compile_seconds, {})
+            self.assertEqual(sorted(os.listdir(os.path.join(spool_directory, Quilt_Merge_Worker.DONE))), ["a_column.json", "b_column.json"])
+            self.assertEqual(os.listdir(os.path.join(spool_directory, Quilt_Merge_Worker.FAILED)), ["c_broken.json"])
+            results_directory = os.path.join(spool_directory, Quilt_Merge_Worker.RESULTS)
+            job_metrics = {}
+            for job_name in ["a_column", "b_column", "c_broken"]:
+                with open(os.path.join(results_directory, job_name, "metrics.json")) as metrics_file:
+                    job_metrics[job_name] = json.load(metrics_file)
+            self.assertFalse(job_metrics["a_column"]["merge_cached"])
+            self.assertTrue(os.path.exists(os.path.join(results_directory, "a_column", "a_column.dat")))
+            self.assertTrue(job_metrics["b_column"]["merge_cached"])
+            for swatch_metric in ["width", "height", "carriage_passes"]:
+                self.assertEqual(job_metrics["b_column"]["swatches"][0][swatch_metric], job_metrics["a_column"]["swatches"][0][swatch_metric])
+            self.assertTrue(os.path.exists(os.path.join(results_directory, "b_column", "b_column.k")))
+            self.assertIn("error", job_metrics["c_broken"])
+            self.assertEqual(worker.report()["jobs_completed"], 2)
+            self.assertEqual(worker.report()["jobs_failed"], 1)
+            self.assertEqual(worker.merge_results.report()["hits"], 1)
+
+    def test_socket_requests(self):
+        with tempfile.TemporaryDirectory() as work_directory, Quilt_Merge_Worker(workers=1) as worker:
+            socket_path = os.path.join(work_directory, "worker.sock")
+            served = []
+            server = threading.Thread(target=lambda: served.append(worker.serve_socket(socket_path, max_jobs=2)))
+            server.start()
+            while not os.path.exists(socket_path):
+                time.sleep(0.01)
+            row_spec = {"name": "row", "swatches": {"left": self.jersey_k, "right": self.jersey_k}, "grid": [["left", "right"]], "compile_dat": False}
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(socket_path)
+                client.sendall(f"{json.dumps({'spec': row_spec, 'output_dir': work_directory})}\nnot json\n".encode())
+                with client.makefile("r") as stream:
+                    responses = [json.loads(stream.readline()) for _ in range(2)]
+            server.join()
+            self.assertEqual(served, [2])
+            self.assertEqual(responses[0]["swatches"][0]["width"], 8)
+            self.assertTrue(os.path.exists(os.path.join(work_directory, "row.k")))
+            self.assertIn("error", responses[1])
+            self.assertFalse(os.path.exists(socket_path))
+
+    def test_socket_survives_malformed_requests_and_disconnects(self):
+        with tempfile.TemporaryDirectory() as work_directory, Quilt_Merge_Worker(workers=1) as worker:
+            socket_path = os.path.join(work_directory, "worker.sock")
+            served = []
+            server = threading.Thread(target=lambda: served.append(worker.serve_socket(socket_path, max_jobs=4)))
+            server.start()
+            while not os.path.exists(socket_path):
+                time.sleep(0.01)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(socket_path)
+                client.sendall(b'[1]\n5\n')
+                with client.makefile("r") as stream:
+                    malformed_responses = [json.loads(stream.readline()) for _ in range(2)]
+            row_spec = {"name": "row", "swatches": {"left": self.jersey_k, "right": self.jersey_k}, "grid": [["left", "right"]], "compile_dat": False}
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:  # Disconnects without reading its response.
+                client.connect(socket_path)
+                client.sendall(f"{json.dumps({'spec': row_spec, 'output_dir': work_directory})}\n".encode())
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(socket_path)
+                client.sendall(b'"x"\n')
+                with client.makefile("r") as stream:
+                    last_response = json.loads(stream.readline())
+            server.join()
+            self.assertEqual(served, [4])
+            self.assertTrue(all("error" in response for response in [*malformed_responses, last_response]))
+            self.assertFalse(os.path.exists(socket_path))
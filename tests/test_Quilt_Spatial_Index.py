@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+
+from quilt_knit.quilt.Quilt import Blocked_Swatch_Connection_Exception, Quilt
+from quilt_knit.swatch.Swatch import Swatch
+
+
+class TestQuilt_Spatial_Index(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+        self.jersey_k = load_test_knitscript_to_knitout_to_dat("jersey.ks", "jersey.k", "jersey.dat", c=1, width=4, height=2)
+
+    def _assert_matches_neighborhoods(self, quilt: Quilt) -> None:
+        for swatch, neighborhood in quilt.swatch_neighborhoods.items():
+            for lower_course, upper_course in [(0, None), (0, 1), (1, swatch.height), (swatch.height, swatch.height)]:
+                self.assertEqual(quilt.spatial_index.get_connections_to_courses(swatch, lower_course, upper_course),
+                                 neighborhood.get_connections_to_courses(lower_course, upper_course))
+
+    def test_grid_swatches_share_a_frame(self):
+        grid = [[Swatch(f"swatch {row} {column}", self.jersey_k) for column in range(2)] for row in range(2)]
+        quilt = Quilt.from_grid(grid)
+        placements = quilt.spatial_index.placements
+        bottom_height = grid[0][0].height
+        self.assertEqual([[placements[swatch] for swatch in row] for row in grid], [[(0, 0), (4, 0)], [(0, bottom_height), (4, bottom_height)]])
+        self.assertEqual(quilt.spatial_index.seam_connections(True, 4, 0, bottom_height + grid[1][0].height),
+                         {quilt.get_connection(grid[0][0], grid[0][1]), quilt.get_connection(grid[1][0], grid[1][1])})
+        self.assertEqual(quilt.spatial_index.seam_connections(False, bottom_height, 0, 4), {quilt.get_connection(grid[0][0], grid[1][0])})
+        self.assertEqual(quilt.spatial_index.seam_connections(False, bottom_height + 1, 0, 8), set())
+        self._assert_matches_neighborhoods(quilt)
+
+    def test_course_wise_merge_keeps_index_in_sync(self):
+        grid = [[Swatch(f"swatch {row} {column}", self.jersey_k) for column in range(2)] for row in range(2)]
+        quilt = Quilt.from_grid(grid)
+        merged_swatch, _upper_slices, _lower_slices = quilt.merge_swatches_course_wise(grid[0][0], grid[0][1])
+        self.assertNotIn(grid[0][1], quilt.spatial_index.placements)
+        self.assertEqual(quilt.spatial_index.placements[merged_swatch], (0, 0))
+        self._assert_matches_neighborhoods(quilt)
+
+    def test_blocking_and_enveloped_connections(self):
+        left_swatch = Swatch("left", self.jersey_k)
+        lower_right_swatch = Swatch("lower right", self.jersey_k)
+        upper_right_swatch = Swatch("upper right", self.jersey_k)
+        quilt = Quilt()
+        lower_connection = quilt.connect_swatches_course_wise(left_swatch, lower_right_swatch, 0, 2, 0, 2)
+        with self.assertRaises(Blocked_Swatch_Connection_Exception) as blocked:
+            quilt.connect_swatches_course_wise(left_swatch, upper_right_swatch, 1, 3, 0, 2)
+        self.assertEqual(blocked.exception.blocking_connections, {lower_connection})
+        enveloping_connection = quilt.connect_swatches_course_wise(left_swatch, upper_right_swatch, 0, 3, 0, 3)
+        self.assertNotIn(lower_connection, quilt)
+        self.assertNotIn(lower_right_swatch, quilt.spatial_index.placements)
+        self.assertEqual(quilt.spatial_index.get_connections_to_courses(left_swatch), {enveloping_connection})
+        self._assert_matches_neighborhoods(quilt)
@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+
+from quilt_knit.cli import main
+from quilt_knit.quilt.Quilt_Spec import Quilt_Spec
+from quilt_knit.swatch.Swatch_Cache import Swatch_Cache
+
+
+class TestQuilt_Spec(TestCase):
+    def setUp(self):
+        cleanup_test_files()
+        self.jersey_k = os.path.abspath(load_test_knitscript_to_knitout_to_dat("jersey.ks", "jersey.k", "jersey.dat", c=1, width=4, height=2))
+
+    def test_toml_spec_builds_quilt(self):
+        with tempfile.TemporaryDirectory() as spec_directory:
+            spec_path = os.path.join(spec_directory, "quad.toml")
+            with open(spec_path, "w") as spec_file:
+                spec_file.write(f'grid = [["left_bottom", "right_bottom"], ["left_top", ""]]\n'
+                                f'[swatches]\nleft_bottom = "{self.jersey_k}"\nright_bottom = "{self.jersey_k}"\nleft_top = "{self.jersey_k}"\nright_top = "{self.jersey_k}"\n'
+                                f'[[course_wise]]\nleft = "left_top"\nright = "right_top"\n'
+                                f'[[wale_wise]]\nbottom = "right_bottom"\ntop = "right_top"\n'
+                                f'[merge]\nbalanced_course_merges = true\n')
+            spec = Quilt_Spec.load(spec_path)
+        self.assertEqual(spec.name, "quad")
+        self.assertEqual(spec.grid, [["left_bottom", "right_bottom"], ["left_top", None]])
+        swatch_cache = Swatch_Cache()
+        quilt = spec.build_quilt(swatch_cache)
+        self.assertEqual(swatch_cache.report(), {"hits": 3, "misses": 1, "cached_programs": 1, "evicted_programs": 0})
+        self.assertEqual(len(quilt.swatch_neighborhoods), 4)
+        self.assertEqual(quilt.course_wise_connections.number_of_edges(), 2)
+        self.assertEqual(quilt.wale_wise_connections.number_of_edges(), 2)
+        self.assertEqual(len(quilt.merge_quilt(**spec.merge_options)), 1)
+
+    def test_spec_rejects_unknown_names(self):
+        with self.assertRaises(ValueError):
+            Quilt_Spec.from_dict({"swatches": {"a": self.jersey_k}, "grid": [["a", "b"]]})
+        with self.assertRaises(ValueError):
+            Quilt_Spec.from_dict({"swatches": {"a": self.jersey_k, "b": self.jersey_k}, "course_wise": [{"left": "a", "right": "b", "first_needle": 0}]})
+        with self.assertRaises(ValueError):
+            Quilt_Spec.from_dict({"swatches": {"a": self.jersey_k}, "merge": {"compile_merges": True}})
+
+    def test_command_line_batch(self):
+        with tempfile.TemporaryDirectory() as work_directory:
+            spec_directory = os.path.join(work_directory, "specs")
+            output_directory = os.path.join(work_directory, "out")
+            cache_directory = os.path.join(work_directory, "cache")
+            os.makedirs(spec_directory)
+            with open(os.path.join(spec_directory, "column.json"), "w") as spec_file:
+                json.dump({"swatches": {"bottom": self.jersey_k, "top": self.jersey_k}, "grid": [["bottom"], ["top"]]}, spec_file)
+            with open(os.path.join(spec_directory, "row.json"), "w") as spec_file:
+                json.dump({"name": "jersey_row", "swatches": {"left": self.jersey_k, "right": self.jersey_k}, "grid": [["left", "right"]], "compile_dat": False}, spec_file)
+            with open(os.path.join(spec_directory, "broken.json"), "w") as spec_file:
+                json.dump({"swatches": {"left": self.jersey_k}, "grid": [["left", "right"]]}, spec_file)
+            status = main([spec_directory, "-o", output_directory, "-w", "1", "--cache-dir", cache_directory, "--profile"])
+            with open(os.path.join(output_directory, "metrics.json")) as metrics_file:
+                metrics = json.load(metrics_file)
+            self.assertEqual(status, 1)
+            self.assertEqual([quilt_metrics["spec"] for quilt_metrics in metrics["quilts"]], [os.path.join(spec_directory, name) for name in ["broken.json", "column.json", "row.json"]])
+            self.assertIn("error", metrics["quilts"][0])
+            self.assertEqual(metrics["swatch_cache"], {"hits": 3, "misses": 1, "cached_programs": 1, "evicted_programs": 0})
+            self.assertEqual(len(os.listdir(cache_directory)), 1)
+            column_metrics, row_metrics = metrics["quilts"][1:]
+            self.assertTrue(os.path.exists(column_metrics["swatches"][0]["knitout"]))
+            self.assertTrue(os.path.exists(column_metrics["swatches"][0]["dat"]))
+            self.assertIn(column_metrics["swatches"][0]["dat"], metrics["dat_compile_seconds"])
+            self.assertEqual(row_metrics["swatches"][0]["knitout"], os.path.join(output_directory, "jersey_row.k"))
+            self.assertIsNone(row_metrics["swatches"][0]["dat"])
+            self.assertEqual(row_metrics["swatches"][0]["width"], 8)
+            self.assertGreater(row_metrics["profile"]["phases"]["connection_selection"]["calls"], 0)
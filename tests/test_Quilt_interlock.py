@@ -1,21 +1,15 @@
 from unittest import TestCase
 
 from clean_up_tests import cleanup_test_files
-from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+from resources.load_ks_resources import load_test_swatch
 
-from quilt_knit.quilt.Quilt import Quilt
-from quilt_knit.swatch.Swatch import Swatch
+from quilt_knit.quilt.Quilt import Quilt, Unsupported_Merge_Option_Warning
 
 
 class TestQuilt(TestCase):
     def setUp(self):
         cleanup_test_files()
 
-    @staticmethod
-    def _swatch(ks: str, swatch_name: str, **python_vars) -> Swatch:
-        swatch_k = load_test_knitscript_to_knitout_to_dat(f"{ks}.ks", f"{ks}.k", f"{ks}.dat", **python_vars)
-        return Swatch(swatch_name, swatch_k)
-
     @staticmethod
     def _interlock_quilt(left_bottom_ks: str, right_bottom_ks: str, left_top_ks: str, right_top_ks: str, center_ks: str,
                          width: tuple[int, int], height: tuple[int, int], **python_vars) -> Quilt:
@@ -25,13 +19,13 @@ class TestQuilt(TestCase):
         tall_vars.update(python_vars)
         square_vars = {"width": width[0], "height": height[0]}
         square_vars.update(python_vars)
-        left_bottom = TestQuilt._swatch(left_bottom_ks, "left bottom", **wide_vars)
-        right_bottom = TestQuilt._swatch(right_bottom_ks, "right bottom", **tall_vars)
-        center = TestQuilt._swatch(center_ks, "center", **square_vars)
+        left_bottom = load_test_swatch(left_bottom_ks, "left bottom", **wide_vars)
+        right_bottom = load_test_swatch(right_bottom_ks, "right bottom", **tall_vars)
+        center = load_test_swatch(center_ks, "center", **square_vars)
         center.remove_cast_on_boundary()
-        left_top = TestQuilt._swatch(left_top_ks, "left top", **tall_vars)
+        left_top = load_test_swatch(left_top_ks, "left top", **tall_vars)
         left_top.remove_cast_on_boundary()
-        right_top = TestQuilt._swatch(right_top_ks, "right top", **wide_vars)
+        right_top = load_test_swatch(right_top_ks, "right top", **wide_vars)
         right_top.remove_cast_on_boundary()
         quilt = Quilt()
         quilt.connect_swatches_wale_wise(left_bottom, left_top, bottom_rightmost_needle_position=left_top.max_needle)
@@ -57,7 +51,19 @@ class TestQuilt(TestCase):
             swatch.compile_to_dat('jersey_merge')
             self.assertEqual(swatch.width, 12)
             self.assertEqual(swatch.height, 14)
-            self.assertEqual(len(swatch.knitout_program), 169)
+            self.assertEqual(len(swatch.knitout_program), 168)
+
+    def test_jersey_quilt_with_multi_course_merges(self):
+        quilt = self._interlock_quilt("jersey", "jersey", "jersey", "jersey", "jersey",
+                                      width=(4, 8), height=(4, 8), c=1)
+        # The course-wise connections of the interlock only span part of their swatches, so the rows are merged pairwise.
+        with self.assertWarns(Unsupported_Merge_Option_Warning):
+            swatches = quilt.merge_quilt(multi_course_merges=True)
+        self.assertEqual(len(swatches), 1)
+        for swatch in swatches:
+            self.assertEqual(swatch.width, 12)
+            self.assertEqual(swatch.height, 14)
+            self.assertEqual(len(swatch.knitout_program), 168)
 
     def test_rib_quilt(self):
         quilt = self._interlock_quilt("rib", "rib", "rib", "rib", "rib",
@@ -69,7 +75,7 @@ class TestQuilt(TestCase):
             self.assertEqual(swatch.width, 12)
             self.assertEqual(swatch.height, 15)
             self.assertEqual(swatch.constructed_height, 14)
-            self.assertEqual(len(swatch.knitout_program), 175)
+            self.assertEqual(len(swatch.knitout_program), 174)
 
     def test_seed_quilt(self):
         quilt = self._interlock_quilt("seed", "seed", "seed", "seed", "seed",
@@ -81,7 +87,7 @@ class TestQuilt(TestCase):
             self.assertEqual(swatch.width, 12)
             self.assertEqual(swatch.height, 26)
             self.assertEqual(swatch.constructed_height, 14)
-            self.assertEqual(len(swatch.knitout_program), 307)
+            self.assertEqual(len(swatch.knitout_program), 306)
 
     def test_lace_quilt(self):
         quilt = self._interlock_quilt("lace", "left_lace", "left_lace", "lace", "left_lace",
@@ -93,7 +99,7 @@ class TestQuilt(TestCase):
             self.assertEqual(swatch.width, 12)
             self.assertEqual(swatch.height, 34)
             self.assertEqual(swatch.constructed_height, 14)
-            self.assertEqual(len(swatch.knitout_program), 218)
+            self.assertEqual(len(swatch.knitout_program), 217)
 
     def test_cable_quilt(self):
         quilt = self._interlock_quilt("cable", "left_cable", "left_cable", "cable", "left_cable",
@@ -105,7 +111,7 @@ class TestQuilt(TestCase):
             self.assertEqual(swatch.width, 12)
             self.assertEqual(swatch.height, 46)
             self.assertEqual(swatch.constructed_height, 14)
-            self.assertEqual(len(swatch.knitout_program), 266)
+            self.assertEqual(len(swatch.knitout_program), 265)
 
     def test_jacquard_quilt(self):
         quilt = self._interlock_quilt("jacquard", "jacquard", "jacquard", "jacquard", "jacquard",
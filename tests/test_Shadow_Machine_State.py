@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from clean_up_tests import cleanup_test_files
+from resources.load_ks_resources import load_test_knitscript_to_knitout_to_dat
+
+from quilt_knit.swatch.Shadow_Machine_State import Shadow_Machine_State
+from quilt_knit.swatch.Swatch import Swatch
+
+
+class TestShadow_Machine_State(TestCase):
+
+    def setUp(self):
+        cleanup_test_files()
+
+    def _assert_shadow_matches_execution(self, swatch_ks: str, **python_vars) -> None:
+        swatch_k = load_test_knitscript_to_knitout_to_dat(f"{swatch_ks}.ks", f"{swatch_ks}.k", f"{swatch_ks}.dat", **python_vars)
+        swatch = Swatch(swatch_ks, swatch_k)
+        shadow = Shadow_Machine_State()
+        for instruction in swatch.knitout_program:
+            shadow.execute(instruction)
+        machine = swatch.execution_knitting_machine
+        self.assertEqual(shadow.rack, machine.rack)
+        self.assertEqual(shadow.all_needle_rack, machine.all_needle_rack)
+        self.assertEqual(shadow.active_carrier_ids, {c.carrier_id for c in machine.carrier_system.active_carriers})
+        self.assertEqual(shadow.inserting_hook_available, machine.carrier_system.inserting_hook_available)
+        self.assertEqual(shadow.loop_holding_needles(), machine.all_loops())
+
+    def test_jersey(self):
+        self._assert_shadow_matches_execution('jersey', c=1, width=6, height=4)
+
+    def test_lace(self):
+        self._assert_shadow_matches_execution('lace', c=1, width=8, height=6)
+
+    def test_cable(self):
+        self._assert_shadow_matches_execution('cable', c=1, width=8, height=6)
+
+    def test_missing_carriers_and_hook(self):
+        shadow = Shadow_Machine_State()
+        self.assertEqual(shadow.missing_carriers([1, 2]), [1, 2])
+        shadow.inhook(1)
+        self.assertFalse(shadow.inserting_hook_available)
+        self.assertEqual(shadow.missing_carriers([1, 2]), [2])
+        shadow.releasehook()
+        self.assertTrue(shadow.inserting_hook_available)
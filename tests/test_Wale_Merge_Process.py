@@ -42,6 +42,8 @@ class TestWale_Merge_Process(TestCase):
         merger.merge_swatches()
         merger.compile_to_dat('jersey_merge')
         self.assertEqual(len(merger.merged_instructions), 30)
+        with open('jersey_merge.dat', 'rb') as dat_file:
+            self.assertEqual(merger.compile_dat(), dat_file.read())
 
         connection = self._make_connection('jersey', 'jersey', c=1, width=4, height=3)
         merger = Wale_Merge_Process(connection)
@@ -154,3 +156,15 @@ class TestWale_Merge_Process(TestCase):
         merger.merge_swatches()
         merger.compile_to_dat('jacquard_seed')
         self.assertEqual(len(merger.merged_instructions), 55)
+
+    def test_merge_swatches_seam_window(self):
+        for bottom_ks, top_ks, python_vars in [('lace', 'cable', {'c': 1}), ('jacquard', 'jacquard', {'white': 1, 'black': 2})]:
+            connection = self._make_connection(bottom_ks, top_ks, width=6, height=8, **python_vars)
+            merger = Wale_Merge_Process(connection)
+            merger.merge_swatches()
+            full_program = [str(i) for i in merger.merged_instructions]
+            connection = self._make_connection(bottom_ks, top_ks, width=6, height=8, **python_vars)
+            merger = Wale_Merge_Process(connection)
+            merger.merge_swatches(seam_window=2)
+            self.assertEqual([str(i) for i in merger.merged_instructions], full_program)
+            merger.compile_to_dat(f'{bottom_ks}_{top_ks}_merge')
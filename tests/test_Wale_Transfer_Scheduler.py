@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from knitout_interpreter.knitout_operations.needle_instructions import Xfer_Instruction
+from virtual_knitting_machine.machine_components.needles.Needle import Needle
+from virtual_knitting_machine.machine_components.needles.Slider_Needle import (
+    Slider_Needle,
+)
+
+from quilt_knit.swatch.wale_wise_merging.Wale_Transfer_Scheduler import (
+    Wale_Transfer_Scheduler,
+)
+
+
+class TestWale_Transfer_Scheduler(TestCase):
+
+    @staticmethod
+    def _xfer(front_position: int, rack: int) -> Xfer_Instruction:
+        return Xfer_Instruction(Needle(True, front_position), Needle(False, front_position - rack))
+
+    def test_rack_order_sweeps_once(self):
+        transfers_by_racking = {rack: [self._xfer(5, rack)] for rack in [-1, 2, 0, -2, 1]}
+        scheduler = Wale_Transfer_Scheduler(transfers_by_racking, [])
+        self.assertEqual(scheduler.rack_order(), [1, 2, -1, -2])
+        transfer_passes = scheduler.schedule()
+        self.assertEqual([cp.rack for cp in transfer_passes], [0, 1, 2, -1, -2])
+
+    def test_slider_transfers_first(self):
+        slider_xfer = Xfer_Instruction(Needle(True, 3), Slider_Needle(is_front=False, position=3))
+        scheduler = Wale_Transfer_Scheduler({1: [self._xfer(4, 1)], 0: [self._xfer(6, 0)]}, [slider_xfer])
+        transfer_passes = scheduler.schedule()
+        self.assertEqual([cp.rack for cp in transfer_passes], [0, 0, 1])
+        self.assertIs(transfer_passes[0].first_instruction, slider_xfer)
+
+    def test_conflicting_transfers_are_split(self):
+        transfers = [self._xfer(2, 0), Xfer_Instruction(Needle(False, 2), Needle(True, 2)), self._xfer(4, 0)]
+        transfer_passes = Wale_Transfer_Scheduler({0: transfers}, []).schedule()
+        self.assertEqual(len(transfer_passes), 2)
+        self.assertEqual(sum(len(cp) for cp in transfer_passes), 3)
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+_SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def _imported_packages(module: str, packages: list[str]) -> list[str]:
+    environment = {**os.environ, "PYTHONPATH": os.pathsep.join(path for path in [_SOURCE_DIRECTORY, os.environ.get("PYTHONPATH")] if path)}
+    check = f"import sys, {module}; print(','.join(package for package in {packages!r} if package in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, env=environment, check=True)
+    return [package for package in result.stdout.strip().split(",") if package]
+
+
+class TestLazyImports(TestCase):
+    def test_quilt_import_defers_dat_backend_and_parser(self):
+        self.assertEqual(_imported_packages("quilt_knit.quilt.Quilt", ["knitout_to_dat_python", "parglare", "quilt_knit.swatch.Dat_Compile_Pool"]), [])
+
+    def test_cli_import_defers_merging_modules(self):
+        self.assertEqual(_imported_packages("quilt_knit.cli", ["quilt_knit.swatch.Swatch", "virtual_knitting_machine"]), [])